@@ -0,0 +1,73 @@
+"""
+Benchmarks of tofu.data, on a synthetic Plasma2D
+
+Each class is a benchmark suite (asv-style):
+    - setup() builds the inputs (not timed)
+    - each time_*() method is timed
+
+Run them with run_benchmarks.py
+"""
+
+# Common
+import numpy as np
+import matplotlib.tri as mpltri
+
+# tofu
+import tofu.data as tfd
+
+
+def _get_plasma2d(nt=50, nR=65, nZ=97, nrho=100):
+    t = np.linspace(0., 1., nt)
+    R, Z = np.meshgrid(np.linspace(1.6, 3.2, nR),
+                       np.linspace(-1.2, 1.2, nZ), indexing='ij')
+    nodes = np.array([R.ravel(), Z.ravel()]).T
+    faces = mpltri.Triangulation(nodes[:, 0], nodes[:, 1]).triangles
+    rho = (np.hypot(nodes[:, 0] - 2.4, nodes[:, 1])[None, :]
+           * (1. + 0.1*t[:, None]))
+    rho1d = np.linspace(0., 2., nrho)
+    return tfd.Plasma2D(
+        dtime={'t': {'data': t}},
+        dradius={'rho1d': {'data': np.tile(rho1d, (t.size, 1)),
+                           'depend': ('t', 'rho1d')}},
+        dmesh={'m0': {'type': 'tri', 'ftype': 1, 'ntri': 1,
+                      'nodes': nodes, 'faces': faces}},
+        d1d={'te': {'data': np.exp(-rho1d[None, :]**2) * (1. + t[:, None]),
+                    'depend': ('t', 'rho1d'), 'quant': 'te'},
+             'rho': {'data': np.tile(rho1d, (t.size, 1)),
+                     'depend': ('t', 'rho1d'), 'quant': 'rho'}},
+        d2d={'emis': {'data': np.exp(-rho**2/0.3)*(1. + t[:, None]),
+                      'depend': ('t', 'm0')},
+             'rho2d': {'data': rho, 'depend': ('t', 'm0'), 'quant': 'rho'}},
+        Name='Bench', Exp='Bench',
+    )
+
+
+class Plasma2D_interp_pts2profile:
+    """ Interpolation of 1d / 2d profiles at arbitrary points """
+
+    def setup(self):
+        self.obj = _get_plasma2d()
+        npts = 100000
+        theta = np.linspace(0., 20.*np.pi, npts)
+        rr = np.linspace(0., 1., npts)
+        self.pts = np.array([2.4 + rr*np.cos(theta),
+                             np.zeros((npts,)),
+                             1.1*rr*np.sin(theta)])
+
+    def _interp(self, cache=True, **kwdargs):
+        if not cache:
+            self.obj.set_ptscache(clear=True)
+        self.obj.interp_pts2profile(pts=self.pts, interp_t='nearest',
+                                    fill_value=0., **kwdargs)
+
+    def time_2d_nocache(self):
+        self._interp(quant='emis', cache=False)
+
+    def time_2d_cached(self):
+        self._interp(quant='emis')
+
+    def time_1d_ref2d_nocache(self):
+        self._interp(quant='te', ref1d='rho', ref2d='rho2d', cache=False)
+
+    def time_2d_nthreads(self):
+        self._interp(quant='emis', cache=False, nthreads=4)
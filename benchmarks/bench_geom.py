@@ -0,0 +1,124 @@
+"""
+Benchmarks of the geometry kernels (tofu.geom._GG), on synthetic configs
+
+Each class is a benchmark suite (asv-style):
+    - setup() builds the inputs (not timed)
+    - each time_*() method is timed
+
+Run them with run_benchmarks.py
+"""
+
+# Common
+import numpy as np
+
+# tofu
+import tofu as tf
+
+
+_DCONFIG = {'R': 2.4, 'r': 1., 'elong': 0.3, 'Dshape': 0.2, 'nP': 200}
+_DCAM = {'pinhole': [3.4, 0., 0.], 'focal': 0.1, 'sensor_size': 0.1,
+         'orientation': [np.pi, np.pi/6, 0.]}
+
+
+def _get_config():
+    return tf.geom.utils.create_config(Exp='Bench', **_DCONFIG)
+
+
+def _get_cam(config, nD=1, sensor_nb=100):
+    func = (tf.geom.utils.create_CamLOS1D if nD == 1
+            else tf.geom.utils.create_CamLOS2D)
+    return func(sensor_nb=sensor_nb, config=config, Name='Bench', Exp='Bench',
+                Diag='Bench', **_DCAM)
+
+
+def _emiss(pts, t=None, vect=None):
+    emiss = np.exp(-(np.hypot(pts[0, :], pts[1, :]) - 2.4)**2/0.1
+                   - pts[2, :]**2/0.1)
+    if t is not None:
+        emiss = emiss[None, :] * (1. + np.atleast_1d(t)[:, None])
+    return emiss
+
+
+class LOS_kInkOut:
+    """ LOS / structures intersections (LOS_Calc_PInOut_VesStruct) """
+
+    def setup(self):
+        self.config = _get_config()
+        self.cam = _get_cam(self.config, nD=2, sensor_nb=100)
+
+    def time_compute_dgeom_1e4(self):
+        self.cam.compute_dgeom(extra=False)
+
+
+class LOS_calc_signal:
+    """ LOS integration of an emissivity (LOS_calc_signal) """
+
+    def setup(self):
+        self.config = _get_config()
+        self.cam = _get_cam(self.config, nD=1, sensor_nb=1000)
+        self.t = np.linspace(0., 1., 10)
+
+    def _calc(self, minimize, method='sum'):
+        self.cam.calc_signal(_emiss, t=self.t, res=0.005, resMode='abs',
+                             method=method, minimize=minimize, plot=False)
+
+    def time_sum_calls(self):
+        self._calc('calls')
+
+    def time_sum_memory(self):
+        self._calc('memory')
+
+    def time_sum_hybrid(self):
+        self._calc('hybrid')
+
+    def time_simps_calls(self):
+        self._calc('calls', method='simps')
+
+    def time_adaptive(self):
+        self.cam.calc_signal(_emiss, t=self.t, res=0.05, resMode='abs',
+                             method='adaptive', tol=1.e-4, plot=False)
+
+
+class Struct_sampling:
+    """ Surface and volume sampling of a structure """
+
+    def setup(self):
+        self.config = _get_config()
+        self.ves = self.config.lStruct[0]
+
+    def time_get_sampleS(self):
+        self.ves.get_sampleS(0.005, resMode='abs', returnas='(X,Y,Z)')
+
+    def time_get_sampleV(self):
+        self.ves.get_sampleV(0.02, resMode='abs', returnas='(X,Y,Z)')
+
+    def time_get_sampleV_domain(self):
+        self.ves.get_sampleV(0.01, resMode='abs', returnas='(X,Y,Z)',
+                             domain=[None, [-0.5, 0.5], [0., np.pi/4.]])
+
+
+class SolidAngle_map:
+    """ Integrated solid angle of particles (compute_solid_angle_map) """
+
+    def setup(self):
+        self.config = _get_config()
+        theta = np.linspace(-1., 1., 50)*np.pi
+        self.part_traj = np.array([2.4*np.cos(theta),
+                                   2.4*np.sin(theta),
+                                   0.2*np.sin(3.*theta)])
+        self.part_radius = 1.e-3
+
+    def _calc(self, block, eps_sang=None):
+        self.config.calc_solidangle_particle_integrated(
+            part_traj=self.part_traj, part_radius=self.part_radius,
+            resolution=0.2, block=block, eps_sang=eps_sang, plot=False,
+        )
+
+    def time_noblock(self):
+        self._calc(False)
+
+    def time_block(self):
+        self._calc(True)
+
+    def time_block_eps(self):
+        self._calc(True, eps_sang=1.e-6)
@@ -0,0 +1,101 @@
+"""
+Benchmarks of the spectral fitting routines of tofu.spectro
+
+Each class is a benchmark suite (asv-style):
+    - setup() builds the inputs (not timed)
+    - each time_*() method is timed
+
+Run them with run_benchmarks.py
+"""
+
+# Common
+import numpy as np
+
+# tofu
+import tofu.spectro as tfs
+
+
+_DLINES = {
+    'a': {'lambda0': 3.95e-10, 'delta': 0.001e-10, 'sigma': 0.002e-10,
+          'amp': 1., 'group': 0},
+    'b': {'lambda0': 3.97e-10, 'delta': -0.001e-10, 'sigma': 0.0015e-10,
+          'amp': 0.5, 'group': 1},
+    'c': {'lambda0': 3.975e-10, 'delta': 0.001e-10, 'sigma': 0.001e-10,
+          'amp': 0.6, 'group': 0},
+    'd': {'lambda0': 3.99e-10, 'delta': 0.002e-10, 'sigma': 0.002e-10,
+          'amp': 0.8, 'group': 1},
+}
+_DCONST = {'amp': False, 'width': 'group', 'shift': False,
+           'double': False, 'symmetry': False}
+
+
+def _get_spect2d(nlamb=200, nphi=51):
+    """ Synthetic 2d spectrum (phi, lamb): 4 gaussian lines + background """
+    lamb = np.linspace(3.94, 4, nlamb)*1e-10
+    phi = np.linspace(-25, 25, nphi)
+    spect2d = 0.1*np.exp(-(phi[:, None]-25)**2/10**2) + 0.*lamb[None, :]
+    for ii, (k0, v0) in enumerate(_DLINES.items()):
+        sigma = v0['sigma']*(1 + 0.5*(ii/len(_DLINES))
+                             * np.cos(phi[:, None]*2*np.pi/50))
+        spect2d += (v0['amp']*np.exp(-phi[:, None]**2/20**2)
+                    * np.exp(-(lamb[None, :] - v0['lambda0']
+                               - v0['delta'])**2 / (2*sigma**2)))
+    spect2d += 0.005*np.sin(lamb[None, :]*1e12 + phi[:, None])
+    return lamb, phi, spect2d
+
+
+class Spectro_fit1d:
+    """ multigausfit1d_from_dlines, on a stack of spectra """
+
+    def setup(self):
+        lamb, phi, spect2d = _get_spect2d()
+        self.dinput = tfs.fit1d_dinput(
+            dlines=_DLINES, dconstraints=_DCONST, data=spect2d[::5, :],
+            lamb=lamb, valid_fraction=0.28, valid_nsigma=0,
+        )
+
+    def time_fit1d_dense(self):
+        tfs.fit1d(dinput=self.dinput, jac='dense', verbose=0, plot=False)
+
+    def time_fit1d_dense_chain(self):
+        tfs.fit1d(dinput=self.dinput, jac='dense', chain=True,
+                  verbose=0, plot=False)
+
+    def time_fit1d_dense_chain_4workers(self):
+        tfs.fit1d(dinput=self.dinput, jac='dense', chain=True, nworkers=4,
+                  verbose=0, plot=False)
+
+
+class Spectro_fit2d:
+    """ multigausfit2d_from_dlines, on a 2d spectrum """
+
+    def setup(self):
+        self.lamb, self.phi, self.spect2d = _get_spect2d(nlamb=100)
+        self.dinput = self._dinput()
+
+    def _dinput(self):
+        return tfs.fit2d_dinput(
+            dlines=_DLINES, dconstraints=_DCONST,
+            data=self.spect2d[None, ...], lamb=self.lamb, phi=self.phi,
+            nbsplines=5, valid_fraction=0.28, valid_nsigma=0,
+        )
+
+    def time_fit2d_dinput(self):
+        self._dinput()
+
+    def time_fit2d_binning(self):
+        tfs._fit12d.multigausfit2d_from_dlines_prepare(
+            data=np.repeat(self.spect2d[None, ...], 50, axis=0),
+            lamb=self.lamb, phi=self.phi,
+            binning={'phi': 20, 'lamb': 50}, nbsplines=5,
+        )
+
+    def time_fit2d_dense(self):
+        tfs._fit12d.multigausfit2d_from_dlines(
+            dinput=self.dinput, jac='dense', verbose=0,
+        )
+
+    def time_fit2d_sparse(self):
+        tfs._fit12d.multigausfit2d_from_dlines(
+            dinput=self.dinput, jac='sparse', verbose=0,
+        )
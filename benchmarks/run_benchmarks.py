@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+"""
+Run the tofu benchmark suites, store baselines and flag regressions
+
+The suites are the bench_*.py modules of this directory (asv-style):
+    - each class is a suite, with an optional setup() method (not timed)
+    - each time_*() method is a benchmark, timed over several repeats
+
+Results are stored as json files in benchmarks/baselines/, one per commit:
+    <commit-sha>.json    (with '_dirty' appended if the tree was modified)
+
+Each run is compared to a reference baseline (by default the one of the
+nearest ancestor commit), and any benchmark slower than threshold x the
+reference is flagged as a regression (=> non-zero exit code, for gating)
+
+Typical use:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py -b geom -r 5 --threshold 1.3
+    python benchmarks/run_benchmarks.py -c benchmarks/baselines/<sha>.json
+"""
+
+# Built-in
+import os
+import sys
+import json
+import time
+import socket
+import getpass
+import platform
+import argparse
+import warnings
+import importlib
+import subprocess
+import datetime as dtm
+
+# Common
+import numpy as np
+
+# tofu
+# test if in a tofu git repo
+_HERE = os.path.abspath(os.path.dirname(__file__))
+_REPO = os.path.dirname(_HERE)
+istofugit = os.path.isdir(os.path.join(_REPO, '.git'))
+if istofugit:
+    # Make sure we load the corresponding tofu
+    sys.path.insert(1, _REPO)
+    import tofu as tf
+    _ = sys.path.pop(1)
+else:
+    import tofu as tf
+sys.path.insert(0, _HERE)
+
+
+###################
+# Defining defaults
+###################
+
+_PATH = os.path.join(_HERE, 'baselines')
+_REPEAT = 3
+_THRESHOLD = 1.2
+_PREFIX = 'bench_'
+
+
+###################
+# git / environment
+###################
+
+
+def _git(*args):
+    """ Return the stripped output of a git command, None if it failed """
+    try:
+        out = subprocess.run(
+            ('git',) + args, cwd=_REPO,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            check=True,
+        ).stdout
+    except Exception:
+        return None
+    return out.decode().strip()
+
+
+def get_meta():
+    """ Return the metadata of the current run (commit, machine, versions) """
+    commit = _git('rev-parse', 'HEAD') if istofugit else None
+    dirty = None
+    if commit is not None:
+        dirty = len(_git('status', '--porcelain', '-uno') or '') > 0
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'date': dtm.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'host': socket.gethostname(),
+        'user': getpass.getuser(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'tofu': tf.__version__,
+        'tofu_file': tf.__file__,
+    }
+
+
+###################
+# Discovery and run
+###################
+
+
+def get_benchmarks(lbench=None):
+    """ Return a dict {name: (class, method name)} of available benchmarks
+
+    Names are module.class.method, and lbench is a list of sub-strings used
+    to select them (all if None)
+    """
+    lmod = sorted([
+        ff[:-3] for ff in os.listdir(_HERE)
+        if ff.startswith(_PREFIX) and ff.endswith('.py')
+    ])
+    dbench = {}
+    for mm in lmod:
+        mod = importlib.import_module(mm)
+        lcls = [
+            vv for kk, vv in vars(mod).items()
+            if isinstance(vv, type) and not kk.startswith('_')
+            and vv.__module__ == mod.__name__
+        ]
+        for cc in lcls:
+            for kk in sorted(dir(cc)):
+                if kk.startswith('time_') and callable(getattr(cc, kk)):
+                    key = '{}.{}.{}'.format(mm, cc.__name__, kk)
+                    dbench[key] = (cc, kk)
+    if lbench is not None:
+        dbench = {
+            kk: vv for kk, vv in dbench.items()
+            if any([bb in kk for bb in lbench])
+        }
+    return dbench
+
+
+def run_benchmarks(dbench, repeat=None, verb=None):
+    """ Run each benchmark repeat times, return a dict of timings (s)
+
+    The setup() of each suite is run (untimed) before each benchmark
+    A failing benchmark is stored with its error message instead of timings
+    """
+    if repeat is None:
+        repeat = _REPEAT
+    if verb is None:
+        verb = True
+
+    dout = {}
+    for ii, (kk, (cc, meth)) in enumerate(dbench.items()):
+        if verb:
+            msg = '\t({}/{}) {}'.format(ii+1, len(dbench), kk)
+            print(msg.ljust(70), end='', flush=True)
+        try:
+            obj = cc()
+            if hasattr(obj, 'setup'):
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    obj.setup()
+            func = getattr(obj, meth)
+            lt = np.zeros((repeat,))
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                for jj in range(repeat):
+                    t0 = time.perf_counter()
+                    func()
+                    lt[jj] = time.perf_counter() - t0
+            dout[kk] = {
+                'min': float(np.min(lt)),
+                'median': float(np.median(lt)),
+                'repeat': repeat,
+            }
+            if verb:
+                print('{:.3e} s'.format(dout[kk]['min']))
+        except Exception as err:
+            dout[kk] = {'error': '{}: {}'.format(type(err).__name__, err)}
+            if verb:
+                print('error ({})'.format(type(err).__name__))
+    return dout
+
+
+###################
+# Baselines
+###################
+
+
+def save(dout, meta, path=None):
+    """ Save results and metadata to path/<commit>.json, return the file
+
+    If the file already exists (e.g.: partial run), results are updated
+    """
+    if path is None:
+        path = _PATH
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    name = meta['commit'] if meta['commit'] is not None else 'nogit'
+    if meta['dirty'] is True:
+        name += '_dirty'
+    pfe = os.path.join(path, name + '.json')
+    if os.path.isfile(pfe):
+        dout = dict(load(pfe)['results'], **dout)
+    with open(pfe, 'w') as fid:
+        json.dump({'meta': meta, 'results': dout}, fid, indent=1,
+                  sort_keys=True)
+    return pfe
+
+
+def load(pfe):
+    with open(pfe, 'r') as fid:
+        return json.load(fid)
+
+
+def get_reference(path=None, exclude=None):
+    """ Return the baseline file of the nearest ancestor commit (or None)
+
+    Only baselines of clean trees are considered
+    The current commit is eligible (a dirty tree is compared to HEAD)
+    """
+    if path is None:
+        path = _PATH
+    if not os.path.isdir(path) or not istofugit:
+        return None
+    lf = [
+        ff for ff in os.listdir(path)
+        if ff.endswith('.json') and '_' not in ff
+        and os.path.join(path, ff) != exclude
+    ]
+    dist, ref = np.inf, None
+    for ff in lf:
+        sha = ff[:-5]
+        if _git('merge-base', '--is-ancestor', sha, 'HEAD') is None:
+            continue
+        nn = int(_git('rev-list', '--count', '{}..HEAD'.format(sha)))
+        if nn < dist:
+            dist, ref = nn, os.path.join(path, ff)
+    return ref
+
+
+def compare(dout, dref, threshold=None):
+    """ Compare results to a reference, return the list of regressions
+
+    A benchmark is a regression if its min time > threshold x reference,
+    or if it fails while it ran in the reference (ratio = inf)
+    Returns a list of (name, time, reference time, ratio)
+    """
+    if threshold is None:
+        threshold = _THRESHOLD
+    lreg = []
+    for kk, vv in dout.items():
+        vref = dref.get(kk)
+        if vref is None or 'min' not in vref:
+            continue
+        if 'min' not in vv:
+            lreg.append((kk, np.nan, vref['min'], np.inf))
+            continue
+        ratio = vv['min'] / vref['min']
+        if ratio > threshold:
+            lreg.append((kk, vv['min'], vref['min'], ratio))
+    return lreg
+
+
+def _print_comparison(dout, dref, lreg, threshold):
+    lreg = [rr[0] for rr in lreg]
+    col = ['benchmark', 'ref (s)', 'new (s)', 'ratio', '']
+    lmsg = []
+    for kk in sorted(dout.keys()):
+        vv, vref = dout[kk], dref.get(kk, {})
+        new = '{:.3e}'.format(vv['min']) if 'min' in vv else 'error'
+        ref = '{:.3e}'.format(vref['min']) if 'min' in vref else '-'
+        if 'min' in vv and 'min' in vref:
+            ratio = '{:.2f}'.format(vv['min'] / vref['min'])
+        else:
+            ratio = '-'
+        flag = '<= REGRESSION' if kk in lreg else ''
+        lmsg.append([kk, ref, new, ratio, flag])
+    nn = max([len(mm[0]) for mm in lmsg] + [len(col[0])])
+    lmsg = [col] + lmsg
+    msg = '\n'.join([
+        ' '.join([mm[0].ljust(nn)] + [m1.ljust(10) for m1 in mm[1:]])
+        for mm in lmsg
+    ])
+    print('\nComparison (threshold = {}):\n'.format(threshold) + msg)
+
+
+###################
+# Main
+###################
+
+
+def main(bench=None, repeat=None, threshold=None, path=None,
+         compare_to=None, save_res=None, verb=None):
+    """ Run, save and compare, return the exit code (1 if regression) """
+    if threshold is None:
+        threshold = _THRESHOLD
+    if save_res is None:
+        save_res = True
+    if verb is None:
+        verb = True
+
+    meta = get_meta()
+    if verb:
+        msg = ('\nRunning tofu benchmarks\n'
+               + '\ttofu {} ({})\n'.format(meta['tofu'], meta['tofu_file'])
+               + '\tcommit {} (dirty: {})\n'.format(meta['commit'],
+                                                     meta['dirty']))
+        print(msg)
+
+    dbench = get_benchmarks(bench)
+    dout = run_benchmarks(dbench, repeat=repeat, verb=verb)
+
+    pfe = None
+    if save_res is True:
+        pfe = save(dout, meta, path=path)
+        if verb:
+            print('\nSaved in:\n\t{}'.format(pfe))
+
+    if compare_to is None:
+        compare_to = get_reference(path=path, exclude=pfe)
+    if compare_to is None:
+        if verb:
+            print('\nNo reference baseline to compare to')
+        return 0
+
+    dref = load(compare_to)
+    lreg = compare(dout, dref['results'], threshold=threshold)
+    if verb:
+        print('\nReference: {}'.format(compare_to))
+        _print_comparison(dout, dref['results'], lreg, threshold)
+    if len(lreg) > 0:
+        msg = '\n{} regression(s) found:\n'.format(len(lreg)) + '\n'.join([
+            '\t{}: {:.3e} s vs {:.3e} s (x{:.2f})'.format(*rr)
+            for rr in lreg
+        ])
+        print(msg)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+
+    # Parse input arguments
+    msg = 'Run the tofu benchmarks, store a baseline and flag regressions'
+    parser = argparse.ArgumentParser(description=msg)
+    parser.add_argument('-b', '--bench', type=str, nargs='+', default=None,
+                        help='sub-strings selecting benchmarks (all if None)')
+    parser.add_argument('-r', '--repeat', type=int, default=_REPEAT,
+                        help='number of timed repeats per benchmark')
+    parser.add_argument('-t', '--threshold', type=float, default=_THRESHOLD,
+                        help='slowdown ratio above which to flag regression')
+    parser.add_argument('-p', '--path', type=str, default=_PATH,
+                        help='directory where baselines are stored')
+    parser.add_argument('-c', '--compare', type=str, default=None,
+                        help='baseline file to compare to'
+                        + ' (default: nearest ancestor commit)')
+    parser.add_argument('-ns', '--nosave', action='store_true',
+                        help='do not save the results as a baseline')
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='only list available benchmarks')
+
+    args = parser.parse_args()
+    if args.list:
+        print('\n'.join(sorted(get_benchmarks(args.bench).keys())))
+        sys.exit(0)
+
+    sys.exit(main(bench=args.bench, repeat=args.repeat,
+                  threshold=args.threshold, path=args.path,
+                  compare_to=args.compare, save_res=not args.nosave))
@@ -2,6 +2,7 @@
 
 # Builtin
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 # Common
 import numpy as np
@@ -9,7 +10,6 @@ import scipy.signal as scpsig
 import scipy.interpolate as scpinterp
 import scipy.linalg as scplin
 import scipy.stats as scpstats
-from matplotlib.tri import LinearTriInterpolator as mplTriLinInterp
 
 
 from . import _comp_new
@@ -18,6 +18,7 @@ from . import _comp_new
 _fmin_coef = 5.
 _ANITYPE = 'sca'
 _FILLVALUE = np.nan
+_TBLOCK_SIZE = int(1e7)     # max nb of gathered values per time block
 
 
 #############################################
@@ -386,6 +387,118 @@ def filter_svd(data, lapack_driver='gesdd', modes=[]):
 #############################################
 
 
+def get_interp_weights(r, z, trifind=None, mpltri=None,
+                       interp_space=None, ntri=None, shape=None):
+    """ Return the mesh indices and weights interpolating at points (r, z)
+
+    The interpolated values are then: np.sum(v[..., ind] * wgt, axis=-2)
+    Points outside of the mesh have ind = -1 and wgt = 0
+
+    For rectangular meshes whose trifind returns (indr, indz), shape is the
+    (n1, n2) shape of the values, the returned indices being flattened
+
+    Return
+    ------
+    ind:    (nv, npts) np.ndarray of int
+        indices of the mesh values (nv = 3 for linear triangular mesh, else 1)
+    wgt:    (nv, npts) np.ndarray of float
+        interpolation weights (barycentric coordinates for linear)
+    """
+
+    # Rectangular mesh (degree 0 only)
+    if mpltri is None:
+        ind = trifind(r, z)
+        if isinstance(ind, tuple):
+            indr, indz = ind
+            indok = (indr > -1) & (indz > -1)
+            ind = np.full(indr.shape, -1, dtype=int)
+            ind[indok] = indr[indok]*shape[1] + indz[indok]
+        ind = np.atleast_1d(ind)[None, :]
+        return ind, (ind > -1).astype(float)
+
+    itri = np.atleast_1d(trifind(r, z))
+    indok = itri > -1
+
+    # Triangular mesh, degree 0: one value per (group of ntri) faces
+    if interp_space != 1:
+        if ntri is None:
+            ntri = 1
+        ind = np.full((1, itri.size), -1, dtype=int)
+        ind[0, indok] = itri[indok] // ntri
+        return ind, indok[None, :].astype(float)
+
+    # Triangular mesh, degree 1: barycentric coordinates in each triangle
+    ind = np.full((3, itri.size), -1, dtype=int)
+    wgt = np.zeros((3, itri.size), dtype=float)
+    ind[:, indok] = mpltri.triangles[itri[indok], :].T
+    x, y = mpltri.x[ind[:, indok]], mpltri.y[ind[:, indok]]
+    det = ((y[1] - y[2])*(x[0] - x[2]) + (x[2] - x[1])*(y[0] - y[2]))
+    wgt[0, indok] = ((y[1] - y[2])*(r[indok] - x[2])
+                     + (x[2] - x[1])*(z[indok] - y[2])) / det
+    wgt[1, indok] = ((y[2] - y[0])*(r[indok] - x[2])
+                     + (x[0] - x[2])*(z[indok] - y[2])) / det
+    wgt[2, indok] = 1. - wgt[0, indok] - wgt[1, indok]
+    return ind, wgt
+
+
+def _run_tblocks(func, lit0, nthreads=None):
+    """ Call func(it0) for each time block, in a thread pool if nthreads > 1
+
+    numpy releases the GIL on large gathers / products, so time blocks
+    are effectively handled in parallel
+    """
+    lit0 = list(lit0)
+    if nthreads is None or nthreads <= 1 or len(lit0) <= 1:
+        for it0 in lit0:
+            func(it0)
+    else:
+        with ThreadPoolExecutor(max_workers=nthreads) as pool:
+            list(pool.map(func, lit0))
+
+
+def interp_from_weights(vq, indt, ind, wgt, fill_value=None, nthreads=None):
+    """ Return the (nt, npts) values interpolated with precomputed weights
+
+    The points are located once (see get_interp_weights()), then all the
+    desired time slices are interpolated as a single gather per time block
+
+    Parameters
+    ----------
+    vq:     (ntq, ...) np.ndarray
+        values on the mesh, for all available times
+    indt:   (nt,) np.ndarray of int
+        indices (in vq) of the desired times
+    ind, wgt:   (nv, npts) np.ndarray
+        as returned by get_interp_weights()
+    nthreads:   None / int
+        if > 1, time blocks are dispatched to a thread pool
+    """
+    if fill_value is None:
+        fill_value = _FILLVALUE
+    vq = vq.reshape((vq.shape[0], -1))
+    indt = np.atleast_1d(indt)
+    nt, npts = indt.size, ind.shape[1]
+    indok = ind[0, :] > -1
+    indv, wgtok = ind[:, indok], wgt[:, indok]
+    val = np.full((nt, npts), fill_value, dtype=float)
+    if not np.any(indok):
+        return val
+
+    # Time blocks of bounded size
+    nblock = max(1, _TBLOCK_SIZE // indv.size)
+
+    def func(it0):
+        it1 = min(it0 + nblock, nt)
+        val[it0:it1, indok] = np.sum(
+            vq[indt[it0:it1, None, None], indv[None, :, :]]
+            * wgtok[None, :, :],
+            axis=1,
+        )
+
+    _run_tblocks(func, range(0, nt, nblock), nthreads=nthreads)
+    return val
+
+
 def get_finterp_isotropic(
     idquant, idref1d, idref2d,
     vquant=None, vr1=None, vr2=None,
@@ -393,8 +506,14 @@ def get_finterp_isotropic(
     idmesh=None, fill_value=None,
     tall=None, tbinall=None, ntall=None,
     indtq=None, indtr1=None, indtr2=None,
-    mpltri=None, trifind=None,
+    mpltri=None, trifind=None, ntri=None, nthreads=None, fweights=None,
 ):
+    """ Return func(pts, vect=None, t=None) => (val, t), interpolating
+
+    fweights, if provided, is used to locate the points on the mesh:
+        fweights(pts) => (ind, wgt), see get_interp_weights()
+    (typically to benefit from a point-location cache)
+    """
 
     if fill_value is None:
         fill_value = _FILLVALUE
@@ -406,196 +525,109 @@ def get_finterp_isotropic(
     # -----------------------------------
     if idref1d is None:
 
-        # --------------------
-        # Linear interpolation
-        if interp_space == 1:
-
-            def func(pts, vect=None, t=None, ntall=ntall,
-                     mplTriLinInterp=mplTriLinInterp,
-                     mpltri=mpltri, trifind=trifind,
-                     vquant=vquant, indtq=indtq,
-                     tall=tall, tbinall=tbinall,
-                     idref1d=idref1d, idref2d=idref2d):
-
-                r, z = np.hypot(pts[0, :], pts[1, :]), pts[2, :]
-                shapeval = list(pts.shape)
-                shapeval[0] = ntall if t is None else t.size
-                val = np.full(tuple(shapeval), fill_value)
-
-                ntall, indt, indtu, indtq = _comp_new._get_indtu(
-                    t=t, tall=tall,
-                    tbinall=tbinall,
-                    indtq=indtq,
-                )[1:-2]
-                for ii in range(0, ntall):
-                    ind = indt == indtu[ii]
-                    val[ind, ...] = mplTriLinInterp(
-                        mpltri,
-                        vquant[indtq[indtu[ii]], :],
-                        trifinder=trifind,
-                    )(r, z).filled(fill_value)
-
-                if np.any(np.isnan(val)) and not np.isnan(fill_value):
-                    val[np.isnan(val)] = fill_value
-                if t is None and tall is not None:
-                    t = tall
-                return val, t
-
-        # --------------------
-        # Degree 0 interpolation
-        else:
-            def func(pts, vect=None, t=None, ntall=ntall,
-                     trifind=trifind,
-                     vquant=vquant, indtq=indtq,
-                     tall=tall, tbinall=tbinall,
-                     idref1d=idref1d, idref2d=idref2d):
-
-                r, z = np.hypot(pts[0,:],pts[1,:]), pts[2,:]
-                shapeval = list(pts.shape)
-                shapeval[0] = ntall if t is None else t.size
-                val = np.full(tuple(shapeval), fill_value)
-
-                indpts = trifind(r,z)
-                if isinstance(indpts, tuple):
-                    indr, indz = indpts
-                    indok = (indr > -1) & (indz > -1)
-                    indr = indr[indok]
-                    indz = indz[indok]
-                else:
-                    indok = indpts > -1
-                    indpts = indpts[indok]
-
-                ntall, indt, indtu, indtq = _comp_new._get_indtu(
-                    t=t, tall=tall,
-                    tbinall=tbinall,
-                    indtq=indtq,
-                )[1:-2]
-
-                if isinstance(indpts, tuple):
-                    for ii in range(0, ntall):
-                        ind = indt == indtu[ii]
-                        val[ind, indok] = vquant[indtq[indtu[ii]], indr, indz]
-                else:
-                    for ii in range(0, ntall):
-                        ind = indt == indtu[ii]
-                        val[ind, indok] = vquant[indtq[indtu[ii]], indpts]
-
-
-                if np.any(np.isnan(val)) and not np.isnan(fill_value):
-                    val[np.isnan(val)] = fill_value
-                if t is None and tall is not None:
-                    t = tall
-                return val, t
+        def func(pts, vect=None, t=None, ntall=ntall,
+                 mpltri=mpltri, trifind=trifind, ntri=ntri,
+                 vquant=vquant, indtq=indtq,
+                 tall=tall, tbinall=tbinall,
+                 interp_space=interp_space, fill_value=fill_value,
+                 idref1d=idref1d, idref2d=idref2d, nthreads=nthreads,
+                 fweights=fweights):
+
+            r, z = np.hypot(pts[0, ...], pts[1, ...]), pts[2, ...]
+            shapeval = list(pts.shape)
 
+            # Locate points once, whatever the number of time steps
+            if fweights is None:
+                ind, wgt = get_interp_weights(
+                    r.ravel(), z.ravel(),
+                    trifind=trifind, mpltri=mpltri,
+                    interp_space=interp_space, ntri=ntri,
+                    shape=vquant.shape[1:],
+                )
+            else:
+                ind, wgt = fweights(pts)
 
+            ntall, indt, indtu, indtq = _comp_new._get_indtu(
+                t=t, tall=tall,
+                tbinall=tbinall,
+                indtq=indtq,
+            )[1:-2]
+            val = interp_from_weights(
+                vquant, indtq[indt], ind, wgt,
+                fill_value=fill_value, nthreads=nthreads,
+            )
+            shapeval[0] = val.shape[0]
+            val = val.reshape(tuple(shapeval))
+
+            if np.any(np.isnan(val)) and not np.isnan(fill_value):
+                val[np.isnan(val)] = fill_value
+            if t is None and tall is not None:
+                t = tall
+            return val, t
+
+    # -----------------------------------
+    # Interpolate 1d quantity on 2d ref
+    # -----------------------------------
     else:
-        if interp_space == 1:
-
-            def func(pts, vect=None, t=None, ntall=ntall,
-                     mplTriLinInterp=mplTriLinInterp,
-                     mpltri=mpltri, trifind=trifind,
-                     vquant=vquant, indtq=indtq,
-                     interp_space=interp_space, fill_value=fill_value,
-                     vr1=vr1, indtr1=indtr1, vr2=vr2, indtr2=indtr2,
-                     tall=tall, tbinall=tbinall,
-                     idref1d=idref1d, idref2d=idref2d):
-
-                r, z = np.hypot(pts[0,:],pts[1,:]), pts[2,:]
-                shapeval = list(pts.shape)
-                shapeval[0] = ntall if t is None else t.size
-                val = np.full(tuple(shapeval), fill_value)
-                t0tri, t0int = 0., 0.
-
-                ntall, indt, indtu, indtq, indtr1, indtr2 = \
-                        _comp_new._get_indtu(
-                            t=t, tall=tall, tbinall=tbinall,
-                            indtq=indtq,
-                            indtr1=indtr1, indtr2=indtr2,
-                        )[1:]
-
-                for ii in range(0, ntall):
-                    # get ref values for mapping
-                    vii = mplTriLinInterp(
-                        mpltri,
-                        vr2[indtr2[indtu[ii]], :],
-                        trifinder=trifind,
-                    )(r, z)
-
-                    # interpolate 1d
-                    ind = indt == indtu[ii]
-                    val[ind, ...] = scpinterp.interp1d(
-                        vr1[indtr1[indtu[ii]], :],
-                        vquant[indtq[indtu[ii]], :],
-                        kind='linear',
-                        bounds_error=False,
-                        fill_value=fill_value,
-                    )(np.asarray(vii))
 
-                val[np.isnan(val)] = fill_value
-                if t is None and tall is not None:
-                    t = tall
-                return val, t
+        def func(pts, vect=None, t=None, ntall=ntall,
+                 mpltri=mpltri, trifind=trifind, ntri=ntri,
+                 vquant=vquant, indtq=indtq,
+                 interp_space=interp_space, fill_value=fill_value,
+                 vr1=vr1, indtr1=indtr1, vr2=vr2, indtr2=indtr2,
+                 tall=tall, tbinall=tbinall,
+                 idref1d=idref1d, idref2d=idref2d, nthreads=nthreads,
+                 fweights=fweights):
+
+            r, z = np.hypot(pts[0, ...], pts[1, ...]), pts[2, ...]
+            shapeval = list(pts.shape)
 
-        else:
-            def func(pts, vect=None, t=None, ntall=ntall,
-                     trifind=trifind,
-                     vquant=vquant, indtq=indtq,
-                     interp_space=interp_space, fill_value=fill_value,
-                     vr1=vr1, indtr1=indtr1, vr2=vr2, indtr2=indtr2,
-                     tall=tall, tbinall=tbinall,
-                     idref1d=idref1d, idref2d=idref2d):
-
-                r, z = np.hypot(pts[0,:],pts[1,:]), pts[2,:]
-                shapeval = list(pts.shape)
-                shapeval[0] = ntall if t is None else t.size
-                val = np.full(tuple(shapeval), fill_value)
-
-                indpts = trifind(r,z)
-                if isinstance(indpts, tuple):
-                    indr, indz = indpts
-                    indok = (indr > -1) & (indz > -1)
-                    indr = indr[indok]
-                    indz = indz[indok]
-                else:
-                    indok = indpts > -1
-                    indpts = indpts[indok]
-
-                ntall, indt, indtu, indtq, indtr1, indtr2 = \
-                        _comp_new._get_indtu(
-                            t=t, tall=tall, tbinall=tbinall,
-                            indtq=indtq,
-                            indtr1=indtr1, indtr2=indtr2,
-                        )[1:]
-
-                if isinstance(indpts, tuple):
-                    for ii in range(0, ntall):
-                        # interpolate 1d
-                        ind = indt == indtu[ii]
-                        val[ind, indok] = scpinterp.interp1d(
-                            vr1[indtr1[indtu[ii]], :],
-                            vquant[indtq[indtu[ii]], :],
-                            kind='linear',
-                            bounds_error=False,
-                            fill_value=fill_value,
-                        )(vr2[indtr2[indtu[ii]], indr, indz])
-                else:
-                    for ii in range(0, ntall):
-                        # interpolate 1d
-                        ind = indt == indtu[ii]
-                        val[ind, indok] = scpinterp.interp1d(
-                            vr1[indtr1[indtu[ii]], :],
-                            vquant[indtq[indtu[ii]], :],
-                            kind='linear',
-                            bounds_error=False,
-                            fill_value=fill_value,
-                        )(vr2[indtr2[indtu[ii]], indpts])
-
-                # Double check nan in case vr2 is itself nan on parts of mesh
-                if np.any(np.isnan(val)) and not np.isnan(fill_value):
-                    val[np.isnan(val)] = fill_value
-                if t is None and tall is not None:
-                    t = tall
-                return val, t
+            # Locate points once, whatever the number of time steps
+            if fweights is None:
+                ind, wgt = get_interp_weights(
+                    r.ravel(), z.ravel(),
+                    trifind=trifind, mpltri=mpltri,
+                    interp_space=interp_space, ntri=ntri,
+                    shape=vr2.shape[1:],
+                )
+            else:
+                ind, wgt = fweights(pts)
+
+            ntall, indt, indtu, indtq, indtr1, indtr2 = \
+                    _comp_new._get_indtu(
+                        t=t, tall=tall, tbinall=tbinall,
+                        indtq=indtq,
+                        indtr1=indtr1, indtr2=indtr2,
+                    )[1:]
+
+            # get ref values for mapping, for all unique times at once
+            vii = interp_from_weights(
+                vr2, indtr2[indtu], ind, wgt,
+                fill_value=np.nan, nthreads=nthreads,
+            )
+
+            # interpolate 1d (mapping depends on time)
+            val = np.full((indt.size, vii.shape[1]), fill_value)
+
+            def func1d(ii):
+                val[indt == indtu[ii], :] = scpinterp.interp1d(
+                    vr1[indtr1[indtu[ii]], :],
+                    vquant[indtq[indtu[ii]], :],
+                    kind='linear',
+                    bounds_error=False,
+                    fill_value=fill_value,
+                )(vii[ii, :])
+
+            _run_tblocks(func1d, range(0, ntall), nthreads=nthreads)
+            shapeval[0] = val.shape[0]
+            val = val.reshape(tuple(shapeval))
+
+            # Double check nan in case vr2 is itself nan on parts of mesh
+            if np.any(np.isnan(val)) and not np.isnan(fill_value):
+                val[np.isnan(val)] = fill_value
+            if t is None and tall is not None:
+                t = tall
+            return val, t
     return func
 
 
@@ -606,8 +638,13 @@ def get_finterp_ani(
     idmesh=None, vq2dR=None,
     vq2dPhi=None, vq2dZ=None,
     tall=None, tbinall=None, ntall=None,
-    indtq=None, trifind=None, Type=None,
+    indtq=None, trifind=None, Type=None, ntri=None, nthreads=None,
+    fweights=None,
 ):
+    """ Return func(pts, vect=None, t=None) => (val, t), interpolating
+
+    See get_finterp_isotropic()
+    """
 
     # -----------------------------------
     # Interpolate directly on 2d quantity
@@ -620,134 +657,58 @@ def get_finterp_ani(
     if interp_t is None:
         interp_t = 'nearest'
 
-    # --------------------
-    # Linear interpolation
-    if interp_space == 1:
-
-        def func(pts, vect=None, t=None, ntall=ntall,
-                 mplTriLinInterp=mplTriLinInterp,
-                 mpltri=mpltri, trifind=trifind,
-                 vq2dR=vq2dR, vq2dPhi=vq2dPhi,
-                 vq2dZ=vq2dZ, indtq=indtq,
-                 tall=tall, tbinall=tbinall):
-
-            # Get pts in (r,z,phi)
-            r, z = np.hypot(pts[0, :], pts[1, :]), pts[2, :]
-            phi = np.arctan2(pts[1, :], pts[0, :])
-
-            # Deduce vect in (r,z,phi)
-            vR = np.cos(phi)*vect[0, :] + np.sin(phi)*vect[1, :]
-            vPhi = -np.sin(phi)*vect[0, :] + np.cos(phi)*vect[1, :]
-            vZ = vect[2, :]
-
-            # Prepare output
-            shapeval = list(pts.shape)
-            shapeval[0] = ntall if t is None else t.size
-            valR = np.full(tuple(shapeval), fill_value)
-            valPhi = np.full(tuple(shapeval), fill_value)
-            valZ = np.full(tuple(shapeval), fill_value)
-
-            # Interpolate
-            ntall, indt, indtu, indtq = _comp_new._get_indtu(
-                t=t, tall=tall,
-                indtq=indtq,
-                tbinall=tbinall,
-            )[1:4]
-
-            for ii in range(0, ntall):
-                ind = indt == indtu[ii]
-                valR[ind, ...] = mplTriLinInterp(
-                    mpltri,
-                    vq2dR[indtq[indtu[ii]], :],
-                    trifinder=trifind,
-                )(r, z)
-                valPhi[ind, ...] = mplTriLinInterp(
-                    mpltri,
-                    vq2dPhi[indtq[indtu[ii]], :],
-                    trifinder=trifind,
-                )(r, z)
-                valZ[ind, ...] = mplTriLinInterp(
-                    mpltri,
-                    vq2dZ[indtq[indtu[ii]], :],
-                    trifinder=trifind,
-                )(r, z)
-
-            if Type == 'sca':
-                val = (valR*vR[None, :] + valPhi*vPhi[None, :]
-                       + valZ*vZ[None, :])
-            elif Type == 'abs(sca)':
-                val = np.abs(valR*vR[None, :] + valPhi*vPhi[None, :]
-                             + valZ*vZ[None, :])
-
-            val[np.isnan(val)] = fill_value
-            if t is None and tall is not None:
-                t = tall
-            return val, t
-
-    # --------------------
-    # Degree 0 interpolation
-    else:
-        def func(pts, vect=None, t=None, ntall=ntall,
-                 trifind=trifind,
-                 vq2dR=vq2dR, vq2dPhi=vq2dPhi,
-                 vq2dZ=vq2dZ, indtq=indtq,
-                 tall=tall, tbinall=tbinall):
-
-            # Get pts in (r,z,phi)
-            r, z = np.hypot(pts[0, :], pts[1, :]), pts[2, :]
-            phi = np.arctan2(pts[1, :], pts[0, :])
-
-            # Deduce vect in (r,z,phi)
-            vR = np.cos(phi)*vect[0, :] + np.sin(phi)*vect[1, :]
-            vPhi = -np.sin(phi)*vect[0, :] + np.cos(phi)*vect[1, :]
-            vZ = vect[2, :]
-
-            # Prepare output
-            shapeval = list(pts.shape)
-            shapeval[0] = ntall if t is None else t.size
-            valR = np.full(tuple(shapeval), fill_value)
-            valPhi = np.full(tuple(shapeval), fill_value)
-            valZ = np.full(tuple(shapeval), fill_value)
-
-            # Interpolate
-            indpts = trifind(r, z)
-            if isinstance(indpts, tuple):
-                indr, indz = trifind(r, z)
-                indok = (indr > -1) & (indz > -1)
-                indr = indr[indok]
-                indz = indz[indok]
-            else:
-                indok = indpts > -1
-                indpts = indpts[indok]
-
-            ntall, indt, indtu, indtq = _comp_new._get_indtu(
-                t=t, tall=tall,
-                indtq=indtq,
-                tbinall=tbinall,
-            )[1:-2]
-
-            if isinstance(indpts, tuple):
-                for ii in range(0, ntall):
-                    ind = indt == indtu[ii]
-                    valR[ind, indok] = vq2dR[indtq[indtu[ii]], indr, indz]
-                    valPhi[ind, indok] = vq2dPhi[indtq[indtu[ii]], indr, indz]
-                    valZ[ind, indok] = vq2dZ[indtq[indtu[ii]], indr, indz]
-            else:
-                for ii in range(0, ntall):
-                    ind = indt == indtu[ii]
-                    valR[ind, indok] = vq2dR[indtq[indtu[ii]], indpts]
-                    valPhi[ind, indok] = vq2dPhi[indtq[indtu[ii]], indpts]
-                    valZ[ind, indok] = vq2dZ[indtq[indtu[ii]], indpts]
-
-            if Type == 'sca':
-                val = (valR*vR[None, :] + valPhi*vPhi[None, :]
-                       + valZ*vZ[None, :])
-            elif Type == 'abs(sca)':
-                val = np.abs(valR*vR[None, :] + valPhi*vPhi[None, :]
-                             + valZ*vZ[None, :])
-
-            val[np.isnan(val)] = fill_value
-            if t is None and tall is not None:
-                t = tall
-            return val, t
+    def func(pts, vect=None, t=None, ntall=ntall,
+             mpltri=mpltri, trifind=trifind, ntri=ntri,
+             vq2dR=vq2dR, vq2dPhi=vq2dPhi,
+             vq2dZ=vq2dZ, indtq=indtq,
+             interp_space=interp_space, fill_value=fill_value,
+             tall=tall, tbinall=tbinall, nthreads=nthreads,
+             fweights=fweights):
+
+        # Get pts in (r,z,phi)
+        r, z = np.hypot(pts[0, :], pts[1, :]), pts[2, :]
+        phi = np.arctan2(pts[1, :], pts[0, :])
+
+        # Deduce vect in (r,z,phi)
+        vR = np.cos(phi)*vect[0, :] + np.sin(phi)*vect[1, :]
+        vPhi = -np.sin(phi)*vect[0, :] + np.cos(phi)*vect[1, :]
+        vZ = vect[2, :]
+
+        # Locate points once, common to all 3 components and time steps
+        if fweights is None:
+            ind, wgt = get_interp_weights(
+                r, z,
+                trifind=trifind, mpltri=mpltri,
+                interp_space=interp_space, ntri=ntri,
+                shape=vq2dR.shape[1:],
+            )
+        else:
+            ind, wgt = fweights(pts)
+
+        # Interpolate
+        ntall, indt, indtu, indtq = _comp_new._get_indtu(
+            t=t, tall=tall,
+            indtq=indtq,
+            tbinall=tbinall,
+        )[1:-2]
+
+        valR, valPhi, valZ = [
+            interp_from_weights(
+                vv, indtq[indt], ind, wgt,
+                fill_value=fill_value, nthreads=nthreads,
+            )
+            for vv in [vq2dR, vq2dPhi, vq2dZ]
+        ]
+
+        if Type == 'sca':
+            val = (valR*vR[None, :] + valPhi*vPhi[None, :]
+                   + valZ*vZ[None, :])
+        elif Type == 'abs(sca)':
+            val = np.abs(valR*vR[None, :] + valPhi*vPhi[None, :]
+                         + valZ*vZ[None, :])
+
+        val[np.isnan(val)] = fill_value
+        if t is None and tall is not None:
+            t = tall
+        return val, t
     return func
@@ -7,6 +7,7 @@ import itertools as itt
 import numpy as np
 import scipy.constants as scpct
 from scipy.interpolate import RectBivariateSpline as scpRectSpl
+from scipy.interpolate import BSpline as scpBSpl
 
 
 _SPECTRAL_DUNITS = {
@@ -237,24 +238,94 @@ def convert_spectral(
 
 # #############################################################################
 # #############################################################################
-#                       Units conversion
+#                       PEC interpolation
 # #############################################################################
 
 
-def _interp_pec(
+def _get_pec_spline(
     ne0=None,
     Te0=None,
     pec0=None,
-    ne=None,
-    Te=None,
     deg=None,
-    grid=None,
 ):
-    """ Interpolate the pec tabulated on a (ne, te) grid """
-    return np.exp(scpRectSpl(
+    """ Return the knots and coefs of the log spline of a pec tabulated on a
+    (ne, te) grid
+
+    The knots only depend on the (ne, Te) grid and deg, so that lines sharing
+    the same grid can be interpolated together (cf. _interp_pec())
+    """
+    tx, ty, coefs = scpRectSpl(
         np.log(ne0),
         np.log(Te0),
         np.log(pec0),
         kx=deg,
         ky=deg,
-    )(np.log(ne), np.log(Te), grid=grid))
+    ).tck
+    return {
+        'tx': tx,
+        'ty': ty,
+        'coefs': coefs.reshape((tx.size - deg - 1, ty.size - deg - 1)),
+        'deg': deg,
+    }
+
+
+def _get_bsplines_basis(knots=None, deg=None, x=None, sparse=None):
+    """ Return the values of all bsplines at x, as a (x.size, nbsplines) array
+
+    If sparse = True, only return the (deg+1) non-zero values for each x, as
+    a tuple of 2 (x.size, deg+1) arrays (indices of bsplines, values)
+
+    As in fitpack, x is first clipped to the knots' range
+    """
+    nbs = knots.size - deg - 1
+    x = np.clip(x, knots[deg], knots[nbs])
+    basis = scpBSpl(knots, np.eye(nbs), deg, extrapolate=False)(x)
+    if sparse is True:
+        ind = np.clip(np.searchsorted(knots, x, side='right') - 1, deg, nbs-1)
+        ind = ind[:, None] + np.arange(-deg, 1)[None, :]
+        return ind, np.take_along_axis(basis, ind, axis=1)
+    return basis
+
+
+def _interp_pec(
+    lspline=None,
+    ne=None,
+    Te=None,
+    grid=None,
+):
+    """ Interpolate the pec of several lines sharing the same (ne, te) grid
+
+    lspline is a list of splines, as returned by _get_pec_spline()
+    The bsplines basis is evaluated once for all lines
+
+    Return a (nlines, n) array if grid = False, (nlines, n1, n2) otherwise
+    """
+    deg = lspline[0]['deg']
+    coefs = np.array([spl['coefs'] for spl in lspline])
+    if grid is True:
+        bne = _get_bsplines_basis(knots=lspline[0]['tx'], deg=deg, x=np.log(ne))
+        bte = _get_bsplines_basis(knots=lspline[0]['ty'], deg=deg, x=np.log(Te))
+        out = np.matmul(np.matmul(bne, coefs), bte.T)
+    else:
+        if ne.shape != Te.shape:
+            msg = (
+                "If grid = False, ne and Te must have the same shape!\n"
+                + "\t- ne.shape = {}\n".format(ne.shape)
+                + "\t- Te.shape = {}".format(Te.shape)
+            )
+            raise Exception(msg)
+        # Only (deg+1)**2 non-zero terms per point
+        indne, bne = _get_bsplines_basis(
+            knots=lspline[0]['tx'], deg=deg, x=np.log(ne), sparse=True,
+        )
+        indte, bte = _get_bsplines_basis(
+            knots=lspline[0]['ty'], deg=deg, x=np.log(Te), sparse=True,
+        )
+        out = np.einsum(
+            'ij,lijk,ik->li',
+            bne,
+            coefs[:, indne[:, :, None], indte[:, None, :]],
+            bte,
+            optimize=True,
+        )
+    return np.exp(out)
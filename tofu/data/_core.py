@@ -5,6 +5,8 @@ import sys
 import os
 import itertools as itt
 import copy
+import hashlib
+from collections import OrderedDict
 import warnings
 from abc import ABCMeta, abstractmethod
 import inspect
@@ -35,6 +37,8 @@ __all__ = ['DataCam1D','DataCam2D',
            'DataCam1DSpectral','DataCam2DSpectral',
            'Plasma2D']
 _INTERPT = 'zero'
+_PTSCACHE_MAXBYTES = int(2e8)  # memory cap of Plasma2D point-location cache
+_TREATCACHE_MAXBYTES = int(5e8)  # memory cap of DataAbstract treatment cache
 
 
 #############################################
@@ -94,6 +98,34 @@ def _format_ind(ind=None, n=None):
     return ind
 
 
+def _fingerprint(*args):
+    """ Return a hash (hex str) of args (arrays, dicts, lists, scalars...)
+
+    Used to identify a treatment stage from its parameters
+    """
+    hh = hashlib.sha1()
+
+    def _update(aa):
+        if isinstance(aa, np.ndarray):
+            hh.update(str((aa.dtype.str, aa.shape)).encode())
+            hh.update(aa.tobytes())
+        elif isinstance(aa, dict):
+            hh.update(b'dict')
+            for kk in sorted(aa.keys(), key=str):
+                _update(kk)
+                _update(aa[kk])
+        elif isinstance(aa, (list, tuple)):
+            hh.update(type(aa).__name__.encode())
+            for bb in aa:
+                _update(bb)
+        else:
+            hh.update(repr(aa).encode())
+
+    for aa in args:
+        _update(aa)
+    return hh.hexdigest()
+
+
 def _select_ind(v, ref, nRef):
     ltypes = [int,float,np.int64,np.float64]
     C0 = type(v) in ltypes
@@ -189,6 +221,8 @@ class DataAbstract(utils.ToFuObject):
         self._dextra = dict.fromkeys(self._get_keys_dextra())
         if self._is2D():
             self._dX12 = dict.fromkeys(self._get_keys_dX12())
+        self._dtreatcache = {'maxbytes': _TREATCACHE_MAXBYTES, 'nbytes': 0,
+                             'dstage': OrderedDict()}
 
     @classmethod
     def _checkformat_inputs_Id(cls, Id=None, Name=None,
@@ -904,6 +938,14 @@ class DataAbstract(utils.ToFuObject):
         return self._ddata[key]
     @property
     def data(self):
+        """ The treated data (read-only, copy it to modify it)
+
+        Since the treatment is lazy and copy-free, self.data is read-only if
+        no treatment step modifies the data (it is then a view of
+        self.ddataRef['data']) or if it is a cached treatment stage
+        Writing in place (e.g.: obj.data[...] = ...) then raises a ValueError,
+        use np.copy(obj.data) or the set_dtreat_*() methods instead
+        """
         return self.get_ddata('data')
     @property
     def t(self):
@@ -1135,6 +1177,7 @@ class DataAbstract(utils.ToFuObject):
         if t is not None:
             t = np.unique(np.asarray(t, dtype=float).ravel())
         self._dtreat['interp-t'] = t
+        self._ddata['uptodate'] = False
 
     @staticmethod
     def _mask(data, mask_ind, mask_val):
@@ -1201,7 +1244,9 @@ class DataAbstract(utils.ToFuObject):
     def _indt(data, t=None, X=None, nnch=None,
               indtX=None, indtlamb=None, indtXlamb=None, indt=None):
         nt0 = t.size
-        if data.ndim==2:
+        if data is None:
+            pass
+        elif data.ndim==2:
             data = data[indt,:]
         elif data.ndim==3:
             data = data[indt,:,:]
@@ -1221,7 +1266,9 @@ class DataAbstract(utils.ToFuObject):
     @staticmethod
     def _indch(data, X=None,
                indXlamb=None, indtXlamb=None, indch=None):
-        if data.ndim==2:
+        if data is None:
+            pass
+        elif data.ndim==2:
             data = data[:,indch]
         elif data.ndim==3:
             data = data[:,indch,:]
@@ -1236,7 +1283,8 @@ class DataAbstract(utils.ToFuObject):
     @staticmethod
     def _indlamb(data, lamb=None,
                  indlamb=None):
-        data = data[:,:,indlamb]
+        if data is not None:
+            data = data[:,:,indlamb]
         if lamb is not None:
             lamb = lamb[indlamb] if lamb.ndim==1 else lamb[:,indlamb]
         return data, lamb
@@ -1300,7 +1348,50 @@ class DataAbstract(utils.ToFuObject):
         self._dtreat['order'] = order
         self._ddata['uptodate'] = False
 
-    def _get_treated_data(self):
+    @staticmethod
+    def _compose_ind(ind0=None, ind=None, n=None):
+        """ Compose a treatment index with an extra selection
+
+        ind0 is a bool index (or None) over the n reference elements
+        ind refers to the elements already selected by ind0
+            (int, slice, or iterable of bool or int)
+        Return a bool index over the n reference elements (or None if all)
+        As elsewhere, the selection is a set (order and repetitions are lost)
+        """
+        if ind is None:
+            return ind0
+        ii = np.arange(n) if ind0 is None else ind0.nonzero()[0]
+        return _format_ind(np.atleast_1d(ii[ind]), n=n)
+
+    @staticmethod
+    def _ind2slice(ind=None):
+        """ Return a slice equivalent to bool index ind if possible
+
+        Slicing returns a view, while indexing with an array returns a copy
+        """
+        if ind is None or np.all(ind):
+            return slice(None)
+        ii = ind.nonzero()[0]
+        if ii.size > 0 and ii[-1] - ii[0] == ii.size - 1:
+            return slice(ii[0], ii[-1] + 1)
+        return ii
+
+    @staticmethod
+    def _take(data, lind):
+        """ Return data[lind], as a view if all lind are slices
+
+        Else, a single copy (of the selected elements only) is made
+        """
+        data = data[tuple([ii if isinstance(ii, slice) else slice(None)
+                           for ii in lind])]
+        if not all([isinstance(ii, slice) for ii in lind]):
+            data = data[np.ix_(*[
+                np.arange(data.shape[jj]) if isinstance(ii, slice) else ii
+                for jj, ii in enumerate(lind)
+            ])]
+        return data
+
+    def _get_treated_data(self, indt=None, indch=None, indlamb=None):
         """ Produce a working copy of the data based on the treated reference
 
         The reference data is always stored and untouched in self.ddataRef
@@ -1310,62 +1401,189 @@ class DataAbstract(utils.ToFuObject):
         By reseting the treatment (self.reset()) all data treatment is
         cancelled and the working copy returns the reference data.
 
+        The treatment is lazy and copy-free:
+            - the index selections (self.dtreat['indt'], ['indch'],
+              ['indlamb'] and the optional indt, indch, indlamb, which refer
+              to the treated data) are composed first, as slices if possible
+            - they are applied before the other steps whenever these commute
+              (i.e.: unless they interpolate between times / channels)
+            - the reference data is copied at most once, and only if needed
+        If no treatment step modifies the data, the working copy is a
+        read-only view of the reference data
+
+        The output of each step is cached (see set_treatcache()), identified
+        by a fingerprint of its parameters and of those of previous steps
+        Changing a step only re-computes the steps from it onwards (e.g.:
+        the masked / offset-corrected data is re-used when changing dfit)
+
         """
         # --------------------
-        # Copy reference data
-        d = self._ddataRef['data'].copy()
-        t, X = self._ddataRef['t'].copy(), self._ddataRef['X'].copy()
+        # Compose index selections (reference data is not copied)
+        order = self._dtreat['order']
         lamb = self._ddataRef['lamb']
+        ind_t = self._compose_ind(
+            self._dtreat['indt'] if 'indt' in order else None,
+            indt, n=self._ddataRef['nt'],
+        )
+        ind_ch = self._compose_ind(
+            self._dtreat['indch'] if 'indch' in order else None,
+            indch, n=self._ddataRef['nch'],
+        )
+        ind_lamb = None
         if lamb is not None:
-            lamb = lamb.copy()
+            ind_lamb = self._compose_ind(
+                self._dtreat['indlamb'] if 'indlamb' in order else None,
+                indlamb, n=self._ddataRef['nlamb'],
+            )
 
-        indtX = self._ddataRef['indtX']
-        if indtX is not None:
-            indtX = indtX.copy()
-        indtlamb = self._ddataRef['indtlamb']
-        if indtlamb is not None:
-            indtlamb = indtlamb.copy()
-        indXlamb = self._ddataRef['indXlamb']
-        if indXlamb is not None:
-            indXlamb = indXlamb.copy()
-        indtXlamb = self._ddataRef['indtXlamb']
-        if indtXlamb is not None:
-            indtXlamb = indtXlamb.copy()
+        # Steps that prevent selecting times / channels first
+        interp_indt = self._dtreat['interp-indt'] is not None
+        interp_indt = interp_indt and 'interp_indt' in order
+        interp_indch = self._dtreat['interp-indch'] is not None
+        interp_indch = interp_indch and 'interp_indch' in order
+        interp_t = self._dtreat['interp-t'] is not None
+        interp_t = interp_t and 'interp_t' in order
+        pre_t = not (interp_indt or interp_t)
+        pre_ch = not interp_indch
+
+        d = self._ddataRef['data']
+        lind = [self._ind2slice(ind_t) if pre_t else slice(None),
+                self._ind2slice(ind_ch) if pre_ch else slice(None),
+                self._ind2slice(ind_lamb)][:d.ndim]
+        d = self._take(d, lind)
+        ich = np.arange(self._ddataRef['nch'])[lind[1]]
+        iit = np.arange(self._ddataRef['nt'])[lind[0]]
+
+        def own(d):
+            # copy only once, before the first in-place step
+            # (never modify the reference or a cached intermediate)
+            if (not d.flags.writeable
+                    or np.may_share_memory(d, self._ddataRef['data'])):
+                d = d.copy()
+            return d
+
+        # --------------------
+        # Active steps, each identified by a fingerprint of its parameters
+        # chained to the previous ones (and to the pre-selection)
+        dparam = {
+            'mask': (self._dtreat['mask-ind'], self._dtreat['mask-val']),
+            'interp_indt': (self._dtreat['interp-indt'],
+                            self._ddataRef['t']),
+            'interp_indch': (self._dtreat['interp-indch'],
+                             self._ddataRef['X']),
+            'data0': self._dtreat['data0-data'],
+            'dfit': self._dtreat['dfit'],
+        }
+        dactive = {
+            'mask': (self._dtreat['mask-ind'] is not None
+                     and bool(np.any(self._dtreat['mask-ind'][lind[1]]))),
+            'interp_indt': interp_indt,
+            'interp_indch': interp_indch,
+            'data0': self._dtreat['data0-data'] is not None,
+            'dfit': self._dtreat['dfit'] is not None,
+        }
+        key = _fingerprint(lind, d.shape)
+        lstage = []
+        for kk in order:
+            if dactive.get(kk, False):
+                key = _fingerprint(key, kk, dparam[kk])
+                lstage.append((kk, key))
+
+        # Resume from the last cached stage (only for the full data)
+        dstage = self._dtreatcache['dstage']
+        cache = (self._dtreatcache['maxbytes'] > 0
+                 and all([ii is None for ii in [indt, indch, indlamb]]))
+        i0 = 0
+        if cache:
+            for ii in range(len(lstage))[::-1]:
+                dd = dstage.get(lstage[ii][1])
+                if dd is not None and dd['ref'] is self._ddataRef['data']:
+                    dstage.move_to_end(lstage[ii][1])
+                    d, i0 = dd['data'], ii + 1
+                    break
 
-        nnch = self._ddataRef['nnch']
         # --------------------
-        # Apply data treatment
-        for kk in self._dtreat['order']:
+        # Apply data treatment (on the selected data only)
+        for kk, key in lstage[i0:]:
             # data only
-            if kk=='mask' and self._dtreat['mask-ind'] is not None:
-                d = self._mask(d, self._dtreat['mask-ind'],
-                               self._dtreat['mask-val'])
+            if kk=='mask':
+                mask = self._dtreat['mask-ind'][lind[1]]
+                d = self._mask(own(d), mask, self._dtreat['mask-val'])
             if kk=='interp_indt':
-                d = self._interp_indt(d, self._dtreat['interp-indt'],
-                                      self._ddataRef['t'])
+                ind = self._dtreat['interp-indt']
+                if type(ind) is dict:
+                    ind = {int((ich == k0).nonzero()[0][0]): v0
+                           for k0, v0 in ind.items() if k0 in ich}
+                d = self._interp_indt(own(d), ind, self._ddataRef['t'])
             if kk=='interp_indch':
-                d = self._interp_indch(d, self._dtreat['interp-indch'],
-                                       self._ddataRef['X'])
+                ind = self._dtreat['interp-indch']
+                if type(ind) is dict:
+                    ind = {int((iit == k0).nonzero()[0][0]): v0
+                           for k0, v0 in ind.items() if k0 in iit}
+                d = self._interp_indch(own(d), ind, self._ddataRef['X'])
             if kk=='data0':
-                d = self._data0(d, self._dtreat['data0-data'])
-            if kk=='dfit' and self._dtreat['dfit'] is not None:
-                d = self._dfit(d, **self._dtreat['dfit'])
-
-            # data + others
-            if kk=='indt' and self._dtreat['indt'] is not None:
-                d,t,X, indtX,indtlamb,indtXlamb, nnch = self._indt(d, t, X,
-                                                                   nnch, indtX,
-                                                                   indtlamb, indtXlamb,
-                                                                   self._dtreat['indt'])
-            if kk=='indch' and self._dtreat['indch'] is not None:
-                d,X, indXlamb,indtXlamb = self._indch(d, X, indXlamb, indtXlamb,
-                                                      self._dtreat['indch'])
-            if kk=='indlamb' and self._dtreat['indlamb'] is not None:
-                d, lamb = self._indch(d, lamb, self._dtreat['indlamb'])
-            if kk=='interp_t' and self._dtreat['interp-t'] is not None:
-                d,t, indtX,indtlamb,indtXlamb\
-                        = self._interp_t(d, t, indtX, indtlamb, indtXlamb,
-                                         self._dtreat['interp-t'], kind='linear')
+                data0 = self._dtreat['data0-data']
+                if data0.ndim == d.ndim:
+                    data0 = self._take(data0, [slice(None)] + lind[1:])
+                else:
+                    data0 = self._take(data0, lind[1:])
+                d = self._data0(d, data0)
+            if kk=='dfit':
+                d = self._dfit(own(d), **self._dtreat['dfit'])
+
+            # Store the intermediate (read-only), if it fits the budget
+            if cache and d.nbytes <= self._dtreatcache['maxbytes']:
+                if np.may_share_memory(d, self._ddataRef['data']):
+                    d = d.copy()
+                d.flags.writeable = False
+                if key in dstage:
+                    self._dtreatcache['nbytes'] -= dstage.pop(key)['nbytes']
+                dstage[key] = {'ref': self._ddataRef['data'], 'data': d,
+                               'nbytes': d.nbytes}
+                self._dtreatcache['nbytes'] += d.nbytes
+                self._treatcache_evict()
+
+        # Selections which could not be applied first
+        lind = [slice(None) if pre_t else self._ind2slice(ind_t),
+                slice(None) if pre_ch else self._ind2slice(ind_ch),
+                slice(None)][:d.ndim]
+        d = self._take(d, lind)
+
+        # --------------------
+        # Reference metadata, selected (small arrays, no copy)
+        t, X = self._ddataRef['t'], self._ddataRef['X']
+        indtX = self._ddataRef['indtX']
+        indtlamb = self._ddataRef['indtlamb']
+        indXlamb = self._ddataRef['indXlamb']
+        indtXlamb = self._ddataRef['indtXlamb']
+        nnch = self._ddataRef['nnch']
+        if ind_t is not None:
+            _, t, X, indtX, indtlamb, indtXlamb, nnch = self._indt(
+                None, t, X, nnch, indtX, indtlamb, indtXlamb, ind_t,
+            )
+        if ind_ch is not None:
+            _, X, indXlamb, indtXlamb = self._indch(
+                None, X, indXlamb, indtXlamb, ind_ch,
+            )
+        if ind_lamb is not None:
+            _, lamb = self._indlamb(None, lamb, ind_lamb)
+        if interp_t:
+            d, t, indtX, indtlamb, indtXlamb = self._interp_t(
+                d, t, indtX, indtlamb, indtXlamb,
+                self._dtreat['interp-t'], kind='linear',
+            )
+
+        # Views of the reference are read-only
+        lk = ['data', 't', 'X', 'lamb',
+              'indtX', 'indtlamb', 'indXlamb', 'indtXlamb']
+        lout = [d, t, X, lamb, indtX, indtlamb, indXlamb, indtXlamb]
+        for ii, aa in enumerate(lout):
+            ref = self._ddataRef[lk[ii]]
+            if aa is not None and np.may_share_memory(aa, ref):
+                lout[ii] = aa.view()
+                lout[ii].flags.writeable = False
+        d, t, X, lamb, indtX, indtlamb, indXlamb, indtXlamb = lout
+
         # --------------------
         # Safety check
         if d.ndim==2:
@@ -1388,6 +1606,29 @@ class DataAbstract(utils.ToFuObject):
                 indtX, indtlamb, indXlamb, indtXlamb, nnch]
         return lout
 
+    def get_data(self, indt=None, indch=None, indlamb=None):
+        """ Return the treated data, restricted to the desired indices
+
+        indt, indch and indlamb refer to the treated data (i.e.: self.t,
+        self.X...), and can be int, slice, or iterable of bool or int
+        The output always has the same number of dimensions as self.data
+
+        If self.ddata is up-to-date, it is simply indexed
+        Otherwise only the desired part of the data is treated, and the full
+        treated data is not computed (nor stored)
+
+        """
+        if self._ddata['uptodate']:
+            lind = [self._compose_ind(None, ii, n=nn)
+                    for ii, nn in zip([indt, indch, indlamb],
+                                      [self._ddata['nt'], self._ddata['nch'],
+                                       self._ddata['nlamb']])]
+            lind = [self._ind2slice(ii) for ii in lind]
+            return self._take(self._ddata['data'],
+                              lind[:self._ddata['data'].ndim])
+        return self._get_treated_data(indt=indt, indch=indch,
+                                      indlamb=indlamb)[0]
+
     def _set_ddata(self):
         if not self._ddata['uptodate']:
             data, t, X, lamb, nt, nch, nlamb,\
@@ -1418,6 +1659,38 @@ class DataAbstract(utils.ToFuObject):
         """
         self._ddata = dict.fromkeys(self._get_keys_ddata())
         self._ddata['uptodate'] = False
+        self.set_treatcache(maxbytes=self._dtreatcache['maxbytes'],
+                            clear=True)
+
+    def set_treatcache(self, maxbytes=None, clear=False):
+        """ Set the memory cap of the treatment cache, or clear it
+
+        The output of each data treatment step is kept (least recently used
+        first out), so that changing a treatment parameter only re-computes
+        the steps which depend on it
+
+        Parameters
+        ----------
+        maxbytes:   None / int
+            Max memory (bytes) used by the cache, 0 disables it
+            None => default (500 MB)
+        clear:      bool
+            Flag indicating whether to empty the cache
+        """
+        if maxbytes is None:
+            maxbytes = _TREATCACHE_MAXBYTES
+        self._dtreatcache['maxbytes'] = int(maxbytes)
+        if clear:
+            self._dtreatcache['dstage'].clear()
+            self._dtreatcache['nbytes'] = 0
+        self._treatcache_evict()
+
+    def _treatcache_evict(self):
+        dstage = self._dtreatcache['dstage']
+        while len(dstage) > 0 and (self._dtreatcache['nbytes']
+                                   > self._dtreatcache['maxbytes']):
+            key, dd = dstage.popitem(last=False)
+            self._dtreatcache['nbytes'] -= dd['nbytes']
 
     def clear_dtreat(self, force=False):
         """ Clear all treatment parameters in self.dtreat
@@ -2323,6 +2596,8 @@ class Plasma2D(utils.ToFuObject):
         self._dindref = dict.fromkeys(self._get_keys_dindref())
         self._ddata = dict.fromkeys(self._get_keys_ddata())
         self._dgeom = dict.fromkeys(self._get_keys_dgeom())
+        self._dptscache = {'maxbytes': _PTSCACHE_MAXBYTES, 'nbytes': 0,
+                           'dpts': OrderedDict()}
 
     @classmethod
     def _checkformat_inputs_Id(cls, Id=None, Name=None,
@@ -3947,7 +4222,7 @@ class Plasma2D(utils.ToFuObject):
         idquant=None, idref1d=None, idref2d=None,
         idq2dR=None, idq2dPhi=None, idq2dZ=None,
         interp_t=None, interp_space=None,
-        fill_value=None, ani=False, Type=None,
+        fill_value=None, ani=False, Type=None, nthreads=None,
     ):
 
         if interp_t is None:
@@ -3987,11 +4262,8 @@ class Plasma2D(utils.ToFuObject):
         # Note : Maybe consider using scipy.LinearNDInterpolator ?
         if idquant is not None:
             vquant = self._ddata[idquant]['data']
-            c0 = (self._ddata[idmesh]['data']['type'] == 'quadtri'
-                  and self._ddata[idmesh]['data']['ntri'] > 1)
-            if c0:
-                vquant = np.repeat(vquant,
-                                   self._ddata[idmesh]['data']['ntri'], axis=0)
+            vr1 = self._ddata[idref1d]['data'] if idref1d is not None else None
+            vr2 = self._ddata[idref2d]['data'] if idref2d is not None else None
         else:
             vq2dR   = self._ddata[idq2dR]['data']
             vq2dPhi = self._ddata[idq2dPhi]['data']
@@ -4000,6 +4272,12 @@ class Plasma2D(utils.ToFuObject):
         if interp_space is None:
             interp_space = self._ddata[idmesh]['data']['ftype']
 
+        # Point location, cached across quantities and time windows
+        def fweights(pts, idmesh=idmesh, interp_space=interp_space):
+            return self._get_pts2mesh_weights(
+                pts, idmesh, interp_space=interp_space,
+            )
+
         # get interpolation function
         if ani:
             # Assuming same mesh and time vector for all 3 components
@@ -4014,11 +4292,13 @@ class Plasma2D(utils.ToFuObject):
                 fill_value=fill_value,
                 indtq=indtq, trifind=trifind,
                 Type=Type, mpltri=mpltri,
+                ntri=self._ddata[idmesh]['data'].get('ntri'),
+                nthreads=nthreads, fweights=fweights,
             )
         else:
             func = _comp.get_finterp_isotropic(
                 idquant, idref1d, idref2d,
-                vquant=vquant,
+                vquant=vquant, vr1=vr1, vr2=vr2,
                 interp_t=interp_t,
                 interp_space=interp_space,
                 fill_value=fill_value,
@@ -4027,6 +4307,8 @@ class Plasma2D(utils.ToFuObject):
                 ntall=ntall, mpltri=mpltri,
                 indtq=indtq, indtr1=indtr1,
                 indtr2=indtr2, trifind=trifind,
+                ntri=self._ddata[idmesh]['data'].get('ntri'),
+                nthreads=nthreads, fweights=fweights,
             )
 
         return func
@@ -4071,11 +4353,14 @@ class Plasma2D(utils.ToFuObject):
     def get_finterp2d(self, quant=None, ref1d=None, ref2d=None,
                       q2dR=None, q2dPhi=None, q2dZ=None,
                       interp_t=None, interp_space=None,
-                      fill_value=None, Type=None):
+                      fill_value=None, Type=None, nthreads=None):
         """ Return the function interpolating (X,Y,Z) pts on a 1d/2d profile
 
         Can be used as input for tf.geom.CamLOS1D/2D.calc_signal()
 
+        The points are located on the mesh once per call, all time steps are
+        then interpolated at once (by blocks dispatched to nthreads threads)
+
         """
         # Check inputs
         msg = "Only 'nearest' available so far for interp_t!"
@@ -4090,15 +4375,93 @@ class Plasma2D(utils.ToFuObject):
                                  idref2d=idref2d, idq2dR=idq2dR,
                                  idq2dPhi=idq2dPhi, idq2dZ=idq2dZ,
                                  interp_t=interp_t, interp_space=interp_space,
-                                 fill_value=fill_value, ani=ani, Type=Type)
+                                 fill_value=fill_value, ani=ani, Type=Type,
+                                 nthreads=nthreads)
         return func
 
 
+    def set_ptscache(self, maxbytes=None, clear=False):
+        """ Set the memory cap of the point-location cache, or clear it
+
+        The mesh indices and interpolation weights of the last interrogated
+        points are kept (least recently used first out), so that the same
+        points (e.g.: LOS samples) are located only once on a mesh, whatever
+        the quantity or time window
+
+        Parameters
+        ----------
+        maxbytes:   None / int
+            Max memory (bytes) used by the cache, 0 disables it
+            None => default (200 MB)
+        clear:      bool
+            Flag indicating whether to empty the cache
+        """
+        if maxbytes is None:
+            maxbytes = _PTSCACHE_MAXBYTES
+        self._dptscache['maxbytes'] = int(maxbytes)
+        if clear:
+            self._dptscache['dpts'].clear()
+            self._dptscache['nbytes'] = 0
+        self._ptscache_evict()
+
+    def _ptscache_evict(self):
+        dpts = self._dptscache['dpts']
+        while len(dpts) > 0 and (self._dptscache['nbytes']
+                                 > self._dptscache['maxbytes']):
+            key, dd = dpts.popitem(last=False)
+            self._dptscache['nbytes'] -= dd['nbytes']
+
+    def _get_pts2mesh_weights(self, pts, idmesh, interp_space=None):
+        """ Return mesh indices and weights interpolating at (X,Y,Z) pts
+
+        Results are cached per (points, mesh), see set_ptscache()
+        See tofu.data._comp.get_interp_weights()
+        """
+        dmesh = self._ddata[idmesh]['data']
+        if interp_space is None:
+            interp_space = dmesh['ftype']
+
+        # -- Check cache (keyed on points content, not identity) -------------
+        pts = np.ascontiguousarray(pts, dtype=float)
+        key = (idmesh, interp_space, pts.shape,
+               hashlib.sha1(pts.view(np.uint8)).hexdigest())
+        dpts = self._dptscache['dpts']
+        if key in dpts.keys() and dpts[key]['ref'] is dmesh:
+            dpts.move_to_end(key)
+            return dpts[key]['ind'], dpts[key]['wgt']
+
+        # -- Compute ----------------------------------------------------------
+        if dmesh['type'] == 'rect':
+            mpltri = None
+            trifind = dmesh['trifind']
+        else:
+            mpltri = dmesh['mpltri']
+            trifind = mpltri.get_trifinder()
+        r = np.hypot(pts[0, ...], pts[1, ...]).ravel()
+        z = pts[2, ...].ravel()
+        ind, wgt = _comp.get_interp_weights(
+            r, z, trifind=trifind, mpltri=mpltri,
+            interp_space=interp_space, ntri=dmesh.get('ntri', None),
+        )
+
+        # -- Store (shared => read-only) and evict least recently used -------
+        nbytes = ind.nbytes + wgt.nbytes
+        if nbytes <= self._dptscache['maxbytes']:
+            ind.flags.writeable = False
+            wgt.flags.writeable = False
+            if key in dpts.keys():
+                self._dptscache['nbytes'] -= dpts.pop(key)['nbytes']
+            dpts[key] = {'ref': dmesh, 'ind': ind, 'wgt': wgt,
+                         'nbytes': nbytes}
+            self._dptscache['nbytes'] += nbytes
+            self._ptscache_evict()
+        return ind, wgt
+
     def interp_pts2profile(self, pts=None, vect=None, t=None,
                            quant=None, ref1d=None, ref2d=None,
                            q2dR=None, q2dPhi=None, q2dZ=None,
                            interp_t=None, interp_space=None,
-                           fill_value=None, Type=None):
+                           fill_value=None, Type=None, nthreads=None):
         """ Return the value of the desired profiles_1d quantity
 
         For the desired inputs points (pts):
@@ -4168,10 +4531,10 @@ class Plasma2D(utils.ToFuObject):
             idquant=idquant, idref1d=idref1d, idref2d=idref2d,
             idq2dR=idq2dR, idq2dPhi=idq2dPhi, idq2dZ=idq2dZ,
             interp_t=interp_t, interp_space=interp_space,
-            fill_value=fill_value, ani=ani, Type=Type,
+            fill_value=fill_value, ani=ani, Type=Type, nthreads=nthreads,
         )
 
-        # This is the slowest step (~1.8 s)
+        # Points located once, all time steps interpolated at once
         val, t = func(pts, vect=vect, t=t)
         return val, t
 
@@ -1033,16 +1033,6 @@ class DataCollection(utils.ToFuObject):
         # Note : Maybe consider using scipy.LinearNDInterpolator ?
         if idquant is not None:
             vquant = self._ddata[idquant]['data']
-            c0 = (
-                self._ddata[idmesh]['data']['type'] == 'quadtri'
-                and self._ddata[idmesh]['data']['ntri'] > 1
-            )
-            if c0:
-                vquant = np.repeat(
-                    vquant,
-                    self._ddata[idmesh]['data']['ntri'],
-                    axis=0,
-                )
             vr1 = self._ddata[idref1d]['data'] if idref1d is not None else None
             vr2 = self._ddata[idref2d]['data'] if idref2d is not None else None
 
@@ -1083,6 +1073,7 @@ class DataCollection(utils.ToFuObject):
                 tall=tall, tbinall=tbinall, ntall=ntall,
                 indtq=dind.get(idquant),
                 trifind=trifind, Type=Type, mpltri=mpltri,
+                ntri=self._ddata[idmesh]['data'].get('ntri'),
             )
         else:
             func = _comp.get_finterp_isotropic(
@@ -1096,6 +1087,7 @@ class DataCollection(utils.ToFuObject):
                 mpltri=mpltri, trifind=trifind,
                 indtq=dind.get(idquant),
                 indtr1=dind.get(idref1d), indtr2=dind.get(idref2d),
+                ntri=self._ddata[idmesh]['data'].get('ntri'),
             )
 
         return func
@@ -23,6 +23,7 @@ _GROUP_LINES = 'lines'
 _GROUP_NE = 'ne'
 _GROUP_TE = 'Te'
 _UNITS_LAMBDA0 = 'm'
+_DEG_PEC = 2
 
 
 #############################################
@@ -57,6 +58,33 @@ class SpectralLines(DataCollection):
 
     _units_lambda0 = _UNITS_LAMBDA0
 
+    def _reset(self):
+        # Run by the parent class __init__()
+        super()._reset()
+        self._dpecspline = {}
+
+    def update(
+        self,
+        dobj=None,
+        ddata=None,
+        dref=None,
+        dref_static=None,
+        dgroup=None,
+    ):
+        """ Can be used to set/add data/ref/group
+
+        Will update existing attribute with new dict
+        The pec splines of new lines are pre-computed (cf. calc_pec())
+        """
+        super().update(
+            dobj=dobj,
+            ddata=ddata,
+            dref=dref,
+            dref_static=dref_static,
+            dgroup=dgroup,
+        )
+        self._set_pec_splines()
+
     def add_line(
         self,
         key=None,
@@ -615,6 +643,66 @@ class SpectralLines(DataCollection):
     # PEC interpolation
     # ------------------
 
+    def _get_pec_refs(self, key=None):
+        """ Return the keys of the (ne, Te) grid of the pec of a line """
+        keypec = self._dobj[self._grouplines][key]['pec']
+        ne0 = [
+            kk for kk in self._ddata[keypec]['ref']
+            if self._ddata[kk]['group'] == (self._groupne,)
+        ][0]
+        Te0 = [
+            kk for kk in self._ddata[keypec]['ref']
+            if self._ddata[kk]['group'] == (self._groupte,)
+        ][0]
+        return keypec, ne0, Te0
+
+    def _set_pec_splines(self, key=None, deg=None):
+        """ Compute and store the pec splines of the chosen lines (if needed)
+
+        Splines are stored in self._dpecspline, per line and deg, and only
+        re-computed if the pec or its (ne, Te) grid changed
+        Splines of lines without conform pec data are silently skipped
+
+        Return a dict of errors, if any
+        """
+        if deg is None:
+            deg = _DEG_PEC
+        dlines = self._dobj.get(self._grouplines, {})
+        if key is None:
+            key = list(dlines.keys())
+
+            # Remove splines of lines that do not exist anymore
+            for k0 in set(self._dpecspline.keys()).difference(key):
+                del self._dpecspline[k0]
+
+        lg = (self._groupne, self._groupte)
+        derr = {}
+        for k0 in key:
+            keypec = dlines[k0].get('pec')
+            if keypec is None or self._ddata[keypec]['group'] != lg:
+                continue
+            try:
+                keypec, ne0, Te0 = self._get_pec_refs(key=k0)
+                ldata = [self._ddata[kk]['data'] for kk in [ne0, Te0, keypec]]
+                spl = self._dpecspline.get(k0, {}).get(deg)
+                if spl is not None and all([
+                    spl['ref'][ii] is ldata[ii] for ii in range(3)
+                ]):
+                    continue
+                spl = _comp_spectrallines._get_pec_spline(
+                    ne0=ldata[0],
+                    Te0=ldata[1],
+                    pec0=ldata[2],
+                    deg=deg,
+                )
+                spl.update({'ref': ldata, 'grid': (ne0, Te0)})
+                if k0 not in self._dpecspline.keys():
+                    self._dpecspline[k0] = {}
+                self._dpecspline[k0][deg] = spl
+            except Exception as err:
+                derr[k0] = str(err)
+        return derr
+
     def calc_pec(
         self,
         key=None,
@@ -648,7 +736,7 @@ class SpectralLines(DataCollection):
         dlines = self._dobj[self._grouplines]
 
         if deg is None:
-            deg = 2
+            deg = _DEG_PEC
 
         # Check data conformity
         lg = (self._groupne, self._groupte)
@@ -682,33 +770,29 @@ class SpectralLines(DataCollection):
                 )
                 raise Exception(msg)
 
-        # Interpolate
-        dout = {}
-        derr = {}
+        # Get splines (only computed if not done yet)
+        derr = self._set_pec_splines(key=key, deg=deg)
+
+        # Interpolate, all lines sharing the same (ne, Te) grid at once
+        dgrid = {}
         for k0 in key:
-            try:
-                ne0 = [
-                    kk for kk in self._ddata[dlines[k0]['pec']]['ref']
-                    if self._ddata[kk]['group'] == (self._groupne,)
-                ][0]
-                ne0 = self._ddata[ne0]['data']
-                Te0 = [
-                    kk for kk in self._ddata[dlines[k0]['pec']]['ref']
-                    if self._ddata[kk]['group'] == (self._groupte,)
-                ][0]
-                Te0 = self._ddata[Te0]['data']
+            if k0 not in derr.keys():
+                grid0 = self._dpecspline[k0][deg]['grid']
+                dgrid[grid0] = dgrid.get(grid0, []) + [k0]
 
-                dout[k0] = _comp_spectrallines._interp_pec(
-                    ne0=ne0,
-                    Te0=Te0,
-                    pec0=self._ddata[dlines[k0]['pec']]['data'],
+        dout = {}
+        for grid0, lk in dgrid.items():
+            try:
+                out = _comp_spectrallines._interp_pec(
+                    lspline=[self._dpecspline[k0][deg] for k0 in lk],
                     ne=dnTe['ne'],
                     Te=dnTe['Te'],
-                    deg=deg,
                     grid=grid,
                 )
+                dout.update({k0: out[ii] for ii, k0 in enumerate(lk)})
             except Exception as err:
-                derr[k0] = str(err)
+                derr.update({k0: str(err) for k0 in lk})
+        dout = {k0: dout[k0] for k0 in key if k0 in dout.keys()}
 
         if len(derr) > 0:
             msg = (
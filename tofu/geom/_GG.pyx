@@ -2973,7 +2973,8 @@ def LOS_calc_signal(func, double[:,::1] ray_orig, double[:,::1] ray_vdir, res,
                     double[:,::1] lims, str dmethod='abs',
                     str method='sum', bint ani=False,
                     t=None, fkwdargs={}, str minimize='calls',
-                    bint Test=True, int num_threads=16):
+                    bint Test=True, int num_threads=16,
+                    chunk_pts=None, chunk_t=None, tol=None):
     """ Compute the synthetic signal, minimizing either function calls or memory
     Params
     =====
@@ -2995,7 +2996,10 @@ def LOS_calc_signal(func, double[:,::1] ray_orig, double[:,::1] ray_vdir, res,
     dmethod: string
         type of discretization step: 'abs' for absolute or 'rel' for relative
     method: string
-        method of quadrature on the LOS
+        method of quadrature on the LOS: 'sum', 'simps', 'romb' or
+        'adaptive' (res is then only the initial step, each LOS is refined
+        until the relative tolerance tol is met, see
+        _LOS_calc_signal_adaptive)
     ani : bool
         to indicate if emission is anisotropic or not
     t : None or array-like
@@ -3004,10 +3008,22 @@ def LOS_calc_signal(func, double[:,::1] ray_orig, double[:,::1] ray_vdir, res,
         "calls" : we use algorithm to minimize the calls to 'func' (default)
         "memory": we use algorithm to minimize memory used
         "hybrid": a mix of both methods
+        "chunks": stream blocks of at most chunk_pts points and chunk_t times
+                  through func, accumulating the integrals in place
     Test : bool
         we test if the inputs are giving in a proper way.
     num_threads: int
         number of threads if we want to parallelize the code.
+    chunk_pts: None or int
+        if minimize="chunks", max number of points per call to func
+        (a LOS is only split between calls if method='sum')
+        None => no limit
+    chunk_t: None or int
+        if minimize="chunks", max number of time steps per call to func
+        None => no limit
+    tol: None or float
+        if method="adaptive", relative tolerance on the integral of each LOS
+        None => _ADAPT_TOL
     """
     cdef str error_message
     cdef str dmode = dmethod.lower()
@@ -3066,11 +3082,16 @@ def LOS_calc_signal(func, double[:,::1] ray_orig, double[:,::1] ray_vdir, res,
                         +" ['abs','rel'], for absolute or relative."
         assert dmode in ['abs','rel'], error_message
         error_message = "Wrong method of integration." \
-                        + " Options are: ['sum','simps','romb']"
-        assert imode in ['sum','simps','romb'], error_message
+                        + " Options are: ['sum','simps','romb','adaptive']"
+        assert imode in ['sum','simps','romb','adaptive'], error_message
         error_message = "Wrong minimize optimization."\
-                        + " Options are: ['calls','memory','hybrid']"
-        assert minim in ['calls','memory','hybrid'], error_message
+                        + " Options are: ['calls','memory','hybrid','chunks']"
+        assert minim in ['calls','memory','hybrid','chunks'], error_message
+        error_message = "Args chunk_pts and chunk_t must be None or int > 0"
+        assert all([cc is None or cc > 0 for cc in [chunk_pts, chunk_t]]), \
+            error_message
+        error_message = "Arg tol must be None or a float in ]0, 1["
+        assert tol is None or 0. < tol < 1., error_message
     # -- Preformat output signal -----------------------------------------------
     if t is None:
         if minim == 'memory':
@@ -3103,8 +3124,19 @@ def LOS_calc_signal(func, double[:,::1] ray_orig, double[:,::1] ray_vdir, res,
         res_arr = np.ones((nlos,), dtype=float) * res
     res_mv = res_arr
     # --------------------------------------------------------------------------
+    # Adaptive quadrature: refine each LOS until tol is met (minimize ignored)
+    if imode == 'adaptive':
+        _LOS_calc_signal_adaptive(func, ray_orig, ray_vdir, res_arr, lims,
+                                  sig, t, nt, dmode, ani, fkwdargs, tol)
+    # --------------------------------------------------------------------------
+    # Stream blocks of points and times through func, bounded memory
+    elif minim == 'chunks':
+        _LOS_calc_signal_chunks(func, ray_orig, ray_vdir, res_arr, lims,
+                                sig, t, nt, dmode, imode, ani, fkwdargs,
+                                chunk_pts, chunk_t, Test, num_threads)
+    # --------------------------------------------------------------------------
     # Minimize function calls: sample (vect), call (once) and integrate
-    if minim == 'calls':
+    elif minim == 'calls':
         if n_imode != 0:
             # Integration mode is Simpson or Romberg
             # Discretize all LOS
@@ -3369,6 +3401,214 @@ def LOS_calc_signal(func, double[:,::1] ray_orig, double[:,::1] ray_vdir, res,
     return sig
 
 
+def _LOS_get_sample_nb(double[::1] res, double[:,::1] lims,
+                       str dmethod='abs', str method='sum'):
+    """ Return the number of sampling points of each LOS
+
+    Mirrors the rules of LOS_get_sample without computing the points,
+    used to group LOS in blocks of bounded size
+    """
+    cdef np.ndarray[double,ndim=1] nraf
+    if dmethod == 'abs':
+        nraf = np.ceil((np.asarray(lims[1, :]) - np.asarray(lims[0, :]))
+                       / np.asarray(res))
+    else:
+        nraf = np.ceil(1. / np.asarray(res))
+    nraf = np.maximum(nraf, 1.)
+    if method == 'simps':
+        nraf = nraf + nraf % 2 + 1
+    elif method == 'romb':
+        nraf = 2**np.ceil(np.log2(nraf)) + 1
+    return nraf.astype(int)
+
+
+def _LOS_calc_signal_chunks(func, double[:,::1] ray_orig,
+                            double[:,::1] ray_vdir,
+                            np.ndarray[double,ndim=1] res_arr,
+                            double[:,::1] lims,
+                            np.ndarray[double,ndim=2, mode='fortran'] sig,
+                            t, int nt, str dmode, str imode, bint ani,
+                            fkwdargs, chunk_pts, chunk_t,
+                            bint Test, int num_threads):
+    """ Fill sig (nt, nlos) in place, streaming blocks through func
+
+    Consecutive LOS are grouped so that each block holds at most chunk_pts
+    points (a single LOS being split only for the 'sum' quadrature), and
+    time steps are passed to func by slices of at most chunk_t.
+    Hence, at most chunk_pts x chunk_t values are in memory at once.
+    """
+    cdef int nlos = ray_orig.shape[1]
+    cdef int ii, i0, i1, it0, it1, ip0, ip1
+    cdef long npts
+    cdef list lt
+    cdef np.ndarray[long,ndim=1] nb
+    cdef np.ndarray[long,ndim=1] cum
+    # -- time slices -----------------------------------------------------------
+    if t is None or not hasattr(t, '__iter__'):
+        lt = [(0, nt, t)]
+    else:
+        chunk_t = nt if chunk_t is None else int(chunk_t)
+        t = np.asarray(t)
+        lt = [(it0, min(it0 + chunk_t, nt), t[it0:min(it0 + chunk_t, nt)])
+              for it0 in range(0, nt, chunk_t)]
+    # -- LOS blocks ------------------------------------------------------------
+    nb = _LOS_get_sample_nb(res_arr, lims, dmethod=dmode, method=imode)
+    chunk_pts = max(int(np.sum(nb)), 1) if chunk_pts is None else int(chunk_pts)
+    sig[...] = 0.
+    i0 = 0
+    while i0 < nlos:
+        # Largest group of consecutive LOS within budget (at least one)
+        cum = np.cumsum(nb[i0:])
+        i1 = i0 + max(int(np.searchsorted(cum, chunk_pts, side='right')), 1)
+        k, reseff, ind = LOS_get_sample(i1 - i0, res_arr[i0:i1],
+                                        np.ascontiguousarray(lims[:, i0:i1]),
+                                        dmethod=dmode, method=imode,
+                                        num_threads=num_threads, Test=Test)
+        indbis = np.r_[0, ind, k.size]
+        nbrep = np.diff(indbis)
+        usbis = np.repeat(ray_vdir[:, i0:i1], nbrep, axis=1)
+        pts = np.repeat(ray_orig[:, i0:i1], nbrep, axis=1) + k[None, :]*usbis
+        npts = k.size
+        if i1 - i0 == 1 and imode == 'sum' and npts > chunk_pts:
+            # Single LOS too long for budget: accumulate sub-blocks
+            for ip0 in range(0, npts, chunk_pts):
+                ip1 = min(ip0 + chunk_pts, npts)
+                for (it0, it1, tt) in lt:
+                    if ani:
+                        val = func(pts[:, ip0:ip1], t=tt,
+                                   vect=-usbis[:, ip0:ip1], **fkwdargs)
+                    else:
+                        val = func(pts[:, ip0:ip1], t=tt, **fkwdargs)
+                    val = np.asarray(val).reshape((it1 - it0, ip1 - ip0))
+                    sig[it0:it1, i0] += np.sum(val, axis=-1)*reseff[0]
+        else:
+            for (it0, it1, tt) in lt:
+                if ani:
+                    val = func(pts, t=tt, vect=-usbis, **fkwdargs)
+                else:
+                    val = func(pts, t=tt, **fkwdargs)
+                val = np.asarray(val).reshape((it1 - it0, npts))
+                if imode == 'sum':
+                    sig[it0:it1, i0:i1] = (np.add.reduceat(val, indbis[:-1],
+                                                           axis=-1)
+                                           * reseff[None, :])
+                elif imode == 'simps':
+                    for ii in range(i1 - i0):
+                        sig[it0:it1, i0+ii] = scpintg.simps(
+                            val[:, indbis[ii]:indbis[ii+1]],
+                            x=None, dx=reseff[ii], axis=-1)
+                else:
+                    for ii in range(i1 - i0):
+                        sig[it0:it1, i0+ii] = scpintg.romb(
+                            val[:, indbis[ii]:indbis[ii+1]],
+                            dx=reseff[ii], axis=-1, show=False)
+        i0 = i1
+    return
+
+
+_ADAPT_TOL = 1.e-3
+_ADAPT_MAXITER = 20
+_ADAPT_FLOOR = 1.e-6
+
+
+def _LOS_calc_signal_adaptive(func, double[:,::1] ray_orig,
+                              double[:,::1] ray_vdir,
+                              np.ndarray[double,ndim=1] res_arr,
+                              double[:,::1] lims,
+                              np.ndarray[double,ndim=2, mode='fortran'] sig,
+                              t, int nt, str dmode, bint ani,
+                              fkwdargs, tol):
+    """ Fill sig (nt, nlos) in place, by adaptive Simpson quadrature
+
+    Each LOS is first split into panels of length ~res (as for 'sum').
+    On each panel, Simpson's rule on 3 points (S1) is compared to the
+    composite rule on its 2 halves (S2, 5 points): the panel is accepted if
+        max_t |S2 - S1| / 15 <= tol * |I_los| * h / L_los
+    and contributes S2 + (S2 - S1)/15, otherwise it is split in 2 halves.
+    Each half inherits 3 of its 5 points from its parent, so only 2 new
+    points are evaluated per new panel.
+    The points of all LOS are passed to func together, once per refinement
+    level (at most _ADAPT_MAXITER levels, the last one being accepted).
+    |I_los| is floored to _ADAPT_FLOOR x the largest signal, so that LOS
+    seeing (almost) nothing do not need refinement.
+    Zero-length LOS (L <= 0) have a null signal and are not refined.
+    """
+    cdef int nlos = ray_orig.shape[1]
+    cdef int it
+    cdef np.ndarray[long,ndim=1] nb
+    if tol is None:
+        tol = _ADAPT_TOL
+    D = np.asarray(ray_orig)
+    u = np.asarray(ray_vdir)
+    k0 = np.asarray(lims[0, :])
+    L = np.asarray(lims[1, :]) - k0
+
+    def feval(los, k):
+        us = u[:, los]
+        pts = D[:, los] + k[None, :]*us
+        if ani:
+            val = func(pts, t=t, vect=-us, **fkwdargs)
+        else:
+            val = func(pts, t=t, **fkwdargs)
+        return np.asarray(val, dtype=float).reshape((nt, k.size))
+
+    def sumlos(val, los):
+        return np.array([np.bincount(los, weights=vv, minlength=nlos)
+                         for vv in val]).reshape((nt, nlos))
+
+    # -- Initial panels: 4 sub-steps each, shared end points -------------------
+    # zero-length LOS (L <= 0) get no panel (null signal, no refinement)
+    nb = _LOS_get_sample_nb(res_arr, lims, dmethod=dmode, method='sum')
+    nb[L <= 0.] = 0
+    npts = 4*nb + 1
+    indpts = np.r_[0, np.cumsum(npts)]
+    lospts = np.repeat(np.arange(nlos), npts)
+    h = L/np.maximum(nb, 1)
+    val = feval(lospts, k0[lospts]
+                + (np.arange(indpts[nlos]) - indpts[lospts])*h[lospts]/4.)
+    los = np.repeat(np.arange(nlos), nb)
+    ipan = np.arange(los.size) - np.r_[0, np.cumsum(nb)[:-1]][los]
+    ind = indpts[los] + 4*ipan
+    hp = h[los]
+    kp = k0[los] + ipan*hp
+    fp = np.stack([val[:, ind + ii] for ii in range(5)], axis=0)
+
+    # -- Refine ----------------------------------------------------------------
+    sig[...] = 0.
+    for it in range(_ADAPT_MAXITER + 1):
+        S1 = hp/6.*(fp[0] + 4.*fp[2] + fp[4])
+        S2 = hp/12.*(fp[0] + 4.*fp[1] + 2.*fp[2] + 4.*fp[3] + fp[4])
+        err = np.max(np.abs(S2 - S1), axis=0) / 15.
+        R = S2 + (S2 - S1)/15.
+
+        # Current estimate of each LOS integral => local tolerance
+        ref = np.max(np.abs(sig + sumlos(R, los)), axis=0)
+        ref = np.maximum(ref, _ADAPT_FLOOR*np.max(ref))
+        ok = err <= tol*ref[los]*hp/L[los]
+        if it == _ADAPT_MAXITER or np.all(ok):
+            ok[:] = True
+        sig += sumlos(R[:, ok], los[ok])
+        if np.all(ok):
+            break
+
+        # Split rejected panels, evaluate the 2 new points of each half
+        los, kp, hp, fp = los[~ok], kp[~ok], hp[~ok], fp[:, :, ~ok]
+        knew = kp[None, :] + np.array([1., 3., 5., 7.])[:, None]*hp[None, :]/8.
+        fnew = feval(np.tile(los, 4), knew.ravel()).reshape((nt, 4, los.size))
+        # children (left, right) interleaved to keep panels sorted by LOS
+        fp = np.stack([
+            np.stack([fp[0], fp[2]], axis=-1),
+            np.stack([fnew[:, 0], fnew[:, 2]], axis=-1),
+            np.stack([fp[1], fp[3]], axis=-1),
+            np.stack([fnew[:, 1], fnew[:, 3]], axis=-1),
+            np.stack([fp[2], fp[4]], axis=-1),
+        ], axis=0).reshape((5, nt, 2*los.size))
+        kp = np.stack([kp, kp + hp/2.], axis=-1).ravel()
+        hp = np.repeat(hp/2., 2)
+        los = np.repeat(los, 2)
+    return
+
+
 ######################################################################
 #               Sinogram-specific
 ######################################################################
@@ -3680,22 +3920,20 @@ def Dust_calc_SolidAngle(pos, r, pts,
                          approx=True, out_coefonly=False,
                          VType='Tor', VPoly=None, VIn=None, VLim=None,
                          LSPoly=None, LSLim=None, LSVIn=None, Forbid=True,
-                         Test=True):
+                         Test=True, eps_sang=0.):
     """ Compute the solid angle of a moving particle of varying radius as seen
     from any number of pixed points
 
     Can be done w/o the approximation that r<<d
     If Ves (and optionally LSPoly) are provided, takes into account vignetting
+    If eps_sang > 0, solid angles below eps_sang are neglected (set to 0),
+    and the corresponding visibility tests (ray casting) are skipped
     """
     cdef block = VPoly is not None
-    cdef float pir2
-    cdef int ii, jj, nptsok, nt=pos.shape[1], npts=pts.shape[1]
+    cdef int ii, nt=pos.shape[1], npts=pts.shape[1]
     cdef np.ndarray[double, ndim=2, mode='c'] sang=np.zeros((nt,npts))
-    cdef array k
-    cdef np.ndarray[double, ndim=1, mode='c'] vis
-    cdef double[::1] k_view
-    cdef double[::1] lspolyx, lspolyy
-    cdef double[::1] lsnormx, lsnormy
+    cdef np.ndarray[double, ndim=1, mode='c'] dist, sangi
+    cdef np.ndarray[long, ndim=1, mode='c'] vis
     if block:
         ind = ~_Ves_isInside(pts, VPoly, ves_lims=VLim, ves_type=VType,
                              in_format='(X,Y,Z)', test=Test)
@@ -3714,98 +3952,36 @@ def Dust_calc_SolidAngle(pos, r, pts,
             lsnormx = None
             lsnormy = None
         ind = (~ind).nonzero()[0]
-        ptstemp = np.ascontiguousarray(pts[:,ind])
-        nptsok = ind.size
-        k = clone(array('d'), nptsok, True)
-        k_view = k
-        if approx and out_coefonly:
-            for ii in range(nt):
-                _bgt.compute_dist_pt_vec(pos[0,ii], pos[1,ii],
-                                         pos[2,ii], nptsok,
-                                         ptstemp, &k_view[0])
-                vis = LOS_isVis_PtFromPts_VesStruct(pos[0,ii], pos[1,ii],
-                                                    pos[2,ii], ptstemp,
-                                                    k=k_view,
-                                                    ves_poly=VPoly,
-                                                    ves_norm=VIn, ves_lims=VLim,
-                                                    lstruct_polyx=lspolyx,
-                                                    lstruct_polyy=lspolyy,
-                                                    lstruct_lims=LSLim,
-                                                    lstruct_normx=lsnormx,
-                                                    lstruct_normy=lsnormy,
-                                                    forbid=Forbid,
-                                                    ves_type=VType, test=Test)
-                for jj in range(nptsok):
-                    if vis[jj]:
-                        sang[ii,ind[jj]] = c_pi/k_view[jj]**2
-        elif approx:
-            for ii in range(nt):
-                _bgt.compute_dist_pt_vec(pos[0,ii], pos[1,ii],
-                                         pos[2,ii], nptsok,
-                                         ptstemp, &k_view[0])
-                vis = LOS_isVis_PtFromPts_VesStruct(pos[0,ii], pos[1,ii],
-                                                    pos[2,ii], ptstemp,
-                                                    ves_poly=VPoly,
-                                                    k=k_view,
-                                                    ves_norm=VIn, ves_lims=VLim,
-                                                    lstruct_polyx=lspolyx,
-                                                    lstruct_polyy=lspolyy,
-                                                    lstruct_lims=LSLim,
-                                                    lstruct_normx=lsnormx,
-                                                    lstruct_normy=lsnormy,
-                                                    forbid=Forbid,
-                                                    ves_type=VType, test=Test)
-                pir2 = c_pi*r[ii]**2
-                for jj in range(nptsok):
-                    if vis[jj]:
-                        sang[ii,ind[jj]] = pir2/k_view[jj]**2
-        else:
-            pir2 = _TWOPI
-            for ii in range(nt):
-                _bgt.compute_dist_pt_vec(pos[0,ii], pos[1,ii],
-                                         pos[2,ii], nptsok,
-                                         ptstemp, &k_view[0])
-                vis = LOS_isVis_PtFromPts_VesStruct(pos[0,ii], pos[1,ii],
-                                                    pos[2,ii],
-                                                    ptstemp,
-                                                    ves_poly=VPoly,
-                                                    k=k_view,
-                                                    ves_norm=VIn, ves_lims=VLim,
-                                                    lstruct_polyx=lspolyx,
-                                                    lstruct_polyy=lspolyy,
-                                                    lstruct_lims=LSLim,
-                                                    lstruct_normx=lsnormx,
-                                                    lstruct_normy=lsnormy,
-                                                    forbid=Forbid,
-                                                    ves_type=VType, test=Test)
-                for jj in range(0,nptsok):
-                    if vis[jj]:
-                        sang[ii,ind[jj]] = pir2*(1-c_sqrt(1-r[ii]**2/k[jj]**2))
-
     else:
+        ind = np.arange(0, npts)
+    ptstemp = np.ascontiguousarray(pts[:,ind])
+
+    for ii in range(nt):
+        dist = np.sqrt(np.sum((ptstemp - pos[:, ii:ii+1])**2, axis=0))
         if approx and out_coefonly:
-            for ii in range(nt):
-                for jj in range(npts):
-                    dij2 = ((pos[0,ii]-pts[0,jj])**2
-                            + (pos[1,ii]-pts[1,jj])**2
-                            + (pos[2,ii]-pts[2,jj])**2)
-                    sang[ii,jj] = c_pi/dij2
+            sangi = c_pi / dist**2
         elif approx:
-            for ii in range(nt):
-                pir2 = c_pi*r[ii]**2
-                for jj in range(npts):
-                    dij2 = ((pos[0,ii]-pts[0,jj])**2
-                            + (pos[0,ii]-pts[0,jj])**2
-                            + (pos[0,ii]-pts[0,jj])**2)
-                    sang[ii,jj] = pir2/dij2
+            sangi = c_pi * r[ii]**2 / dist**2
         else:
-            pir2 = _TWOPI
-            for ii in range(nt):
-                for jj in range(npts):
-                    dij2 = ((pos[0,ii]-pts[0,jj])**2
-                            + (pos[0,ii]-pts[0,jj])**2
-                            + (pos[0,ii]-pts[0,jj])**2)
-                    sang[ii,jj] = pir2*(1-c_sqrt(1-r[ii]**2/dij2))
+            sangi = _TWOPI * (1. - np.sqrt(1. - r[ii]**2 / dist**2))
+        # Neglect small solid angles before any ray casting
+        indok = np.isfinite(sangi) & (sangi >= eps_sang)
+        if not np.any(indok):
+            continue
+        indok = indok.nonzero()[0]
+        if block:
+            vis = LOS_isVis_PtFromPts_VesStruct(
+                pos[0,ii], pos[1,ii], pos[2,ii],
+                np.ascontiguousarray(ptstemp[:, indok]),
+                dist=np.ascontiguousarray(dist[indok]),
+                ves_poly=VPoly, ves_norm=VIn, ves_lims=VLim,
+                lstruct_polyx=lspolyx, lstruct_polyy=lspolyy,
+                lstruct_lims=LSLim,
+                lstruct_normx=lsnormx, lstruct_normy=lsnormy,
+                forbid=Forbid, ves_type=VType, test=Test,
+            )
+            indok = indok[vis.astype(bool)]
+        sang[ii, ind[indok]] = sangi[indok]
     return sang
 
 
@@ -4576,13 +4752,16 @@ def compute_solid_angle_map(double[:,::1] part_coords, double[::1] part_r,
                             double eps_vz=_VSMALL, double eps_b=_VSMALL,
                             double eps_plane=_VSMALL, str ves_type='Tor',
                             double margin=_VSMALL, int num_threads=48,
-                            bint test=True):
+                            bint test=True,
+                            double eps_sang=0., int ngroups=0):
     """
     Computes the 2D map of the integrated solid angles subtended by each of
     the sz_p particles P of radius part_r at the position part_coords
     in the sampled volume.
     If approx, a 8th degree approximation will be used for the computation
     of the solid angle
+    If eps_sang > 0, solid angles below eps_sang are neglected, and the
+    corresponding visibility tests (ray casting) are skipped
 
     Parameters
     ----------
@@ -4660,6 +4839,13 @@ def compute_solid_angle_map(double[:,::1] part_coords, double[::1] part_r,
        Typically this is the number of cores available on the machine.
     test : bool, optional
        Should we run tests? Default True
+    eps_sang : double, optional
+       Solid angle (sr) below which the contribution of a particle to a
+       point is neglected (no ray casting). Default 0 (no approximation)
+    ngroups : int, optional
+       Number of groups (toroidal sectors) particles are sorted in, a whole
+       group being skipped for a point if its largest possible solid angle
+       is below eps_sang. Default (0): sqrt(sz_p) if eps_sang > 0, else 1
 
     Returns
     -------
@@ -4884,6 +5070,23 @@ def compute_solid_angle_map(double[:,::1] part_coords, double[::1] part_r,
     # initializing utilitary arrays
     num_threads = _ompt.get_effective_num_threads(num_threads)
     lstruct_lims_np = flatten_lstruct_lims(lstruct_lims)
+    # .. grouping particles by toroidal sectors (bounding spheres) ...........
+    if ngroups <= 0:
+        ngroups = <int>c_ceil(c_sqrt(sz_p)) if eps_sang > 0. else 1
+    ngroups = min(ngroups, sz_p)
+    part_ind = np.argsort(np.arctan2(part_coords[1, :], part_coords[0, :]),
+                          kind='stable')
+    group_start = np.linspace(0, sz_p, ngroups + 1).astype(int)
+    group_center = np.zeros((3, ngroups))
+    group_rad = np.zeros((ngroups,))
+    group_rmax = np.zeros((ngroups,))
+    for jj in range(ngroups):
+        indg = part_ind[group_start[jj]:group_start[jj+1]]
+        ptsg = np.asarray(part_coords)[:, indg]
+        group_center[:, jj] = np.mean(ptsg, axis=1)
+        group_rad[jj] = np.max(np.sqrt(np.sum(
+            (ptsg - group_center[:, jj:jj+1])**2, axis=0)))
+        group_rmax[jj] = np.max(np.asarray(part_r)[indg])
     # ..............
     _st.sa_assemble_arrays(block,
                            approx,
@@ -4921,7 +5124,14 @@ def compute_solid_angle_map(double[:,::1] part_coords, double[::1] part_r,
                            reso_rdrdz_mv,
                            pts_mv,
                            ind_mv,
-                           num_threads)
+                           num_threads,
+                           eps_sang,
+                           ngroups,
+                           group_start,
+                           part_ind,
+                           group_center,
+                           group_rad,
+                           group_rmax)
     # ... freeing up memory ....................................................
     free(lindex_z)
     free(disc_r)
@@ -11,6 +11,7 @@ from xml.dom import minidom
 import numpy as np
 import scipy.interpolate as scpinterp
 import scipy.integrate as scpintg
+import scipy.sparse as scpsp
 from inspect import signature as insp
 
 
@@ -45,6 +46,8 @@ _SAMPLE_RESMODE = {
     'surface': 'abs',
     'volume': 'abs',
 }
+# Max number of points per tile when sampling a volume by tiles
+_SAMPLEV_TILE_PTS = int(1e6)
 
 
 def _check_float(var=None, varname=None, vardef=None):
@@ -1056,6 +1059,182 @@ def _Ves_get_sampleV(
     return pts, dV, ind, reseff
 
 
+def _Ves_get_sampleV_cellrange(MinMax, dstep, dl, margin=1.0e-9):
+    """ Return the step and [n0, n1[ range of cells of a sampled segment
+
+    Mirrors the cell selection of the cython sampling routines (absolute
+    mode), so that tiles put together give exactly the same cells
+    """
+    ncells = int(np.ceil((MinMax[1] - MinMax[0]) / dstep))
+    step = (MinMax[1] - MinMax[0]) / ncells
+    lim = [MinMax[0], MinMax[1]]
+    if dl is not None:
+        if dl[0] is not None and dl[0] > MinMax[0]:
+            lim[0] = dl[0]
+        if dl[1] is not None and dl[1] < MinMax[1]:
+            lim[1] = dl[1]
+    abs0 = np.abs(lim[0] - MinMax[0])
+    if abs0 - step*np.floor(abs0/step) < margin*step:
+        n0 = int(np.round((lim[0] - MinMax[0]) / step))
+    else:
+        n0 = int(np.floor((lim[0] - MinMax[0]) / step))
+    abs1 = np.abs(lim[1] - MinMax[0])
+    if abs1 - step*np.floor(abs1/step) < margin*step:
+        n1 = int(np.round((lim[1] - MinMax[0]) / step))
+    else:
+        n1 = int(np.floor((lim[1] - MinMax[0]) / step)) + 1
+    return step, n0, n1
+
+
+def _Ves_get_sampleV_tiles(
+    VPoly,
+    Min1,
+    Max1,
+    Min2,
+    Max2,
+    res=None,
+    domain=None,
+    resMode=None,
+    VType="Tor",
+    VLim=None,
+    returnas="(X,Y,Z)",
+    margin=1.0e-9,
+    algo="new",
+    num_threads=48,
+    tile_pts=None,
+):
+    """ Sample the volume by tiles (generator)
+
+    The domain is split in tiles along the two poloidal coordinates
+    ((R, Z) for a torus, (Y, Z) for a linear device), each tile holding at
+    most about tile_pts points (at least one cell in each direction)
+
+    Each tile is sampled by _Ves_get_sampleV() on a sub-domain whose limits
+    lie at cell centers, so that tiles do not overlap and their global
+    indices are those of the whole sample
+
+    Yields (pts, dV, ind, reseff) for each non-empty tile
+    """
+
+    # -------------
+    #  Check inputs
+    res, domain, resMode, _ = _Ves_get_sample_checkinputs(
+        res=res,
+        domain=domain,
+        resMode=resMode,
+        ind=None,
+        which='volume',
+    )
+    if tile_pts is None:
+        tile_pts = _SAMPLEV_TILE_PTS
+    if not (type(tile_pts) in _LTYPES and tile_pts >= 1):
+        msg = ("Arg tile_pts must be a positive int!\n"
+               + "\t- provided: {}".format(tile_pts))
+        raise Exception(msg)
+
+    # -------------
+    # Cells ranges along both poloidal coordinates
+    if VType.lower() == "tor":
+        i1, i2 = 0, 1
+    else:
+        i1, i2 = 1, 2
+    step1, n10, n11 = _Ves_get_sampleV_cellrange(
+        [Min1, Max1], res[i1], domain[i1], margin=margin,
+    )
+    step2, n20, n21 = _Ves_get_sampleV_cellrange(
+        [Min2, Max2], res[i2], domain[i2], margin=margin,
+    )
+
+    # Upper bound of the nb. of pts per (1, 2) cell, for each cell along 1
+    if VType.lower() == "tor":
+        r = Min1 + (0.5 + np.arange(n10, n11))*step1
+        npts12 = np.ceil(2.*np.pi*r / res[2])
+        if domain[2] is not None and None not in domain[2]:
+            frac = np.mod(domain[2][1] - domain[2][0], 2.*np.pi) / (2.*np.pi)
+            if frac > 0.:
+                npts12 = np.ceil(npts12 * frac) + 1
+    else:
+        VLim = np.array(VLim).ravel()
+        npts12 = np.full((n11 - n10,),
+                         np.ceil((VLim[1] - VLim[0]) / res[0]))
+
+    # -------------
+    # Loop on tiles: blocks of cells along 1, then blocks of cells along 2
+    i0 = 0
+    while i0 < n11 - n10:
+        cum = np.cumsum(npts12[i0:])
+        n1 = max(1, np.searchsorted(cum, tile_pts, side='right'))
+        nblock2 = max(1, int(tile_pts // cum[n1 - 1]))
+        dom1 = [Min1 + (n10 + i0 + 0.5)*step1,
+                Min1 + (n10 + i0 + n1 - 0.5)*step1]
+        for j0 in range(n20, n21, nblock2):
+            j1 = min(j0 + nblock2, n21)
+            dom = list(domain)
+            dom[i1] = dom1
+            dom[i2] = [Min2 + (j0 + 0.5)*step2, Min2 + (j1 - 0.5)*step2]
+            pts, dV, ind, reseff = _Ves_get_sampleV(
+                VPoly, Min1, Max1, Min2, Max2,
+                res=res, domain=dom, resMode=resMode, ind=None,
+                VType=VType, VLim=VLim, returnas=returnas,
+                margin=margin, algo=algo, num_threads=num_threads,
+            )
+            if ind.size > 0:
+                yield pts, dV, ind, reseff
+        i0 += n1
+
+
+def _Ves_get_sampleV_memmap(memmap, tiles):
+    """ Write the tiles of a volume sample to raw binary files
+
+    The files (C-ordered, native endianness) are:
+        - memmap + '_pts.bin': float, (npts, 3)
+        - memmap + '_dV.bin': float, (npts,) (if dV is not a scalar)
+        - memmap + '_ind.bin': int, (npts,)
+    And are returned as read-only np.memmap, pts being transposed to (3, npts)
+
+    The scalar components of reseff are common to all tiles (checked), while
+    the array ones (toroidal resolution, one value per R of the tile) are
+    returned as a list with one array per tile, in the order of the files
+    """
+    lf = {kk: memmap + '_{}.bin'.format(kk) for kk in ['pts', 'dV', 'ind']}
+    dV, lreseff, npts = None, [], 0
+    with open(lf['pts'], 'wb') as fpts, \
+            open(lf['dV'], 'wb') as fdV, \
+            open(lf['ind'], 'wb') as find:
+        for ptsi, dVi, indi, reseffi in tiles:
+            np.ascontiguousarray(ptsi.T, dtype=float).tofile(fpts)
+            np.ascontiguousarray(indi, dtype=int).tofile(find)
+            if np.isscalar(dVi):
+                dV = dVi
+            else:
+                np.ascontiguousarray(dVi, dtype=float).tofile(fdV)
+            lreseff.append(reseffi)
+            npts += indi.size
+    if dV is not None:
+        os.remove(lf['dV'])
+    if npts == 0:
+        msg = "No point in the sampled volume!"
+        raise Exception(msg)
+
+    reseff = []
+    for ii, rr in enumerate(lreseff[0]):
+        lrr = [reseffi[ii] for reseffi in lreseff]
+        if np.isscalar(rr):
+            if not np.allclose(lrr, rr):
+                msg = ("Tiles have different effective resolutions!\n"
+                       + "\t- reseff[{}]: {}".format(ii, lrr))
+                raise Exception(msg)
+            reseff.append(rr)
+        else:
+            reseff.append(lrr)
+
+    pts = np.memmap(lf['pts'], dtype=float, mode='r', shape=(npts, 3)).T
+    ind = np.memmap(lf['ind'], dtype=int, mode='r', shape=(npts,))
+    if dV is None:
+        dV = np.memmap(lf['dV'], dtype=float, mode='r', shape=(npts,))
+    return pts, dV, ind, reseff
+
+
 # ==============================================================================
 # =  phi / theta projections for magfieldlines
 # ==============================================================================
@@ -1455,3 +1634,59 @@ def LOS_calc_signal(
     elif method == "romb":
         Int = scpintg.romb(Vals, dx=dLr, show=False)
     return Int
+
+
+def LOS_calc_geommatrix(
+    func, Ds, us, DL, res, nval,
+    resMode="abs", method="sum", num_threads=16,
+):
+    """ Return the sparse matrix integrating mesh values along each LOS
+
+    func(pts) must return (ind, wgt), the (nv, npts) indices of the mesh
+    values and interpolation weights at pts (ind = -1 outside the mesh),
+    as given by tofu.data._comp.get_interp_weights()
+
+    The signal is then geommat.dot(val) for any (nval,) or (nval, nt) val
+
+    Return
+    ------
+    geommat:    (nlos, nval) scipy.sparse.csr_matrix
+    wout:       (nlos,) np.ndarray
+        total integration weights of the points outside the mesh
+        (to be multiplied by the fill_value)
+    """
+    if method not in ["sum", "simps"]:
+        msg = ("Arg method must be in ['sum', 'simps'] "
+               + "(romb is not linear in a simple way)\n"
+               + "\t- provided: {}".format(method))
+        raise Exception(msg)
+    nlos = Ds.shape[1]
+
+    # Sample and get the quadrature weight of each point
+    k, reseff, ind = _GG.LOS_get_sample(
+        nlos, res, DL, dmethod=resMode, method=method,
+        num_threads=num_threads, Test=True,
+    )
+    indbis = np.r_[0, ind, k.size]
+    nbrep = np.diff(indbis)
+    ilos = np.repeat(np.arange(0, nlos), nbrep)
+    wquad = np.repeat(reseff, nbrep)
+    if method == "simps":
+        # Composite Simpson (odd nb of points): dx/3 * [1, 4, 2, ..., 4, 1]
+        pos = np.arange(0, k.size) - np.repeat(indbis[:-1], nbrep)
+        npos = np.repeat(nbrep, nbrep)
+        wquad *= np.where(
+            (pos == 0) | (pos == npos - 1), 1., np.where(pos % 2, 4., 2.)
+        ) / 3.
+    pts = Ds[:, ilos] + k[None, :]*us[:, ilos]
+
+    # Interpolation weights
+    indv, wgt = func(pts)
+    indok = indv > -1
+    ilos = np.broadcast_to(ilos[None, :], indv.shape)[indok]
+    data = (wgt*wquad[None, :])[indok]
+    geommat = scpsp.csr_matrix((data, (ilos, indv[indok])),
+                               shape=(nlos, nval))
+    wout = np.bincount(np.repeat(np.arange(0, nlos), nbrep)[~indok[0, :]],
+                       weights=wquad[~indok[0, :]], minlength=nlos)
+    return geommat, wout
@@ -1,6 +1,7 @@
 
 
 import warnings
+import hashlib
 
 import numpy as np
 import scipy.interpolate as scpinterp
@@ -87,6 +88,29 @@ def _checkformat_xixj(xi, xj):
         )
 
 
+def _get_lut_hash(*args):
+    """ Return a hash (hex str) of the content of args
+
+    args can be None, scalars, str, np.ndarrays or dict / list of those
+    Used as key / geometry fingerprint of the detector lookup tables
+    """
+    hh = hashlib.sha1()
+    for aa in args:
+        if isinstance(aa, dict):
+            for kk in sorted(aa.keys()):
+                hh.update(kk.encode())
+                hh.update(_get_lut_hash(aa[kk]).encode())
+        elif isinstance(aa, (list, tuple)):
+            hh.update(_get_lut_hash(*aa).encode())
+        elif isinstance(aa, np.ndarray):
+            aa = np.ascontiguousarray(aa)
+            hh.update(str((aa.dtype, aa.shape)).encode())
+            hh.update(aa.view(np.uint8))
+        else:
+            hh.update(repr(aa).encode())
+    return hh.hexdigest()
+
+
 # ###############################################
 #           sampling
 # ###############################################
@@ -208,11 +232,12 @@ def CrystBragg_get_noute1e2_from_psitheta(
     # vout = (
     # (np.cos(psi)*nout + np.sin(psi)*e1)*np.sin(theta) + np.cos(theta)*e2
     # )
+    cpsi, spsi = np.cos(psi), np.sin(psi)
     vout = (
-         (np.cos(psi)*nout + np.sin(psi)*e1)*np.cos(theta) + np.sin(theta)*e2
+         (cpsi*nout + spsi*e1)*np.cos(theta) + np.sin(theta)*e2
          )
     if e1e2:
-        ve1 = -np.sin(psi)*nout + np.cos(psi)*e1
+        ve1 = -spsi*nout + cpsi*e1
         ve2 = np.array([vout[1, ...]*ve1[2, ...] - vout[2, ...]*ve1[1, ...],
                         vout[2, ...]*ve1[0, ...] - vout[0, ...]*ve1[2, ...],
                         vout[0, ...]*ve1[1, ...] - vout[1, ...]*ve1[0, ...]])
@@ -844,10 +869,38 @@ def get_lambphifit(lamb, phi, nxi, nxj):
     return lambfit, phifit
 
 
+def get_lambphifit_bins(lamb, phi, nlambfit, nphifit):
+    """ Return a dict of (lambfit, phifit) and the bin index of each pixel
+
+    indlamb (resp. indphi) is the index of the lambfit (resp. phifit) bin
+    each pixel (lamb, phi) falls into, they have the shape of lamb
+    """
+    lambfit, phifit = get_lambphifit(lamb, phi, nlambfit, nphifit)
+    indlamb = np.digitize(lamb, 0.5*(lambfit[1:] + lambfit[:-1]))
+    indphi = np.digitize(phi, 0.5*(phifit[1:] + phifit[:-1]))
+    return {
+        'lambfit': lambfit, 'phifit': phifit,
+        'indlamb': indlamb, 'indphi': indphi,
+    }
+
+
+def _get_bins_nanmean(dd, ind, indu, sel=None):
+    """ Return the nanmean of dd over each bin indu (ind == indu) """
+    ok = ~np.isnan(dd)
+    if sel is not None:
+        ok &= sel
+    nbins = indu[-1] + 1
+    num = np.bincount(ind[ok], weights=dd[ok], minlength=nbins)[indu]
+    nn = np.bincount(ind[ok], minlength=nbins)[indu]
+    out = np.full(indu.shape, np.nan)
+    out[nn > 0] = num[nn > 0] / nn[nn > 0]
+    return out
+
+
 def _calc_spect1d_from_data2d(ldata, lamb, phi,
                               nlambfit=None, nphifit=None,
                               spect1d=None, mask=None,
-                              vertsum1d=None):
+                              vertsum1d=None, dbins=None):
     # Check / format inputs
     if spect1d is None:
         spect1d = 'mean'
@@ -885,19 +938,20 @@ def _calc_spect1d_from_data2d(ldata, lamb, phi,
     if vertsum1d is None:
         vertsum1d = True
 
-    # Compute lambfit / phifit and spectrum1d
+    # Compute lambfit / phifit and spectrum1d (bins can be pre-computed)
     if mask is not None:
         for ii in range(len(ldata)):
             ldata[ii][~mask] = np.nan
-    lambfit, phifit = get_lambphifit(lamb, phi, nlambfit, nphifit)
-    lambfitbins = 0.5*(lambfit[1:] + lambfit[:-1])
-    ind = np.digitize(lamb, lambfitbins)
+    if dbins is None:
+        dbins = get_lambphifit_bins(lamb, phi, nlambfit, nphifit)
+    lambfit, phifit = dbins['lambfit'], dbins['phifit']
+    ind = dbins['indlamb']
+    indu = np.unique(ind)
 
     # Get phi window
     if spect1d == 'mean':
         phiminmax = np.r_[phifit.min(), phifit.max()][None, :]
-        spect1d_out = [np.array([np.nanmean(dd[ind == jj])
-                                 for jj in np.unique(ind)])[None, :]
+        spect1d_out = [_get_bins_nanmean(dd, ind, indu)[None, :]
                        for dd in ldata]
     else:
         nspect = len(spect1d)
@@ -908,20 +962,19 @@ def _calc_spect1d_from_data2d(ldata, lamb, phi,
         for ii in range(nspect):
             phicent = np.nanmean(phifit) + spect1d[ii][0]*dphi/2.
             indphi = np.abs(phi - phicent) < spect1d[ii][1]*dphi
-            for jj in np.unique(ind):
-                indj = indphi & (ind == jj)
-                if np.any(indj):
-                    for ij in range(len(ldata)):
-                        spect1d_out[ij][ii, jj] = np.nanmean(ldata[ij][indj])
+            indj = np.unique(ind[indphi])
+            if indj.size > 0:
+                for ij in range(len(ldata)):
+                    spect1d_out[ij][ii, indj] = _get_bins_nanmean(
+                        ldata[ij], ind, indj, sel=indphi,
+                    )
             phiminmax[ii, :] = (np.nanmin(phi[indphi]),
                                 np.nanmax(phi[indphi]))
 
     if vertsum1d is True:
-        phifitbins = 0.5*(phifit[1:] + phifit[:-1])
-        ind = np.digitize(phi, phifitbins)
-        vertsum1d = [np.array([np.nanmean(dd[ind == ii])
-                               for ii in np.unique(ind)])
-                     for dd in ldata]
+        ind = dbins['indphi']
+        indu = np.unique(ind)
+        vertsum1d = [_get_bins_nanmean(dd, ind, indu) for dd in ldata]
     if len(ldata) == 1:
         spect1d_out = spect1d_out[0]
         if vertsum1d is not False:
@@ -950,7 +1003,13 @@ def calc_dthetapsiphi_from_lambpts(
     For each pts/lamb, there may be up to 2 arcs on the crystal
     Only returns valid solution (inside extenthalf), with nan elsewhere
 
-    psi and dtheta returned as (nlamb, npts, 2, ndtheta) arrays
+    if grid is True:
+        psi and dtheta returned as (nlamb, npts, ndtheta, 2) arrays
+    else:
+        bragg is (npts,) => psi and dtheta are (npts, ndtheta, 2) arrays
+        bragg is (npts, nlamb) => (npts, nlamb, ndtheta, 2) arrays
+
+    All (pts, lamb) combinations are computed at once by broadcasting
 
     Here nout, e1, e2 are at the unique crystal summit!
 
@@ -961,169 +1020,71 @@ def calc_dthetapsiphi_from_lambpts(
         ndtheta = 10
 
     npts = pts.shape[1]
-    nlamb = bragg.size
+    bragg = np.atleast_1d(bragg)
     if grid is None:
         grid = True
     if grid is False:
-        if nlamb != npts:
-            msg = "If grid = False, lamb.shape should be (pts.shape[1],)"
+        if bragg.shape[0] != npts or bragg.ndim > 2:
+            msg = (
+                "If grid = False, lamb.shape should be (pts.shape[1],)"
+                + " or (pts.shape[1], nlamb)"
+            )
             raise Exception(msg)
-
-    # Prepare output
-    if grid is True:
-        scaPCem = np.full((nlamb, npts, 2), np.nan)
-        dtheta = np.full((nlamb, npts, ndtheta, 2), np.nan)
-        psi = np.full((nlamb, npts, ndtheta, 2), np.nan)
-        num = np.full((nlamb, npts, ndtheta, 2), np.nan)
-        angextra = np.full((nlamb, npts, ndtheta, 2), np.nan)
-        dtheta_u = np.full((nlamb, npts, ndtheta), np.nan)
-        psi_u = np.full((nlamb, npts, ndtheta), np.nan)
-        sol1 = np.full((nlamb, npts), np.nan)
-        sol2 = np.full((nlamb, npts), np.nan)
+        # pts-wise quantities are broadcast against (npts,) or (npts, nlamb)
+        shapepts = (npts,) + (1,)*(bragg.ndim - 1)
     else:
-        scaPCem = np.full((npts, 2), np.nan)
-        dtheta = np.full((npts, ndtheta, 2), np.nan)
-        psi = np.full((npts, ndtheta, 2), np.nan)
-        num = np.full((npts, ndtheta, 2), np.nan)
-        angextra = np.full((npts, ndtheta, 2), np.nan)
-        dtheta_u = np.full((npts, ndtheta), np.nan)
-        psi_u = np.full((npts, ndtheta), np.nan)
-        sol1 = np.full((npts,), np.nan)
-        sol2 = np.full((npts,), np.nan)
+        bragg = bragg.ravel()[:, None]
+        shapepts = (1, npts)
 
     # Get to scalar product scaPCem
     # Already ok for non-parallelism (via nout)
     center = summit - rcurve*nout
     PC = center[:, None] - pts
-    PCnorm2 = np.sum(PC**2, axis=0)
+    PCnorm2 = np.sum(PC**2, axis=0).reshape(shapepts)
     cos2 = np.cos(bragg)**2
     # PM.CM = Rsca + R**2  (ok)
     # PMCM = PMnR*sin       (ok)
     # PMn2 = PCn2*sin2 + 2Rsin2*sca + R2sin2
     #
     # sca**2 + 2Rcos2*sca + R2cos2 - PCnsin2 = 0
-    if grid is True:
-        deltaon4 = np.sin(bragg)[:, None]**2*(
-            PCnorm2[None, :] - rcurve**2*cos2[:, None]
-        )
-    else:
-        deltaon4 = np.sin(bragg)**2 * (PCnorm2 - rcurve**2*cos2)
-
-    # Get two relevant solutions
-    ind = deltaon4 >= 0.
-    if grid is True:
-        cos2 = np.repeat(cos2[:, None], npts, axis=1)[ind]
-        PCnorm = np.tile(np.sqrt(PCnorm2), (nlamb, 1))[ind]
-    else:
-        cos2 = cos2[ind]
-        PCnorm = np.sqrt(PCnorm2)[ind]
-    sol1 = -rcurve*cos2 - np.sqrt(deltaon4[ind])
-    sol2 = -rcurve*cos2 + np.sqrt(deltaon4[ind])
+    deltaon4 = np.sin(bragg)**2 * (PCnorm2 - rcurve**2*cos2)
 
+    # Get two relevant solutions (nan if deltaon4 < 0)
     # Only keep solution going outward sphere
     # scaPMem = scaPCem + rcurve >= 0
-    ind1 = (sol1 >= -rcurve)
-    ind2 = (sol2 >= -rcurve)
-
-    sol1 = sol1[ind1]
-    sol2 = sol2[ind2]
-    if grid is True:
-        indn = ind.nonzero()
-        ind1 = [indn[0][ind1], indn[1][ind1]]
-        ind2 = [indn[0][ind2], indn[1][ind2]]
-        scaPCem[ind1[0], ind1[1], 0] = sol1
-        scaPCem[ind2[0], ind2[1], 1] = sol2
-    else:
-        indn = ind.nonzero()[0]
-        scaPCem[indn[ind1], 0] = sol1
-        scaPCem[indn[ind2], 1] = sol2
-    ind = ~np.isnan(scaPCem)
+    with np.errstate(invalid='ignore'):
+        sqrtdelta = np.sqrt(deltaon4)
+        scaPCem = np.stack(
+            (-rcurve*cos2 - sqrtdelta, -rcurve*cos2 + sqrtdelta),
+            axis=-1,
+        )
+        scaPCem[~(scaPCem >= -rcurve)] = np.nan
 
     # Get equation on PCem
     # CM = rcurve * (sin(dtheta)e2 + cos(dtheta)(cos(psi)nout + sin(psi)e1))
     # PC.eM = scaPCem, thus introducing Z = PC.e2, Y = PC.e1, X = PC.nout
     # Xcos(dtheta)cos(psi) + Ycos(dtheta)sin(psi) + Zsin(dtheta) = scaPCem
     # dtheta is specified, psi is deduced
-    X = np.sum(PC*nout[:, None], axis=0)
-    Y = np.sum(PC*e1[:, None], axis=0)
-    Z = np.sum(PC*e2[:, None], axis=0)
-
-    if grid is True:
-        scaPCem = np.repeat(scaPCem[:, :, None, :], ndtheta, axis=2)
-    else:
-        scaPCem = np.repeat(scaPCem[:, None, :], ndtheta, axis=1)
+    # pts-wise quantities are broadcast to (..., ndtheta, 2)
+    X = np.sum(PC*nout[:, None], axis=0).reshape(shapepts)[..., None, None]
+    Y = np.sum(PC*e1[:, None], axis=0).reshape(shapepts)[..., None, None]
+    Z = np.sum(PC*e2[:, None], axis=0).reshape(shapepts)[..., None, None]
+    dtheta_u = extenthalf[1]*np.linspace(-1, 1, ndtheta)[:, None]
+
+    # Define angextra to get
+    # sin(psi + angextra) = (scaPCem - Z*sin(theta)) / (XYnorm*cos(theta))
+    with np.errstate(invalid='ignore'):
+        num = (
+            (scaPCem[..., None, :] - Z*np.sin(dtheta_u))
+            / (np.sqrt(X**2 + Y**2)*np.cos(dtheta_u))
+        )
+        ind = np.abs(num) <= 1.
+        psi = np.arcsin(num) - np.arctan2(X, Y)
+        ind &= np.abs(psi) <= extenthalf[0]
+    del num
 
-    # broadcast and specify dtheta
-    ind = ~np.isnan(scaPCem)
-    if grid is True:
-        XYnorm = np.repeat(
-            np.repeat(
-                np.repeat(
-                    np.sqrt(X**2 + Y**2)[None, :], nlamb, axis=0,
-                )[..., None],
-                ndtheta,
-                axis=-1,
-            )[..., None],
-            2,
-            axis=-1,
-        )[ind]
-        Z = np.repeat(
-            np.repeat(
-                np.repeat(Z[None, :], nlamb, axis=0)[..., None],
-                ndtheta,
-                axis=-1,
-            )[..., None],
-            2,
-            axis=-1,
-        )[ind]
-        # Define angextra to get
-        # sin(psi + angextra) = (scaPCem - Z*sin(theta)) / (XYnorm*cos(theta))
-        angextra[ind] = np.repeat(
-            np.repeat(
-                np.repeat(np.arctan2(X, Y)[None, :], nlamb, axis=0)[..., None],
-                ndtheta, axis=-1)[..., None],
-            2, axis=-1)[ind]
-        dtheta[ind] = np.repeat(
-            np.repeat(
-                np.repeat(
-                    extenthalf[1]*np.linspace(-1, 1, ndtheta)[:, None],
-                    2, axis=1)[None, ...],
-                npts, axis=0)[None, ...],
-            nlamb, axis=0)[ind]
-    else:
-        XYnorm = np.repeat(
-            np.repeat(np.sqrt(X**2+Y**2)[:, None], ndtheta, axis=1)[..., None],
-            2,
-            axis=-1,
-        )[ind]
-        Z = np.repeat(
-            np.repeat(Z[:, None], ndtheta, axis=1)[..., None],
-            2,
-            axis=-1,
-        )[ind]
-        angextra[ind] = np.repeat(
-            np.repeat(np.arctan2(X, Y)[:, None], ndtheta, axis=-1)[..., None],
-            2,
-            axis=-1,
-        )[ind]
-        dtheta[ind] = np.repeat(
-            np.repeat(
-                extenthalf[1]*np.linspace(-1, 1, ndtheta)[:, None],
-                2,
-                axis=1,
-            )[None, ...],
-            npts,
-            axis=0,
-        )[ind]
-
-    num[ind] = (
-        (scaPCem[ind] - Z*np.sin(dtheta[ind])) / (XYnorm*np.cos(dtheta[ind]))
-    )
-    ind[ind] = np.abs(num[ind]) <= 1.
-    psi[ind] = np.arcsin(num[ind]) - angextra[ind]
-    ind[ind] = np.abs(psi[ind]) <= extenthalf[0]
     psi[~ind] = np.nan
-    dtheta[~ind] = np.nan
+    dtheta = np.where(ind, dtheta_u, np.nan)
     if np.any(np.sum(ind, axis=-1) == 2):
         msg = (
             "\nDouble solutions found for {} / {} points!".format(
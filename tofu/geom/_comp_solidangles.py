@@ -14,6 +14,7 @@ from . import _GG
 _APPROX = True
 _ANISO = False
 _BLOCK = True
+_EPS_SANG = 0.
 _LTYPES = [int, float, np.int_, np.float_]
 
 
@@ -31,8 +32,18 @@ def _check_calc_solidangle_particle(
     approx=None,
     aniso=None,
     block=None,
+    eps_sang=None,
 ):
 
+    # Check eps_sang
+    if eps_sang is None:
+        eps_sang = _EPS_SANG
+    if not (type(eps_sang) in _LTYPES and eps_sang >= 0.):
+        msg = ("Arg eps_sang must be a positive float\n"
+               + "\t- provided: {}".format(eps_sang))
+        raise Exception(msg)
+    eps_sang = float(eps_sang)
+
     # Check booleans
     if approx is None:
         approx = _APPROX
@@ -114,7 +125,7 @@ def _check_calc_solidangle_particle(
         rad = np.full((nmax,), rad[0])
     if ntraj < nmax:
         traj = np.repeat(traj, nmax, axis=1)
-    return traj, pts, rad, config, approx, aniso, block
+    return traj, pts, rad, config, approx, aniso, block, eps_sang
 
 
 ###############################################################################
@@ -131,6 +142,7 @@ def calc_solidangle_particle(
     approx=None,
     aniso=None,
     block=None,
+    eps_sang=None,
 ):
     """ Compute the solid angle subtended by a particle along a trajectory
 
@@ -171,6 +183,10 @@ def calc_solidangle_particle(
     block:          None / bool
         Flag indicating whether to check for vignetting by structural elements
         provided by config
+    eps_sang:       None / float
+        Solid angle (sr) below which a (pts, particle) pair is neglected
+        (set to 0), no visibility check (ray casting) being done for it
+        Default to 0. (no approximation)
 
     Return:
     -------
@@ -182,7 +198,7 @@ def calc_solidangle_particle(
     # Prepare inputs
     (
         part_traj, pts, part_radius, config,
-        approx, aniso, block
+        approx, aniso, block, eps_sang,
     ) = _check_calc_solidangle_particle(
         traj=part_traj,
         pts=pts,
@@ -191,6 +207,7 @@ def calc_solidangle_particle(
         approx=approx,
         aniso=aniso,
         block=block,
+        eps_sang=eps_sang,
     )
 
     ################
@@ -216,12 +233,31 @@ def calc_solidangle_particle(
     # when particle in mesh point, distance len_v = 0 thus sang neglected
     sang[where_zero] = 0.
 
+    # neglected pairs
+    if eps_sang > 0.:
+        sang[sang < eps_sang] = 0.
+
     # block
     if block:
         kwdargs = config.get_kwdargs_LOS_isVis()
-        indvis = _GG.LOS_areVis_PtsFromPts_VesStruct(
-            pts, part_traj, dist=len_v, **kwdargs
-        )
+        if eps_sang > 0.:
+            # Only ray-cast the pts and positions involved in a kept pair
+            ipts = np.any(sang > 0., axis=1)
+            itraj = np.any(sang > 0., axis=0)
+            indvis = np.zeros(sang.shape, dtype=int)
+            if np.any(ipts):
+                indvis[np.ix_(ipts, itraj)] = (
+                    _GG.LOS_areVis_PtsFromPts_VesStruct(
+                        np.ascontiguousarray(pts[:, ipts]),
+                        np.ascontiguousarray(part_traj[:, itraj]),
+                        dist=np.ascontiguousarray(len_v[np.ix_(ipts, itraj)]),
+                        **kwdargs
+                    )
+                )
+        else:
+            indvis = _GG.LOS_areVis_PtsFromPts_VesStruct(
+                pts, part_traj, dist=len_v, **kwdargs
+            )
         iout = indvis == 0
         sang[iout] = 0.
         vect[:, iout] = np.nan
@@ -244,6 +280,8 @@ def calc_solidangle_particle_integ(
     DR=None,
     DZ=None,
     DPhi=None,
+    eps_sang=None,
+    ngroups=None,
 ):
 
     # step0: if block : generate kwdargs from config
@@ -311,7 +349,7 @@ def calc_solidangle_particle_integ(
 
     (
         part_traj, _, part_radius, config,
-        approx, _, block
+        approx, _, block, eps_sang,
     ) = _check_calc_solidangle_particle(
         traj=part_traj,
         pts=False,
@@ -320,8 +358,16 @@ def calc_solidangle_particle_integ(
         approx=approx,
         aniso=False,
         block=block,
+        eps_sang=eps_sang,
     )
 
+    if ngroups is None:
+        ngroups = 0
+    if not (type(ngroups) in _LTYPES and int(ngroups) == ngroups):
+        msg = ("Arg ngroups must be an int (0 => default)\n"
+               + "\t- provided: {}".format(ngroups))
+        raise Exception(msg)
+
     # ------------------
     # Define the volume to be sampled: smallest vessel
 
@@ -347,5 +393,7 @@ def calc_solidangle_particle_integ(
         block=block,
         approx=approx,
         limit_vpoly=kwdargs['ves_poly'],
+        eps_sang=eps_sang,
+        ngroups=int(ngroups),
         **kwdargs,
     )
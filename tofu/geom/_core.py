@@ -10,6 +10,7 @@ import os
 import warnings
 import copy
 import inspect
+from collections import OrderedDict
 
 
 # Common
@@ -66,6 +67,7 @@ _PHITHETAPROJ_NPHI = 2000
 _PHITHETAPROJ_NTHETA = 1000
 _RES = 0.005
 _DREFLECT = {"specular": 0, "diffusive": 1, "ccube": 2}
+_GEOMMAT_MAXBYTES = int(2e8)    # memory cap of the cached geometry matrices
 
 # Saving
 _COMMENT = '#'
@@ -1378,7 +1380,9 @@ class Struct(utils.ToFuObject):
         ind=None,
         returnas="(X,Y,Z)",
         algo="new",
-        num_threads=48
+        num_threads=48,
+        memmap=None,
+        tile_pts=None,
     ):
         """ Sample, with resolution res, the volume defined by domain or ind
 
@@ -1433,6 +1437,16 @@ class Struct(utils.ToFuObject):
         Ind     :   None / iterable of ints
             Array of indices of the entities to be considered
             (only when multiple entities, i.e.: self.nLim>1)
+        memmap  :   None / str
+            If provided (incompatible with ind), the sample is computed by
+            tiles (see get_sampleV_tiles()) written to raw binary files:
+                memmap + '_pts.bin', memmap + '_dV.bin', memmap + '_ind.bin'
+            pts, dV and ind are then returned as read-only np.memmap
+            (dV is not stored if it is a scalar), and the toroidal
+            resolution reseff[2] (which depends on R) is a list of arrays,
+            one per tile, the other components being common to all tiles
+        tile_pts :  None / int
+            Max number of points per tile, used with memmap
 
         Returns
         -------
@@ -1447,6 +1461,23 @@ class Struct(utils.ToFuObject):
             Effective resolution in both directions after sample computation
         """
 
+        if memmap is not None:
+            if ind is not None:
+                msg = "Args memmap and ind cannot be used together!"
+                raise Exception(msg)
+            if not isinstance(memmap, str):
+                msg = ("Arg memmap must be a str (path prefix of files)!\n"
+                       + "\t- provided: {}".format(memmap))
+                raise Exception(msg)
+            return _comp._Ves_get_sampleV_memmap(
+                memmap,
+                self.get_sampleV_tiles(
+                    res=res, domain=domain, resMode=resMode,
+                    returnas=returnas, algo=algo, num_threads=num_threads,
+                    tile_pts=tile_pts,
+                ),
+            )
+
         args = [
             self.Poly,
             self.dgeom["P1Min"][0],
@@ -1468,6 +1499,58 @@ class Struct(utils.ToFuObject):
         )
         return _comp._Ves_get_sampleV(*args, **kwdargs)
 
+    def get_sampleV_tiles(
+        self,
+        res=None,
+        domain=None,
+        resMode=None,
+        returnas="(X,Y,Z)",
+        algo="new",
+        num_threads=48,
+        tile_pts=None,
+    ):
+        """ Iterate on tiles of the volume sample, in bounded memory
+
+        Same sample as get_sampleV() (with ind=None), but computed and
+        yielded by tiles along the poloidal cross-section ((R, Z) for a
+        torus, (Y, Z) for a linear device)
+        Useful for fine resolutions, where the whole sample would not fit
+        in memory, e.g.:
+            > for pts, dV, ind, reseff in obj.get_sampleV_tiles(0.001):
+            >     out += np.sum(emiss(pts) * dV)
+
+        The indices are those of the whole sample, and tiles do not overlap
+
+        Parameters
+        ----------
+        res, domain, resMode, returnas, algo, num_threads:
+            See get_sampleV()
+        tile_pts :  None / int
+            Max number of points per tile (about, at least one cell of the
+            cross-section per tile), default to 1e6
+
+        Yields
+        ------
+        pts, dV, ind, reseff:   the sample of each tile, see get_sampleV()
+        """
+        return _comp._Ves_get_sampleV_tiles(
+            self.Poly,
+            self.dgeom["P1Min"][0],
+            self.dgeom["P1Max"][0],
+            self.dgeom["P2Min"][1],
+            self.dgeom["P2Max"][1],
+            res=res,
+            domain=domain,
+            resMode=resMode,
+            VType=self.Id.Type,
+            VLim=self.Lim,
+            returnas=returnas,
+            margin=1.0e-9,
+            algo=algo,
+            num_threads=num_threads,
+            tile_pts=tile_pts,
+        )
+
     def _get_phithetaproj(self, refpt=None):
         # Prepare ax
         if refpt is None:
@@ -2147,6 +2230,10 @@ class StructOut(Struct):
         msg = "StructOut subclasses cannot use get_sampleV()!"
         raise Exception(msg)
 
+    def get_sampleV_tiles(self, *args, **kwdargs):
+        msg = "StructOut subclasses cannot use get_sampleV_tiles()!"
+        raise Exception(msg)
+
 
 class PlasmaDomain(StructIn):
     _color = (0.8, 0.8, 0.8, 1.0)
@@ -2449,6 +2536,8 @@ class Config(utils.ToFuObject):
         self._dStruct = dict.fromkeys(self._get_keys_dStruct())
         self._dextraprop = dict.fromkeys(self._get_keys_dextraprop())
         self._dsino = dict.fromkeys(self._get_keys_dsino())
+        self._dgeom_buffer = {}
+        self._geom_buffer_version = 0
 
     @classmethod
     def _checkformat_inputs_Id(
@@ -2736,6 +2825,8 @@ class Config(utils.ToFuObject):
         )
         self._dStruct.update({"Lim": Lim, "nLim": nLim})
         self._set_dlObj(lStruct, din=self._dStruct)
+        # The cached geometry buffers refer to the former lStruct
+        self._dgeom_buffer = {}
 
     def _set_dextraprop(self, dextraprop=None):
         dextraprop, dC = self._checkformat_inputs_dextraprop(dextraprop)
@@ -4008,34 +4099,127 @@ class Config(utils.ToFuObject):
             description_2d=description_2d,
         )
 
-    def get_kwdargs_LOS_isVis(self):
+    @staticmethod
+    def _get_geom_buffer_ref(lS):
+        """ Objects identifying the current geometry of each Struct
+
+        Any change of geometry (e.g.: via Struct.move()) replaces them
+        """
+        return [
+            (ss._dgeom["Poly"], ss._dgeom["pos"], ss._dgeom["extent"])
+            for ss in lS
+        ]
+
+    @staticmethod
+    def _get_geom_buffer_readonly(dkwd):
+        """ Return a copy of dkwd where arrays are replaced by read-only views
+        """
+        def _readonly(arr):
+            arr = arr.view()
+            arr.flags.writeable = False
+            return arr
+
+        dout = {}
+        for kk, vv in dkwd.items():
+            if isinstance(vv, np.ndarray):
+                vv = _readonly(vv)
+            elif isinstance(vv, list):
+                vv = [
+                    _readonly(v0) if isinstance(v0, np.ndarray) else v0
+                    for v0 in vv
+                ]
+            dout[kk] = vv
+        return dout
+
+    def get_geom_buffer(self, indIn=None, indOut=None):
+        """ Return the flattened geometry used by the ray-tracing routines
+
+        The polygons, normal vectors and limits of the StructOut are flattened
+        into a single contiguous array, that tofu passes without copy to the
+        _GG routines (LOS_Calc_PInOut_VesStruct(),
+        LOS_areVis_PtsFromPts_VesStruct()...).
+
+        The result is cached, and only re-computed if the Config changes
+        (add_Struct(), remove_Struct()) or if one of the Struct is moved.
+        The returned arrays are read-only views of the cached buffer (copy
+        them to pass them to the _GG routines, which take writable arrays)
+
+        The buffer can be saved / re-loaded with save_geom_buffer() /
+        load_geom_buffer()
+
+        Parameters
+        ----------
+        indIn:      None / int
+            Index (in self.lStruct) of the StructIn to be used as vessel
+            If None, the StructIn with the smallest surface is used
+        indOut:     None / iterable of ints
+            Indices (in self.lStruct) of the StructOut to be used
+            If None, all StructOut are used
+
+        Return:
+        -------
+        dbuffer:    dict
+            Keyword arguments of the _GG ray-tracing routines (ves_poly,
+            ves_norm, ves_lims, lstruct_polyx...) and 'version', an int
+            incremented each time a buffer of this Config is re-computed
+            (it never decreases, even after add_Struct() / remove_Struct())
+        """
+        return dict(
+            self._get_geom_buffer(indIn=indIn, indOut=indOut, readonly=True)
+        )
+
+    def _get_geom_buffer(self, indIn=None, indOut=None, readonly=None):
+        """ Same as get_geom_buffer(), but return the cached dict
+
+        If readonly is False (default), the cached writable arrays are
+        returned, for tofu's own calls to the _GG routines only: they are
+        shared by all calls and must not be modified
+        """
+        if readonly is None:
+            readonly = False
+        kdkwd = "dkwd_ro" if readonly else "dkwd"
 
         lS = self.lStruct
 
-        # -- Getting "vessels" or IN structures -------------------------------
-        lSIn = [ss for ss in lS if ss._InOut == "in"]
-        if len(lSIn) == 0:
-            msg = "self.config must have at least a StructIn subclass !"
-            assert len(lSIn) > 0, msg
-        elif len(lSIn) > 1:
-            S = lSIn[np.argmin([ss.dgeom["Surf"] for ss in lSIn])]
-        else:
-            S = lSIn[0]
+        # -- Check inputs -----------------------------------------------------
+        if indIn is None:
+            lindIn = [ii for ii, ss in enumerate(lS) if ss._InOut == "in"]
+            if len(lindIn) == 0:
+                msg = "self.config must have at least a StructIn subclass !"
+                raise Exception(msg)
+            indIn = lindIn[np.argmin([lS[ii].dgeom["Surf"] for ii in lindIn])]
+        if indOut is None:
+            indOut = [ii for ii, ss in enumerate(lS) if ss._InOut == "out"]
+        indIn = int(indIn)
+        indOut = tuple([int(ii) for ii in indOut])
+
+        # -- Check cache ------------------------------------------------------
+        key = (indIn, indOut)
+        lSbuf = [lS[indIn]] + [lS[ii] for ii in indOut]
+        lref = self._get_geom_buffer_ref(lSbuf)
+        if key in self._dgeom_buffer.keys():
+            dbuf = self._dgeom_buffer[key]
+            c0 = all([
+                all([aa is bb for aa, bb in zip(ref, ref0)])
+                for ref, ref0 in zip(lref, dbuf["ref"])
+            ])
+            if c0:
+                return dbuf[kdkwd]
 
-        # ... and its poly, limts, type, etc.
-        VPoly = S.Poly_closed
-        VVIn = S.dgeom["VIn"]
+        # monotonic over the life of the Config (not reset by _set_dStruct)
+        self._geom_buffer_version += 1
+        version = self._geom_buffer_version
+
+        # -- Vessel -----------------------------------------------------------
+        S = lS[indIn]
         if np.size(np.shape(S.Lim)) > 1:
             Lim = np.asarray([S.Lim[0][0], S.Lim[0][1]])
         else:
             Lim = S.Lim
-        VType = self.Id.Type
-
-        # -- Getting OUT structures -------------------------------------------
-        lS = [ss for ss in lS if ss._InOut == "out"]
 
+        # -- StructOut --------------------------------------------------------
+        lS = lSbuf[1:]
         if len(lS) == 0:
-
             lSLim, lSnLim = None, None
             num_lim_structs, num_tot_structs = 0, 0
             lSPolyx, lSPolyy = None, None
@@ -4046,28 +4230,31 @@ class Config(utils.ToFuObject):
 
             # Lims
             lSLim = [ss.Lim for ss in lS]
-            lSnLim = np.array([ss.noccur for ss in lS])
+            lSnLim = np.array([ss.noccur for ss in lS], dtype=int)
 
             # Nb of structures and of structures inc. Lims (toroidal occurence)
             num_lim_structs = len(lS)
             num_tot_structs = int(np.sum([max(1, ss.noccur) for ss in lS]))
 
-            # build concatenated C-contiguous arrays of x and y coordinates
-            lSPolyx = np.concatenate([ss.Poly_closed[0, :] for ss in lS])
-            lSPolyy = np.concatenate([ss.Poly_closed[1, :] for ss in lS])
-            lSVInx = np.concatenate([ss.dgeom['VIn'][0, :] for ss in lS])
-            lSVIny = np.concatenate([ss.dgeom['VIn'][1, :] for ss in lS])
-
-            # lsnvert = cumulated number of points in the poly of each Struct
-            lsnvert = np.cumsum([
-                ss.Poly_closed[0].size for ss in lS],
-                dtype=int,
-            )
+            # single C-contiguous buffer of x and y coordinates and normals
+            lpoly = [ss.Poly_closed for ss in lS]
+            lsnvert = np.cumsum([pp.shape[1] for pp in lpoly], dtype=int)
+            nvert = lsnvert[-1]
+            nnorm = nvert - num_lim_structs
+            buf = np.concatenate(
+                [pp[0, :] for pp in lpoly]
+                + [pp[1, :] for pp in lpoly]
+                + [ss.dgeom['VIn'][0, :] for ss in lS]
+                + [ss.dgeom['VIn'][1, :] for ss in lS]
+            ).astype(float)
+            lSPolyx = buf[:nvert]
+            lSPolyy = buf[nvert:2*nvert]
+            lSVInx = buf[2*nvert:2*nvert + nnorm]
+            lSVIny = buf[2*nvert + nnorm:]
 
-        # Now setting keyword arguments:
         dkwd = dict(
-            ves_poly=VPoly,
-            ves_norm=VVIn,
+            ves_poly=np.ascontiguousarray(S.Poly_closed, dtype=float),
+            ves_norm=np.ascontiguousarray(S.dgeom["VIn"], dtype=float),
             ves_lims=Lim,
             nstruct_tot=num_tot_structs,
             nstruct_lim=num_lim_structs,
@@ -4078,7 +4265,119 @@ class Config(utils.ToFuObject):
             lstruct_normx=lSVInx,
             lstruct_normy=lSVIny,
             lnvert=lsnvert,
-            ves_type=VType,
+            ves_type=self.Id.Type,
+            version=version,
+        )
+        self._dgeom_buffer[key] = {
+            "ref": lref,
+            "dkwd": dkwd,
+            "dkwd_ro": self._get_geom_buffer_readonly(dkwd),
+        }
+        return self._dgeom_buffer[key][kdkwd]
+
+    def save_geom_buffer(
+        self, indIn=None, indOut=None, path=None, name=None, verb=None,
+    ):
+        """ Save the flattened geometry (see get_geom_buffer()) in a npz file
+
+        The file only contains numpy arrays, it can be re-loaded (e.g.: by
+        another process) with Config.load_geom_buffer(), without the Config
+
+        Default path is self.Id.SavePath, default name is
+        'GeomBuffer_' + self.Id.SaveName
+        Return the saved file (path + name + .npz)
+        """
+        if verb is None:
+            verb = True
+        if path is None:
+            path = self.Id.SavePath
+        if name is None:
+            name = 'GeomBuffer_' + self.Id.SaveName
+        if not name.endswith('.npz'):
+            name = name + '.npz'
+        pfe = os.path.join(os.path.abspath(path), name)
+
+        dkwd = self._get_geom_buffer(indIn=indIn, indOut=indOut)
+        dout = {
+            kk: np.asarray(dkwd[kk])
+            for kk in [
+                'ves_poly', 'ves_norm', 'ves_lims', 'ves_type',
+                'nstruct_tot', 'nstruct_lim', 'version',
+            ]
+        }
+        if dkwd['lstruct_polyx'] is not None:
+            # lims of each StructOut (possibly none) as rows of a 2d array
+            lLim = [np.reshape(ll, (-1, 2)) for ll in dkwd['lstruct_lims']]
+            dout.update({
+                'lstruct_buffer': np.concatenate([
+                    dkwd[kk] for kk in [
+                        'lstruct_polyx', 'lstruct_polyy',
+                        'lstruct_normx', 'lstruct_normy',
+                    ]
+                ]),
+                'lstruct_lims': np.concatenate(lLim, axis=0),
+                'lstruct_nlimrows': np.array([ll.shape[0] for ll in lLim]),
+                'lstruct_nlim': dkwd['lstruct_nlim'],
+                'lnvert': dkwd['lnvert'],
+            })
+        np.savez(pfe, **dout)
+        if verb is True:
+            msg = "Saved geometry buffer in:\n\t{}".format(pfe)
+            print(msg)
+        return pfe
+
+    @staticmethod
+    def load_geom_buffer(pfe=None):
+        """ Load a flattened geometry saved with save_geom_buffer()
+
+        Return a dict with the same keys as get_geom_buffer(), with writable
+        arrays (owned by the caller) that can be passed to the _GG routines
+        """
+        dd = dict(np.load(pfe, allow_pickle=False))
+        dkwd = {
+            'ves_poly': dd['ves_poly'],
+            'ves_norm': dd['ves_norm'],
+            'ves_lims': dd['ves_lims'],
+            'ves_type': str(dd['ves_type']),
+            'nstruct_tot': int(dd['nstruct_tot']),
+            'nstruct_lim': int(dd['nstruct_lim']),
+            'version': int(dd['version']),
+        }
+        lk = [
+            'lstruct_polyx', 'lstruct_polyy', 'lstruct_normx',
+            'lstruct_normy', 'lstruct_lims', 'lstruct_nlim', 'lnvert',
+        ]
+        if 'lstruct_buffer' not in dd.keys():
+            dkwd.update(dict.fromkeys(lk, None))
+            return dkwd
+
+        # single buffer, as in get_geom_buffer()
+        buf, lnvert = dd['lstruct_buffer'], dd['lnvert']
+        nvert = lnvert[-1]
+        nnorm = nvert - dkwd['nstruct_lim']
+        ind = np.cumsum(dd['lstruct_nlimrows'])[:-1]
+        dkwd.update({
+            'lstruct_polyx': buf[:nvert],
+            'lstruct_polyy': buf[nvert:2*nvert],
+            'lstruct_normx': buf[2*nvert:2*nvert + nnorm],
+            'lstruct_normy': buf[2*nvert + nnorm:],
+            'lstruct_lims': [
+                ll if ll.size > 0 else np.zeros((0,))
+                for ll in np.split(dd['lstruct_lims'], ind, axis=0)
+            ],
+            'lstruct_nlim': dd['lstruct_nlim'],
+            'lnvert': lnvert,
+        })
+        return dkwd
+
+    def get_kwdargs_LOS_isVis(self):
+
+        # Get the cached flattened geometry
+        dkwd = dict(self._get_geom_buffer())
+        del dkwd["version"]
+
+        # Now setting keyword arguments:
+        dkwd.update(
             rmin=-1,
             forbid=True,
             eps_uz=1.0e-6,
@@ -4098,6 +4397,7 @@ class Config(utils.ToFuObject):
         approx=None,
         aniso=None,
         block=None,
+        eps_sang=None,
     ):
         """ Compute the solid angle subtended by a particle along a trajectory
 
@@ -4136,6 +4436,9 @@ class Config(utils.ToFuObject):
         block:      None / bool
             Flag indicating whether to check for vignetting by structural
             elements provided by config
+        eps_sang:   None / float
+            Solid angle (sr) below which a (pts, particle) pair is neglected,
+            no visibility check (ray casting) being done for it
 
         Return:
         -------
@@ -4151,6 +4454,7 @@ class Config(utils.ToFuObject):
             approx=approx,
             aniso=aniso,
             block=block,
+            eps_sang=eps_sang,
         )
 
 
@@ -4164,6 +4468,8 @@ class Config(utils.ToFuObject):
         DR=None,
         DZ=None,
         DPhi=None,
+        eps_sang=None,
+        ngroups=None,
         plot=None,
         vmin=None,
         vmax=None,
@@ -4206,6 +4512,15 @@ class Config(utils.ToFuObject):
         block:      None / bool
             Flag indicating whether to check for vignetting by structural
             elements provided by config
+        eps_sang:   None / float
+            Solid angle (sr) below which the contribution of a particle
+            position to a volume element is neglected, no visibility check
+            (ray casting) being done for it. Recommended for long
+            trajectories (e.g.: 1e-6), default to 0. (no approximation)
+        ngroups:    None / int
+            Nb. of groups (toroidal sectors) particle positions are sorted in
+            whole groups being skipped when too far to contribute (eps_sang)
+            Default: sqrt(N) if eps_sang > 0
 
         Return:
         -------
@@ -4232,6 +4547,8 @@ class Config(utils.ToFuObject):
             DPhi=DPhi,
             block=block,
             approx=approx,
+            eps_sang=eps_sang,
+            ngroups=ngroups,
         )
 
         if plot is False:
@@ -4420,6 +4737,7 @@ class Rays(utils.ToFuObject):
         self._dsino = dict.fromkeys(self._get_keys_dsino())
         self._dchans = dict.fromkeys(self._get_keys_dchans())
         self._dmisc = dict.fromkeys(self._get_keys_dmisc())
+        self._dgeommat = OrderedDict()
         # self._dplot = copy.deepcopy(self.__class__._ddef['dplot'])
 
     @classmethod
@@ -5143,9 +5461,9 @@ class Rays(utils.ToFuObject):
         VVIn = S.dgeom["VIn"]
         largs = [D, u, VPoly, VVIn]
 
-        lS = [self.config.lStruct[ii] for ii in indOut]
         if self._method == "ref":
 
+            lS = [self.config.lStruct[ii] for ii in indOut]
             Lim = S.Lim
             nLim = S.noccur
             VType = self.config.Id.Type
@@ -5176,60 +5494,13 @@ class Rays(utils.ToFuObject):
 
         elif self._method == "optimized":
 
-            if np.size(np.shape(S.Lim)) > 1:
-                Lim = np.asarray([S.Lim[0][0], S.Lim[0][1]])
-            else:
-                Lim = S.Lim
-            nLim = S.noccur
-            VType = self.config.Id.Type
-
-            lSPolyx, lSVInx = [], []
-            lSPolyy, lSVIny = [], []
-            lSLim, lSnLim = [], []
-            lsnvert = []
-            num_tot_structs = 0
-            num_lim_structs = 0
-            for ss in lS:
-                lp = ss.Poly_closed[0]
-                [lSPolyx.append(item) for item in lp]
-                lp = ss.Poly_closed[1]
-                [lSPolyy.append(item) for item in lp]
-                lp = ss.dgeom["VIn"][0]
-                [lSVInx.append(item) for item in lp]
-                lp = ss.dgeom["VIn"][1]
-                [lSVIny.append(item) for item in lp]
-                lSLim.append(ss.Lim)
-                lSnLim.append(ss.noccur)
-                if len(lsnvert) == 0:
-                    lsnvert.append(len(ss.Poly_closed[0]))
-                else:
-                    lsnvert.append(
-                        len(ss.Poly_closed[0]) + lsnvert[num_lim_structs - 1]
-                    )
-                num_lim_structs += 1
-                if ss.Lim is None or len(ss.Lim) == 0:
-                    num_tot_structs += 1
-                else:
-                    num_tot_structs += len(ss.Lim)
-
-            lsnvert = np.asarray(lsnvert, dtype=int)
-            lSPolyx = np.asarray(lSPolyx)
-            lSPolyy = np.asarray(lSPolyy)
-            lSVInx = np.asarray(lSVInx)
-            lSVIny = np.asarray(lSVIny)
-
-            dkwd = dict(ves_lims=Lim,
-                        nstruct_tot=num_tot_structs,
-                        nstruct_lim=num_lim_structs,
-                        lstruct_polyx=lSPolyx,
-                        lstruct_polyy=lSPolyy,
-                        lstruct_lims=lSLim,
-                        lstruct_nlim=np.asarray(lSnLim, dtype=int),
-                        lstruct_normx=lSVInx,
-                        lstruct_normy=lSVIny,
-                        lnvert=lsnvert,
-                        ves_type=VType,
-                        rmin=-1, forbid=True, eps_uz=1.e-6, eps_vz=1.e-9,
+            # Get the cached flattened geometry (passed without copy)
+            dkwd = dict(self.config._get_geom_buffer(
+                indIn=indIn[0], indOut=indOut,
+            ))
+            largs = [D, u, dkwd.pop("ves_poly"), dkwd.pop("ves_norm")]
+            del dkwd["version"]
+            dkwd.update(rmin=-1, forbid=True, eps_uz=1.e-6, eps_vz=1.e-9,
                         eps_a=1.e-9, eps_b=1.e-9, eps_plane=1.e-9, test=True)
 
         return indStruct, largs, dkwd
@@ -7115,6 +7386,9 @@ class Rays(utils.ToFuObject):
         method="sum",
         minimize="calls",
         num_threads=16,
+        chunk_pts=None,
+        chunk_t=None,
+        tol=None,
         reflections=True,
         coefs=None,
         coefs_reflect=None,
@@ -7161,10 +7435,20 @@ class Rays(utils.ToFuObject):
             - 'sum':    A numpy.sum() on the local values (x segments) DEFAULT
             - 'simps':  using :meth:`scipy.integrate.simps`
             - 'romb':   using :meth:`scipy.integrate.romb`
+            - 'adaptive': adaptive Simpson, each LOS is refined (from res)
+                          until the relative tolerance tol is met
         minimize : string, method to minimize for computation optimization
             - "calls": minimal number of calls to `func` (default)
             - "memory": slowest method, to use only if "out of memory" error
             - "hybrid": mix of before-mentioned methods.
+            - "chunks": stream blocks of points / times through `func`,
+                        bounded by chunk_pts and chunk_t
+        chunk_pts : None / int, if minimize="chunks"
+            max number of points per call to `func` (None => no limit)
+        chunk_t :   None / int, if minimize="chunks"
+            max number of time steps per call to `func` (None => no limit)
+        tol :       None / float, if method="adaptive"
+            relative tolerance on the integral of each LOS (None => 1e-3)
 
 
         Returns
@@ -7206,6 +7490,9 @@ class Rays(utils.ToFuObject):
                 minimize=minimize,
                 num_threads=num_threads,
                 Test=True,
+                chunk_pts=chunk_pts,
+                chunk_t=chunk_t,
+                tol=tol,
             )
 
             c0 = (
@@ -7237,6 +7524,9 @@ class Rays(utils.ToFuObject):
                         minimize=minimize,
                         num_threads=num_threads,
                         Test=True,
+                        chunk_pts=chunk_pts,
+                        chunk_t=chunk_t,
+                        tol=tol,
                     )
 
             # Integrate
@@ -7304,6 +7594,161 @@ class Rays(utils.ToFuObject):
             connect=connect,
         )
 
+    def _get_geommatrix_Plasma2D(
+        self,
+        plasma2d,
+        quant=None,
+        interp_space=None,
+        res=None,
+        DL=None,
+        resMode="abs",
+        method="sum",
+        num_threads=16,
+        reflections=True,
+        coefs_reflect=None,
+        ind=None,
+    ):
+        """ Return the cached geometry matrix, re-computed only if needed """
+
+        # -- Check inputs -----------------------------------------------------
+        out = plasma2d._checkformat_qr12RPZ(quant=quant)
+        idquant, idref1d, ani = out[0], out[1], out[-1]
+        if ani or idref1d is not None:
+            msg = ("The geometry matrix is only available for isotropic "
+                   + "quantities defined directly on a 2d mesh\n"
+                   + "\t- provided: {}".format(quant))
+            raise Exception(msg)
+        if method == "adaptive":
+            msg = ("The geometry matrix does not depend on the quantity\n"
+                   + "\t=> method='adaptive' cannot be used with it")
+            raise Exception(msg)
+        idmesh = [qq for qq in plasma2d._ddata[idquant]['depend']
+                  if plasma2d._dindref[qq]['group'] == 'mesh'][0]
+        dmesh = plasma2d._ddata[idmesh]['data']
+
+        indok, Ds, us, DL, E = self._calc_signal_preformat(ind=ind, DL=DL)
+        if Ds is None:
+            msg = "No LOS with a non-zero length!"
+            raise Exception(msg)
+        if res is None:
+            res = _RES
+        if num_threads is None:
+            num_threads = _NUM_THREADS
+        if coefs_reflect is None:
+            coefs_reflect = 1.0
+        c0 = (
+            reflections
+            and self._dgeom["dreflect"] is not None
+            and self._dgeom["dreflect"].get("nb", 0) > 0
+        )
+
+        # -- Check cache ------------------------------------------------------
+        key = (
+            idmesh, interp_space,
+            tuple(np.atleast_1d(res).tolist()), resMode, method,
+            c0, coefs_reflect if c0 else None,
+            None if ind is None else np.asarray(ind).tobytes(),
+            DL.tobytes(),
+        )
+        lref = [self._dgeom["D"], self._dgeom["u"], self._dgeom["kIn"],
+                self._dgeom["kOut"], self._dgeom["dreflect"], dmesh]
+        if key in self._dgeommat.keys():
+            dmat = self._dgeommat[key]
+            if all([aa is bb for aa, bb in zip(lref, dmat["ref"])]):
+                self._dgeommat.move_to_end(key)
+                return dmat, indok, idquant
+
+        # -- Compute ----------------------------------------------------------
+        def func(pts):
+            return plasma2d._get_pts2mesh_weights(
+                pts, idmesh, interp_space=interp_space,
+            )
+
+        kwdargs = dict(
+            resMode=resMode, method=method, num_threads=num_threads,
+        )
+        geommat, wout = _comp.LOS_calc_geommatrix(
+            func, Ds, us, DL, res, dmesh["size"], **kwdargs
+        )
+        if c0:
+            indch = self._check_indch(ind)
+            for ii in range(self._dgeom["dreflect"]["nb"]):
+                Dsi = np.ascontiguousarray(
+                    self._dgeom["dreflect"]["Ds"][:, indch, ii][:, indok]
+                )
+                usi = np.ascontiguousarray(
+                    self._dgeom["dreflect"]["us"][:, indch, ii][:, indok]
+                )
+                geomi, wouti = _comp.LOS_calc_geommatrix(
+                    func, Dsi, usi, DL, res, dmesh["size"], **kwdargs
+                )
+                geommat = geommat + coefs_reflect * geomi
+                wout = wout + coefs_reflect * wouti
+
+        geommat = geommat.tocsr()
+        nbytes = (geommat.data.nbytes + geommat.indices.nbytes
+                  + geommat.indptr.nbytes + wout.nbytes)
+        dmat = {"ref": lref, "geommat": geommat, "wout": wout,
+                "nbytes": nbytes}
+        self._dgeommat[key] = dmat
+        self._dgeommat.move_to_end(key)
+
+        # Least recently used matrices are evicted beyond _GEOMMAT_MAXBYTES
+        while (len(self._dgeommat) > 1
+               and (sum([dd["nbytes"] for dd in self._dgeommat.values()])
+                    > _GEOMMAT_MAXBYTES)):
+            self._dgeommat.popitem(last=False)
+        return dmat, indok, idquant
+
+    def calc_geommatrix_from_Plasma2D(
+        self,
+        plasma2d,
+        quant=None,
+        interp_space=None,
+        res=None,
+        DL=None,
+        resMode="abs",
+        method="sum",
+        num_threads=16,
+        reflections=True,
+        coefs_reflect=None,
+        ind=None,
+    ):
+        """ Return the sparse matrix mapping mesh values to LOS-integrals
+
+        The matrix is computed once per (camera, mesh, resolution...) and
+        cached (least recently used matrices are dropped beyond
+        _GEOMMAT_MAXBYTES), so that the signal at any time is a single sparse
+        product:
+            sig = geommat.dot(val)
+        with val the (nval,) or (nval, nt) values of a 2d quantity on the mesh
+        (nodes for linear triangular meshes, cells otherwise)
+
+        Only the LOS with a non-zero length are considered (like in
+        calc_signal_from_Plasma2D()), the points outside the mesh are ignored
+
+        Parameters
+        ----------
+        plasma2d:   tofu.data.Plasma2D
+            The object holding the mesh
+        quant:      str
+            key of a 2d (mesh-based) quantity, used to identify the mesh
+        method:     str
+            quadrature method, in ['sum', 'simps']
+
+        Returns
+        -------
+        geommat:    scipy.sparse.csr_matrix
+            (nlos, nval) sparse geometry matrix
+
+        """
+        dmat = self._get_geommatrix_Plasma2D(
+            plasma2d, quant=quant, interp_space=interp_space, res=res,
+            DL=DL, resMode=resMode, method=method, num_threads=num_threads,
+            reflections=reflections, coefs_reflect=coefs_reflect, ind=ind,
+        )[0]
+        return dmat["geommat"]
+
     def calc_signal_from_Plasma2D(
         self,
         plasma2d,
@@ -7326,6 +7771,9 @@ class Rays(utils.ToFuObject):
         method="sum",
         minimize="calls",
         num_threads=16,
+        chunk_pts=None,
+        chunk_t=None,
+        tol=None,
         reflections=True,
         coefs=None,
         coefs_reflect=None,
@@ -7340,7 +7788,18 @@ class Rays(utils.ToFuObject):
         units=None,
         draw=True,
         connect=True,
+        geommat=False,
     ):
+        """ Return the LOS-integrated signal of a Plasma2D quantity
+
+        If geommat=True (isotropic 2d quantity only), the signal is computed
+        as a sparse product with the geometry matrix, cached on the camera
+        (see calc_geommatrix_from_Plasma2D()), instead of interpolating the
+        quantity on the LOS sample points at each call
+        It only handles interp_t='nearest' and Type=None (fill_value is used
+        for nan values and for the parts of the LOS outside the mesh)
+
+        """
 
         # Format input
         indok, Ds, us, DL, E = self._calc_signal_preformat(
@@ -7374,6 +7833,37 @@ class Rays(utils.ToFuObject):
             if fill_value is None:
                 fill_value = 0.0
 
+        if newcalc and geommat:
+            # Single sparse product with the cached geometry matrix
+            # (time steps are taken as with interp_t='nearest')
+            if interp_t != "nearest" or Type is not None:
+                msg = ("geommat=True only handles interp_t='nearest' and "
+                       + "Type=None (isotropic quantity)\n"
+                       + "\t- provided: interp_t={}, Type={}".format(
+                           interp_t, Type))
+                raise Exception(msg)
+            dmat, indok, idquant = self._get_geommatrix_Plasma2D(
+                plasma2d,
+                quant=quant,
+                interp_space=interp_space,
+                res=res,
+                resMode=resMode,
+                method=method,
+                num_threads=num_threads,
+                reflections=reflections,
+                coefs_reflect=coefs_reflect,
+                ind=ind,
+            )
+            tbinall, ntall, indtq = plasma2d._get_tcom(idquant=idquant)[1:4]
+            val = plasma2d._ddata[idquant]['data'][
+                indtq[np.digitize(t, tbinall)], :
+            ]
+            if np.any(np.isnan(val)):
+                val = np.where(np.isnan(val), fill_value, val)
+            sig = (dmat["geommat"].dot(val.T).T
+                   + fill_value * dmat["wout"][None, :])
+
+        elif newcalc:
             func = plasma2d.get_finterp2d(
                 quant=quant,
                 ref1d=ref1d,
@@ -7417,6 +7907,9 @@ class Rays(utils.ToFuObject):
                 minimize=minimize,
                 Test=True,
                 num_threads=num_threads,
+                chunk_pts=chunk_pts,
+                chunk_t=chunk_t,
+                tol=tol,
             )
             c0 = (
                 reflections
@@ -7447,6 +7940,9 @@ class Rays(utils.ToFuObject):
                         minimize=minimize,
                         num_threads=num_threads,
                         Test=True,
+                        chunk_pts=chunk_pts,
+                        chunk_t=chunk_t,
+                        tol=tol,
                     )
         else:
             # Get ptsRZ along LOS // Which to choose ???
@@ -16,6 +16,7 @@ import numpy as np
 import scipy.interpolate as scpinterp
 import scipy.stats as scpstats
 import datetime as dtm
+from collections import OrderedDict
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 
@@ -39,6 +40,10 @@ _NTHREADS = 16
 # rotate / translate instance
 _RETURN_COPY = False
 _USE_NON_PARALLELISM = True
+# memory cap (bytes) of the detector lookup tables cache, see get_lut()
+_LUT_MAXBYTES = int(5e8)
+# memory bound (bytes) on the temporaries of get_lamb_avail_from_pts()
+_LAMB_AVAIL_MAXBYTES = 2**28
 
 
 """
@@ -148,6 +153,8 @@ class CrystalBragg(utils.ToFuObject):
         self._dmat = dict.fromkeys(self._get_keys_dmat())
         self._dbragg = dict.fromkeys(self._get_keys_dbragg())
         self._dmisc = dict.fromkeys(self._get_keys_dmisc())
+        self._dlut = {'maxbytes': _LUT_MAXBYTES, 'nbytes': 0,
+                      'dlut': OrderedDict()}
         #self._dplot = copy.deepcopy(self.__class__._ddef['dplot'])
 
     @classmethod
@@ -267,6 +274,7 @@ class CrystalBragg(utils.ToFuObject):
             dgeom=dgeom, ddef=self._ddef['dgeom'],
             valid_keys=self._get_keys_dgeom(),
         )
+        self.set_lut(clear=True)
         if self._dgeom['move'] is not None:
             self.set_move(
                 move=self._dgeom['move'],
@@ -280,6 +288,7 @@ class CrystalBragg(utils.ToFuObject):
             ddef=self._ddef['dmat'],
             valid_keys=self._get_keys_dmat()
         )
+        self.set_lut(clear=True)
 
     def set_dbragg(self, dbragg=None):
         self._dbragg = _check_optics._checkformat_dbragg(
@@ -1240,6 +1249,7 @@ class CrystalBragg(utils.ToFuObject):
                          self._dgeom['e2'],
                          )
         self._dmat['alpha'], self._dmat['beta'] = alpha, beta
+        self.set_lut(clear=True)
 
     def calc_meridional_sagital_focus(
         self,
@@ -2034,6 +2044,238 @@ class CrystalBragg(utils.ToFuObject):
         else:
             return bragg, phi
 
+    # -----------------
+    # methods for detector lookup tables
+    # -----------------
+
+    def set_lut(self, maxbytes=None, clear=False):
+        """ Set the memory cap of the detector lookup tables cache
+
+        Lookup tables store the (bragg, phi, lamb) of each detector pixel
+        (and optionally the binning indices of the pixels), see get_lut()
+        They are cleared whenever the geometry changes (move, set_dgeom,
+        set_dmat, update_non_parallelism...)
+
+        Parameters
+        ----------
+        maxbytes:   None / int
+            Max memory (bytes) used by the cache, 0 disables it
+            None => default (500 MB)
+        clear:      bool
+            Flag indicating whether to empty the cache
+        """
+        if maxbytes is None:
+            maxbytes = _LUT_MAXBYTES
+        self._dlut['maxbytes'] = int(maxbytes)
+        if clear:
+            self._dlut['dlut'].clear()
+            self._dlut['nbytes'] = 0
+        self._lut_evict()
+
+    def _lut_evict(self):
+        dlut = self._dlut['dlut']
+        while len(dlut) > 0 and self._dlut['nbytes'] > self._dlut['maxbytes']:
+            key, dd = dlut.popitem(last=False)
+            self._dlut['nbytes'] -= dd['nbytes']
+
+    def _lut_store(self, key, dd, dbins=None):
+        """ Store (read-only) a lookup table and evict least recently used
+
+        If dbins is provided, it is added to the already stored table key
+        """
+        dlut = self._dlut['dlut']
+        if dbins is None:
+            dd['dbins'] = dd.get('dbins', {})
+            lv = [dd[kk] for kk in ['bragg', 'phi', 'lamb']] + [
+                v1 for v0 in dd['dbins'].values() for v1 in v0.values()
+            ]
+        else:
+            lv = list(dbins.values())
+        nbytes = sum([vv.nbytes for vv in lv])
+        if nbytes > self._dlut['maxbytes']:
+            return
+        for vv in lv:
+            vv.flags.writeable = False
+
+        if dbins is None:
+            if key in dlut.keys():
+                self._dlut['nbytes'] -= dlut.pop(key)['nbytes']
+            dd['nbytes'] = nbytes
+            dlut[key] = dd
+        else:
+            dd = dlut[key]
+            dd['dbins'][tuple([int(ii) for ii in dbins['nfit']])] = dbins
+            dd['nbytes'] += nbytes
+        self._dlut['nbytes'] += nbytes
+        self._lut_evict()
+
+    def _get_lut_geom(self, use_non_parallelism=None):
+        """ Return the geometry fingerprint of the lookup tables """
+        nout, e1, e2, use_non_parallelism = self.get_unit_vectors(
+            use_non_parallelism=use_non_parallelism,
+        )
+        geom = _comp_optics._get_lut_hash(
+            self._dgeom['summit'], self._dgeom['rcurve'],
+            self._dgeom['extenthalf'], nout, e1, e2, self._dmat['d'],
+        )
+        return geom, use_non_parallelism
+
+    def get_lut(
+        self,
+        xi=None, xj=None, det=None,
+        dtheta=None, psi=None, n=None,
+        use_non_parallelism=None,
+        nlambfit=None, nphifit=None,
+    ):
+        """ Return a lookup table of (bragg, phi, lamb) of detector pixels
+
+        The table is computed once per (crystal geometry, detector, pixels,
+        dtheta, psi, n) with get_lambbraggphi_from_ptsxixj_dthetapsi()
+        (grid=True) and cached, see set_lut()
+
+        If nlambfit and nphifit are provided, the binning of the pixels on
+        (lambfit, phifit) is also computed and cached, see
+        _comp_optics.get_lambphifit_bins()
+
+        Cached tables are read-only, they can be saved / re-loaded with
+        save_lut() / load_lut()
+
+        Return
+        ------
+        dlut:   dict
+            'bragg', 'phi', 'lamb': arrays with the shape of the pixels
+                (+ a last dimension if several (dtheta, psi) are provided)
+            + 'lambfit', 'phifit', 'indlamb', 'indphi' if nlambfit, nphifit
+        """
+
+        # Check / format inputs
+        xi, xj, (xii, xjj) = _comp_optics._checkformat_xixj(xi, xj)
+        det = self._checkformat_det(det)
+        geom, use_non_parallelism = self._get_lut_geom(
+            use_non_parallelism=use_non_parallelism,
+        )
+        key = _comp_optics._get_lut_hash(
+            xii, xjj,
+            {kk: det[kk] for kk in ['cent', 'nout', 'ei', 'ej']},
+            dtheta, psi, n, use_non_parallelism,
+        )
+
+        # Check cache
+        dlut = self._dlut['dlut']
+        if key in dlut.keys() and dlut[key]['geom'] == geom:
+            dlut.move_to_end(key)
+            dd = dlut[key]
+        else:
+            bragg, phi, lamb = self.get_lambbraggphi_from_ptsxixj_dthetapsi(
+                xi=xii, xj=xjj, det=det,
+                dtheta=dtheta, psi=psi,
+                use_non_parallelism=use_non_parallelism,
+                n=n,
+                grid=True,
+                return_lamb=True,
+            )
+            # single crystal point (dtheta, psi) => shape of the pixels
+            if bragg.shape[-1] == 1 and bragg.ndim > xii.ndim:
+                bragg, phi, lamb = bragg[..., 0], phi[..., 0], lamb[..., 0]
+            dd = {
+                'geom': geom, 'use_non_parallelism': use_non_parallelism,
+                'bragg': bragg, 'phi': phi, 'lamb': lamb,
+            }
+            self._lut_store(key, dd)
+
+        dout = {kk: dd[kk] for kk in ['bragg', 'phi', 'lamb']}
+        if nlambfit is None and nphifit is None:
+            return dout
+
+        # binning indices, cached with the table
+        kbins = (nlambfit, nphifit)
+        dbins = dd.get('dbins', {}).get(kbins)
+        if dbins is None:
+            dbins = _comp_optics.get_lambphifit_bins(
+                dd['lamb'], dd['phi'], nlambfit, nphifit,
+            )
+            dbins['nfit'] = np.array(kbins)
+            if key in dlut.keys():
+                self._lut_store(key, dd, dbins=dbins)
+        dout.update({kk: vv for kk, vv in dbins.items() if kk != 'nfit'})
+        return dout
+
+    def save_lut(self, path=None, name=None, verb=None):
+        """ Save the cached detector lookup tables in a npz file
+
+        Default path is self.Id.SavePath, default name is
+        'LUT_' + self.Id.SaveName
+        Return the saved file (path + name + .npz)
+        """
+        if verb is None:
+            verb = True
+        if path is None:
+            path = self.Id.SavePath
+        if name is None:
+            name = 'LUT_' + self.Id.SaveName
+        if not name.endswith('.npz'):
+            name = name + '.npz'
+        pfe = os.path.join(os.path.abspath(path), name)
+
+        # flat keys: '<key>-<field>' or '<key>-bins<ii>-<field>'
+        dout = {}
+        for key, dd in self._dlut['dlut'].items():
+            for kk in ['geom', 'use_non_parallelism', 'bragg', 'phi', 'lamb']:
+                dout['{}-{}'.format(key, kk)] = np.asarray(dd[kk])
+            for ii, dbins in enumerate(dd['dbins'].values()):
+                for kk, vv in dbins.items():
+                    dout['{}-bins{}-{}'.format(key, ii, kk)] = vv
+        np.savez(pfe, **dout)
+        if verb is True:
+            msg = "Saved {} lookup tables in:\n\t{}".format(
+                len(self._dlut['dlut']), pfe,
+            )
+            print(msg)
+        return pfe
+
+    def load_lut(self, pfe=None):
+        """ Load lookup tables saved with save_lut() into the cache
+
+        Only tables matching the current geometry are loaded
+        """
+        if not (isinstance(pfe, str) and os.path.isfile(pfe)):
+            msg = "Arg pfe must be a valid file!\n\t- provided: {}".format(pfe)
+            raise Exception(msg)
+
+        dlut = {}
+        with np.load(pfe, allow_pickle=False) as out:
+            for kk in out.files:
+                lk = kk.split('-')
+                vv = out[kk]
+                if vv.ndim == 0:
+                    vv = vv.item()
+                dd = dlut.setdefault(lk[0], {'dbins': {}})
+                if len(lk) == 2:
+                    dd[lk[1]] = vv
+                else:
+                    dd['dbins'].setdefault(lk[1], {})[lk[2]] = vv
+        for dd in dlut.values():
+            dd['dbins'] = {
+                tuple([int(ii) for ii in v0['nfit']]): v0
+                for v0 in dd['dbins'].values()
+            }
+
+        lout = []
+        for key, dd in dlut.items():
+            geom = self._get_lut_geom(
+                use_non_parallelism=dd['use_non_parallelism'],
+            )[0]
+            if dd['geom'] == geom:
+                self._lut_store(key, dd)
+            else:
+                lout.append(key)
+        if len(lout) > 0:
+            msg = (
+                "The following lookup tables do not match the geometry "
+                + "and were not loaded:\n\t- " + "\n\t- ".join(lout)
+            )
+            warnings.warn(msg)
+
     def get_lamb_avail_from_pts(
         self,
         pts=None,
@@ -2042,6 +2284,7 @@ class CrystalBragg(utils.ToFuObject):
         use_non_parallelism=None,
         strict=None,
         return_xixj=None,
+        chunk_pts=None,
     ):
         """ Return the wavelength accessible from plasma points on the crystal
 
@@ -2061,6 +2304,8 @@ class CrystalBragg(utils.ToFuObject):
             - ndtheta: sampling of the lamb interval (default: 20)
             - npsi: sampling of the lamb interval (default: 'envelop')
             - det: (optional) a detector dict, for xi and xj
+            - chunk_pts: (optional) max number of pts computed at once, all
+              lamb being computed together (default: memory-bounded)
         Returns:
             - lamb: (npts, nlamb) array of sampled valid wavelength interval
             - phi:  (npts, nlamb, ndtheta, npsi, 2) array of phi
@@ -2102,37 +2347,51 @@ class CrystalBragg(utils.ToFuObject):
         lamb = lambmin[:, None] + (lambmax-lambmin)[:, None]*klamb
         bragg = self._checkformat_bragglamb(lamb=lamb, n=n)
 
-        # Compute dtheta / psi for each pts and lamb
+        # Compute dtheta / psi for all lamb at once, by chunks of pts
+        # each pts involves ~32 (nlamb, ndtheta, 2) temporaries
+        pts = _comp_optics._checkformat_pts(pts)
         npts = lamb.shape[0]
+        if chunk_pts is None:
+            chunk_pts = _LAMB_AVAIL_MAXBYTES // (32*8*nlamb*ndtheta*2)
+        chunk_pts = max(int(chunk_pts), 1)
+
         dtheta = np.full((npts, nlamb, ndtheta, 2), np.nan)
         psi = np.full((npts, nlamb, ndtheta, 2), np.nan)
         phi = np.full((npts, nlamb, ndtheta, 2), np.nan)
-        for ii in range(nlamb):
+        dox = return_xixj is True and det is not None
+        if dox:
+            xi = np.full((npts, nlamb, ndtheta, 2), np.nan)
+            xj = np.full((npts, nlamb, ndtheta, 2), np.nan)
+        for i0 in range(0, npts, chunk_pts):
+            ind = slice(i0, min(i0 + chunk_pts, npts))
             (
-                dtheta[:, ii, :, :], psi[:, ii, :, :],
-                phi[:, ii, :, :],
+                dtheta[ind, ...], psi[ind, ...], phi[ind, ...],
             ) = self._calc_dthetapsiphi_from_lambpts(
-                pts=pts, bragg=bragg[:, ii], lamb=None,
+                pts=pts[:, ind], bragg=bragg[ind, :], lamb=None,
                 n=n, ndtheta=ndtheta,
                 use_non_parallelism=use_non_parallelism,
                 grid=False,
             )[:3]
 
-        if return_xixj is True and det is not None:
-            xi, xj, strict = self.calc_xixj_from_braggphi(
-                phi=phi+np.pi,
-                bragg=bragg[..., None, None],
-                n=n,
-                dtheta=dtheta,
-                psi=psi,
-                det=det,
-                data=None,
-                use_non_parallelism=use_non_parallelism,
-                strict=strict,
-                return_strict=True,
-                plot=False,
-                dax=None,
-            )
+            if dox:
+                xi[ind, ...], xj[ind, ...], strict = (
+                    self.calc_xixj_from_braggphi(
+                        phi=phi[ind, ...]+np.pi,
+                        bragg=bragg[ind, :, None, None],
+                        n=n,
+                        dtheta=dtheta[ind, ...],
+                        psi=psi[ind, ...],
+                        det=det,
+                        data=None,
+                        use_non_parallelism=use_non_parallelism,
+                        strict=strict,
+                        return_strict=True,
+                        plot=False,
+                        dax=None,
+                    )
+                )
+
+        if dox:
             if strict is True and np.any(np.isnan(xi)):
                 indnan = np.isnan(xi)
                 phi[indnan] = np.nan
@@ -2177,23 +2436,15 @@ class CrystalBragg(utils.ToFuObject):
 
         # reshape bragg for matching dtheta.shape
         if grid is True:
-            bragg = np.repeat(
-                np.repeat(
-                    np.repeat(bragg[:, None], npts, axis=-1)[..., None],
-                    dtheta.shape[2],
-                    axis=-1,
-                )[..., None],
-                2,
-                axis=-1,
-            )
+            bragg = np.broadcast_to(
+                bragg[:, None, None, None], dtheta.shape,
+            ).copy()
             pts = pts[:, None, :, None, None]
         else:
-            bragg = np.repeat(
-                np.repeat(bragg[:, None], dtheta.shape[1], axis=1)[..., None],
-                2,
-                axis=-1,
-            )
-            pts = pts[..., None, None]
+            bragg = np.broadcast_to(
+                bragg[..., None, None], dtheta.shape,
+            ).copy()
+            pts = pts.reshape((3, npts) + (1,)*(bragg.ndim - 1))
         bragg[~indok] = np.nan
 
         # Get corresponding phi and re-check bragg, for safety
@@ -2302,7 +2553,8 @@ class CrystalBragg(utils.ToFuObject):
     def _calc_spect1d_from_data2d(self, data, lamb, phi,
                                   nlambfit=None, nphifit=None,
                                   nxi=None, nxj=None,
-                                  spect1d=None, mask=None, vertsum1d=None):
+                                  spect1d=None, mask=None, vertsum1d=None,
+                                  dbins=None):
         if nlambfit is None:
             nlambfit = nxi
         if nphifit is None:
@@ -2314,12 +2566,14 @@ class CrystalBragg(utils.ToFuObject):
             spect1d=spect1d,
             mask=mask,
             vertsum1d=vertsum1d,
+            dbins=dbins,
         )
 
     def plot_data_vs_lambphi(
         self,
         xi=None, xj=None, data=None, mask=None,
         det=None, dtheta=None, psi=None, n=None,
+        use_non_parallelism=None,
         nlambfit=None, nphifit=None,
         magaxis=None, npaxis=None,
         dlines=None, spect1d='mean',
@@ -2344,22 +2598,27 @@ class CrystalBragg(utils.ToFuObject):
         nxi = xi.size if xi is not None else np.unique(xii).size
         nxj = xj.size if xj is not None else np.unique(xjj).size
 
-        # Compute lamb / phi
-        bragg, phi, lamb = self.get_lambbraggphi_from_ptsxixj_dthetapsi(
+        if nlambfit is None:
+            nlambfit = nxi
+        if nphifit is None:
+            nphifit = nxj
+
+        # Compute lamb / phi (and binning) from lookup table
+        dlut = self.get_lut(
             xi=xii, xj=xjj, det=det,
             dtheta=dtheta, psi=psi,
             use_non_parallelism=use_non_parallelism,
             n=n,
-            grid=True,
-            return_lamb=True,
+            nlambfit=nlambfit, nphifit=nphifit,
         )
+        bragg, phi, lamb = dlut['bragg'], dlut['phi'], dlut['lamb']
 
         # Compute lambfit / phifit and spectrum1d
         (spect1d, lambfit, phifit,
          vertsum1d, phiminmax) = self._calc_spect1d_from_data2d(
             data, lamb, phi,
             nlambfit=nlambfit, nphifit=nphifit, nxi=nxi, nxj=nxj,
-            spect1d=spect1d, mask=mask, vertsum1d=True
+            spect1d=spect1d, mask=mask, vertsum1d=True, dbins=dlut,
         )
 
         # Get phiref from mag axis
@@ -2588,6 +2847,7 @@ class CrystalBragg(utils.ToFuObject):
         self, dlines=None, dconstraints=None, dprepare=None,
         data=None, xi=None, xj=None, n=None,
         det=None, dtheta=None, psi=None,
+        use_non_parallelism=None,
         mask=None, domain=None, pos=None, binning=None, subset=None,
         # lphi=None, lphi_tol=None,
         deg=None, knots=None, nbsplines=None,
@@ -2608,15 +2868,14 @@ class CrystalBragg(utils.ToFuObject):
             nxi = xi.size if xi is not None else np.unique(xii).size
             nxj = xj.size if xj is not None else np.unique(xjj).size
 
-            # Compute lamb / phi
-            bragg, phi, lamb = self.get_lambbraggphi_from_ptsxixj_dthetapsi(
+            # Compute lamb / phi from lookup table
+            dlut = self.get_lut(
                 xi=xii, xj=xjj, det=det,
                 dtheta=dtheta, psi=psi,
                 use_non_parallelism=use_non_parallelism,
                 n=n,
-                grid=True,
-                return_lamb=True,
             )
+            phi, lamb = dlut['phi'], dlut['lamb']
 
             # ----------------------
             # Prepare input data (domain, binning, subset, noise...)
@@ -2739,6 +2998,7 @@ class CrystalBragg(utils.ToFuObject):
     def noise_analysis(
         self, data=None, xi=None, xj=None, n=None,
         det=None, dtheta=None, psi=None,
+        use_non_parallelism=None,
         mask=None, valid_fraction=None, nxerrbin=None,
         margin=None, domain=None, nlamb=None,
         deg=None, knots=None, nbsplines=None,
@@ -2754,15 +3014,14 @@ class CrystalBragg(utils.ToFuObject):
     ):
 
         # ----------------------
-        # Geometrical transform
-        bragg, phi, lamb = self.get_lambbraggphi_from_ptsxixj_dthetapsi(
+        # Geometrical transform (lookup table)
+        dlut = self.get_lut(
             xi=xi, xj=xj, det=det,
             dtheta=dtheta, psi=psi,
             use_non_parallelism=use_non_parallelism,
             n=n,
-            grid=True,
-            return_lamb=True,
         )
+        phi, lamb = dlut['phi'], dlut['lamb']
 
         import tofu.spectro._fit12d as _fit12d
         return _fit12d.noise_analysis_2d(
@@ -2799,6 +3058,7 @@ class CrystalBragg(utils.ToFuObject):
     def noise_analysis_scannbs(
         self, data=None, xi=None, xj=None, n=None,
         det=None, dtheta=None, psi=None,
+        use_non_parallelism=None,
         mask=None, nxerrbin=None,
         domain=None, nlamb=None,
         deg=None, knots=None, nbsplines=None, lnbsplines=None,
@@ -2813,15 +3073,14 @@ class CrystalBragg(utils.ToFuObject):
     ):
 
         # ----------------------
-        # Geometrical transform
-        bragg, phi, lamb = self.get_lambbraggphi_from_ptsxixj_dthetapsi(
+        # Geometrical transform (lookup table)
+        dlut = self.get_lut(
             xi=xi, xj=xj, det=det,
             dtheta=0, psi=0,
             use_non_parallelism=use_non_parallelism,
             n=n,
-            grid=True,
-            return_lamb=True,
         )
+        phi, lamb = dlut['phi'], dlut['lamb']
 
         import tofu.spectro._fit12d as _fit12d
         return _fit12d.noise_analysis_2d_scannbs(
@@ -55,6 +55,19 @@ cdef bint inter_ray_aabb_box(const int[3] sign,
                              const double[3] ds,
                              const bint countin) nogil
 
+# ==============================================================================
+# =  Bounding Volume Hierarchy (BVH) of axis aligned bounding boxes
+# ==============================================================================
+cdef int build_bvh_bboxes(const int nbox,
+                          const double* lbounds,
+                          const int leaf_size,
+                          double* node_bounds,
+                          int* node_child,
+                          int* node_axis,
+                          int* node_start,
+                          int* node_count,
+                          int* box_order) nogil
+
 # ==============================================================================
 # =  Raytracing basic tools: intersection ray and triangle (in 3d space)
 # ==============================================================================
@@ -90,6 +103,14 @@ cdef void raytracing_inout_struct_tor(const int num_los,
                                       const double* lstruct_polyy,
                                       const double* lstruct_normx,
                                       const double* lstruct_normy,
+                                      const int nnodes,
+                                      const double* bvh_bounds,
+                                      const int* bvh_child,
+                                      const int* bvh_axis,
+                                      const int* bvh_start,
+                                      const int* bvh_count,
+                                      const int* bvh_order,
+                                      const int* lbox_struct,
                                       const double eps_uz,
                                       const double eps_vz,
                                       const double eps_a,
@@ -27,6 +27,9 @@ from ._basic_geom_tools cimport is_point_in_path_vec
 from ._basic_geom_tools cimport compute_inv_and_sign
 from . cimport _basic_geom_tools as _bgt
 
+# Maximum number of structures' bounding boxes in a leaf of the BVH
+cdef int _BVH_LEAF_SIZE = 2
+
 # ==============================================================================
 # =  3D Bounding box (not Toroidal)
 # ==============================================================================
@@ -531,6 +534,139 @@ cdef inline bint inter_ray_aabb_box(const int[3] sign,
     return  res
 
 
+# ==============================================================================
+# =  Bounding Volume Hierarchy (BVH) of axis aligned bounding boxes
+# ==============================================================================
+cdef inline int build_bvh_bboxes(const int nbox,
+                                 const double* lbounds,
+                                 const int leaf_size,
+                                 double* node_bounds,
+                                 int* node_child,
+                                 int* node_axis,
+                                 int* node_start,
+                                 int* node_count,
+                                 int* box_order) nogil:
+    """
+    Builds a binary bounding volume hierarchy over a set of axis aligned
+    bounding boxes (typically the bounding boxes of the structures of a
+    configuration). The boxes are split recursively at the middle of the
+    longest extent of their centers, until at most `leaf_size` boxes remain
+    in a node. The tree is stored flattened: the two children of a node are
+    always consecutive.
+    Params
+    =====
+    nbox : int
+       Number of bounding boxes
+    lbounds : (6 * nbox) double array
+       Bounding boxes, as computed by `comp_bbox_poly_tor(_lim)`
+    leaf_size : int
+       Maximum number of boxes in a leaf of the tree
+    node_bounds : (6 * (2 * nbox - 1)) double array <INOUT>
+       Bounding box of each node of the tree
+    node_child : (2 * nbox - 1) int array <INOUT>
+       Index of the first child of each node (-1 if the node is a leaf),
+       the second child index is node_child[inode] + 1
+    node_axis : (2 * nbox - 1) int array <INOUT>
+       Axis along which the node was split (-1 if leaf)
+    node_start : (2 * nbox - 1) int array <INOUT>
+       Index, in box_order, of the first box of each node
+    node_count : (2 * nbox - 1) int array <INOUT>
+       Number of boxes in each node
+    box_order : (nbox) int array <INOUT>
+       Permutation of the boxes indices such that the boxes of each node are
+       box_order[node_start[inode]:node_start[inode] + node_count[inode]]
+    Returns
+    =======
+       Number of nodes of the tree
+    """
+    cdef int ii, jj, kk, tmp
+    cdef int inode, start, count, nleft
+    cdef int axis
+    cdef int nnodes = 1
+    cdef int stack_size = 0
+    cdef double split, ext, ext_max
+    cdef double[3] cmin
+    cdef double[3] cmax
+    cdef int* stack = <int*> malloc(sizeof(int) * 2 * nbox)
+    cdef double* centers = <double*> malloc(sizeof(double) * 3 * nbox)
+    # -- Initialization --------------------------------------------------------
+    for ii in range(nbox):
+        box_order[ii] = ii
+        for kk in range(3):
+            centers[3*ii + kk] = 0.5 * (lbounds[6*ii + kk]
+                                        + lbounds[6*ii + 3 + kk])
+    node_start[0] = 0
+    node_count[0] = nbox
+    stack[0] = 0
+    stack_size = 1
+    # -- Building nodes (depth first) ------------------------------------------
+    while stack_size > 0:
+        stack_size = stack_size - 1
+        inode = stack[stack_size]
+        start = node_start[inode]
+        count = node_count[inode]
+        node_child[inode] = -1
+        node_axis[inode] = -1
+        # bounding box of the node and extent of the centers
+        for kk in range(3):
+            node_bounds[6*inode + kk] = lbounds[6*box_order[start] + kk]
+            node_bounds[6*inode + 3 + kk] = lbounds[6*box_order[start] + 3 + kk]
+            cmin[kk] = centers[3*box_order[start] + kk]
+            cmax[kk] = cmin[kk]
+        for ii in range(start + 1, start + count):
+            jj = box_order[ii]
+            for kk in range(3):
+                if lbounds[6*jj + kk] < node_bounds[6*inode + kk]:
+                    node_bounds[6*inode + kk] = lbounds[6*jj + kk]
+                if lbounds[6*jj + 3 + kk] > node_bounds[6*inode + 3 + kk]:
+                    node_bounds[6*inode + 3 + kk] = lbounds[6*jj + 3 + kk]
+                if centers[3*jj + kk] < cmin[kk]:
+                    cmin[kk] = centers[3*jj + kk]
+                if centers[3*jj + kk] > cmax[kk]:
+                    cmax[kk] = centers[3*jj + kk]
+        if count <= leaf_size:
+            continue
+        # splitting along longest extent of centers
+        axis = 0
+        ext_max = cmax[0] - cmin[0]
+        for kk in range(1, 3):
+            ext = cmax[kk] - cmin[kk]
+            if ext > ext_max:
+                ext_max = ext
+                axis = kk
+        if ext_max <= _VSMALL:
+            # all centers are identical, cannot split
+            continue
+        split = 0.5 * (cmin[axis] + cmax[axis])
+        ii = start
+        jj = start + count - 1
+        while ii <= jj:
+            if centers[3*box_order[ii] + axis] < split:
+                ii = ii + 1
+            else:
+                tmp = box_order[ii]
+                box_order[ii] = box_order[jj]
+                box_order[jj] = tmp
+                jj = jj - 1
+        nleft = ii - start
+        if nleft == 0 or nleft == count:
+            nleft = count // 2
+        # creating children
+        node_child[inode] = nnodes
+        node_axis[inode] = axis
+        node_start[nnodes] = start
+        node_count[nnodes] = nleft
+        node_start[nnodes + 1] = start + nleft
+        node_count[nnodes + 1] = count - nleft
+        stack[stack_size] = nnodes
+        stack[stack_size + 1] = nnodes + 1
+        stack_size = stack_size + 2
+        nnodes = nnodes + 2
+    free(stack)
+    free(centers)
+    return nnodes
+
+
 # ==============================================================================
 # =  Raytracing basic tools: intersection ray and triangle (in 3d space)
 # ==============================================================================
@@ -596,6 +732,14 @@ cdef inline void raytracing_inout_struct_tor(const int num_los,
                                              const double* lstruct_polyy,
                                              const double* lstruct_normx,
                                              const double* lstruct_normy,
+                                             const int nnodes,
+                                             const double* bvh_bounds,
+                                             const int* bvh_child,
+                                             const int* bvh_axis,
+                                             const int* bvh_start,
+                                             const int* bvh_count,
+                                             const int* bvh_order,
+                                             const int* lbox_struct,
                                              const double eps_uz,
                                              const double eps_vz,
                                              const double eps_a,
@@ -682,6 +826,16 @@ cdef inline void raytracing_inout_struct_tor(const int num_los,
     lstruct_normy : (2, num_vertex-1) double array
        List of "y" coordinates of the normal vectors going "inwards" of the
         edges of the Polygon defined by lstruct_poly
+    nnodes : int
+       Number of nodes of the bounding volume hierarchy built on lbounds
+       (see `build_bvh_bboxes`). If not is_out_struct then 0
+    bvh_<val> : arrays
+       Flattened bounding volume hierarchy (bounds, first child, split axis,
+       first box index and number of boxes of each node, and boxes ordering)
+       as computed by `build_bvh_bboxes`. If not is_out_struct then NULL
+    lbox_struct : (nstruct) int array
+       Index of the structure (in [0, nstruct_lim[) of each bounding box.
+       If not is_out_struct then NULL
     eps<val> : double
        Small value, acceptance of error
     num_threads : int
@@ -698,8 +852,9 @@ cdef inline void raytracing_inout_struct_tor(const int num_los,
     cdef double lim_min=0., lim_max=0., invuz=0.
     cdef int totnvert=0
     cdef int nvert
-    cdef int ind_struct, ind_bounds
-    cdef int ind_los, ii, jj
+    cdef int ind_bounds
+    cdef int ind_los, ii, jj, kk
+    cdef int inode, ind_box, stack_size
     cdef bint lim_is_none
     cdef bint found_new_kout
     cdef bint inter_bbox
@@ -714,6 +869,7 @@ cdef inline void raytracing_inout_struct_tor(const int num_los,
     cdef double* loc_vp = NULL
     cdef int* sign_ray = NULL
     cdef int* ind_loc = NULL
+    cdef int* bvh_stack = NULL
     # == Defining parallel part ================================================
     with nogil, parallel(num_threads=num_threads):
         # We use local arrays for each thread so
@@ -729,9 +885,9 @@ cdef inline void raytracing_inout_struct_tor(const int num_los,
             invr_ray  = <double *> malloc(sizeof(double) * 3)
             lim_ves   = <double *> malloc(sizeof(double) * 2)
             sign_ray  = <int *> malloc(sizeof(int) * 3)
+            bvh_stack = <int *> malloc(sizeof(int) * nnodes)
         # == The parallelization over the LOS ==================================
         for ind_los in prange(num_los):
-            ind_struct = 0
             loc_org[0] = ray_orig[0, ind_los]
             loc_org[1] = ray_orig[1, ind_los]
             loc_org[2] = ray_orig[2, ind_los]
@@ -777,27 +933,53 @@ cdef inline void raytracing_inout_struct_tor(const int num_los,
 
             # == Case "OUT" structure ==========================================
             if is_out_struct:
-                # We work on each structure
-                for ii in range(nstruct_lim):
-                    # -- Getting structure's data ------------------------------
-                    if ii == 0:
-                        nvert = lnvert[0]
-                        totnvert = 0
-                    else:
-                        totnvert = lnvert[ii-1]
-                        nvert = lnvert[ii] - totnvert
-                    ind_struct = lsz_lim[ii]
-                    # -- Working on the structure limited ----------------------
-                    for jj in range(lstruct_nlim[ii]):
-                        lim_min = langles[(ind_struct+jj)*2]
-                        lim_max = langles[(ind_struct+jj)*2 + 1]
-                        lim_is_none = lis_limited[ind_struct+jj] == 1
+                # We traverse the bounding volume hierarchy of the structures,
+                # nearest child first, pruning the nodes that are not hit by
+                # the ray or that are behind the last POut encountered
+                bvh_stack[0] = 0
+                stack_size = 1
+                while stack_size > 0:
+                    stack_size = stack_size - 1
+                    inode = bvh_stack[stack_size]
+                    inter_bbox = inter_ray_aabb_box(sign_ray, invr_ray,
+                                                    &bvh_bounds[inode*6],
+                                                    loc_org, True)
+                    if not inter_bbox:
+                        continue
+                    inter_bbox = inter_ray_aabb_box(sign_ray, invr_ray,
+                                                    &bvh_bounds[inode*6],
+                                                    last_pout, False)
+                    if inter_bbox:
+                        continue
+                    if bvh_child[inode] >= 0:
+                        if sign_ray[bvh_axis[inode]] == 0:
+                            bvh_stack[stack_size] = bvh_child[inode] + 1
+                            bvh_stack[stack_size + 1] = bvh_child[inode]
+                        else:
+                            bvh_stack[stack_size] = bvh_child[inode]
+                            bvh_stack[stack_size + 1] = bvh_child[inode] + 1
+                        stack_size = stack_size + 2
+                        continue
+                    # -- Leaf: working on each (limited) structure -------------
+                    for kk in range(bvh_start[inode],
+                                    bvh_start[inode] + bvh_count[inode]):
+                        ind_box = bvh_order[kk]
+                        # -- Getting structure's data --------------------------
+                        ii = lbox_struct[ind_box]
+                        if ii == 0:
+                            nvert = lnvert[0]
+                            totnvert = 0
+                        else:
+                            totnvert = lnvert[ii-1]
+                            nvert = lnvert[ii] - totnvert
+                        jj = ind_box - lsz_lim[ii]
+                        lim_min = langles[ind_box*2]
+                        lim_max = langles[ind_box*2 + 1]
+                        lim_is_none = lis_limited[ind_box] == 1
                         # We test if it is really necessary to compute the inter
                         # ie. we check if the ray intersects the bounding box
-
                         inter_bbox = inter_ray_aabb_box(sign_ray, invr_ray,
-                                                        &lbounds[(ind_struct
-                                                                  + jj)*6],
+                                                        &lbounds[ind_box*6],
                                                         loc_org,
                                                         True)
                         if not inter_bbox:
@@ -805,8 +987,7 @@ cdef inline void raytracing_inout_struct_tor(const int num_los,
                         # We check that the bounding box is not "behind"
                         # the last POut encountered
                         inter_bbox = inter_ray_aabb_box(sign_ray, invr_ray,
-                                                        &lbounds[(ind_struct
-                                                                  + jj)*6],
+                                                        &lbounds[ind_box*6],
                                                         last_pout, False)
                         if inter_bbox:
                             continue
@@ -899,6 +1080,7 @@ cdef inline void raytracing_inout_struct_tor(const int num_los,
             free(lim_ves)
             free(invr_ray)
             free(sign_ray)
+            free(bvh_stack)
     return
 
 
@@ -1511,6 +1693,14 @@ cdef inline void compute_inout_tot(const int num_los,
     cdef int *llimits = NULL
     cdef long *lsz_lim = NULL
     cdef long* lstruct_nlim = NULL
+    cdef int nnodes = 0
+    cdef int* lbox_struct = NULL
+    cdef int* bvh_child = NULL
+    cdef int* bvh_axis = NULL
+    cdef int* bvh_start = NULL
+    cdef int* bvh_count = NULL
+    cdef int* bvh_order = NULL
+    cdef double* bvh_bounds = NULL
     cdef int[1] llim_ves
     cdef double[2] lbounds_ves
     cdef double[2] lim_ves
@@ -1551,6 +1741,7 @@ cdef inline void compute_inout_tot(const int num_los,
                                     &ves_poly[1][0],
                                     &ves_norm[0][0],
                                     &ves_norm[1][0],
+                                    0, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
                                     eps_uz, eps_vz, eps_a, eps_b, eps_plane,
                                     num_threads, False) # structure is in
 
@@ -1560,6 +1751,7 @@ cdef inline void compute_inout_tot(const int num_los,
             llimits = <int *>malloc(nstruct_tot * sizeof(int))
             lsz_lim = <long *>malloc(nstruct_lim * sizeof(long))
             lstruct_nlim = <long *>malloc(nstruct_lim * sizeof(long))
+            lbox_struct = <int *>malloc(nstruct_tot * sizeof(int))
             for ii in range(nstruct_lim):
                 # We get the number of vertices and limits of the struct's poly
                 if ii == 0:
@@ -1579,6 +1771,7 @@ cdef inline void compute_inout_tot(const int num_los,
                     lstruct_nlim[ii] = lstruct_nlim[ii] + 1
                     # computing structure bounding box (no limits)
                     llimits[ind_struct] = 1 # True : is continous
+                    lbox_struct[ind_struct] = ii
                     comp_bbox_poly_tor(nvert,
                                        &lstruct_polyx[ind_min],
                                        &lstruct_polyy[ind_min],
@@ -1595,6 +1788,7 @@ cdef inline void compute_inout_tot(const int num_los,
                     lim_ves[1] = lstruct_lims[lsl_ind + 1]
                     lsl_ind += 2
                     llimits[ind_struct] = 0 # False : struct is limited
+                    lbox_struct[ind_struct] = ii
                     lim_min = c_atan2(c_sin(lim_ves[0]), c_cos(lim_ves[0]))
                     lim_max = c_atan2(c_sin(lim_ves[1]), c_cos(lim_ves[1]))
                     comp_bbox_poly_tor_lim(nvert,
@@ -1613,6 +1807,7 @@ cdef inline void compute_inout_tot(const int num_los,
                         lim_ves[1] = lstruct_lims[lsl_ind + 1]
                         lsl_ind += 2
                         llimits[ind_struct] = 0 # False : struct is limited
+                        lbox_struct[ind_struct] = ii
                         lim_min = c_atan2(c_sin(lim_ves[0]), c_cos(lim_ves[0]))
                         lim_max = c_atan2(c_sin(lim_ves[1]), c_cos(lim_ves[1]))
                         comp_bbox_poly_tor_lim(nvert,
@@ -1624,6 +1819,17 @@ cdef inline void compute_inout_tot(const int num_los,
                         langles[ind_struct*2 + 1] = lim_max
                         ind_struct = 1 + ind_struct
             # end loops over structures
+            # -- Building the bounding volume hierarchy of the structures ------
+            bvh_bounds = <double *>malloc((2*nstruct_tot - 1) * 6
+                                          * sizeof(double))
+            bvh_child = <int *>malloc((2*nstruct_tot - 1) * sizeof(int))
+            bvh_axis = <int *>malloc((2*nstruct_tot - 1) * sizeof(int))
+            bvh_start = <int *>malloc((2*nstruct_tot - 1) * sizeof(int))
+            bvh_count = <int *>malloc((2*nstruct_tot - 1) * sizeof(int))
+            bvh_order = <int *>malloc(nstruct_tot * sizeof(int))
+            nnodes = build_bvh_bboxes(nstruct_tot, lbounds, _BVH_LEAF_SIZE,
+                                      bvh_bounds, bvh_child, bvh_axis,
+                                      bvh_start, bvh_count, bvh_order)
             # -- Computing intersection between structures and LOS -------------
             raytracing_inout_struct_tor(num_los, ray_vdir, ray_orig,
                                         coeff_inter_out, coeff_inter_in,
@@ -1638,6 +1844,9 @@ cdef inline void compute_inout_tot(const int num_los,
                                         &lstruct_polyy[0],
                                         &lstruct_normx[0],
                                         &lstruct_normy[0],
+                                        nnodes, bvh_bounds, bvh_child,
+                                        bvh_axis, bvh_start, bvh_count,
+                                        bvh_order, lbox_struct,
                                         eps_uz, eps_vz, eps_a,
                                         eps_b, eps_plane,
                                         num_threads,
@@ -1645,6 +1854,14 @@ cdef inline void compute_inout_tot(const int num_los,
 
             free(lsz_lim)
             free(llimits)
+            free(lstruct_nlim)
+            free(lbox_struct)
+            free(bvh_bounds)
+            free(bvh_child)
+            free(bvh_axis)
+            free(bvh_start)
+            free(bvh_count)
+            free(bvh_order)
     else:
         # -- Cylindrical case --------------------------------------------------
         # .. if there are, we get the limits for the vessel ....................
@@ -290,4 +290,11 @@ cdef void sa_assemble_arrays(int block,
                              double[::1] reso_rdrdz,
                              double[:, ::1] pts_mv,
                              long[::1] ind_mv,
-                             int num_threads)
+                             int num_threads,
+                             double eps_sang=*,
+                             int ngroups=*,
+                             long[::1] group_start=*,
+                             long[::1] part_ind=*,
+                             double[:, ::1] group_center=*,
+                             double[::1] group_rad=*,
+                             double[::1] group_rmax=*)
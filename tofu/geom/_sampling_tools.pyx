@@ -2077,7 +2077,20 @@ cdef inline void sa_assemble_arrays(int block,
                                     double[::1] reso_rdrdz,
                                     double[:, ::1] pts_mv,
                                     long[::1] ind_mv,
-                                    int num_threads):
+                                    int num_threads,
+                                    double eps_sang=0.,
+                                    int ngroups=1,
+                                    long[::1] group_start=None,
+                                    long[::1] part_ind=None,
+                                    double[:, ::1] group_center=None,
+                                    double[::1] group_rad=None,
+                                    double[::1] group_rmax=None):
+    cdef double[:, ::1] part_sub
+    if block:
+        # buffer for the particles selected for ray casting (see
+        # sa_select_particles), declared here so that cython can run
+        # without gil
+        part_sub = np.zeros((3, sz_p))
     if block and use_approx:
         # .. useless tabs .....................................................
         # declared here so that cython can run without gil
@@ -2119,7 +2132,9 @@ cdef inline void sa_assemble_arrays(int block,
                               reso_r_z, disc_r, step_rphi,
                               disc_z, ind_rz2pol, sz_phi,
                               reso_rdrdz, pts_mv, ind_mv,
-                              num_threads)
+                              num_threads,
+                              eps_sang, ngroups, group_start, part_ind,
+                              group_center, group_rad, group_rmax, part_sub)
     elif not block and use_approx:
         assemble_unblock_approx(part_coords, part_rad,
                                 is_in_vignette,
@@ -2131,7 +2146,7 @@ cdef inline void sa_assemble_arrays(int block,
                                 disc_z, ind_rz2pol,
                                 sz_phi,
                                 reso_rdrdz, pts_mv, ind_mv,
-                                num_threads)
+                                num_threads, eps_sang)
     elif block:
         # .. useless tabs .....................................................
         # declared here so that cython can run without gil
@@ -2173,7 +2188,9 @@ cdef inline void sa_assemble_arrays(int block,
                              reso_r_z, disc_r, step_rphi,
                              disc_z, ind_rz2pol, sz_phi,
                              reso_rdrdz, pts_mv, ind_mv,
-                             num_threads)
+                             num_threads,
+                             eps_sang, ngroups, group_start, part_ind,
+                             group_center, group_rad, group_rmax, part_sub)
     else:
         assemble_unblock_exact(part_coords, part_rad,
                                is_in_vignette,
@@ -2185,7 +2202,7 @@ cdef inline void sa_assemble_arrays(int block,
                                disc_z, ind_rz2pol,
                                sz_phi,
                                reso_rdrdz, pts_mv, ind_mv,
-                               num_threads)
+                               num_threads, eps_sang)
     return
 
 
@@ -2232,11 +2249,21 @@ cdef inline void assemble_block_approx(double[:, ::1] part_coords,
                                        double[::1] reso_rdrdz,
                                        double[:, ::1] pts_mv,
                                        long[::1] ind_mv,
-                                       int num_threads) nogil:
+                                       int num_threads,
+                                       double eps_sang,
+                                       int ngroups,
+                                       long[::1] group_start,
+                                       long[::1] part_ind,
+                                       double[:, ::1] group_center,
+                                       double[::1] group_rad,
+                                       double[::1] group_rmax,
+                                       double[:, ::1] part_sub) nogil:
     cdef int rr
     cdef int zz
     cdef int jj
     cdef int pp
+    cdef int kk
+    cdef int nsub
     cdef int ind_pol
     cdef int loc_first_ind
     cdef int loc_size_phi
@@ -2249,10 +2276,12 @@ cdef inline void assemble_block_approx(double[:, ::1] part_coords,
     cdef double loc_phi
     cdef double loc_step_rphi
     cdef long* is_vis
+    cdef long* ind_sub = NULL
     cdef double* dist = NULL
 
     dist = <double*> malloc(sz_p * sizeof(double))
     is_vis = <long*> malloc(sz_p * sizeof(long))
+    ind_sub = <long*> malloc(sz_p * sizeof(long))
     for rr in range(sz_r):
         loc_r = disc_r[rr]
         vol_pi = step_rphi[rr] * loc_r * c_pi
@@ -2272,14 +2301,20 @@ cdef inline void assemble_block_approx(double[:, ::1] part_coords,
                     loc_phi = - c_pi + (0.5 + indiijj) * loc_step_rphi
                     loc_x = loc_r * c_cos(loc_phi)
                     loc_y = loc_r * c_sin(loc_phi)
-                    # computing distance ....
-                    _bgt.compute_dist_pt_vec(loc_x, loc_y, loc_z,
-                                             sz_p, part_coords,
-                                             &dist[0])
+                    # selecting particles (distance, threshold) ....
+                    nsub = sa_select_particles(loc_x, loc_y, loc_z,
+                                               part_coords, part_rad,
+                                               1, eps_sang, ngroups,
+                                               group_start, part_ind,
+                                               group_center, group_rad,
+                                               group_rmax, part_sub,
+                                               &dist[0], &ind_sub[0])
+                    if nsub == 0:
+                        continue
                     # checking if visible .....
                     _rt.is_visible_pt_vec_core(loc_x, loc_y, loc_z,
-                                               part_coords,
-                                               sz_p,
+                                               part_sub,
+                                               nsub,
                                                ves_poly, ves_norm,
                                                &is_vis[0], dist,
                                                ves_lims,
@@ -2301,15 +2336,16 @@ cdef inline void assemble_block_approx(double[:, ::1] part_coords,
                                                eps_vz, eps_b, eps_plane,
                                                1, # is toroidal
                                                forbid, 1)
-
-                    for pp in range(sz_p):
-                        if is_vis[pp] and dist[pp] > part_rad[pp]:
+                    for kk in range(nsub):
+                        if is_vis[kk]:
+                            pp = ind_sub[kk]
                             sa_map[ind_pol,
                                    pp] += sa_approx_formula(part_rad[pp],
-                                                            dist[pp],
+                                                            dist[kk],
                                                             vol_pi)
     free(dist)
     free(is_vis)
+    free(ind_sub)
     return
 
 
@@ -2331,7 +2367,8 @@ cdef inline void assemble_unblock_approx(double[:, ::1] part_coords,
                                          double[::1] reso_rdrdz,
                                          double[:, ::1] pts_mv,
                                          long[::1] ind_mv,
-                                         int num_threads) nogil:
+                                         int num_threads,
+                                         double eps_sang) nogil:
     cdef int rr
     cdef int zz
     cdef int jj
@@ -2377,15 +2414,89 @@ cdef inline void assemble_unblock_approx(double[:, ::1] part_coords,
                                                  sz_p, part_coords,
                                                  &dist[0])
                         for pp in range(sz_p):
-                            if dist[pp]  > part_rad[pp]:
-                                sa_map[ind_pol,
-                                       pp] += sa_approx_formula(part_rad[pp],
-                                                                dist[pp],
-                                                                vol_pi)
+                            if dist[pp] <= part_rad[pp]:
+                                continue
+                            if (eps_sang > 0.
+                                and sa_approx_formula(part_rad[pp], dist[pp],
+                                                      c_pi) < eps_sang):
+                                continue
+                            sa_map[ind_pol,
+                                   pp] += sa_approx_formula(part_rad[pp],
+                                                            dist[pp],
+                                                            vol_pi)
         free(dist)
     return
 
 
+cdef inline int sa_select_particles(double pt0, double pt1, double pt2,
+                                    double[:, ::1] part_coords,
+                                    double[::1] part_rad,
+                                    int use_approx,
+                                    double eps_sang,
+                                    int ngroups,
+                                    long[::1] group_start,
+                                    long[::1] part_ind,
+                                    double[:, ::1] group_center,
+                                    double[::1] group_rad,
+                                    double[::1] group_rmax,
+                                    double[:, ::1] part_sub,
+                                    double* dist_sub,
+                                    long* ind_sub) nogil:
+    """
+    Select the particles seen from point P = [pt0, pt1, pt2] whose solid
+    angle is at least eps_sang (and which do not contain P), before any ray
+    casting.
+    Particles are grouped (e.g.: by toroidal sector) in ngroups groups, the
+    members of group gg being part_ind[group_start[gg]:group_start[gg+1]].
+    Each group is bounded by a sphere (group_center, group_rad) and
+    group_rmax is its largest particle radius: a whole group is skipped if
+    its largest possible solid angle is below eps_sang.
+
+    Fills part_sub (coordinates), dist_sub (distances to P) and ind_sub
+    (indices in part_coords) of the selected particles, and returns their
+    number.
+    """
+    cdef int gg
+    cdef int kk
+    cdef int pp
+    cdef int nsub = 0
+    cdef double dd
+    cdef double sang
+    for gg in range(ngroups):
+        if eps_sang > 0.:
+            dd = c_sqrt((pt0 - group_center[0, gg])**2
+                        + (pt1 - group_center[1, gg])**2
+                        + (pt2 - group_center[2, gg])**2) - group_rad[gg]
+            if dd > group_rmax[gg]:
+                if use_approx:
+                    sang = sa_approx_formula(group_rmax[gg], dd, c_pi)
+                else:
+                    sang = sa_exact_formula(group_rmax[gg], dd, c_pi)
+                if sang < eps_sang:
+                    continue
+        for kk in range(group_start[gg], group_start[gg+1]):
+            pp = part_ind[kk]
+            dd = c_sqrt((pt0 - part_coords[0, pp])**2
+                        + (pt1 - part_coords[1, pp])**2
+                        + (pt2 - part_coords[2, pp])**2)
+            if dd <= part_rad[pp]:
+                continue
+            if eps_sang > 0.:
+                if use_approx:
+                    sang = sa_approx_formula(part_rad[pp], dd, c_pi)
+                else:
+                    sang = sa_exact_formula(part_rad[pp], dd, c_pi)
+                if sang < eps_sang:
+                    continue
+            part_sub[0, nsub] = part_coords[0, pp]
+            part_sub[1, nsub] = part_coords[1, pp]
+            part_sub[2, nsub] = part_coords[2, pp]
+            dist_sub[nsub] = dd
+            ind_sub[nsub] = pp
+            nsub += 1
+    return nsub
+
+
 cdef inline double sa_approx_formula(double radius,
                                      double distance,
                                      double volpi,
@@ -2462,11 +2573,21 @@ cdef inline void assemble_block_exact(double[:, ::1] part_coords,
                                       double[::1] reso_rdrdz,
                                       double[:, ::1] pts_mv,
                                       long[::1] ind_mv,
-                                      int num_threads) nogil:
+                                      int num_threads,
+                                      double eps_sang,
+                                      int ngroups,
+                                      long[::1] group_start,
+                                      long[::1] part_ind,
+                                      double[:, ::1] group_center,
+                                      double[::1] group_rad,
+                                      double[::1] group_rmax,
+                                      double[:, ::1] part_sub) nogil:
     cdef int rr
     cdef int zz
     cdef int jj
     cdef int pp
+    cdef int kk
+    cdef int nsub
     cdef int ind_pol
     cdef int loc_first_ind
     cdef int loc_size_phi
@@ -2479,10 +2600,12 @@ cdef inline void assemble_block_exact(double[:, ::1] part_coords,
     cdef double loc_phi
     cdef double loc_step_rphi
     cdef long* is_vis
+    cdef long* ind_sub = NULL
     cdef double* dist = NULL
 
     dist = <double*> malloc(sz_p * sizeof(double))
     is_vis = <long*> malloc(sz_p * sizeof(long))
+    ind_sub = <long*> malloc(sz_p * sizeof(long))
     for rr in range(sz_r):
         loc_r = disc_r[rr]
         vol_pi = step_rphi[rr] * loc_r * c_pi
@@ -2502,16 +2625,20 @@ cdef inline void assemble_block_exact(double[:, ::1] part_coords,
                     loc_phi = - c_pi + (0.5 + indiijj) * loc_step_rphi
                     loc_x = loc_r * c_cos(loc_phi)
                     loc_y = loc_r * c_sin(loc_phi)
-                    # computing distance ....
-                    _bgt.compute_dist_pt_vec(loc_x,
-                                             loc_y,
-                                             loc_z,
-                                             sz_p, part_coords,
-                                             &dist[0])
+                    # selecting particles (distance, threshold) ....
+                    nsub = sa_select_particles(loc_x, loc_y, loc_z,
+                                               part_coords, part_rad,
+                                               0, eps_sang, ngroups,
+                                               group_start, part_ind,
+                                               group_center, group_rad,
+                                               group_rmax, part_sub,
+                                               &dist[0], &ind_sub[0])
+                    if nsub == 0:
+                        continue
                     # checking if visible .....
                     _rt.is_visible_pt_vec_core(loc_x, loc_y, loc_z,
-                                               part_coords,
-                                               sz_p,
+                                               part_sub,
+                                               nsub,
                                                ves_poly, ves_norm,
                                                &is_vis[0], dist,
                                                ves_lims,
@@ -2533,14 +2660,16 @@ cdef inline void assemble_block_exact(double[:, ::1] part_coords,
                                                eps_vz, eps_b, eps_plane,
                                                1, # is toroidal
                                                forbid, 1)
-                    for pp in range(sz_p):
-                        if is_vis[pp] and dist[pp] > part_rad[pp]:
+                    for kk in range(nsub):
+                        if is_vis[kk]:
+                            pp = ind_sub[kk]
                             sa_map[ind_pol,
                                    pp] += sa_exact_formula(part_rad[pp],
-                                                           dist[pp],
+                                                           dist[kk],
                                                            vol_pi)
     free(dist)
     free(is_vis)
+    free(ind_sub)
     return
 
 
@@ -2562,7 +2691,8 @@ cdef inline void assemble_unblock_exact(double[:, ::1] part_coords,
                                         double[::1] reso_rdrdz,
                                         double[:, ::1] pts_mv,
                                         long[::1] ind_mv,
-                                        int num_threads) nogil:
+                                        int num_threads,
+                                        double eps_sang) nogil:
     cdef int rr
     cdef int zz
     cdef int jj
@@ -2608,11 +2738,16 @@ cdef inline void assemble_unblock_exact(double[:, ::1] part_coords,
                                                  sz_p, part_coords,
                                                  &dist[0])
                         for pp in range(sz_p):
-                            if dist[pp]  > part_rad[pp]:
-                                sa_map[ind_pol,
-                                       pp] += sa_exact_formula(part_rad[pp],
-                                                               dist[pp],
-                                                               vol_pi)
+                            if dist[pp] <= part_rad[pp]:
+                                continue
+                            if (eps_sang > 0.
+                                and sa_exact_formula(part_rad[pp], dist[pp],
+                                                     c_pi) < eps_sang):
+                                continue
+                            sa_map[ind_pol,
+                                   pp] += sa_exact_formula(part_rad[pp],
+                                                           dist[pp],
+                                                           vol_pi)
         free(dist)
     return
 
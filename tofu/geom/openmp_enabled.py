@@ -0,0 +1,6 @@
+# Autogenerated by Tofu's setup.py on 2026-10-18 10:21:43
+def is_openmp_enabled():
+    """
+    Determine whether this package was built with OpenMP support.
+    """
+    return True
@@ -97,5 +97,5 @@ except Exception as err:
 
 
 __all__ = ['MultiIDSLoader', 'load_Config', 'load_Plasma2D',
-           'load_Cam', 'load_Data']
+           'load_Cam', 'load_Data', 'load_batch']
 del warnings, traceback, itt, _KEYSTR
@@ -1,6 +1,11 @@
 
 # Built-in
 import os
+import time
+import hashlib
+import tempfile
+import weakref
+import operator
 import warnings
 import functools as ftools
 
@@ -8,6 +13,7 @@ import functools as ftools
 import numpy as np
 
 # tofu
+from tofu import __version__
 pfe = os.path.join(os.path.expanduser('~'), '.tofu', '_imas2tofu_def.py')
 if os.path.isfile(pfe):
     # Make sure we load the user-specific file
@@ -48,6 +54,20 @@ _STACK = True
 _WARN = True
 _RETURN_ALL = False
 
+# Local disk cache (user-specific def files may predate it)
+_CACHE = getattr(_defimas2tofu, '_IMAS_CACHE', False)
+_CACHE_PATH = getattr(
+    _defimas2tofu, '_IMAS_CACHE_PATH',
+    os.path.join(os.path.expanduser('~'), '.tofu', 'imas2tofu_cache'))
+_CACHE_MAXBYTES = getattr(_defimas2tofu, '_IMAS_CACHE_MAXBYTES', int(2e9))
+_CACHE_MAXAGE = getattr(_defimas2tofu, '_IMAS_CACHE_MAXAGE', 30.)
+_LCACHE_KEYS = ['user', 'database', 'version', 'shot', 'run']
+# ids_properties fields identifying the version of an ids in the database
+_LCACHE_TOKEN = ['creation_date', 'provider',
+                 'version_put.data_dictionary', 'version_put.access_layer']
+_LCH = ['channel', 'gauge', 'group', 'antenna',
+        'pipe', 'reciprocating', 'bpol_probe']
+
 
 # #############################################################################
 #                      Units functions
@@ -124,7 +144,16 @@ def _get_condfromstr(sid, sig=None):
     return lid0, id1
 
 
+@ftools.lru_cache(maxsize=None)
 def get_fsig(sig):
+    """ Return a function extracting sig from an ids
+
+    The function is compiled once per signal path (and shared):
+        - node sequences are resolved with operator.attrgetter()
+        - selections ([...=...]) are resolved once per array of structures,
+          and cached (weakly) for subsequent calls, the cached index is
+          only used if the length and the condition still match
+    """
     # break sig in list of elementary nodes
     sig = _prepare_sig(sig)
     ls0 = sig.split('.')
@@ -140,7 +169,8 @@ def get_fsig(sig):
         if lc[ii]:
             # there is []
             if nseq > 0:
-                dcond[jj] = {'type': 0, 'lstr': seq}
+                dcond[jj] = {'type': 0, 'lstr': seq,
+                             'get': operator.attrgetter('.'.join(seq))}
                 seq = []
                 jj += 1
 
@@ -161,11 +191,14 @@ def get_fsig(sig):
                 ind = [int(strin)]
             dcond[jj] = {'str': ss[:ss.index('[')], 'type': typ,
                          'ind': ind, 'cond': cond}
+            if typ == 2:
+                dcond[jj]['getcond'] = operator.attrgetter('.'.join(cond[0]))
             jj += 1
         else:
             seq.append(ls0[ii])
             if ii == ns-1:
-                dcond[jj] = {'type': 0, 'lstr': seq}
+                dcond[jj] = {'type': 0, 'lstr': seq,
+                             'get': operator.attrgetter('.'.join(seq))}
 
     c0 = [v['type'] == 1 and (v['ind'] is None or len(v['ind']) > 1)
           for v in dcond.values()]
@@ -174,6 +207,45 @@ def get_fsig(sig):
                + "\t- sig: {}".format(sig))
         raise Exception(msg)
 
+    # Selection indices, per array of structures: {aos: (len(aos), ind)}
+    # Weak keys => entries vanish with the ids they belong to
+    dsel = weakref.WeakKeyDictionary()
+
+    def ismatch(val, dc):
+        if isinstance(val, str):
+            return val.strip() == dc['cond'][1].strip()
+        return val == dc['cond'][1]
+
+    def get_sel(aos, dc):
+        nb = len(aos)
+        try:
+            sel = dsel.get(aos)
+        except TypeError:
+            # not weak-referenceable / hashable => no caching
+            sel = None
+        # the aos may have been re-filled in place => check the condition
+        if (
+            sel is not None and sel[0] == nb
+            and ismatch(dc['getcond'](aos[sel[1]]), dc)
+        ):
+            return sel[1]
+
+        ind = [
+            ll for ll in range(0, nb) if ismatch(dc['getcond'](aos[ll]), dc)
+        ]
+        if len(ind) != 1:
+            msg = ("No / several matching signals for:\n"
+                   + "\t- {}[]{} = {}\n".format(dc['str'],
+                                                dc['cond'][0],
+                                                dc['cond'][1])
+                   + "\t- nb.of matches: {}".format(len(ind)))
+            raise Exception(msg)
+        try:
+            dsel[aos] = (nb, ind[0])
+        except TypeError:
+            pass
+        return ind[0]
+
     # Create function for getting signal
     def fsig(obj, indt=None, indch=None, stack=None, dcond=dcond):
         if stack is None:
@@ -184,8 +256,7 @@ def get_fsig(sig):
 
             # Standard case (no [])
             if dcond[ii]['type'] == 0:
-                sig = [ftools.reduce(getattr, [sig[jj]]+dcond[ii]['lstr'])
-                       for jj in range(0, nsig)]
+                sig = list(map(dcond[ii]['get'], sig))
 
             # dependency
             elif dcond[ii]['type'] == 1:
@@ -220,32 +291,8 @@ def get_fsig(sig):
             # one index to be found
             else:
                 for jj in range(0, nsig):
-                    sig[jj] = getattr(sig[jj], dcond[ii]['str'])
-                    nb = len(sig[jj])
-                    typ = type(ftools.reduce(
-                        getattr, [sig[jj][0]] + dcond[ii]['cond'][0]))
-                    if typ == str:
-                        ind = [
-                            ll for ll in range(0, nb)
-                            if (ftools.reduce(
-                                getattr,
-                                [sig[jj][ll]] + dcond[ii]['cond'][0]).strip()
-                                == dcond[ii]['cond'][1].strip())]
-                    else:
-                        ind = [ll for ll in range(0, nb)
-                               if (ftools.reduce(
-                                   getattr,
-                                   [sig[jj][ll]]+dcond[ii]['cond'][0])
-                                   == dcond[ii]['cond'][1])]
-                    if len(ind) != 1:
-                        msg = ("No / several matching signals for:\n"
-                               + "\t- {}[]{} = {}\n".format(
-                                   dcond[ii]['str'],
-                                   dcond[ii]['cond'][0],
-                                   dcond[ii]['cond'][1])
-                               + "\t- nb.of matches: {}".format(len(ind)))
-                        raise Exception(msg)
-                    sig[jj] = sig[jj][ind[0]]
+                    aos = getattr(sig[jj], dcond[ii]['str'])
+                    sig[jj] = aos[get_sel(aos, dcond[ii])]
 
         # Conditions for stacking / sqeezing sig
         lc = [(stack and nsig > 1 and isinstance(sig[0], np.ndarray)
@@ -263,6 +310,218 @@ def get_fsig(sig):
     return fsig
 
 
+# #############################################################################
+#                      Local disk cache
+# #############################################################################
+
+
+def get_dcache(dids=None, didd=None, path=None, maxbytes=None, maxage=None,
+               ftoken=None):
+    """ Return the cache parameters dict, None if no ids can be cached
+
+    Only ids from an idd identified by (user, database, version, shot, run)
+    can be cached (not those from an idd provided as an object)
+
+    ftoken(ids, occ) returns the version token of an ids occurence in the
+    database (cf. get_cache_token()), tokens are memoized in the dict
+    """
+    if path is None:
+        path = _CACHE_PATH
+    if maxbytes is None:
+        maxbytes = _CACHE_MAXBYTES
+    if maxage is None:
+        maxage = _CACHE_MAXAGE
+    dkey = {}
+    for ids, v0 in dids.items():
+        params = didd[v0['idd']]['params']
+        if all([params.get(kk) is not None for kk in _LCACHE_KEYS]):
+            dkey[ids] = [params[kk] for kk in _LCACHE_KEYS]
+    if len(dkey) == 0:
+        return None
+    return {'path': path, 'maxbytes': int(maxbytes), 'maxage': maxage,
+            'dkey': dkey, 'ftoken': ftoken, 'dtoken': {}}
+
+
+def get_cache_token(ids, occ=None):
+    """ Return a str identifying the version of an ids in the database
+
+    Built from the ids_properties fields in _LCACHE_TOKEN, read:
+        - from the ids itself if occ is None (i.e.: the ids was got)
+        - by partial get of occurence occ otherwise (the ids is not got)
+    Returns None if they are all empty
+    """
+    if occ is not None:
+        fpart = getattr(ids, 'partial_get', None)
+        if fpart is None:
+            fpart = getattr(ids, 'partialGet')
+    lval = []
+    for ff in _LCACHE_TOKEN:
+        val = None
+        if occ is not None:
+            val = fpart('ids_properties/' + ff.replace('.', '/'), int(occ))
+        if val is None:
+            # read from the ids (also if filled in place by partial get)
+            val = ids.ids_properties
+            for ss in ff.split('.'):
+                val = getattr(val, ss)
+        if isinstance(val, bytes):
+            val = val.decode()
+        lval.append(str(val).strip())
+    if all([vv == '' for vv in lval]):
+        return None
+    return repr(lval)
+
+
+def _get_cache_token(dcache, ids, occ):
+    """ Return the (memoized) token of (ids, occ), None if not available """
+    kk = (ids, int(occ))
+    if kk not in dcache['dtoken'].keys():
+        token = None
+        if dcache.get('ftoken') is not None:
+            try:
+                token = dcache['ftoken'](ids, occ)
+            except Exception:
+                # The backend cannot provide it => only maxage applies
+                token = None
+        dcache['dtoken'][kk] = token
+    return dcache['dtoken'][kk]
+
+
+def _get_cache_key(dcache, ids, sig, occ, indt=None, indch=None, stack=None):
+    """ Return the key (str) and file of a cache entry """
+    key = repr(dcache['dkey'][ids] + [ids, int(occ), sig, stack, __version__])
+    hh = hashlib.sha1(key.encode())
+    for ind in [indt, indch]:
+        hh.update(b'|')
+        if ind is not None:
+            ind = np.asarray(ind)
+            hh.update(ind.dtype.str.encode() + ind.tobytes())
+    return key, os.path.join(dcache['path'], hh.hexdigest() + '.npz')
+
+
+def _cache_load(pfe, key, token=None, maxage=None):
+    """ Return (True, value) from a valid cache entry, (False, None) if none
+
+    An entry is valid if its key matches, it was saved with the same token
+    (version of the ids in the database, not checked if token is None) and
+    it is not older than maxage (days), invalid entries are removed
+    """
+    if not os.path.isfile(pfe):
+        return False, None
+    try:
+        with np.load(pfe, allow_pickle=True) as out:
+            valid = (str(out['key']) == key
+                     and (token is None or str(out['token']) == token)
+                     and (maxage is None
+                          or time.time() - float(out['date']) < maxage*86400))
+            if valid:
+                val = out['data']
+                if not bool(out['isarr']):
+                    val = val.item()
+    except Exception:
+        valid = False
+    if not valid:
+        try:
+            os.remove(pfe)
+        except OSError:
+            pass
+        return False, None
+    # Mark as recently used (for eviction)
+    os.utime(pfe)
+    return True, val
+
+
+def _cache_save(pfe, key, val, token=None, dcache=None):
+    """ Save a cache entry (atomically), with the token of its ids
+
+    The entry is written to a unique temporary file (several threads or
+    processes may save the same entry) and then moved to pfe
+    Old entries are not evicted here (it lists the whole cache), but once per
+    MultiIDSLoader.get_data() call, see cache_evict()
+    """
+    if not os.path.isdir(dcache['path']):
+        os.makedirs(dcache['path'], exist_ok=True)
+    isarr = isinstance(val, np.ndarray)
+    if isarr is False:
+        data = np.empty((), dtype=object)
+        data[()] = val
+    else:
+        data = val
+    # Not a .npz (i.e.: ignored by cache_evict() until moved)
+    fd, pfetmp = tempfile.mkstemp(dir=dcache['path'], suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as ff:
+            np.savez(ff, key=np.array(key), date=np.array(time.time()),
+                     token=np.array('' if token is None else token),
+                     isarr=np.array(isarr), data=data)
+        os.replace(pfetmp, pfe)
+    except Exception:
+        if os.path.isfile(pfetmp):
+            os.remove(pfetmp)
+        raise
+
+
+def cache_evict(path=None, maxbytes=None):
+    """ Remove the least recently used cache entries above maxbytes """
+    if path is None:
+        path = _CACHE_PATH
+    if maxbytes is None:
+        maxbytes = _CACHE_MAXBYTES
+    if not os.path.isdir(path):
+        return
+    lf = []
+    for ff in os.listdir(path):
+        pf = os.path.join(path, ff)
+        if ff.endswith('.npz') and os.path.isfile(pf):
+            lf.append((os.path.getmtime(pf), os.path.getsize(pf), pf))
+    nbytes = np.sum([ff[1] for ff in lf])
+    for ff in sorted(lf):
+        if nbytes <= maxbytes:
+            break
+        os.remove(ff[2])
+        nbytes -= ff[1]
+
+
+def clear_cache(path=None):
+    """ Remove all entries of the local disk cache """
+    cache_evict(path=path, maxbytes=0)
+
+
+def get_nch(ids, occ=None, dids=None, dcache=None, fget=None, lch=None):
+    """ Return the name and length of the channels array of an ids
+
+    The channels array is the first attribute of the ids in lch
+    Returns (None, None) if there is none
+    Uses the cache (if any), otherwise gets the ids (via fget) if needed
+    """
+    if lch is None:
+        lch = _LCH
+    if occ is None:
+        occ = dids[ids]['occ'][0]
+    indoc = np.nonzero(dids[ids]['occ'] == occ)[0][0]
+
+    key, pfe = None, None
+    if dcache is not None and ids in dcache['dkey'].keys():
+        key, pfe = _get_cache_key(dcache, ids, '__nch__' + '.'.join(lch), occ)
+        token = _get_cache_token(dcache, ids, occ)
+        ok, val = _cache_load(pfe, key, token=token, maxage=dcache['maxage'])
+        if ok:
+            return val
+
+    if not dids[ids]['isget'][indoc] and fget is not None:
+        fget(ids)
+    ind = [ii for ii in range(len(lch))
+           if hasattr(dids[ids]['ids'][indoc], lch[ii])]
+    if len(ind) == 0:
+        val = (None, None)
+    else:
+        val = (lch[ind[0]], len(getattr(dids[ids]['ids'][indoc],
+                                        lch[ind[0]])))
+    if key is not None:
+        _cache_save(pfe, key, val, token=token, dcache=dcache)
+    return val
+
+
 # #############################################################################
 #                      Data functions
 # #############################################################################
@@ -276,9 +535,14 @@ def _checkformat_getdata_dsig(
     dids=None,
     dshort=None,
     dcomp=None,
-    dall_except=None
+    dall_except=None,
+    dcache=None,
+    fget=None,
 ):
-    """ Check the desired ids / signal is available """
+    """ Check the desired ids / signal is available
+
+    If fget is provided, ids not gotten yet are allowed (got on demand)
+    """
 
     if not isinstance(dids, dict):
         msg = ("dids must be a dict\n"
@@ -348,7 +612,7 @@ def _checkformat_getdata_dsig(
 
         # Check all occ have isget = True
         indok = dids[k0]['isget'][indoc]
-        if not np.all(indok):
+        if not np.all(indok) and fget is None:
             msg = ("All desired occurences shall have not been gotten!\n"
                    + "    - desired occ:   {}\n".format(occi)
                    + "    - available occ: {}\n".format(dids[k0]['occ'])
@@ -357,8 +621,9 @@ def _checkformat_getdata_dsig(
             raise Exception(msg)
 
         # Check indch
-        if hasattr(dids[k0]['ids'][indoc[0]], 'channel'):
-            nch = len(getattr(dids[k0]['ids'][indoc[0]], 'channel'))
+        chan, nch = get_nch(k0, occ=occi[0], dids=dids,
+                            dcache=dcache, fget=fget, lch=['channel'])
+        if chan is not None:
             indchi = _checkformat_getdata_indch(indchi, nch)
 
         # Check shortcuts
@@ -546,7 +811,7 @@ def _get_data_units(ids=None, sig=None, occ=None,
                     stack=None, isclose=None, flatocc=None,
                     nan=None, pos=None, empty=None,
                     dids=None, dcomp=None, dshort=None, dall_except=None,
-                    data=True, units=True):
+                    data=True, units=True, dcache=None, fget=None):
     """ Reference method for getting data and units, using shortcuts
 
     For a given ids, sig (shortcut) and occurence (occ)
@@ -567,6 +832,10 @@ def _get_data_units(ids=None, sig=None, occ=None,
     but computed from a combination of signals in the ids.
     The computation function must have been defined previously
 
+    If dcache is provided, the data is first looked for in the local cache
+    (and stored there once extracted from the ids, got via fget if needed),
+    entries saved from another version of the ids are not used
+
     """
 
     # --------------
@@ -599,7 +868,8 @@ def _get_data_units(ids=None, sig=None, occ=None,
                     data=True, units=False, indt=indt, stack=stack,
                     flatocc=False, nan=nan, pos=pos, warn=False,
                     dids=dids, dcomp=dcomp, dshort=dshort,
-                    dall_except=dall_except)[ids]
+                    dall_except=dall_except,
+                    dcache=dcache, fget=fget)[ids]
                 out = [dcomp[ids][sig]['func'](
                     *[ddata[kk]['data'][nn] for kk in lstr],
                     **kargs)
@@ -619,10 +889,29 @@ def _get_data_units(ids=None, sig=None, occ=None,
     else:
         if data is True:
             try:
-                out = [dshort[ids][sig]['fsig'](dids[ids]['ids'][ii],
-                                                indt=indt, indch=indch,
-                                                stack=stack)
-                       for ii in indoc]
+                if dcache is not None and ids not in dcache['dkey'].keys():
+                    dcache = None
+                out = []
+                for ii in indoc:
+                    if dcache is not None:
+                        key, pfe = _get_cache_key(
+                            dcache, ids, sig, occref[ii],
+                            indt=indt, indch=indch, stack=stack)
+                        token = _get_cache_token(dcache, ids, occref[ii])
+                        ok, val = _cache_load(pfe, key, token=token,
+                                              maxage=dcache['maxage'])
+                        if ok:
+                            out.append(val)
+                            continue
+                    if not dids[ids]['isget'][ii] and fget is not None:
+                        fget(ids)
+                    val = dshort[ids][sig]['fsig'](dids[ids]['ids'][ii],
+                                                   indt=indt, indch=indch,
+                                                   stack=stack)
+                    if dcache is not None:
+                        _cache_save(pfe, key, val, token=token,
+                                    dcache=dcache)
+                    out.append(val)
                 if pos is None:
                     pos = dshort[ids][sig].get('pos', False)
             except Exception as err:
@@ -656,7 +945,8 @@ def get_data_units(dsig=None, occ=None,
                    isclose=None, flatocc=True,
                    nan=True, pos=None, empty=None, strict=None,
                    return_all=None, warn=None,
-                   dids=None, dshort=None, dcomp=None, dall_except=None):
+                   dids=None, dshort=None, dcomp=None, dall_except=None,
+                   dcache=None, fget=None):
     """ Return a dict with the data and units (and empty, errors)
 
     Can be used:
@@ -668,6 +958,10 @@ def get_data_units(dsig=None, occ=None,
     Return a dict also containing a bool indicating whether the data is empty
     and error strings if any was raised
 
+    If dcache is provided (cf. get_dcache()), signals are read from / stored
+    in the local disk cache, and ids not yet gotten are got (via fget) only
+    if some signal is missing from the cache
+
     """
 
     # ------------------
@@ -693,7 +987,9 @@ def get_data_units(dsig=None, occ=None,
         dids=dids,
         dshort=dshort,
         dcomp=dcomp,
-        dall_except=dall_except)
+        dall_except=dall_except,
+        dcache=dcache,
+        fget=fget)
 
     # ------------------
     # get data
@@ -720,7 +1016,8 @@ def get_data_units(dsig=None, occ=None,
                     data=data, units=units,
                     nan=nan, pos=pos, empty=empty,
                     dids=dids, dcomp=dcomp, dshort=dshort,
-                    dall_except=dall_except)
+                    dall_except=dall_except,
+                    dcache=dcache, fget=fget)
 
                 lc = [dout[ids][sigi]['errdata'] is not None,
                       dout[ids][sigi]['errunits'] is not None]
@@ -24,6 +24,7 @@ import matplotlib as mpl
 import datetime as dtm
 
 # tofu
+import tofu.utils as utils
 pfe = os.path.join(os.path.expanduser('~'), '.tofu', '_imas2tofu_def.py')
 if os.path.isfile(pfe):
     # Make sure we load the user-specific file
@@ -59,7 +60,7 @@ except Exception as err:
 __all__ = ['check_units_IMASvsDSHORT',
            'MultiIDSLoader',
            'load_Config', 'load_Plasma2D',
-           'load_Cam', 'load_Data',
+           'load_Cam', 'load_Data', 'load_batch',
            '_save_to_imas']
 
 
@@ -177,7 +178,8 @@ class MultiIDSLoader(object):
     def __init__(self, preset=None, dids=None, ids=None, occ=None, idd=None,
                  shot=None, run=None, refshot=None, refrun=None,
                  user=None, database=None, version=None,
-                 ids_base=None, synthdiag=None, get=None, ref=True):
+                 ids_base=None, synthdiag=None, get=None, ref=True,
+                 cache=None):
         """ A class for handling multiple ids loading from IMAS
 
         IMAS provides access to a database via a standardized structure (idd
@@ -227,6 +229,12 @@ class MultiIDSLoader(object):
         This class provides an easy interface to access several ids from
         several idd (or a unique idd of course).
 
+        cache: Signals extracted from ids can be stored in a local disk cache
+            (~/.tofu/imas2tofu_cache/ by default, cf. self.set_cache()).
+            If cache = True, ids are then only got from the database when a
+            requested signal is not in the cache yet.
+            The default (False) can be changed in your ~/.tofu/ def file.
+
 
         Example
         -------
@@ -256,6 +264,7 @@ class MultiIDSLoader(object):
 
         # Initialize dicts
         self._init_dict()
+        self.set_cache(cache=cache)
 
         # Check and format inputs
         if dids is None:
@@ -293,7 +302,7 @@ class MultiIDSLoader(object):
             if get is None:
                 get = True
         self._set_fsig()
-        if get is True:
+        if get is True and self._dcache['cache'] is False:
             self.open_get_close()
 
     def _init_dict(self):
@@ -824,6 +833,92 @@ class MultiIDSLoader(object):
             self._didd[k]['idd'].close()
             self._didd[k]['isopen'] = False
 
+    def _get_ondemand(self, ids):
+        """ Get all occurences of an ids, if not done yet (silently) """
+        if np.all(self._dids[ids]['isget']):
+            return
+        llids = self._checkformat_get_ids(ids)
+        lidd = [lids[0] for lids in llids]
+        self._open(idd=lidd)
+        lerr = self._get(llids=llids, verb=False)
+        self._close(idd=lidd)
+        if len(lerr) > 0:
+            raise lerr[0]
+
+    def set_cache(self, cache=None, path=None, maxbytes=None, maxage=None):
+        """ Set the use of the local disk cache of extracted signals
+
+        Cache entries are keyed by (user, database, version, shot, run, ids,
+        occ, signal, indt, indch) and stored as .npz files in path
+        When cache = True, ids are got from the database on demand only (i.e.:
+        when a requested signal is not in the cache)
+
+        Each entry also stores a version token of its ids in the database
+        (ids_properties: creation_date, provider, version_put), read by
+        partial get and compared at each use, so that an ids re-written under
+        the same (shot, run) is re-extracted
+        If the backend cannot provide it (no partial get, or all these fields
+        empty), a stale entry may be used until it is older than maxage
+
+        Parameters
+        ----------
+        cache:      None / bool
+            Flag indicating whether to use the cache (default: False)
+        path:       None / str
+            Directory of the cache (default: ~/.tofu/imas2tofu_cache/)
+        maxbytes:   None / int
+            Max size of the cache (least recently used entries removed)
+        maxage:     None / float
+            Max age of valid entries (days), older ones are re-extracted
+            (default: 30, bounds the staleness of entries without token)
+        """
+        if cache is None:
+            cache = _comp._CACHE
+        if not isinstance(cache, bool):
+            msg = ("Arg cache must be a bool!\n"
+                   + "\t- provided: {}".format(cache))
+            raise Exception(msg)
+        self._dcache = {'cache': cache, 'path': path,
+                        'maxbytes': maxbytes, 'maxage': maxage}
+
+    @staticmethod
+    def clear_cache(path=None):
+        """ Remove all entries of the local disk cache """
+        _comp.clear_cache(path=path)
+
+    def _get_dcache(self):
+        """ Return the cache parameters and on-demand get function """
+        if self._dcache['cache'] is False:
+            return None, None
+        dcache = _comp.get_dcache(
+            dids=self._dids, didd=self._didd, path=self._dcache['path'],
+            maxbytes=self._dcache['maxbytes'], maxage=self._dcache['maxage'],
+            ftoken=self._get_cache_token,
+        )
+        return dcache, self._get_ondemand
+
+    def _get_cache_token(self, ids, occ):
+        """ Return the version token of an ids occurence in the database
+
+        Read from the ids if it was got, by partial get otherwise
+        """
+        indoc = np.nonzero(self._dids[ids]['occ'] == occ)[0][0]
+        if self._dids[ids]['isget'][indoc]:
+            return _comp.get_cache_token(self._dids[ids]['ids'][indoc])
+        lidd = [self._dids[ids]['idd']]
+        self._open(idd=lidd)
+        try:
+            idd = self._didd[lidd[0]]['idd']
+            return _comp.get_cache_token(getattr(idd, ids), occ=occ)
+        finally:
+            self._close(idd=lidd)
+
+    def _get_nch(self, ids, occ=None, lch=None):
+        """ Return the name and length of the channels array of an ids """
+        dcache, fget = self._get_dcache()
+        return _comp.get_nch(ids, occ=occ, dids=self._dids,
+                             dcache=dcache, fget=fget, lch=lch)
+
     def get_list_notget_ids(self):
         lids = [k for k,v in self._dids.items() if np.any(v['isget'] == False)]
         return lids
@@ -1175,7 +1270,7 @@ class MultiIDSLoader(object):
             dids = self._checkformat_ids(ids, occ=occ, idd=idd, isget=isget)
 
             self._dids.update(dids)
-            if get:
+            if get and self._dcache['cache'] is False:
                 self.open_get_close()
 
     def add_ids_base(self, occ=None, idd=None,
@@ -1253,6 +1348,7 @@ class MultiIDSLoader(object):
         else:
             assert occ in self._dids[ids]['occ']
         indoc = np.where(self._dids[ids]['occ'] == occ)[0][0]
+        self._get_ondemand(ids)
         return self._dids[ids]['ids'][indoc]
 
 
@@ -1435,8 +1531,14 @@ class MultiIDSLoader(object):
         dsig:  dict, only returned in return_all = True
             Dictionnary of requested signals, occ, indt, indch
 
+        If the local disk cache is used (cf. self.set_cache()), signals are
+        read from it first, and the ids are got only if needed
+        The least recently used entries beyond the cache size are removed at
+        the end of the call
+
         """
-        return _comp.get_data_units(
+        dcache, fget = self._get_dcache()
+        out = _comp.get_data_units(
             dsig=dsig,
             occ=occ,
             data=data,
@@ -1455,7 +1557,16 @@ class MultiIDSLoader(object):
             dshort=self._dshort,
             dcomp=self._dcomp,
             dall_except=self._dall_except,
-            return_all=return_all)
+            return_all=return_all,
+            dcache=dcache,
+            fget=fget)
+
+        # Evict old cache entries once per call (not per saved signal)
+        if dcache is not None:
+            _comp.cache_evict(
+                path=dcache['path'], maxbytes=dcache['maxbytes'],
+            )
+        return out
 
     def get_events(self, occ=None, verb=True, returnas=False):
         """ Return chronoligical events stored in pulse_schedule
@@ -1615,6 +1726,7 @@ class MultiIDSLoader(object):
         assert occ.size == 1, "Please choose one occ only !"
         occ = occ[0]
         indoc = np.nonzero(self._dids[ids]['occ'] == occ)[0][0]
+        self._get_ondemand(ids)
 
         if description_2d is None:
             if len(self._dids[ids]['ids'][indoc].description_2d) >= 2:
@@ -2132,17 +2244,13 @@ class MultiIDSLoader(object):
             ids = next(iter(idsok))
 
         # Check ids has channels (channel, gauge, ...)
-        lch = ['channel', 'gauge', 'group', 'antenna',
-               'pipe', 'reciprocating', 'bpol_probe']
-        ind = [ii for ii in range(len(lch))
-               if hasattr(self._dids[ids]['ids'][occ], lch[ii])]
-        if len(ind) == 0:
+        chan, nch = self._get_nch(ids, occ=self._dids[ids]['occ'][occ])
+        if chan is None:
             msg = "ids {} has no attribute with '[chan]' index!".format(ids)
             raise Exception(msg)
-        nch = len(getattr(self._dids[ids]['ids'][0], lch[ind[0]]))
         if nch == 0:
             msg = ('ids {} has 0 channels:\n'.format(ids)
-                   + '\t- len({}.{}) = 0\n'.format(ids, lch[ind[0]])
+                   + '\t- len({}.{}) = 0\n'.format(ids, chan)
                    + '\t- idd: {}'.format(self._dids[ids]['idd']))
             raise Exception(msg)
 
@@ -2310,7 +2418,7 @@ class MultiIDSLoader(object):
 
         # cam
         cam = None
-        nchMax = len(self._dids[ids]['ids'][0].channel)
+        nchMax = self._get_nch(ids)[1]
         Etendues, Surfaces = None, None
         if config is None:
             msg = "A config must be provided to compute the geometry !"
@@ -2542,7 +2650,7 @@ class MultiIDSLoader(object):
         cam = None
         indchanstr = self._dshort[ids][dsig['data']]['str'].index('[chan]')
         chanstr = self._dshort[ids][dsig['data']]['str'][:indchanstr]
-        nchMax = len(getattr(self._dids[ids]['ids'][0], chanstr))
+        nchMax = self._get_nch(ids, lch=[chanstr])[1]
 
         # Check channel indices
         indchr = self.inspect_channels(ids, indch=indch,
@@ -3101,6 +3209,90 @@ def load_Data(shot=None, run=None, user=None, database=None, version=None,
                         plot=plot, bck=bck, indch_auto=indch_auto)
 
 
+_DLOAD = {'Config': load_Config, 'Plasma2D': load_Plasma2D,
+          'Cam': load_Cam, 'Data': load_Data}
+
+
+def load_batch(lshot=None, func=None, nworkers=None, pool=None,
+               verb=None, **kwdargs):
+    """ Load the same tofu objects for several shots, concurrently
+
+    Each (shot, run) is loaded independently by func, in a bounded pool of
+    workers (I/O-bound database scans are then no longer sequential)
+    A failing (shot, run) does not stop the others, its error is reported
+
+    Parameters
+    ----------
+    lshot:      int / list
+        shot(s) to be loaded, as int or (shot, run) tuples
+        run = None => default run
+    func:       str / callable
+        The loading function, called with shot, run and kwdargs:
+            - 'Config', 'Plasma2D', 'Cam', 'Data': load_<func>()
+            - callable: a custom function f(shot=, run=, **kwdargs)
+              (must be picklable, i.e.: module-level, if pool='process')
+    nworkers:   None / int
+        Max number of concurrent workers (default: min(8, nb. of shots))
+    pool:       None / str
+        Type of pool of workers:
+            - 'process' (default): safe for the IMAS backend
+            - 'thread': less overhead, for thread-safe backends
+    verb:       bool
+        Flag indicating whether to print a summary
+    kwdargs:
+        Passed to func for each shot (e.g.: ids, user, database, tlim...)
+        plot is False by default
+
+    Return
+    ------
+    dout:       dict
+        The loaded objects {(shot, run): obj}, in the order of lshot
+    derr:       dict
+        The errors (traceback str) {(shot, run): err} of failed shots
+    """
+
+    # -------------
+    # Check inputs
+
+    if not (func in _DLOAD.keys() or callable(func)):
+        msg = ("Arg func must be a callable or in {}\n".format(list(_DLOAD))
+               + "\t- provided: {}".format(func))
+        raise Exception(msg)
+    if verb is None:
+        verb = True
+    if func in _DLOAD.keys():
+        if kwdargs.get('plot') is None:
+            kwdargs['plot'] = False
+        func = _DLOAD[func]
+
+    # -------------
+    # Load concurrently
+
+    lshot, dout, derr = utils._load_batch(
+        lshot=lshot, func=func, run=_defimas2tofu._IMAS_DIDD['run'],
+        nworkers=nworkers, pool=pool, kwdargs=kwdargs,
+    )
+
+    # -------------
+    # Summary
+
+    if verb:
+        lmsg = [[str(ss), str(rr),
+                 'ok' if (ss, rr) in dout.keys()
+                 else derr[(ss, rr)].strip().split('\n')[-1]]
+                for ss, rr in lshot]
+        msg = MultiIDSLoader._getcharray(lmsg, col=['shot', 'run', 'status'])
+        print(msg)
+    if len(derr) > 0:
+        msg = ("{} / {} shot(s) could not be loaded:\n".format(len(derr),
+                                                               len(lshot))
+               + "\n".join(["\t- {}: {}".format(
+                   kk, vv.strip().split('\n')[-1])
+                   for kk, vv in derr.items()]))
+        warnings.warn(msg)
+    return dout, derr
+
+
 #############################################################
 #############################################################
 #           save_to_imas object-specific functions
@@ -26,6 +26,8 @@ To see the shortcuts available from your running ipython console do:
 Available since tofu 1.4.3
 """
 
+import os
+
 import numpy as np
 
 
@@ -52,6 +54,14 @@ _IMAS_DIDD = {
 
 _T0 = False
 
+# local disk cache of signals extracted from ids (opt-in, see get_data())
+# entries are keyed by (user, database, version, shot, run, ids, occ, sig)
+_IMAS_CACHE = False
+_IMAS_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.tofu',
+                                'imas2tofu_cache')
+_IMAS_CACHE_MAXBYTES = int(2e9)     # least recently used entries removed
+_IMAS_CACHE_MAXAGE = 30.            # days, older entries are not valid
+
 # ############################################################################
 #
 #           shortcuts for imas2tofu interface (MultiIDSLoader class)
@@ -2,6 +2,7 @@
 # Built-in
 import os
 import re
+import json
 import itertools as itt
 import warnings
 
@@ -17,6 +18,10 @@ _DTYPES = {'adf11': ['acd', 'ccd', 'scd', 'plt', 'prb'],
            'adf15': None}
 _DEG = 1
 _PECASFUNC = True
+_STORE = True
+_STORE_DIR = '_store'
+_STORE_INDEX = 'index.json'
+_STORE_VERSION = 1
 
 
 # #############################################################################
@@ -106,6 +111,123 @@ def _get_available_elements_from_path(path=None, typ1=None):
     return element
 
 
+# #############################################################################
+# #############################################################################
+#                       Binary store
+# #############################################################################
+
+
+def _get_store_index(path_local):
+    """ Return the index of the binary store (a dict), {} if none
+
+    The binary store holds, in ~/.tofu/openadas2tofu/_store/, the data of each
+    downloaded file already read once, as a flat .npy file (memory-mapped)
+    The index (json) stores, for each file, its metadata and those of each
+    line / ion (element, charge, wavelength...) with the position of its
+    arrays in the .npy file
+    """
+    pfe = os.path.join(path_local, _STORE_DIR, _STORE_INDEX)
+    if not os.path.isfile(pfe):
+        return {}
+    try:
+        with open(pfe, 'r') as fid:
+            dindex = json.load(fid)
+    except Exception:
+        return {}
+    if dindex.get('version') != _STORE_VERSION:
+        return {}
+    return dindex['files']
+
+
+def _save_store_index(path_local, dindex):
+    pfe = os.path.join(path_local, _STORE_DIR, _STORE_INDEX)
+    pfetmp = '{}_tmp{}'.format(pfe, os.getpid())
+    with open(pfetmp, 'w') as fid:
+        json.dump({'version': _STORE_VERSION, 'files': dindex}, fid)
+    os.replace(pfetmp, pfe)
+
+
+def _store_isok(pfe, dfile=None):
+    """ Return True if the stored version of file pfe is up-to-date """
+    if dfile is None:
+        return False
+    stat = os.stat(pfe)
+    return dfile['mtime'] == stat.st_mtime and dfile['size'] == stat.st_size
+
+
+def _store_write(pfe, draw, path_local):
+    """ Store the raw data of a file, return its index entry (dict)
+
+    draw is a dict of {key: {'meta': {...}, 'arrays': {...}}}
+    All arrays are concatenated (as float) in a single .npy file
+    """
+    path = os.path.join(path_local, _STORE_DIR)
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    rel = os.path.relpath(pfe, path_local)
+    npy = rel[:-4].replace(os.sep, '_') + '.npy'
+
+    dkeys, larr, ind = {}, [], 0
+    for key, vv in draw.items():
+        dkeys[key] = {'meta': vv['meta'], 'arrays': {}}
+        for k1, v1 in vv['arrays'].items():
+            dkeys[key]['arrays'][k1] = [ind, list(v1.shape)]
+            larr.append(v1.ravel())
+            ind += v1.size
+    data = np.concatenate(larr) if len(larr) > 0 else np.zeros((0,))
+
+    # Written to a tmp file then renamed (as the index): arrays previously
+    # returned by _store_read() may still map the former .npy file
+    pfenpy = os.path.join(path, npy)
+    pfetmp = '{}_tmp{}'.format(pfenpy, os.getpid())
+    with open(pfetmp, 'wb') as fid:
+        np.save(fid, data.astype(float))
+    os.replace(pfetmp, pfenpy)
+
+    stat = os.stat(pfe)
+    return {
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'npy': npy,
+        'lambda0': [
+            vv['meta']['lambda0'] for vv in dkeys.values()
+            if 'lambda0' in vv['meta'].keys()
+        ],
+        'keys': dkeys,
+    }
+
+
+def _store_read(dfile, path_local, lambmin=None, lambmax=None):
+    """ Return the raw data (draw) of a stored file, from its index entry
+
+    Only lines within [lambmin, lambmax] are returned (if relevant)
+    Arrays are (copy-on-write) views of the memory-mapped .npy file
+    """
+    lk = [
+        k0 for k0, v0 in dfile['keys'].items()
+        if 'lambda0' not in v0['meta'].keys()
+        or not (
+            (lambmin is not None and v0['meta']['lambda0'] < lambmin)
+            or (lambmax is not None and v0['meta']['lambda0'] > lambmax)
+        )
+    ]
+    if len(lk) == 0:
+        return {}
+    data = np.load(
+        os.path.join(path_local, _STORE_DIR, dfile['npy']),
+        mmap_mode='c',
+    )
+    draw = {}
+    for k0 in lk:
+        v0 = dfile['keys'][k0]
+        draw[k0] = {'meta': v0['meta'], 'arrays': {}}
+        for k1, (ind, shape) in v0['arrays'].items():
+            draw[k0]['arrays'][k1] = np.asarray(
+                data[ind:ind+int(np.prod(shape))]
+            ).reshape(shape)
+    return draw
+
+
 def _format_for_DataCollection_adf15(
     dout,
     dsource0=None,
@@ -438,6 +560,7 @@ def step03_read_all(
     dref0=None,
     ddata0=None,
     dlines0=None,
+    store=None,
     verb=None, **kwdargs,
 ):
     """ Read all relevant openadas files for chosen typ1
@@ -458,6 +581,11 @@ def step03_read_all(
 
     If typ1 = 'adf15', you can optioanlly provide a min/max wavelength
 
+    If store = True (default), each file is only parsed once, and its data is
+    then stored in a binary format in ~/.tofu/openadas2tofu/_store/, with an
+    index (element, charge, wavelength) used to only read the relevant data
+    The stored data is updated if the file was modified (e.g.: re-downloaded)
+
     The result is returned as a dict
 
     examples
@@ -573,6 +701,8 @@ def step03_read_all(
 
     if verb is None:
         verb = True
+    if store is None:
+        store = _STORE
 
     # --------------------
     # Get list of relevant directories per element
@@ -630,11 +760,46 @@ def step03_read_all(
     # Extract data from each file
     func = eval('_read_{}'.format(typ1))
     dout = {}
+    if store is True:
+        dindex = _get_store_index(path_local)
+        lambmin = kwdargs.get('lambmin')
+        lambmax = kwdargs.get('lambmax')
+        update = False
     for pfe in lpfe:
+        draw = None
+        if store is True:
+            rel = os.path.relpath(pfe, path_local)
+            if not _store_isok(pfe, dindex.get(rel)):
+                if verb is True:
+                    msg = "\tStoring data from {}".format(pfe)
+                    print(msg)
+                dindex[rel] = _store_write(
+                    pfe, eval('_read_{}_raw'.format(typ1))(pfe), path_local,
+                )
+                update = True
+
+            # Skip files without any relevant line
+            lamb = np.array(dindex[rel].get('lambda0', []))
+            c0 = (
+                lamb.size > 0
+                and not np.any(
+                    (lambmin is None or lamb >= lambmin)
+                    & (lambmax is None or lamb <= lambmax)
+                )
+            )
+            if c0:
+                continue
+            draw = _store_read(
+                dindex[rel], path_local, lambmin=lambmin, lambmax=lambmax,
+            )
+
         if verb is True:
             msg = "\tLoading data from {}".format(pfe)
             print(msg)
-        dout = func(pfe, dout=dout, **kwdargs)
+        dout = func(pfe, dout=dout, draw=draw, **kwdargs)
+
+    if store is True and update is True:
+        _save_store_index(path_local, dindex)
 
     if typ1 == 'adf15' and format_for_DataCollection is True:
         return _format_for_DataCollection_adf15(
@@ -653,12 +818,19 @@ def step03_read_all(
 # #############################################################################
 
 
-def _read_adf11(pfe, deg=None, dout=None):
-    if deg is None:
-        deg = _DEG
-    if dout is None:
-        dout = {}
+# typ1: (key, conversion of log10(coefs) to SI, units)
+# coefslog10-6 to convert cm3/s -> m3/s
+# coefslog10+6 to convert W.cm3 -> W.m3
+_DADF11 = {
+    'scd': ('ionis', -6, 'log10(m3/s)'),
+    'acd': ('recomb', -6, 'log10(m3/s)'),
+    'ccd': ('recomb_ce', -6, 'log10(m3/s)'),
+    'plt': ('rad_bb', 6, 'log10(W.m3)'),
+    'prb': ('rad_fffb', 6, 'log10(W.m3)'),
+}
+
 
+def _get_adf11_typ1(pfe):
     # Get second order file type
     typ1 = [vv for vv in _DTYPES['adf11'] if vv in pfe]
     if len(typ1) != 1:
@@ -666,16 +838,28 @@ def _read_adf11(pfe, deg=None, dout=None):
                + "\t- available: {}\n".format(_DTYPES['adf11'])
                + "\t- provided: {}".format(pfe))
         raise Exception(msg)
-    typ1 = typ1[0]
+    return typ1[0]
+
+
+def _read_adf11_raw(pfe):
+    """ Parse an adf11 file, return a dict of raw tabulated data
+
+    Return a dict of {key: {'meta': {...}, 'arrays': {...}}}, one per ion
+    (cf. _store_write())
+    """
+
+    typ1 = _get_adf11_typ1(pfe)
 
     # Get element
     elem = pfe[:-4].split('_')[1]
     comline = '-'*60
     comline2 = 'C'+comline
 
-    if typ1 in ['acd', 'ccd', 'scd', 'plt', 'prb']:
+    draw = {}
+    if typ1 in _DADF11.keys():
 
         # read blocks
+        in_ne, in_te, in_ion, charge = False, False, False, None
         with open(pfe) as search:
             for ii, line in enumerate(search):
 
@@ -699,8 +883,8 @@ def _read_adf11(pfe, deg=None, dout=None):
                                + "\t- lstr = {}".format(lstr))
                         raise Exception(msg)
                     Z, nne, nte, q0, qend = map(int, lin)
-                    nelog10 = np.array([])
-                    telog10 = np.array([])
+                    nelog10 = []
+                    telog10 = []
                     in_ne = True
                     continue
 
@@ -709,19 +893,17 @@ def _read_adf11(pfe, deg=None, dout=None):
 
                 # Get nelog10
                 if in_ne:
-                    li = [ss for ss in line.strip().split(' ')
-                          if ss.strip() != '']
-                    nelog10 = np.append(nelog10, np.array(li, dtype=float))
-                    if nelog10.size == nne:
+                    nelog10 += line.split()
+                    if len(nelog10) == nne:
+                        nelog10 = np.array(nelog10, dtype=float)
                         in_ne = False
                         in_te = True
 
                 # Get telog10
                 elif in_te is True:
-                    li = [ss for ss in line.strip().split(' ')
-                          if ss.strip() != '']
-                    telog10 = np.append(telog10, np.array(li, dtype=float))
-                    if telog10.size == nte:
+                    telog10 += line.split()
+                    if len(telog10) == nte:
+                        telog10 = np.array(telog10, dtype=float)
                         in_te = False
                         in_ion = True
 
@@ -734,75 +916,60 @@ def _read_adf11(pfe, deg=None, dout=None):
                         charge = nion - 1
                     else:
                         charge = nion
-                    coefslog10 = np.array([])
+                    coefslog10 = []
                 elif in_ion is True and charge is not None:
-                    li = [ss for ss in line.strip().split(' ')
-                          if ss.strip() != '']
-                    coefslog10 = np.append(coefslog10,
-                                           np.array(li, dtype=float))
-                    if coefslog10.size == nne*nte:
+                    coefslog10 += line.split()
+                    if len(coefslog10) == nne*nte:
                         key = '{}{}'.format(elem, charge)
-                        tkv = [('element', elem), ('Z', Z), ('charge', charge)]
-                        if key in dout.keys():
-                            assert all([dout[key][ss] == vv for ss, vv in tkv])
-                        else:
-                            dout[key] = {ss: vv for ss, vv in tkv}
-                        if typ1 == 'scd':
-                            # nelog10+6 to convert /cm3 -> /m3
-                            # coefslog10-6 to convert cm3/s -> m3/s
-                            func = scpRectSpl(nelog10+6, telog10,
-                                              coefslog10.reshape((nne, nte))-6,
-                                              kx=deg, ky=deg)
-                            dout[key]['ionis'] = {'func': func,
-                                                  'type': 'log10_nete',
-                                                  'units': 'log10(m3/s)',
-                                                  'source': pfe}
-                        elif typ1 == 'acd':
-                            # nelog10+6 to convert /cm3 -> /m3
-                            # coefslog10-6 to convert cm3/s -> m3/s
-                            func = scpRectSpl(nelog10+6, telog10,
-                                              coefslog10.reshape((nne, nte))-6,
-                                              kx=deg, ky=deg)
-                            dout[key]['recomb'] = {'func': func,
-                                                   'type': 'log10_nete',
-                                                   'units': 'log10(m3/s)',
-                                                   'source': pfe}
-                        elif typ1 == 'ccd':
-                            # nelog10+6 to convert /cm3 -> /m3
-                            # coefslog10-6 to convert cm3/s -> m3/s
-                            func = scpRectSpl(nelog10+6, telog10,
-                                              coefslog10.reshape((nne, nte))-6,
-                                              kx=deg, ky=deg)
-                            dout[key]['recomb_ce'] = {'func': func,
-                                                      'type': 'log10_nete',
-                                                      'units': 'log10(m3/s)',
-                                                      'source': pfe}
-                        elif typ1 == 'plt':
-                            # nelog10+6 to convert /cm3 -> /m3
-                            # coefslog10+6 to convert W.cm3 -> W.m3
-                            func = scpRectSpl(nelog10+6, telog10,
-                                              coefslog10.reshape((nne, nte))+6,
-                                              kx=deg, ky=deg)
-                            dout[key]['rad_bb'] = {'func': func,
-                                                   'type': 'log10_nete',
-                                                   'units': 'log10(W.m3)',
-                                                   'source': pfe}
-                        elif typ1 == 'prb':
-                            # nelog10+6 to convert /cm3 -> /m3
-                            # coefslog10+6 to convert W.cm3 -> W.m3
-                            func = scpRectSpl(nelog10+6, telog10,
-                                              coefslog10.reshape((nne, nte))+6,
-                                              kx=deg, ky=deg)
-                            dout[key]['rad_fffb'] = {'func': func,
-                                                     'type': 'log10_nete',
-                                                     'units': 'log10(W.m3)',
-                                                     'source': pfe}
+                        draw[key] = {
+                            'meta': {
+                                'element': elem, 'Z': Z, 'charge': charge,
+                            },
+                            'arrays': {
+                                'nelog10': nelog10,
+                                'telog10': telog10,
+                                'coefslog10': np.array(
+                                    coefslog10, dtype=float,
+                                ).reshape((nne, nte)),
+                            },
+                        }
                         if nion == Z:
                             break
+    return draw
+
+
+def _adf11_from_raw(draw, pfe, deg=None, dout=None):
+    """ Fill dout with interpolation functions from raw adf11 data """
+    if deg is None:
+        deg = _DEG
+    if dout is None:
+        dout = {}
 
+    k1, coef, units = _DADF11[_get_adf11_typ1(pfe)]
+    for key, vv in draw.items():
+        tkv = list(vv['meta'].items())
+        if key in dout.keys():
+            assert all([dout[key][ss] == v1 for ss, v1 in tkv])
+        else:
+            dout[key] = {ss: v1 for ss, v1 in tkv}
+        # nelog10+6 to convert /cm3 -> /m3
+        func = scpRectSpl(vv['arrays']['nelog10']+6,
+                          vv['arrays']['telog10'],
+                          vv['arrays']['coefslog10']+coef,
+                          kx=deg, ky=deg)
+        dout[key][k1] = {'func': func,
+                         'type': 'log10_nete',
+                         'units': units,
+                         'source': pfe}
     return dout
 
 
+def _read_adf11(pfe, deg=None, dout=None, draw=None):
+    if draw is None:
+        draw = _read_adf11_raw(pfe)
+    return _adf11_from_raw(draw, pfe, deg=deg, dout=dout)
+
+
 # #############################################################################
 #                      Specialized functions for ADF 15
 # #############################################################################
@@ -812,24 +979,12 @@ def _get_adf15_key(elem, charge, isoel, typ0, typ1):
     return '{}{}_{}_oa_{}_{}'.format(elem, charge, isoel, typ0, typ1)
 
 
-def _read_adf15(
-    pfe,
-    dout=None,
-    lambmin=None,
-    lambmax=None,
-    pec_as_func=None,
-    deg=None,
-):
-    """
-    Here lambmin and lambmax are provided in m
-    """
+def _read_adf15_raw(pfe):
+    """ Parse an adf15 file, return a dict of raw tabulated data
 
-    if deg is None:
-        deg = _DEG
-    if pec_as_func is None:
-        pec_as_func = _PECASFUNC
-    if dout is None:
-        dout = {}
+    Return a dict of {key: {'meta': {...}, 'arrays': {...}}}, one per line
+    (cf. _store_write()), with ne and pec converted to /m3 and m3/s
+    """
 
     # Get summary of transitions
     flagblock = '/isel ='
@@ -846,9 +1001,9 @@ def _read_adf15(
     typ1 = typ1.split('_')[1]
 
     # Extract data from file
+    draw = {}
     nlines, nblock = None, 0
     in_ne, in_te, in_pec, in_tab, itab = False, False, False, False, np.inf
-    skip = False
     with open(pfe) as search:
         for ii, line in enumerate(search):
 
@@ -864,93 +1019,55 @@ def _read_adf15(
                 lamb = float(lstr[0])*1.e-10
                 isoel = nblock + 1
                 nblock += 1
-                c0 = ((lambmin is not None and lamb < lambmin)
-                      or (lambmax is not None and lamb > lambmax))
-                if c0:
-                    skip = True
-                    continue
-                skip = False
                 nne, nte = int(lstr[1]), int(lstr[2])
                 typ = [ss[ss.index('type=')+len('type='):ss.index('/ispb')]
                        for ss in lstr[3:] if 'type=' in ss]
                 assert len(typ) == 1
                 # To be updated : proper reading from line
                 in_ne = True
-                ne = np.array([])
-                te = np.array([])
-                pec = np.full((nne*nte,), np.nan)
-                ind = 0
-                # il = 0
-                continue
-
-            if 'root partition information' in line and skip is True:
-                skip = False
-
-            # Check lamb is ok
-            if skip is True:
+                ne = []
+                te = []
+                pec = []
                 continue
 
             # Get ne for the transition being scanned (block)
             if in_ne is True:
-                ne = np.append(ne,
-                               np.array(line.rstrip().strip().split(' '),
-                                        dtype=float))
-                if ne.size == nne:
+                ne += line.split()
+                if len(ne) == nne:
                     in_ne = False
                     in_te = True
 
             # Get te for the transition being scanned (block)
             elif in_te is True:
-                te = np.append(te,
-                               np.array(line.rstrip().strip().split(' '),
-                                        dtype=float))
-                if te.size == nte:
+                te += line.split()
+                if len(te) == nte:
                     in_te = False
                     in_pec = True
 
             # Get pec for the transition being scanned (block)
             elif in_pec is True:
-                data = np.array(line.rstrip().strip().split(' '),
-                                dtype=float)
-                pec[ind:ind+data.size] = data
-                # pec[il, :] = data
-                ind += data.size
-                # il += 1
-                if ind == pec.size:
+                pec += line.split()
+                if len(pec) == nne*nte:
                     in_pec = False
                     key = _get_adf15_key(elem, charge, isoel, typ0, typ1)
-                    # PEC reshaping and conversion to cm3/s -> m3/s
-                    pec = pec.reshape((nne, nte)) * 1e-6
-                    # log(ne)+6 to convert /cm3 -> /m3
-                    ne = ne*1e6
-
-                    if pec_as_func is True:
-                        pec_rec = scpRectSpl(
-                            np.log(ne),
-                            np.log(te),
-                            np.log(pec),
-                            kx=deg,
-                            ky=deg,
-                        )
-
-                        def pec(Te=None, ne=None, pec_rec=pec_rec):
-                            return np.exp(pec_rec(np.log(ne), np.log(Te)))
-
-                    dout[key] = {
-                        'lambda0': lamb,
-                        'ion': '{}{}+'.format(elem, charge),
-                        'charge': charge,
-                        'element': elem,
-                        'symbol': '{}{}-{}'.format(typ0, typ1, isoel),
-                        'source': pfe,
-                        'type': typ[0],
-                        'ne': ne,
-                        'ne_units': '/m3',
-                        'te': te,
-                        'te_units': 'eV',
-                        'pec': pec,
-                        'pec_type': 'f(ne, Te)',
-                        'pec_units': 'm3/s',
+                    draw[key] = {
+                        'meta': {
+                            'lambda0': lamb,
+                            'ion': '{}{}+'.format(elem, charge),
+                            'charge': charge,
+                            'element': elem,
+                            'symbol': '{}{}-{}'.format(typ0, typ1, isoel),
+                            'type': typ[0],
+                        },
+                        'arrays': {
+                            # log(ne)+6 to convert /cm3 -> /m3
+                            'ne': np.array(ne, dtype=float)*1e6,
+                            'te': np.array(te, dtype=float),
+                            # PEC reshaping and conversion to cm3/s -> m3/s
+                            'pec': np.array(
+                                pec, dtype=float,
+                            ).reshape((nne, nte)) * 1e-6,
+                        },
                     }
 
             # Get transitions from table at the end
@@ -963,26 +1080,110 @@ def _read_adf15(
                 isoel = int(lstr[1])
                 lamb = float(lstr[2])*1.e-10
                 key = _get_adf15_key(elem, charge, isoel, typ0, typ1)
-                c0 = ((lambmin is None or lambmin < lamb)
-                      and (lambmax is None or lambmax > lamb))
-                if c0 and key not in dout.keys():
+                if key not in draw.keys():
                     msg = ("Inconsistency in file {}:\n".format(pfe)
                            + "\t- line should be present".format(key))
                     raise Exception(msg)
-                if key in dout.keys():
-                    if dout[key]['lambda0'] != lamb:
-                        msg = "Inconsistency in file {}".format(pfe)
-                        raise Exception(msg)
-                    c0 = (dout[key]['type'] not in lstr
-                          or lstr.index(dout[key]['type']) < 4)
-                    if c0:
-                        msg = ("Inconsistency in table, type not found:\n"
-                               + "\t- expected: {}\n".format(dout[key]['type'])
-                               + "\t- line: {}".format(line))
-                        raise Exception(msg)
-                    trans = lstr[3:lstr.index(dout[key]['type'])]
-                    dout[key]['transition'] = ''.join(trans)
+                if draw[key]['meta']['lambda0'] != lamb:
+                    msg = "Inconsistency in file {}".format(pfe)
+                    raise Exception(msg)
+                c0 = (draw[key]['meta']['type'] not in lstr
+                      or lstr.index(draw[key]['meta']['type']) < 4)
+                if c0:
+                    msg = ("Inconsistency in table, type not found:\n"
+                           + "\t- expected: {}\n".format(
+                               draw[key]['meta']['type'])
+                           + "\t- line: {}".format(line))
+                    raise Exception(msg)
+                trans = lstr[3:lstr.index(draw[key]['meta']['type'])]
+                draw[key]['meta']['transition'] = ''.join(trans)
                 if isoel == nlines:
                     in_tab = False
-    assert all(['transition' in vv.keys() for vv in dout.values()])
+    assert all(['transition' in vv['meta'].keys() for vv in draw.values()])
+    return draw
+
+
+def _adf15_from_raw(
+    draw,
+    pfe,
+    dout=None,
+    lambmin=None,
+    lambmax=None,
+    pec_as_func=None,
+    deg=None,
+):
+    """ Fill dout with the lines of raw adf15 data in [lambmin, lambmax]
+
+    Here lambmin and lambmax are provided in m
+    """
+
+    if deg is None:
+        deg = _DEG
+    if pec_as_func is None:
+        pec_as_func = _PECASFUNC
+    if dout is None:
+        dout = {}
+
+    for key, vv in draw.items():
+        lamb = vv['meta']['lambda0']
+        c0 = ((lambmin is not None and lamb < lambmin)
+              or (lambmax is not None and lamb > lambmax))
+        if c0:
+            continue
+
+        ne, te, pec = [vv['arrays'][kk] for kk in ['ne', 'te', 'pec']]
+        if pec_as_func is True:
+            pec_rec = scpRectSpl(
+                np.log(ne),
+                np.log(te),
+                np.log(pec),
+                kx=deg,
+                ky=deg,
+            )
+
+            def pec(Te=None, ne=None, pec_rec=pec_rec):
+                return np.exp(pec_rec(np.log(ne), np.log(Te)))
+
+        dout[key] = {
+            'lambda0': lamb,
+            'ion': vv['meta']['ion'],
+            'charge': vv['meta']['charge'],
+            'element': vv['meta']['element'],
+            'symbol': vv['meta']['symbol'],
+            'source': pfe,
+            'type': vv['meta']['type'],
+            'ne': ne,
+            'ne_units': '/m3',
+            'te': te,
+            'te_units': 'eV',
+            'pec': pec,
+            'pec_type': 'f(ne, Te)',
+            'pec_units': 'm3/s',
+            'transition': vv['meta']['transition'],
+        }
     return dout
+
+
+def _read_adf15(
+    pfe,
+    dout=None,
+    lambmin=None,
+    lambmax=None,
+    pec_as_func=None,
+    deg=None,
+    draw=None,
+):
+    """
+    Here lambmin and lambmax are provided in m
+    """
+    if draw is None:
+        draw = _read_adf15_raw(pfe)
+    return _adf15_from_raw(
+        draw,
+        pfe,
+        dout=dout,
+        lambmin=lambmin,
+        lambmax=lambmax,
+        pec_as_func=pec_as_func,
+        deg=deg,
+    )
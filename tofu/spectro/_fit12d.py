@@ -5,6 +5,7 @@ import warnings
 import itertools as itt
 import copy
 import datetime as dtm      # DB
+import concurrent.futures as futures
 
 # Common
 import numpy as np
@@ -52,6 +53,7 @@ _BINNING = False
 _POS = False
 _SUBSET = False
 _CHAIN = True
+_NWORKERS = 1
 _METHOD = 'trf'
 _LOSS = 'linear'
 _D3 = {
@@ -798,7 +800,7 @@ def _binning_check(
                     binning[k0]['edges']).ravel()
                 if binning[k0]['nbins'] != binning[k0]['edges'].size - 1:
                     raise Exception(msg)
-        elif binning[k0].get('bin_edges') is not None:
+        elif binning[k0].get('edges') is not None:
             binning[k0]['edges'] = np.atleast_1d(binning[k0]['edges']).ravel()
             binning[k0]['nbins'] = binning[k0]['edges'].size - 1
         else:
@@ -820,13 +822,79 @@ def _binning_check(
     return binning
 
 
+def _binning_indices(xx, edges):
+    """ Return the bin index of each value of xx (-1 if outside edges)
+
+    As in scipy.stats.binned_statistic, the last bin includes its right edge
+    """
+    nbins = edges.size - 1
+    ind = np.searchsorted(edges, xx, side='right') - 1
+    ind[xx == edges[-1]] = nbins - 1
+    ind[(ind < 0) | (ind >= nbins)] = -1
+    return ind
+
+
+def _binning_sum(data, indok, ind, nbins, stream=None):
+    """ Return the sum and number of valid pixels per bin, for all spectra
+
+    ind (flat bin index of each pixel, -1 if outside) is computed once for
+    the static (lamb, phi) maps, all spectra are then binned in a single
+    bincount (spectrum ii uses bins ii*(nbins+1) + ind)
+
+    If stream is an int, spectra are binned by groups of stream spectra
+    (limits memory usage for long shots, data can be a np.memmap)
+    """
+    nspect = data.shape[0]
+    if stream is None or stream is False:
+        stream = nspect
+    if not (isinstance(stream, (int, np.integer)) and stream >= 1):
+        msg = (
+            "Arg stream must be False or a strictly positive int!\n"
+            + "\t- provided: {}".format(stream)
+        )
+        raise Exception(msg)
+
+    # pixels outside the bins (ind = -1) go to an extra last bin
+    ind = np.where(ind.ravel() >= 0, ind.ravel(), nbins)
+    databin = np.zeros((nspect, nbins))
+    nperbin = np.zeros((nspect, nbins), dtype=int)
+    indf = None
+    for i0 in range(0, nspect, stream):
+        i1 = min(i0 + stream, nspect)
+        ni = i1 - i0
+        if indf is None or indf.shape[0] != ni:
+            indf = (
+                np.arange(ni)[:, None]*(nbins + 1) + ind[None, :]
+            ).ravel()
+        oki = np.asarray(indok[i0:i1]).ravel()
+        datai = np.asarray(data[i0:i1]).ravel()
+        nn = ni*(nbins + 1)
+        databin[i0:i1, :] = np.bincount(
+            indf, weights=np.where(oki, datai, 0.), minlength=nn,
+        ).reshape((ni, nbins + 1))[:, :-1]
+        nperbin[i0:i1, :] = np.bincount(
+            indf, weights=oki, minlength=nn,
+        ).reshape((ni, nbins + 1))[:, :-1]
+    return databin, nperbin
+
+
 def binning_2d_data(
     lamb, phi, data, indok=None,
     domain=None, binning=None,
     nbsplines=None,
     phi1d=None, lamb1d=None,
     dataphi1d=None, datalamb1d=None,
+    stream=None,
 ):
+    """ Bin the 2d data (nspect, nphi, nlamb) on a (phi, lamb) grid
+
+    Bin indices are computed once from the (lamb, phi) maps of the detector
+    and all spectra are binned together (see _binning_sum())
+    Use stream (int) to bin the spectra by groups of stream spectra
+
+    Binned data is the sum of valid pixels in each bin (nan if empty),
+    the number of valid pixels per bin is stored in binning['nperbin']
+    """
 
     # ------------------
     # Checkformat input
@@ -836,26 +904,26 @@ def binning_2d_data(
     )
 
     nspect = data.shape[0]
+    if indok is None:
+        indok = (~np.isnan(data)) & (~np.isnan(lamb))[None, ...]
+
     if binning is False:
         if phi1d is None:
-            phi1d_bins = np.linspace(domain['phi'][0], domain['phi'][1], 100)
-            lamb1d_bins = np.linspace(
-                domain['lamb'][0], domain['lamb'][1], 100,
-            )
-            dataf = data.reshape((nspect, data.shape[1]*data.shape[2]))
-            dataphi1d = scpstats.binned_statistics(
-                phi.ravel(),
-                dataf,
-                statistic='sum',
-            )
-            datalamb1d = scpstats.binned_statistics(
-                lamb.ravel(),
-                dataf,
-                statistic='sum',
-            )
-            phi1d = 0.5*(phi1d_bins[1:] + phi1d_bins[:-1])
-            lamb1d = 0.5*(lamb1d_bins[1:] + lamb1d_bins[:-1])
-            import pdb; pdb.set_trace()     # DB
+            # 1d profiles (mean along lamb / phi) on 100 bins
+            dout = {}
+            for k0, xx in [('phi', phi), ('lamb', lamb)]:
+                edges = np.linspace(
+                    domain[k0]['minmax'][0], domain[k0]['minmax'][1], 101,
+                )
+                ind = _binning_indices(xx, edges)
+                sumbin, nbin = _binning_sum(
+                    data, indok, ind, edges.size - 1, stream=stream,
+                )
+                data1d = np.full(sumbin.shape, np.nan)
+                data1d[nbin > 0] = sumbin[nbin > 0] / nbin[nbin > 0]
+                dout[k0] = (0.5*(edges[1:] + edges[:-1]), data1d)
+            phi1d, dataphi1d = dout['phi']
+            lamb1d, datalamb1d = dout['lamb']
 
         return (
             lamb, phi, data, indok, binning,
@@ -865,27 +933,20 @@ def binning_2d_data(
     else:
         nphi = binning['phi']['nbins']
         nlamb = binning['lamb']['nbins']
-        bins = (binning['lamb']['edges'], binning['phi']['edges'])
 
         # ------------------
-        # Compute
-        databin = np.full((nspect, nphi, nlamb), np.nan)
-        nperbin = np.full((nspect, nphi, nlamb), np.nan)
-        for ii in range(nspect):
-            databin[ii, ...] = scpstats.binned_statistic_2d(
-                phi[indok[ii, ...]],
-                lamb[indok[ii, ...]],
-                data[indok[ii, ...]],
-                statistic='sum', bins=bins,
-                range=None, expand_binnumbers=True,
-            )[0]
-            nperbin[ii, ...] = scpstats.binned_statistic_2d(
-                phi[indok[ii, ...]],
-                lamb[indok[ii, ...]],
-                np.ones((indok[ii, ...].sum(),), dtype=int),
-                statistic='sum', bins=bins,
-                range=None, expand_binnumbers=True,
-            )[0]
+        # Compute (bin indices are computed once for all spectra)
+        indphi = _binning_indices(phi, binning['phi']['edges'])
+        indlamb = _binning_indices(lamb, binning['lamb']['edges'])
+        ind = indphi*nlamb + indlamb
+        ind[(indphi < 0) | (indlamb < 0)] = -1
+
+        databin, nperbin = _binning_sum(
+            data, indok, ind, nphi*nlamb, stream=stream,
+        )
+        databin = databin.reshape((nspect, nphi, nlamb))
+        nperbin = nperbin.reshape((nspect, nphi, nlamb))
+        databin[nperbin == 0] = np.nan
         binning['nperbin'] = nperbin
 
         lambbin = 0.5*(
@@ -894,13 +955,14 @@ def binning_2d_data(
         phibin = 0.5*(
             binning['phi']['edges'][1:] + binning['phi']['edges'][:-1]
         )
-        lambbin = np.repeat(lambbin[None, :], nphi, axis=0)
-        phibin = np.repeat(phibin[:, None], nlamb, axis=1)
-        indok = ~np.isnan(databin)
-
         # dataphi1d
         phi1d = phibin
         lamb1d = lambbin
+
+        lambbin = np.repeat(lambbin[None, :], nphi, axis=0)
+        phibin = np.repeat(phibin[:, None], nlamb, axis=1)
+        indok = nperbin > 0
+
         dataphi1d = np.nanmean(databin, axis=2)
         datalamb1d = np.nanmean(databin, axis=1)
 
@@ -1090,6 +1152,7 @@ def multigausfit2d_from_dlines_prepare(
     nbsplines=None, deg=None, subset=None,
     nxi=None, nxj=None,
     lphi=None, lphi_tol=None,
+    stream=None,
 ):
 
     # --------------
@@ -1142,6 +1205,7 @@ def multigausfit2d_from_dlines_prepare(
         nbsplines=nbsplines,
         phi1d=phi1d, lamb1d=lamb1d,
         dataphi1d=dataphi1d, datalamb1d=datalamb1d,
+        stream=stream,
     )
 
     # --------------
@@ -1175,7 +1239,7 @@ def multigausfit2d_from_dlines_prepare(
 def multigausfit2d_from_dlines_dbsplines(
     knots=None, deg=None, nbsplines=None,
     phimin=None, phimax=None,
-    symmetryaxis=None,
+    symmetryaxis=None, phi=None,
 ):
     # Check / format input
     if nbsplines is None:
@@ -1186,7 +1250,10 @@ def multigausfit2d_from_dlines_dbsplines(
         raise Exception(msg)
 
     if nbsplines is False:
-        lk = ['knots', 'knots_mult', 'nknotsperbs', 'ptsx0', 'nbs', 'deg']
+        lk = [
+            'knots', 'knots_mult', 'nknotsperbs', 'ptsx0', 'nbs', 'deg',
+            'bs_basis',
+        ]
         return dict.fromkeys(lk, False)
 
     if deg is None:
@@ -1250,9 +1317,63 @@ def multigausfit2d_from_dlines_dbsplines(
         'nknotsperbs': nknotsperbs, 'ptsx0': ptsx0,
         'nbs': nbs, 'deg': deg,
     }
+
+    # Values of all bsplines at phi (computed once, used at each iteration)
+    if phi is not None:
+        if symmetryaxis is not False:
+            phi = np.abs(phi - np.nanmean(symmetryaxis))
+        dbsplines['bs_basis'] = multigausfit2d_from_dlines_bsbasis(
+            phi=phi, knots_mult=knots_mult,
+            nknotsperbs=nknotsperbs, nbs=nbs,
+        )
     return dbsplines
 
 
+def multigausfit2d_from_dlines_bsbasis(
+    phi=None, knots_mult=None, nknotsperbs=None, nbs=None,
+):
+    """ Return the values of all bsplines at phi, as a sparse matrix
+
+    The matrix is a (phi.size, nbs) csr_matrix (phi is flattened)
+    Each bspline is only evaluated on its support, so that only the
+    (deg+1) non-zero values are computed and stored for each point
+    Points outside of the knots (or nan) have no non-zero value
+
+    Thus, for any (nbs, n) array of coefs, basis.dot(coefs) is the
+    (phi.size, n) array of values of the n corresponding splines at phi
+    """
+    phi = np.ravel(phi)
+    # Not basis_element(), which is 0 at the upper edge of the last bspline
+    BS = BSpline(
+        knots_mult, np.zeros((nbs,), dtype=float), nknotsperbs - 2,
+        extrapolate=False,
+    )
+    lrow, lcol, lval = [], [], []
+    for ii in range(nbs):
+        ind = (
+            (phi >= knots_mult[ii])
+            & (phi <= knots_mult[ii+nknotsperbs-1])
+        ).nonzero()[0]
+        BS.c[:] = 0.
+        BS.c[ii] = 1.
+        val = BS(phi[ind])
+        if np.any(np.isnan(val)):
+            msg = (
+                "Some nan have been detected in the bsplines basis!\n"
+                + "\t- bspline {}".format(ii)
+            )
+            raise Exception(msg)
+        iok = val != 0.
+        lrow.append(ind[iok])
+        lcol.append(np.full((iok.sum(),), ii))
+        lval.append(val[iok])
+
+    return sparse.csr_matrix(
+        (np.concatenate(lval), (np.concatenate(lrow), np.concatenate(lcol))),
+        shape=(phi.size, nbs),
+    )
+
+
 ###########################################################
 ###########################################################
 #
@@ -1755,7 +1876,7 @@ def fit2d_dinput(
     valid_return_fract=None,
     dscales=None, dx0=None, dbounds=None,
     nxi=None, nxj=None,
-    lphi=None, lphi_tol=None,
+    lphi=None, lphi_tol=None, stream=None,
     defconst=_DCONSTRAINTS,
 ):
     """ Check and format a dict of inputs to be fed to fit2d()
@@ -1771,6 +1892,8 @@ def fit2d_dinput(
         - subset:
         - same_spectrum:
         - focus:
+        - binning: False or number / edges of (phi, lamb) bins
+        - stream: int, bin the spectra by groups of stream spectra
 
     """
 
@@ -1785,6 +1908,7 @@ def fit2d_dinput(
             nbsplines=nbsplines, deg=deg,
             nxi=nxi, nxj=nxj,
             lphi=None, lphi_tol=None,
+            stream=stream,
         )
 
     # ------------------------
@@ -1854,7 +1978,8 @@ def fit2d_dinput(
         knots=knots, deg=deg, nbsplines=nbsplines,
         phimin=dprepare['domain']['phi']['minmax'][0],
         phimax=dprepare['domain']['phi']['minmax'][1],
-        symmetryaxis=dinput.get('symmetry_axis')
+        symmetryaxis=dinput.get('symmetry_axis'),
+        phi=dprepare['phi'],
     ))
 
     # ------------------------
@@ -2671,7 +2796,12 @@ def _dict2vector_dscalesx0bounds(
     x[:, dinput['dind']['bck_rate']['x'][0]] = dd['bck_rate']
     for k0 in _DORDER:
         for ii, k1 in enumerate(dinput[k0]['keys']):
-            x[:, dinput['dind'][k0]['x'][ii]] = dd[k0][k1]
+            ind = dinput['dind'][k0]['x'][..., ii]
+            if np.ndim(ind) == 0:
+                x[:, ind] = dd[k0][k1]
+            else:
+                # 2d: same value for all bsplines
+                x[:, ind] = np.atleast_1d(dd[k0][k1])[:, None]
 
     if dinput['double'] is not False:
         if dinput['double'] is True:
@@ -2762,12 +2892,170 @@ def _checkformat_options(chain, method, tr_solver, tr_options,
             xtol, ftol, gtol, loss, max_nfev, verbose, verbscp)
 
 
+def _checkformat_nworkers(nworkers=None, nblocks=None, nspect=None):
+    if nworkers is None:
+        nworkers = _NWORKERS
+    if nworkers == -1:
+        nworkers = os.cpu_count()
+    if not (isinstance(nworkers, (int, np.integer)) and nworkers >= 1):
+        msg = (
+            "Arg nworkers must be a strictly positive int (or -1 for all)!\n"
+            + "\t- provided: {}".format(nworkers)
+        )
+        raise Exception(msg)
+    if nblocks is None:
+        nblocks = nworkers
+    if not (isinstance(nblocks, (int, np.integer)) and nblocks >= 1):
+        msg = (
+            "Arg nblocks must be a strictly positive int!\n"
+            + "\t- provided: {}".format(nblocks)
+        )
+        raise Exception(msg)
+    nblocks = min(nblocks, nspect)
+    nworkers = min(nworkers, nblocks)
+    return nworkers, nblocks
+
+
+# Inputs shared by all blocks fitted by a worker process (pool workers only,
+# set by _fit1d_init())
+_DFIT1D = {}
+
+
+def _fit1d_prepare(dshared):
+    """ Return the inputs shared by all blocks + the cost / jac functions """
+    dd = dict(dshared)
+    (
+        _, dd['func_cost'], dd['func_jac'],
+    ) = _funccostjac.multigausfit1d_from_dlines_funccostjac(
+        dshared['lamb'], dinput=dshared['dinput'], dind=dshared['dind'],
+        jac=dshared['jac'], indx=dshared['indx'],
+    )
+    return dd
+
+
+def _fit1d_init(dshared):
+    """ Store the inputs shared by all blocks of a worker process
+
+    Run once per process (pool initializer), so that dinput is not sent
+    with each block
+    """
+    _DFIT1D.clear()
+    _DFIT1D.update(_fit1d_prepare(dshared))
+
+
+def _fit1d_block(ind, dd=None, verbose=None, maxl=None):
+    """ Fit successively the spectra of indices ind (a block)
+
+    If chain, each fit starts from the solution of the previous one
+    Uses the inputs dd (from _fit1d_prepare()), or, in a pool worker, those
+    set by _fit1d_init()
+    Returns a dict of results for the block
+    """
+    if dd is None:
+        dd = _DFIT1D
+    indx, x0 = dd['indx'], dd['x0'][ind, :]
+    nspect, nind = dd['datacost'].shape[0], len(ind)
+
+    dout = {
+        'ind': ind,
+        'x0': x0,
+        'sol_x': np.full((nind, dd['dind']['sizex']), np.nan),
+        'success': np.full((nind,), np.nan),
+        'time': np.full((nind,), np.nan),
+        'cost': np.full((nind,), np.nan),
+        'nfev': np.full((nind,), np.nan),
+        'validity': np.zeros((nind,), dtype=int),
+        'message': ['' for ss in range(nind)],
+        'errmsg': ['' for ss in range(nind)],
+    }
+
+    end = '\r'
+    for jj, ii in enumerate(ind):
+
+        if verbose == 3:
+            msg = "\nspect {} / {}".format(ii+1, nspect)
+            print(msg)
+
+        try:
+            dti = None
+            t0i = dtm.datetime.now()     # DB
+            if not dd['dinput']['valid']['indt'][ii]:
+                continue
+
+            # optimization
+            res = scpopt.least_squares(
+                dd['func_cost'], x0[jj, indx],
+                jac=dd['func_jac'], bounds=dd['bounds'][:, indx],
+                method=dd['method'], ftol=dd['ftol'], xtol=dd['xtol'],
+                gtol=dd['gtol'], x_scale=1.0, f_scale=1.0,
+                loss=dd['loss'], diff_step=None,
+                tr_solver=dd['tr_solver'], tr_options=dd['tr_options'],
+                jac_sparsity=None, max_nfev=dd['max_nfev'],
+                verbose=dd['verbscp'], args=(),
+                kwargs={
+                    'data': dd['datacost'][ii, :],
+                    'scales': dd['scales'][ii, :],
+                    'const': dd['const'][ii, :],
+                    'indok': dd['dinput']['dprepare']['indok'][ii, :],
+                },
+            )
+            dti = (dtm.datetime.now() - t0i).total_seconds()
+
+            if dd['chain'] is True and jj < nind-1:
+                x0[jj+1, indx] = res.x
+
+            # cost, message, time
+            dout['success'][jj] = res.success
+            dout['cost'][jj] = res.cost
+            dout['nfev'][jj] = res.nfev
+            dout['message'][jj] = res.message
+            dout['time'][jj] = round(
+                (dtm.datetime.now()-t0i).total_seconds(),
+                ndigits=3,
+            )
+            dout['sol_x'][jj, indx] = res.x
+            dout['sol_x'][jj, ~indx] = (
+                dd['const'][ii, :] / dd['scales'][ii, ~indx]
+            )
+
+        except Exception as err:
+            dout['errmsg'][jj] = str(err)
+            dout['validity'][jj] = -1
+
+        # Verbose
+        if verbose in [1, 2]:
+            if dout['validity'][jj] == 0:
+                col = np.char.array([
+                    '{} / {}'.format(ii+1, nspect),
+                    '{}'.format(dti),
+                    '{:5.3e}'.format(res.cost),
+                    str(res.nfev),
+                    str(res.njev),
+                    res.message,
+                ])
+            else:
+                col = np.char.array([
+                    '{} / {}'.format(ii+1, nspect),
+                    '{}'.format(dti),
+                    ' - ', ' - ', ' - ',
+                    dout['errmsg'][jj],
+                ])
+            msg = ' '.join([cc.ljust(maxl) for cc in col])
+            if verbose == 1:
+                if ii == nspect-1:
+                    end = '\n'
+                print(msg, end=end, flush=True)
+            else:
+                print(msg, end='\n')
+    return dout
+
+
 def multigausfit1d_from_dlines(
     dinput=None,
     method=None, tr_solver=None, tr_options=None,
     xtol=None, ftol=None, gtol=None,
     max_nfev=None, chain=None, verbose=None,
-    loss=None, jac=None,
+    loss=None, jac=None, nworkers=None, nblocks=None,
 ):
     """ Solve multi_gaussian fit in 1d from dlines
 
@@ -2788,6 +3076,11 @@ def multigausfit1d_from_dlines(
         - vni: 10 km/s
         - cij: np.mean(data)
 
+    Spectra can be fitted in parallel, by a pool of nworkers processes
+    (nworkers = -1 => all cores), each fitting a block of successive spectra
+    The spectra are split in nblocks blocks (default: nworkers), chaining
+    (if chain = True) is done within each block
+
     """
 
     # ---------------------------
@@ -2847,113 +3140,86 @@ def multigausfit1d_from_dlines(
     x0[:, ~indx] = const / scales[:, ~indx]
 
     # ---------------------------
-    # Get function, cost function and jacobian
-    (
-        func_detail, func_cost, func_jac,
-    ) = _funccostjac.multigausfit1d_from_dlines_funccostjac(
-        lamb, dinput=dinput, dind=dind, jac=jac, indx=indx,
+    # Inputs shared by all blocks
+    nworkers, nblocks = _checkformat_nworkers(
+        nworkers=nworkers, nblocks=nblocks, nspect=nspect,
     )
-
-    # ---------------------------
-    # Prepare output
-    sol_x = np.full((nspect, dind['sizex']), np.nan)
-    success = np.full((nspect,), np.nan)
-    time = np.full((nspect,), np.nan)
-    cost = np.full((nspect,), np.nan)
-    nfev = np.full((nspect,), np.nan)
-    validity = np.zeros((nspect,), dtype=int)
-    message = ['' for ss in range(nspect)]
-    errmsg = ['' for ss in range(nspect)]
+    dshared = {
+        'dinput': dinput, 'dind': dind, 'lamb': lamb, 'datacost': datacost,
+        'jac': jac, 'indx': indx, 'x0': x0, 'bounds': bounds,
+        'scales': scales, 'const': const, 'chain': chain,
+        'method': method, 'tr_solver': tr_solver, 'tr_options': tr_options,
+        'xtol': xtol, 'ftol': ftol, 'gtol': gtol, 'loss': loss,
+        'max_nfev': max_nfev, 'verbscp': verbscp,
+    }
 
     # Prepare msg
+    maxl = None
     if verbose in [1, 2]:
         col = np.char.array([
             'spect', 'time (s)', 'cost', 'nfev', 'njev', 'msg',
         ])
         maxl = max(np.max(np.char.str_len(col)), 10)
+        if nworkers > 1:
+            col = np.char.array(['block', 'spect', 'time (s)'])
         msg = '\n'.join([' '.join([cc.ljust(maxl) for cc in col]),
-                         ' '.join(['-'*maxl]*6)])
+                         ' '.join(['-'*maxl]*col.size)])
         print(msg)
 
     # ---------------------------
-    # Main loop
-    end = '\r'
+    # Main loop (blocks of successive spectra)
     t0 = dtm.datetime.now()     # DB
-    for ii in range(nspect):
-
-        if verbose == 3:
-            msg = "\nspect {} / {}".format(ii+1, nspect)
-            print(msg)
-
-        try:
-            dti = None
-            t0i = dtm.datetime.now()     # DB
-            if not dinput['valid']['indt'][ii]:
-                continue
-
-            # optimization
-            res = scpopt.least_squares(
-                func_cost, x0[ii, indx],
-                jac=func_jac, bounds=bounds[:, indx],
-                method=method, ftol=ftol, xtol=xtol,
-                gtol=gtol, x_scale=1.0, f_scale=1.0,
-                loss=loss, diff_step=None,
-                tr_solver=tr_solver, tr_options=tr_options,
-                jac_sparsity=None, max_nfev=max_nfev,
-                verbose=verbscp, args=(),
-                kwargs={
-                    'data': datacost[ii, :],
-                    'scales': scales[ii, :],
-                    'const': const[ii, :],
-                    'indok': dprepare['indok'][ii, :],
-                },
-            )
-            dti = (dtm.datetime.now() - t0i).total_seconds()
-
-            if chain is True and ii < nspect-1:
-                x0[ii+1, indx] = res.x
-
-            # cost, message, time
-            success[ii] = res.success
-            cost[ii] = res.cost
-            nfev[ii] = res.nfev
-            message[ii] = res.message
-            time[ii] = round(
-                (dtm.datetime.now()-t0i).total_seconds(),
-                ndigits=3,
-            )
-            sol_x[ii, indx] = res.x
-            sol_x[ii, ~indx] = const[ii, :] / scales[ii, ~indx]
-
-        except Exception as err:
-            errmsg[ii] = str(err)
-            validity[ii] = -1
+    lind = np.array_split(np.arange(nspect), nblocks)
+    if nworkers == 1:
+        dd = _fit1d_prepare(dshared)
+        lout = [
+            _fit1d_block(ind, dd=dd, verbose=verbose, maxl=maxl)
+            for ind in lind
+        ]
+    else:
+        lout = []
+        with futures.ProcessPoolExecutor(
+            max_workers=nworkers,
+            initializer=_fit1d_init,
+            initargs=(dshared,),
+        ) as pool:
+            lfut = [
+                pool.submit(_fit1d_block, ind, verbose=0) for ind in lind
+            ]
+            for ii, fut in enumerate(futures.as_completed(lfut)):
+                lout.append(fut.result())
+                if verbose in [1, 2]:
+                    ind = lout[-1]['ind']
+                    col = np.char.array([
+                        '{} / {}'.format(ii+1, nblocks),
+                        '{} - {}'.format(ind[0]+1, ind[-1]+1),
+                        '{}'.format(np.nansum(lout[-1]['time'])),
+                    ])
+                    msg = ' '.join([cc.ljust(maxl) for cc in col])
+                    print(msg, flush=True)
 
-        # Verbose
-        if verbose in [1, 2]:
-            if validity[ii] == 0:
-                col = np.char.array([
-                    '{} / {}'.format(ii+1, nspect),
-                    '{}'.format(dti),
-                    '{:5.3e}'.format(res.cost),
-                    str(res.nfev),
-                    str(res.njev),
-                    res.message,
-                ])
-            else:
-                col = np.char.array([
-                    '{} / {}'.format(ii+1, nspect),
-                    '{}'.format(dti),
-                    ' - ', ' - ', ' - ',
-                    errmsg[ii],
-                ])
-            msg = ' '.join([cc.ljust(maxl) for cc in col])
-            if verbose == 1:
-                if ii == nspect-1:
-                    end = '\n'
-                print(msg, end=end, flush=True)
-            else:
-                print(msg, end='\n')
+    # ---------------------------
+    # Gather blocks
+    sol_x = np.full((nspect, dind['sizex']), np.nan)
+    success = np.full((nspect,), np.nan)
+    time = np.full((nspect,), np.nan)
+    cost = np.full((nspect,), np.nan)
+    nfev = np.full((nspect,), np.nan)
+    validity = np.zeros((nspect,), dtype=int)
+    message = ['' for ss in range(nspect)]
+    errmsg = ['' for ss in range(nspect)]
+    for dout in lout:
+        ind = dout['ind']
+        x0[ind, :] = dout['x0']
+        sol_x[ind, :] = dout['sol_x']
+        success[ind] = dout['success']
+        time[ind] = dout['time']
+        cost[ind] = dout['cost']
+        nfev[ind] = dout['nfev']
+        validity[ind] = dout['validity']
+        for jj, ii in enumerate(ind):
+            message[ii] = dout['message'][jj]
+            errmsg[ii] = dout['errmsg'][jj]
 
     # ---------------------------
     # Reshape in case of same_spectrum
@@ -3079,6 +3345,15 @@ def multigausfit2d_from_dlines(
         - vni: 10 km/s
         - cij: np.mean(data)
 
+    The jacobian (jac) can be:
+        - 'dense': analytical, as a (npts, nx) array
+        - 'sparse': analytical, as a scipy.sparse.csr_matrix storing only
+                    the non-zero terms (each bspline only affects the pixels
+                    of its support) => memory scales with nb. of non-zeros
+        - '2-point', '3-point': finite differences, computed only on the
+                    non-zero terms (via jac_sparsity)
+    Except for 'dense', tr_solver must be 'lsmr' (default)
+
     """
 
     # ---------------------------
@@ -3091,6 +3366,13 @@ def multigausfit2d_from_dlines(
          chain, method, tr_solver, tr_options,
          xtol, ftol, gtol, loss, max_nfev, verbose,
     )
+    if jac in ['sparse', '2-point', '3-point'] and tr_solver == 'exact':
+        msg = (
+            "tr_solver = 'exact' only works with a dense jacobian!\n"
+            + "\t- jac: {}\n".format(jac)
+            + "  => use tr_solver = 'lsmr' (or None)"
+        )
+        raise Exception(msg)
 
     # ---------------------------
     # Load dinput if necessary
@@ -3102,9 +3384,16 @@ def multigausfit2d_from_dlines(
     # DEPRECATED?
     lamb = dprepare['lamb']
     if dinput['symmetry'] is True:
-        phi = np.abs(phi - np.nanmean(dinput['symmetry_axis']))
+        phi2 = np.abs(dprepare['phi'] - np.nanmean(dinput['symmetry_axis']))
     else:
-        phi = dprepare['phi']
+        phi2 = dprepare['phi']
+
+    # bsplines basis (if dinput was computed before it was stored)
+    if dinput.get('bs_basis') is None:
+        dinput['bs_basis'] = multigausfit2d_from_dlines_bsbasis(
+            phi=phi2, knots_mult=dinput['knots_mult'],
+            nknotsperbs=dinput['nknotsperbs'], nbs=dinput['nbs'],
+        )
 
     # ---------------------------
     # Get scaling, x0, bounds from dict
@@ -3140,13 +3429,10 @@ def multigausfit2d_from_dlines(
          dinput=dinput, dind=dind, jac=jac, indx=indx,
     )
 
-    # TBF after multigausfit2d_from_dlines_funccostjac() is checked
-
     # ---------------------------
     # Prepare output
-    datacost = np.reshape(
-        dprepare['data'][:, dprepare['indok']],
-        (nspect, dprepare['indok'].sum()))
+    datacost = dprepare['data'].reshape((nspect, -1))
+    indok = dprepare['indok'].reshape((nspect, -1))
     sol_x = np.full((nspect, dind['sizex']), np.nan)
     success = np.full((nspect,), np.nan)
     time = np.full((nspect,), np.nan)
@@ -3156,18 +3442,6 @@ def multigausfit2d_from_dlines(
     message = ['' for ss in range(nspect)]
     errmsg = ['' for ss in range(nspect)]
 
-    if dprepare.get('indok_var') is not None:
-        msg = ('indok_var not implemented yet!')
-        raise Exception(msg)
-        if dprepare['indok_var'].ndim == 3:
-            indok_var = dprepare['indok_var'].reshape(
-                (nspect, dprepare['lamb'].size))
-        else:
-            indok_var = [dprepare['indok_var'].ravel()]*nspect
-    else:
-        indok_var = [False]*nspect
-    dprepare['indok_var'] = indok_var
-
     # Prepare msg
     if verbose in [1, 2]:
         col = np.char.array(['Spect', 'time (s)', 'cost',
@@ -3186,26 +3460,41 @@ def multigausfit2d_from_dlines(
             msg = "\nSpect {} / {}".format(ii+1, nspect)
             print(msg)
         try:
+            dti = None
             t0i = dtm.datetime.now()     # DB
             if not dinput['valid']['indt'][ii]:
                 continue
+
+            # finite differences => only on non-zero terms of jacobian
+            jac_sparsity = None
+            if jac in ['2-point', '3-point']:
+                jac_sparsity = (
+                    _funccostjac.multigausfit2d_from_dlines_jac_sparsity(
+                        indok=indok[ii, :], indx=indx,
+                        dinput=dinput, dind=dind,
+                    )
+                )
+
             res = scpopt.least_squares(
-                func_cost, x0_scale[ii, :],
-                jac=func_jac, bounds=bounds_scale,
+                func_cost, x0[ii, indx],
+                jac=func_jac, bounds=bounds[:, indx],
                 method=method, ftol=ftol, xtol=xtol,
                 gtol=gtol, x_scale=1.0, f_scale=1.0,
                 loss=loss, diff_step=None,
                 tr_solver=tr_solver, tr_options=tr_options,
-                jac_sparsity=None, max_nfev=max_nfev,
+                jac_sparsity=jac_sparsity, max_nfev=max_nfev,
                 verbose=verbscp, args=(),
-                kwargs={'data': datacost[ii, :],
-                        'scales': scales[ii, :],
-                        'indok_var': indok_var[ii],
-                        'ind_bs': dinput['valid']['indbs'][ii, :]})
+                kwargs={
+                    'data': datacost[ii, :],
+                    'scales': scales[ii, :],
+                    'const': const[ii, :],
+                    'indok': indok[ii, :],
+                },
+            )
             dti = (dtm.datetime.now() - t0i).total_seconds()
 
             if chain is True and ii < nspect-1:
-                x0_scale[ii+1, :] = res.x
+                x0[ii+1, indx] = res.x
 
             # cost, message, time
             success[ii] = res.success
@@ -3214,7 +3503,8 @@ def multigausfit2d_from_dlines(
             message[ii] = res.message
             time[ii] = round((dtm.datetime.now()-t0i).total_seconds(),
                              ndigits=3)
-            sol_x[ii, :] = res.x
+            sol_x[ii, indx] = res.x
+            sol_x[ii, ~indx] = const[ii, :] / scales[ii, ~indx]
 
         except Exception as err:
             errmsg[ii] = str(err)
@@ -3271,9 +3561,9 @@ def multigausfit2d_from_dlines(
     # ---------------------------
     # Format output as dict
     dfit = {'dinput': dinput,
-            'scales': scales, 'x0_scale': x0_scale,
-            'bounds_scale': bounds_scale, 'phi2': phi2,
-            'jac': jac, 'sol_x': sol_x,
+            'scales': scales, 'x0': x0,
+            'bounds': bounds, 'phi2': phi2,
+            'jac': jac, 'sol_x': sol_x, 'indx': indx,
             'dratio': dratio, 'dshift': dshift,
             'time': time, 'success': success,
             'validity': validity, 'errmsg': np.array(errmsg),
@@ -3296,7 +3586,7 @@ def fit1d(
     xtol=None, ftol=None, gtol=None,
     max_nfev=None, loss=None, chain=None,
     dx0=None, x0_scale=None, bounds_scale=None,
-    jac=None, verbose=None, showonly=None,
+    jac=None, nworkers=None, nblocks=None, verbose=None, showonly=None,
     save=None, name=None, path=None,
     amp=None, coefs=None, ratio=None,
     Ti=None, width=None,
@@ -3345,7 +3635,8 @@ def fit1d(
             method=method, max_nfev=max_nfev,
             tr_solver=tr_solver, tr_options=tr_options,
             xtol=xtol, ftol=ftol, gtol=gtol, loss=loss,
-            chain=chain, verbose=verbose, jac=jac)
+            chain=chain, verbose=verbose, jac=jac,
+            nworkers=nworkers, nblocks=nblocks)
 
     # ----------------------
     # Optional saving
@@ -4162,25 +4453,19 @@ def get_noise_costjac(deg=None, nbsplines=None, dbsplines=None, phi=None,
         return scpinterp.BSpline(km, x, deg,
                                  extrapolate=False, axis=0)(phi) - data
 
-    jac = np.zeros((phi.size, dbsplines['nbs']), dtype=float)
-    km = dbsplines['knots_mult']
-    kpb = dbsplines['nknotsperbs']
-    lind = [(phi >= km[ii]) & (phi < km[ii+kpb-1])
-            for ii in range(dbsplines['nbs'])]
-    if sparse is True:
-        def jac_func(x, jac=jac, km=km, data=None,
-                     phi=phi, kpb=kpb, lind=lind):
-            for ii in range(x.size):
-                jac[lind[ii], ii] = scpinterp.BSpline.basis_element(
-                    km[ii:ii+kpb], extrapolate=False)(phi[lind[ii]])
-            return scpsparse.csr_matrix(jac)
-    else:
-        def jac_func(x, jac=jac, km=km, data=None,
-                     phi=phi, kpb=kpb, lind=lind):
-            for ii in range(x.size):
-                jac[lind[ii], ii] = scpinterp.BSpline.basis_element(
-                    km[ii:ii+kpb], extrapolate=False)(phi[lind[ii]])
-            return jac
+    # The jacobian does not depend on x: values of bsplines, computed once
+    # (copied at each call, least_squares() may modify it in place)
+    jac = multigausfit2d_from_dlines_bsbasis(
+        phi=phi,
+        knots_mult=dbsplines['knots_mult'],
+        nknotsperbs=dbsplines['nknotsperbs'],
+        nbs=dbsplines['nbs'],
+    )
+    if sparse is not True:
+        jac = jac.toarray()
+
+    def jac_func(x, jac=jac, data=None):
+        return jac.copy()
     return cost, jac_func
 
 
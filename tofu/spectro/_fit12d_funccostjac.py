@@ -3,7 +3,6 @@
 import numpy as np
 import scipy.optimize as scpopt
 import scipy.sparse as scpsparse
-from scipy.interpolate import BSpline
 
 # Temporary for debugging
 import matplotlib.pyplot as plt
@@ -365,21 +364,120 @@ def multigausfit1d_from_dlines_funccostjac(
 ###########################################################
 
 
-def multigausfit2d_from_dlines_funccostjac(lamb, phi,
-                                           dinput=None,
-                                           binning=None,
-                                           dind=None,
-                                           scales=None,
-                                           indok=None,
-                                           jac=None):
+def _get_lines_mat(ij=None, coefs=None):
+    """ Return a (nlines, nx) matrix summing the lines sharing a parameter
+
+    ij is the list of indices of lines depending on each parameter
+    The coefs of lines are included, so that, for any (npts, nlines) array
+    of derivatives per line, dl.dot(mat) gives the derivatives per parameter
+    """
+    mat = np.zeros((coefs.size, len(ij)), dtype=float)
+    for jj, ii in enumerate(ij):
+        mat[ii, jj] = coefs[ii]
+    return mat
+
+
+def _get_jac_pattern_2d(bs=None, dind=None, idratiox=None, idshx=None):
+    """ Return the non-zero terms of the 2d jacobian, block by block
+
+    bs is the (npts, nbs) sparse bsplines basis of the fitted points
+    The blocks are, in this order:
+        bck_amp, bck_rate, amp, width, shift, [dratio], [dshift]
+    (dratio and dshift only if they are fitted)
+
+    Return:
+        - lflat: flat indices of the terms of each block in the full
+                 (npts, sizex) jacobian
+        - lixx: indices in x of the terms of the amp, width, shift blocks
+        - row, val: row and value of the non-zero terms of bs
+    """
+    sizex = dind['sizex']
+    npts = bs.shape[0]
+    bscoo = bs.tocoo()
+
+    # bck and double: one full column each
+    lcol = [dind['bck_amp']['x'][0], dind['bck_rate']['x'][0]]
+    lcold = [ii % sizex for ii in [idratiox, idshx] if ii is not None]
+
+    # amp, width, shift: only for non-zero bsplines
+    lixx = [dind[k0]['x'][bscoo.col, :] for k0 in ['amp', 'width', 'shift']]
+    lflat = (
+        [np.arange(0, npts)*sizex + ii for ii in lcol]
+        + [bscoo.row[:, None]*sizex + ixx for ixx in lixx]
+        + [np.arange(0, npts)*sizex + ii for ii in lcold]
+    )
+    return lflat, lixx, bscoo.row, bscoo.data[:, None]
+
+
+def _get_jac_sparse_2d(lflat=None, npts=None, sizex=None, indx=None):
+    """ Return the csr structure of the 2d jacobian (free parameters only)
+
+    perm is such that, with vals the concatenated values of all blocks
+    (in the order of lflat), vals[perm] is the data of the csr_matrix
+    """
+    flat = np.concatenate([ff.ravel() for ff in lflat])
+    row, col = flat // sizex, flat % sizex
+    keep = indx[col]
+    icol = np.cumsum(indx) - 1
+    jac = scpsparse.csr_matrix(
+        (
+            np.arange(1, keep.sum()+1, dtype=float),
+            (row[keep], icol[col[keep]]),
+        ),
+        shape=(npts, indx.sum()),
+    )
+    perm = keep.nonzero()[0][jac.data.astype(int) - 1]
+    return jac, perm
+
+
+def multigausfit2d_from_dlines_jac_sparsity(
+    indok=None,
+    indx=None,
+    dinput=None,
+    dind=None,
+):
+    """ Return the sparsity structure of the 2d jacobian, as a csr_matrix
+
+    For least_squares(jac_sparsity=...), with jac = '2-point' or '3-point'
+    indok is the (flattened) boolean array of fitted points
+    """
+    idratiox, idshx = None, None
+    if dinput['double'] is not False:
+        c0 = dinput['double'] is True
+        if c0 or dinput['double'].get('dratio') is None:
+            idratiox = dind['dratio']['x']
+        if c0 or dinput['double'].get('dshift') is None:
+            idshx = dind['dshift']['x']
+    if indx is None:
+        indx = np.ones((dind['sizex'],), dtype=bool)
+
+    bs = dinput['bs_basis'][np.ravel(indok).nonzero()[0], :]
+    lflat = _get_jac_pattern_2d(
+        bs=bs, dind=dind, idratiox=idratiox, idshx=idshx,
+    )[0]
+    jac = _get_jac_sparse_2d(
+        lflat=lflat, npts=bs.shape[0], sizex=dind['sizex'], indx=indx,
+    )[0]
+    jac.data[:] = 1.
+    return jac
+
+
+def multigausfit2d_from_dlines_funccostjac(
+    lamb,
+    phi,
+    indx=None,
+    dinput=None,
+    dind=None,
+    scales=None,
+    jac=None,
+):
 
     if jac is None:
         jac = _JAC
 
-    ibckx = dind['bck']['x']
-    iax = dind['amp']['x']
-    iwx = dind['width']['x']
-    ishx = dind['shift']['x']
+    ibckax = dind['bck_amp']['x']
+    ibckrx = dind['bck_rate']['x']
+    nbck = 1    # ibckax.size + ibckrx.size
     idratiox, idshx = None, None
     if dinput['double'] is not False:
         c0 = dinput['double'] is True
@@ -404,60 +502,97 @@ def multigausfit2d_from_dlines_funccostjac(lamb, phi,
     offsetwl = dinput['width']['offset']
     offsetsl = dinput['shift']['offset']
 
-    # If no binning => no fast indexing on lamb / phi (e.g.: for sparse)
-    km = dinput['knots_mult']
-    kpb = dinput['nknotsperbs']
-    nbs = dinput['nbs']
-
-    # bsplines-specific
-    phicost = phi[indok].ravel()
-    lambnormcost = lamb[indok].ravel()[:, None] / dinput['lines'][None, :]
-    libs = np.array([((phicost >= km[ii]) & (phicost <= km[ii+kpb-1]))
-                     for ii in range(nbs)])
-    lbs = [BSpline.basis_element(
-        km[ii:ii+kpb],
-        extrapolate=False)(phicost[libs[ii]])[:, None]
-           for ii in range(nbs)]
-    BS = BSpline(km, np.ones(ial.shape, dtype=float), dinput['deg'],
-                 extrapolate=False, axis=0)
-
-    lcond = [np.any(np.isnan(bs)) for bs in lbs]
-    if np.any(lcond):
-        msg = ("Some nan have been detected in the jacobian!\n"
-               + "\t- lbs[{}]".format(lcond.index(True)))
+    # bsplines values at phi: sparse (npts, nbs), pre-computed in dinput
+    bsbasis = dinput['bs_basis']
+    if bsbasis is False or bsbasis.shape[0] != phi.size:
+        msg = (
+            "dinput['bs_basis'] does not match phi!\n"
+            + "\t- phi.size: {}\n".format(phi.size)
+            + "\t- dinput['bs_basis']: {}\n".format(bsbasis)
+            + "  => Please re-compute dinput with fit2d_dinput()"
+        )
         raise Exception(msg)
 
-    # func_details returns result in same shape as input
-    def func_detail(x, phi=phi,
-                    lambnorm=lamb[..., None]/dinput['lines'][None, ...],
-                    ibckx=ibckx,
-                    ial=ial,
-                    iwl=iwl,
-                    ishl=ishl,
-                    idratiox=idratiox,
-                    idshx=idshx,
-                    nlines=dinput['nlines'],
-                    km=km, kpb=kpb, nbs=nbs,
-                    deg=dinput['deg'],
-                    BS=BS,
-                    nbck=int(ibckx.size/dinput['nbs']),
-                    coefsal=coefsal[None, :],
-                    coefswl=coefswl[None, :],
-                    coefssl=coefssl[None, :],
-                    double=dinput['double'],
-                    scales=None,
-                    indok=None,
-                    indbs=None):
+    lambrel = (lamb - np.nanmin(lamb)).ravel()
+    lambnorm = lamb.ravel()[:, None]/dinput['lines'][None, :]
+
+    xscale = np.full((dind['sizex'],), np.nan)
+    if indx is None:
+        indx = np.ones((dind['sizex'],), dtype=bool)
+
+    # Matrices summing the lines sharing a parameter (jacobian)
+    mata = _get_lines_mat(iaj, coefsal)
+    matw = _get_lines_mat(iwj, coefswl)
+    mats = _get_lines_mat(ishj, coefssl)
+
+    # Quantities depending only on indok, re-computed only if indok changes
+    # (i.e.: once per spectrum, not once per iteration)
+    dindok = {'indok': None}
+
+    def get_indok(indok, dindok=dindok):
         if indok is None:
-            indok = np.ones(phi.shape, dtype=bool)
-        shape = tuple(np.r_[phi.shape, nbck+nlines, nbs])
+            indok = np.ones((lambrel.size,), dtype=bool)
+        else:
+            indok = np.ravel(indok)
+        c0 = (
+            dindok['indok'] is None
+            or not np.array_equal(indok, dindok['indok'])
+        )
+        if c0:
+            bs = bsbasis[indok.nonzero()[0], :]
+            lflat, lixx, row, val = _get_jac_pattern_2d(
+                bs=bs, dind=dind, idratiox=idratiox, idshx=idshx,
+            )
+            dindok.update({
+                'indok': indok,
+                'bs': bs,
+                'row': row,
+                'val': val,
+                'lixx': lixx,
+                'lflat': lflat,
+                'lambrel': lambrel[indok],
+                'lambnorm': lambnorm[indok, :],
+                'jac0': None,
+                'jacsp': None,
+            })
+        return dindok
+
+    # func_details returns result in same shape as input
+    def func_detail(
+        x,
+        xscale=xscale,
+        indx=indx,
+        ibckax=ibckax,
+        ibckrx=ibckrx,
+        ial=ial,
+        iwl=iwl,
+        ishl=ishl,
+        idratiox=idratiox,
+        idshx=idshx,
+        nlines=dinput['nlines'],
+        nbck=nbck,
+        coefsal=coefsal[None, :],
+        coefswl=coefswl[None, :],
+        coefssl=coefssl[None, :],
+        offsetal=offsetal[None, :],
+        offsetwl=offsetwl[None, :],
+        offsetsl=offsetsl[None, :],
+        double=dinput['double'],
+        scales=None,
+        indok=None,
+        const=None,
+    ):
+        dd = get_indok(indok)
+        bs, lambnorm = dd['bs'], dd['lambnorm']
+        shape = tuple(np.r_[lambnorm.shape[0], nbck+nlines])
         y = np.full(shape, np.nan)
-        xscale = x*scales
-        # make sure iwl is 2D to get all lines at once
-        BS.c = xscale[iwl] * coefswl
-        wi2 = BS(phi)
-        BS.c = xscale[ishl] * coefssl
-        shift = BS(phi)
+        xscale[indx] = x*scales[indx]
+        xscale[~indx] = const
+
+        # Prepare (all bsplines at once)
+        amp = bs.dot(xscale[ial])*coefsal + offsetal
+        wi2 = bs.dot(xscale[iwl])*coefswl + offsetwl
+        shift = bs.dot(xscale[ishl])*coefssl + offsetsl
         exp = np.exp(-(lambnorm - (1 + shift))**2 / (2*wi2))
 
         if double is not False:
@@ -470,173 +605,135 @@ def multigausfit2d_from_dlines_funccostjac(lamb, phi,
                 dshift = shift + double.get('dshift', xscale[idshx])
             expd = np.exp(-(lambnorm - (1 + dshift))**2 / (2*wi2))
 
-        # Loop on individual bsplines for amp
-        for ii in range(nbs):
-            bs = BSpline.basis_element(km[ii:ii+kpb],
-                                       extrapolate=False)(phi)
-
-            indbs = ~np.isnan(bs)
-            bs = bs[indbs]
-            y[indbs, 0, ii] = xscale[ibckx[ii]]*bs
-            for jj in range(nlines):
-                amp = bs * xscale[ial[ii, jj]] * coefsal[0, jj]
-                y[indbs, nbck+jj, ii] = amp * exp[indbs, jj]
-                if double is not False:
-                    y[indbs, nbck+jj, ii] += (amp * dratio * expd[indbs, jj])
+        # compute y
+        y[:, :nbck] = (
+            xscale[ibckax]
+            * np.exp(xscale[ibckrx]*dd['lambrel'])
+        )[:, None]
+        y[:, nbck:] = amp * exp
+        if double is not False:
+            y[:, nbck:] += amp * dratio * expd
         return y
 
     # cost and jacob return flattened results (for least_squares())
-    def cost(x, phi=phicost,
-             lambnorm=lambnormcost,
-             ibckx=ibckx,
-             ial=ial,
-             iwl=iwl,
-             ishl=ishl,
-             idratiox=idratiox,
-             idshx=idshx,
-             km=km, kpb=kpb,
-             deg=dinput['deg'],
-             scales=scales,
-             coefsal=coefsal[None, :],
-             coefswl=coefswl[None, :],
-             coefssl=coefssl[None, :],
-             double=dinput['double'],
-             indok_var=None, ind_bs=None, data=0.):
-
-        xscale = x*scales
-
-        # Background
-        y = BSpline(km, xscale[ibckx], deg,
-                    extrapolate=False, axis=0)(phi)
+    def cost(
+        x,
+        xscale=xscale,
+        indx=indx,
+        ibckax=ibckax,
+        ibckrx=ibckrx,
+        ial=ial,
+        iwl=iwl,
+        ishl=ishl,
+        idratiox=idratiox,
+        idshx=idshx,
+        scales=scales,
+        coefsal=coefsal[None, :],
+        coefswl=coefswl[None, :],
+        coefssl=coefssl[None, :],
+        offsetal=offsetal[None, :],
+        offsetwl=offsetwl[None, :],
+        offsetsl=offsetsl[None, :],
+        double=dinput['double'],
+        indok=None,
+        const=None,
+        data=0.,
+    ):
+        dd = get_indok(indok)
+        bs, lambnorm = dd['bs'], dd['lambnorm']
+
+        # xscale = x*scales
+        xscale[indx] = x*scales[indx]
+        xscale[~indx] = const
 
         # make sure iwl is 2D to get all lines at once
-        amp = BSpline(km, xscale[ial] * coefsal, deg,
-                      extrapolate=False, axis=0)(phi)
-        wi2 = BSpline(km, xscale[iwl] * coefswl, deg,
-                      extrapolate=False, axis=0)(phi)
-        csh = xscale[ishl] * coefssl
-        y += np.nansum((amp
-                        * np.exp(-(lambnormcost
-                                   - (1 + BSpline(km, csh, deg,
-                                                  extrapolate=False,
-                                                  axis=0)(phi)))**2
-                                 / (2*wi2))),
-                       axis=1)
-        import pdb; pdb.set_trace()    # DB
+        amp = bs.dot(xscale[ial])*coefsal + offsetal
+        inv_2wi2 = 1./(2.*(bs.dot(xscale[iwl])*coefswl + offsetwl))
+        shift = bs.dot(xscale[ishl])*coefssl + offsetsl
+        y = (
+            np.nansum(
+                amp * np.exp(-(lambnorm - (1 + shift))**2 * inv_2wi2),
+                axis=1,
+            )
+            + xscale[ibckax]*np.exp(xscale[ibckrx]*dd['lambrel'])
+        )
         if double is not False:
             if double is True:
                 dratio = xscale[idratiox]
                 # scales[ishl] or scales[idshx] ? coefssl ? +> no
-                csh = csh + xscale[idshx]
+                dshift = shift + xscale[idshx]
             else:
                 dratio = double.get('dratio', xscale[idratiox])
-                csh = csh + double.get('dshift', xscale[idshx])
+                dshift = shift + double.get('dshift', xscale[idshx])
 
             y += np.nansum((amp * dratio
-                            * np.exp(-(lambnormcost
-                                       - (1 + BSpline(
-                                           km, csh, deg,
-                                           extrapolate=False,
-                                           axis=0)(phi)))**2
-                                     / (2*wi2))),
-                           axis=1)
-        return y - data
+                            * np.exp(-(lambnorm - (1 + dshift))**2
+                                     * inv_2wi2)), axis=1)
+
+        if isinstance(data, np.ndarray):
+            return y - data.ravel()[dd['indok']]
+        else:
+            return y - data
 
     # Prepare jac
     if jac in ['dense', 'sparse']:
-        # Define a callable jac returning (nlamb, sizex) matrix of partial
+        # Define a callable jac returning (npts, sizex) matrix of partial
         # derivatives of np.sum(func_details(scaled), axis=0)
+        # Only its non-zero terms are computed (see _get_jac_pattern_2d())
+        # If sparse, returned as a csr_matrix (memory ~ nb. of non-zero)
 
-        # Pre-instanciate jacobian
-        jac0 = np.zeros((phicost.size, dind['sizex']), dtype=float)
-
-        def jacob(x, lambnorm=lambnormcost, phi=phicost,
-                  ibckx=ibckx,
-                  iax=iax, iaj=iaj, ial=ial,
-                  iwx=iwx, iwj=iwj, iwl=iwl,
-                  ishx=ishx, ishj=ishj, ishl=ishl,
-                  idratiox=idratiox, idshx=idshx,
-                  km=km, kpb=kpb, nbs=nbs,
-                  coefsal=coefsal[None, :],
-                  coefswl=coefswl[None, :],
-                  coefssl=coefssl[None, :],
-                  double=dinput['double'],
-                  scales=None, indok_var=None, data=None,
-                  jac0=jac0, lbs=lbs, libs=libs, BS=BS):
+        def jacob(
+            x,
+            xscale=xscale,
+            indx=indx,
+            ibckax=ibckax,
+            ibckrx=ibckrx,
+            ial=ial, mata=mata,
+            iwl=iwl, matw=matw,
+            ishl=ishl, mats=mats,
+            idratiox=idratiox, idshx=idshx,
+            coefsal=coefsal[None, :],
+            coefswl=coefswl[None, :],
+            coefssl=coefssl[None, :],
+            offsetal=offsetal[None, :],
+            offsetwl=offsetwl[None, :],
+            offsetsl=offsetsl[None, :],
+            double=dinput['double'],
+            allx=np.all(indx),
+            sparse=jac == 'sparse',
+            scales=None, indok=None, data=None,
+            const=None,
+        ):
             """ Basic docstr """
-            xscale = x*scales
+            dd = get_indok(indok)
+            bs, lambnorm, lambrel = dd['bs'], dd['lambnorm'], dd['lambrel']
+            xscale[indx] = x*scales[indx]
+            xscale[~indx] = const
 
             # Intermediates
+            amp = bs.dot(xscale[ial])*coefsal + offsetal
+            wi2 = bs.dot(xscale[iwl])*coefswl + offsetwl
+            inv_wi2 = 1./wi2
+            shift = bs.dot(xscale[ishl])*coefssl + offsetsl
+            beta = (lambnorm - (1 + shift)) * inv_wi2 / 2.
+            alpha = -beta**2 * (2*wi2)
+            exp = np.exp(alpha)
 
-            # Loop on bs
-            for ii in range(nbs):
-                bs = lbs[ii]
-
-                # Intermediates
-                BS.c = xscale[ial] * coefsal
-                amp = BS(phi[libs[ii]])
-                BS.c = xscale[iwl] * coefswl
-                wi2 = BS(phi[libs[ii]])
-                BS.c = xscale[ishl] * coefssl
-                shift = BS(phi[libs[ii]])
-                beta = (lambnorm[libs[ii], :] - (1 + shift)) / (2*wi2)
-                alpha = -beta**2 * (2*wi2)
-                # exp = np.exp(alpha)
-                bsexp = bs * np.exp(alpha)
-
-                # Background
-                jac0[libs[ii], ibckx[ii]] = bs[:, 0] * scales[ibckx[ii]]
-
-                # amp (shape: nphi/lamb, namp[jj])
-                for jj in range(len(iaj)):
-                    ix = iax[ii, jj]
-                    # jac0[libs[ii], ix] = np.sum(
-                    # (bs * exp[:, iaj[jj]] * scales[ix]
-                    # * coefsal[0:1, iaj[jj]]),
-                    # axis=1)
-                    jac0[libs[ii], ix] = np.sum(
-                        bsexp[:, iaj[jj]] * coefsal[:, iaj[jj]],
-                        axis=1) * scales[ix]
-
-                # width2
-                for jj in range(len(iwj)):
-                    ix = iwx[ii, jj]
-                    # jac0[libs[ii], ix] = np.sum(
-                    # (amp[:, iwj[jj]]
-                    # * (-alpha[:, iwj[jj]]
-                    # * bs * exp[:, iwj[jj]] * scales[ix]
-                    # * coefswl[0:1, iwj[jj]]
-                    # / wi2[:, iwj[jj]])),
-                    # axis=1)
-                    jac0[libs[ii], ix] = np.sum(
-                        (
-                            -alpha[:, iwj[jj]] * amp[:, iwj[jj]]
-                            * bsexp[:, iwj[jj]] * coefswl[:, iwj[jj]]
-                            / wi2[:, iwj[jj]]
-                        ),
-                        axis=1,
-                    ) * scales[ix]
+            # Background
+            expbck = np.exp(xscale[ibckrx]*lambrel)
+            lval = [
+                scales[ibckax[0]] * expbck,
+                xscale[ibckax[0]] * scales[ibckrx[0]] * lambrel * expbck,
+            ]
 
-                # shift
-                for jj in range(len(ishj)):
-                    ix = ishx[ii, jj]
-                    # jac0[libs[ii], ix] = np.sum(
-                    # (amp[:, ishj[jj]]
-                    # * 2.*beta[:, ishj[jj]]
-                    # * bs * exp[:, ishj[jj]] * scales[ix]
-                    # * coefssl[0:1, ishj[jj]]),
-                    # axis=1)
-                    jac0[libs[ii], ix] = np.sum(
-                        (
-                            amp[:, ishj[jj]] * 2. * beta[:, ishj[jj]]
-                            * bsexp[:, ishj[jj]] * coefssl[:, ishj[jj]]
-                        ),
-                        axis=1,
-                    ) * scales[ix]
+            # derivatives per line (without bsplines and coefs)
+            da = exp
+            dw = -alpha * amp * exp * inv_wi2
+            ds = amp * 2. * beta * exp
 
-                # double
-                if double is False:
-                    continue
+            # double
+            lvald = []
+            if double is not False:
 
                 if double is True:
                     dratio = xscale[idratiox]
@@ -645,213 +742,61 @@ def multigausfit2d_from_dlines_funccostjac(lamb, phi,
                 else:
                     dratio = double.get('dratio', xscale[idratiox])
                     dshift = shift + double.get('dshift', xscale[idshx])
-
-                # ampd = amp*dratio
-                betad = (lambnorm[libs[ii], :] - (1 + dshift)) / (2*wi2)
+                # ampd not defined to save memory => *dratio instead
+                betad = (lambnorm - (1 + dshift)) * inv_wi2 / 2.
                 alphad = -betad**2 * (2*wi2)
                 expd = np.exp(alphad)
-                bsexpd = bs * expd
-
-                # amp
-                for jj in range(len(iaj)):
-                    ix = iax[ii, jj]
-                    # jac0[libs[ii], ix] += dratio*np.sum(
-                    # (bs * scales[ix] * coefsal[0:1, iaj[jj]]
-                    # * expd[:, iaj[jj]]),
-                    # axis=1)
-                    jac0[libs[ii], ix] += dratio*np.sum(
-                        bsexpd[:, iaj[jj]] * coefsal[:, iaj[jj]],
-                        axis=1) * scales[ix]
-
-                # width2
-                for jj in range(len(iwj)):
-                    ix = iwx[ii, jj]
-                    # jac0[libs[ii], ix] += np.sum(
-                    # (ampd[:, iwj[jj]]
-                    # * (-alphad[:, iwj[jj]]
-                    # * bs * scales[ix] * coefswl[0:1, iwj[jj]]
-                    # / wi2[:, iwj[jj]])
-                    # * expd[:, iwj[jj]]),
-                    # axis=1)
-                    jac0[libs[ii], ix] += np.sum(
-                        (-alphad[:, iwj[jj]] * amp[:, iwj[jj]]
-                         * bsexpd[:, iwj[jj]] * coefswl[:, iwj[jj]]
-                         / wi2[:, iwj[jj]]), axis=1) * scales[ix] * dratio
 
-                # shift
-                for jj in range(len(ishj)):
-                    ix = ishx[ii, jj]
-                    # jac0[libs[ii], ix] += np.sum(
-                    # (ampd[:, ishj[jj]]
-                    # * 2.*betad[:, ishj[jj]]
-                    # * bs * scales[ix] * coefssl[0:1, ishj[jj]]
-                    # * expd[:, ishj[jj]]),
-                    # axis=1)
-                    jac0[libs[ii], ix] += np.sum(
-                        (amp[:, ishj[jj]] * 2.*betad[:, ishj[jj]]
-                         * bsexpd[:, ishj[jj]] * coefssl[:, ishj[jj]]),
-                        axis=1) * scales[ix] * dratio
+                da = da + dratio * expd
+                dw = dw - dratio * alphad * amp * expd * inv_wi2
+                ds = ds + dratio * amp * 2. * betad * expd
 
                 # dratio
-                if double is True or double.get('dratio') is None:
-                    jac0[libs[ii], idratiox] = (scales[idratiox]
-                                                * np.sum(amp * expd, axis=1))
+                if idratiox is not None:
+                    lvald.append(
+                        scales[idratiox] * np.sum(amp * expd, axis=1)
+                    )
 
                 # dshift
-                if double is True or double.get('dshift') is None:
-                    jac0[libs[ii], idshx] = dratio * np.sum(
-                        amp * 2.*betad*scales[idshx] * expd, axis=1)
-            return jac0
-
-    elif jac == 'sparse':
-
-        msg = ""
-        raise Exception(msg)
-
-        # Define a callable jac returning (nlamb, sizex) matrix of partial
-        # derivatives of np.sum(func_details(scaled), axis=0)
-
-        # Pre-instanciate jacobian
-        # libsT = libs.T
-        # indflat = np.flatnonzero(libsT)
-        # row_ind, col_ind = libsT.nonzero()
-        # libsi = [indflat[col_ind==ii] for ii in range(nbs)]
-
-        # jac0 = scpsparse.csr_matrix((libsT[libsT].astype(float),
-        # (row_ind, col_ind)),
-        # shape=libsT.shape)
-
-        # def jacob(x, lamb=lambcost, phi=phicost,
-        # ibckx=ibckx,
-        # iax=iax, iaj=iaj, ial=ial,
-        # iwx=iwx, iwj=iwj, iwl=iwl,
-        # ishx=ishx, ishj=ishj, ishl=ishl,
-        # idratiox=idratiox, idshx=idshx,
-        # lines=dinput['lines'][None, :],
-        # km=km, kpb=kpb, nbs=nbs,
-        # deg=dinput['deg'],
-        # coefsal=coefsal[None, :],
-        # coefswl=coefswl[None, :],
-        # coefssl=coefssl[None, :],
-        # double=dinput['double'],
-        # scales=None, indok_var=None, data=None,
-        # jac0=jac0, lbs=lbs, libsi=libsi):
-        # """ Basic docstr """
-        # xscale = x*scales
-
-        # # Intermediates
-
-    # # Loop on bs
-    # for ii in range(nbs):
-        # bs = lbs[ii]
-
-        # # Intermediates
-        # amp = BSpline(km, xscale[ial] * coefsal, deg,
-        # extrapolate=False, axis=0)(phi[libs[ii]])
-        # wi2 = BSpline(km, xscale[iwl] * coefswl, deg,
-        # extrapolate=False, axis=0)(phi[libs[ii]])
-        # shift = BSpline(km, xscale[ishl] * coefssl, deg,
-        # extrapolate=False, axis=0)(phi[libs[ii]])
-        # beta = (lamb[libs[ii], :]/lines - (1 + shift)) / (2*wi2)
-        # alpha = -beta**2 * (2*wi2)
-        # exp = np.exp(alpha)
-
-        # # Background
-        # import ipdb; ipdb.set_trace()       # DB
-        # jac0.data[libsi[ibckx[ii]]] = bs[:, 0] * scales[ibckx[ii]]
-        # #jac0[libs[ii], ibckx[ii]] = bs[:, 0] * scales[ibckx[ii]]
-
-        # # amp
-        # for jj in range(len(iaj)):
-        # ix = iax[ii, jj]
-        # jac0.data[libs[ii], ix] = np.sum(
-        # (bs * exp[:, iaj[jj]] * scales[ix]
-        # * coefsal[0:1, iaj[jj]]),
-        # axis=1)
-
-        # # width2
-        # for jj in range(len(iwj)):
-        # ix = iwx[ii, jj]
-        # jac0[libs[ii], ix] = np.sum(
-        # (amp[:, iwj[jj]]
-        # * (-alpha[:, iwj[jj]]
-        # * bs * exp[:, iwj[jj]] * scales[ix]
-        # * coefswl[0:1, iwj[jj]]
-        # / wi2[:, iwj[jj]])),
-        # axis=1)
-
-        # # shift
-        # for jj in range(len(ishj)):
-        # ix = ishx[ii, jj]
-        # jac0[libs[ii], ix] = np.sum(
-        # (amp[:, ishj[jj]]
-        # * 2.*beta[:, ishj[jj]]
-        # * bs * exp[:, ishj[jj]] * scales[ix]
-        # * coefssl[0:1, ishj[jj]]),
-        # axis=1)
-
-        # # double
-        # if double is False:
-        # continue
-
-        # if double is True:
-        # dratio = xscale[idratiox]
-        # # coefssl are line-specific, they do not affect dshift
-        # shiftd = shift + xscale[idshx]
-        # else:
-        # if double.get('dratio') is None:
-        # dratio = xscale[idratiox]
-        # else:
-        # dratio = double.get('dratio')
-        # if double.get('dshift') is None:
-        # shiftd = shift + xscale[idshx]
-        # else:
-        # shiftd = shift + double.get('dshift')
-
-        # ampd = amp*dratio
-        # betad = (lamb[libs[ii]]/lines - (1 + shiftd)) / (2*wi2)
-        # alphad = -betad**2 * (2*wi2)
-        # expd = np.exp(alphad)
-
-        # # amp
-        # for jj in range(len(iaj)):
-        # ix = iax[ii, jj]
-        # jac0[libs[ii], ix] += dratio*np.sum(
-        # (bs * scales[ix] * coefsal[0:1, iaj[jj]]
-        # * expd[:, iaj[jj]]),
-        # axis=1)
-
-        # # width2
-        # for jj in range(len(iwj)):
-        # ix = iwx[ii, jj]
-        # jac0[libs[ii], ix] += np.sum(
-        # (ampd[:, iwj[jj]]
-        # * (-alphad[:, iwj[jj]]
-        # * bs * scales[ix] * coefswl[0:1, iwj[jj]]
-        # / wi2[:, iwj[jj]])
-        # * expd[:, iwj[jj]]),
-        # axis=1)
-
-        # # shift
-        # for jj in range(len(ishj)):
-        # ix = ishx[ii, jj]
-        # jac0[libs[ii], ix] += np.sum(
-        # (ampd[:, ishj[jj]]
-        # * 2.*betad[:, ishj[jj]]
-        # * bs * scales[ix] * coefssl[0:1, ishj[jj]]
-        # * expd[:, ishj[jj]]),
-        # axis=1)
-
-        # # dratio
-        # if double is True or double.get('dratio') is None:
-        # jac0[libs[ii], idratiox] = (scales[idratiox]
-        # *np.sum(amp*expd, axis=1))
-
-        # # dshift
-        # if double is True or double.get('dshift') is None:
-        # jac0[libs[ii], idshx] = np.sum(
-        # ampd * 2.*betad*scales[idshx] * expd, axis=1)
-        # return jac0[indok, :]
+                if idshx is not None:
+                    lvald.append(dratio * np.sum(
+                        amp * 2.*betad*scales[idshx] * expd, axis=1))
+
+            # amp, width2, shift: only the non-zero bsplines of each point
+            row, val = dd['row'], dd['val']
+            for ii, (dl, mat) in enumerate([(da, mata), (dw, matw),
+                                            (ds, mats)]):
+                lval.append(
+                    val * dl.dot(mat)[row, :] * scales[dd['lixx'][ii]]
+                )
+            lval += lvald
+
+            # sparse: csr structure computed once per indok
+            if sparse is True:
+                if dd['jacsp'] is None:
+                    dd['jacsp'] = _get_jac_sparse_2d(
+                        lflat=dd['lflat'], npts=lambrel.size,
+                        sizex=xscale.size, indx=indx,
+                    )
+                jacsp, perm = dd['jacsp']
+                vals = np.concatenate([vv.ravel() for vv in lval])
+                return scpsparse.csr_matrix(
+                    (vals[perm], jacsp.indices, jacsp.indptr),
+                    shape=jacsp.shape,
+                )
+
+            # dense: jac0 is re-used (all its non-zero terms are updated)
+            if dd['jac0'] is None:
+                dd['jac0'] = np.zeros(
+                    (lambrel.size, xscale.size), dtype=float,
+                )
+            jac0flat = dd['jac0'].ravel()
+            for flat, vv in zip(dd['lflat'], lval):
+                jac0flat[flat] = vv
+            if allx:
+                return dd['jac0']
+            else:
+                return dd['jac0'][:, indx]
 
     if jac not in ['dense', 'sparse', 'LinearSparseOperator']:
         if jac not in ['2-point', '3-point']:
@@ -3,6 +3,7 @@ This module contains tests for tofu.geom in its structured version
 """
 
 # External modules
+import warnings
 import numpy as np
 # ToFu-specific
 import tofu.geom._GG as GG
@@ -1910,3 +1911,161 @@ def test24_is_visible(debug=0):
 
         print(are_vis)
         print(np.shape(are_vis))
+
+
+def test25_LOS_PInOut_many_structs():
+    # Many small limited structures, to make sure the bounding volume
+    # hierarchy used to cull the structures does not depend on their order
+    VP = np.array([[4., 9., 9., 4., 4.], [-3., -3., 3., 3., -3.]])
+    VIn = np.array([[0., -1., 0., 1.], [1., 0., -1., 0.]])
+    nstruct = 30
+    rr = np.linspace(4.5, 8.5, nstruct)
+    zz = 2.5*np.sin(np.arange(0, nstruct))
+    lphi = np.linspace(-np.pi, np.pi, nstruct, endpoint=False)
+    lpoly = [np.array([[r0, r0+0.2, r0+0.2, r0, r0],
+                       [z0, z0, z0+0.2, z0+0.2, z0]])
+             for r0, z0 in zip(rr, zz)]
+    llims = [None if ii % 3 == 0
+             else np.asarray([np.r_[lphi[ii], lphi[ii] + 0.5]])
+             for ii in range(nstruct)]
+    lnlim = np.array([0 if ii % 3 == 0 else 1 for ii in range(nstruct)])
+    # LOS
+    nlos = 500
+    phi = np.linspace(-np.pi, np.pi, nlos)
+    Ds = np.array([10.*np.cos(phi), 10.*np.sin(phi), np.cos(5*phi)])
+    us = np.array([5.*np.cos(phi+0.3), 5.*np.sin(phi+0.3),
+                   2.*np.sin(7*phi)]) - Ds
+    us = np.ascontiguousarray(us / np.sqrt(np.sum(us**2, axis=0)))
+    Ds = np.ascontiguousarray(Ds)
+
+    def calc(order):
+        return GG.LOS_Calc_PInOut_VesStruct(
+            Ds, us, VP, VIn,
+            ves_lims=None,
+            nstruct_tot=len(order),
+            nstruct_lim=len(order),
+            lnvert=np.cumsum(np.full((len(order),), 5, dtype=int)),
+            lstruct_polyx=np.concatenate([lpoly[ii][0] for ii in order]),
+            lstruct_polyy=np.concatenate([lpoly[ii][1] for ii in order]),
+            lstruct_nlim=lnlim[order],
+            lstruct_lims=[llims[ii] for ii in order],
+            lstruct_normx=np.tile(VIn[0], len(order)),
+            lstruct_normy=np.tile(VIn[1], len(order)),
+            ves_type='Tor', test=True,
+        )
+
+    lout = [calc(order) for order in [np.arange(0, nstruct),
+                                      np.arange(0, nstruct)[::-1]]]
+    kPIn, kPOut, VperpOut, IOut = lout[0]
+    # some LOS must be stopped by the structures
+    assert np.any(IOut[0, :] > 0)
+    assert np.allclose(kPIn, lout[1][0], equal_nan=True)
+    assert np.allclose(kPOut, lout[1][1], equal_nan=True)
+    assert np.allclose(VperpOut, lout[1][2], equal_nan=True)
+    indok = IOut[0, :] > 0
+    assert np.all(IOut[0, indok] == nstruct + 1 - lout[1][3][0, indok])
+
+    # Reference without culling: one structure at a time (single box)
+    lref = [calc(np.r_[ii]) for ii in range(nstruct)]
+    kPOutref = np.array([out[1] for out in lref])
+    indref = np.argmin(kPOutref, axis=0)
+    ilos = np.arange(0, nlos)
+    assert all([np.allclose(kPIn, out[0], equal_nan=True) for out in lref])
+    assert np.allclose(kPOut, kPOutref[indref, ilos])
+    VperpOutref = np.array([out[2] for out in lref])
+    assert np.allclose(VperpOut, VperpOutref[indref, :, ilos].T)
+    IOutref = np.array([out[3] for out in lref])[indref, :, ilos].T
+    IOutref[0, indok] = indref[indok] + 1
+    assert np.array_equal(IOut, IOutref)
+
+
+def test26_LOS_calc_signal_chunks():
+    # Streaming blocks of points and times must give the same signal as the
+    # default 'calls' algorithm, whatever the budgets
+    nlos = 7
+    Ds = np.ascontiguousarray(np.tile([[3.], [0.], [0.]], (1, nlos)))
+    us = np.array([-np.ones((nlos,)),
+                   np.linspace(-0.2, 0.2, nlos),
+                   np.linspace(-0.1, 0.1, nlos)])
+    us = np.ascontiguousarray(us / np.sqrt(np.sum(us**2, axis=0)))
+    lims = np.ascontiguousarray([np.zeros((nlos,)),
+                                 np.linspace(1., 2., nlos)])
+    t = np.linspace(0., 1., 11)
+
+    def func(pts, t=None, vect=None):
+        val = np.exp(-(np.hypot(pts[0, :], pts[1, :]) - 2.)**2)
+        tt = np.atleast_1d(0. if t is None else t)
+        val = val[None, :] * (1. + tt[:, None])
+        if vect is not None:
+            val = val * np.abs(vect[0, :])[None, :]
+        return val
+
+    for method in ['sum', 'simps', 'romb']:
+        for tt in [None, t]:
+            for ani in [False, True]:
+                sigref = GG.LOS_calc_signal(func, Ds, us, 0.01, lims,
+                                            method=method, ani=ani, t=tt,
+                                            minimize='calls')
+                for (cpts, ct) in [(None, None), (50, 3), (120, None),
+                                   (1, 1)]:
+                    sig = GG.LOS_calc_signal(func, Ds, us, 0.01, lims,
+                                             method=method, ani=ani, t=tt,
+                                             minimize='chunks',
+                                             chunk_pts=cpts, chunk_t=ct)
+                    assert sig.shape == sigref.shape
+                    assert np.allclose(sig, sigref)
+
+
+def test27_LOS_calc_signal_adaptive():
+    # Adaptive quadrature must meet the tolerance with much fewer calls to
+    # func than a fixed fine step, on a profile with a steep edge
+    nlos = 7
+    Ds = np.ascontiguousarray(np.tile([[3.5], [0.], [0.]], (1, nlos)))
+    us = np.array([-np.ones((nlos,)),
+                   np.linspace(-0.3, 0.3, nlos),
+                   np.linspace(-0.2, 0.2, nlos)])
+    us = np.ascontiguousarray(us / np.sqrt(np.sum(us**2, axis=0)))
+    lims = np.ascontiguousarray([np.zeros((nlos,)),
+                                 np.linspace(1.5, 3., nlos)])
+    t = np.linspace(0., 1., 5)
+    lnpts = []
+
+    def func(pts, t=None, vect=None):
+        lnpts.append(pts.shape[1])
+        rho = np.hypot(np.hypot(pts[0, :], pts[1, :]) - 2.4, pts[2, :])
+        val = np.clip(1. - rho**2, 0., None) * (rho < 0.8)
+        tt = np.atleast_1d(0. if t is None else t)
+        val = val[None, :] * (1. + tt[:, None])
+        if vect is not None:
+            val = val * np.abs(vect[0, :])[None, :]
+        return val
+
+    for tt in [None, t]:
+        for ani in [False, True]:
+            sigref = GG.LOS_calc_signal(func, Ds, us, 1.e-6, lims,
+                                        method='sum', ani=ani, t=tt)
+            del lnpts[:]
+            sig = GG.LOS_calc_signal(func, Ds, us, 0.05, lims,
+                                     method='adaptive', ani=ani, t=tt,
+                                     tol=1.e-5)
+            assert sig.shape == sigref.shape
+            assert np.allclose(sig, sigref, rtol=1.e-4, atol=0.)
+            assert sum(lnpts) < 0.01*nlos*3./1.e-6
+
+    # A zero-length LOS has a null signal and must not be refined
+    Ds2 = np.ascontiguousarray(Ds[:, :2])
+    us2 = np.ascontiguousarray(us[:, :2])
+    lims2 = np.ascontiguousarray([[0., 1.], [2., 1.]])
+    del lnpts[:]
+    sig1 = GG.LOS_calc_signal(func, np.ascontiguousarray(Ds2[:, :1]),
+                              np.ascontiguousarray(us2[:, :1]), 0.05,
+                              np.ascontiguousarray(lims2[:, :1]),
+                              method='adaptive', tol=1.e-5)
+    npts1 = sum(lnpts)
+    del lnpts[:]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        sig = GG.LOS_calc_signal(func, Ds2, us2, 0.05, lims2,
+                                 method='adaptive', tol=1.e-5)
+    assert np.allclose(sig[:, 0], sig1[:, 0]) and np.all(sig[:, 1] == 0.)
+    assert sum(lnpts) <= npts1 + 1
@@ -561,6 +561,58 @@ class Test01_Struct(object):
                     pfe = obj.save_to_txt(return_pfe=True, verb=verb)
                     os.remove(pfe)
 
+    def test20_get_sampleV_tiles(self):
+        ldomain = [None,
+                   [[2., 3.], [0., None], [0., np.pi/2.]]]
+        for typ in self.dobj.keys():
+            for c in self.dobj[typ].keys():
+                if issubclass(eval('tfg.%s'%c), tfg._core.StructOut):
+                    continue
+                for n in self.dobj[typ][c].keys():
+                    obj = self.dobj[typ][c][n]
+                    for dom in ldomain:
+                        pts, dV, ind, reseff = obj.get_sampleV(
+                            0.1, domain=dom, returnas='(X,Y,Z)',
+                        )
+                        lt = list(obj.get_sampleV_tiles(
+                            0.1, domain=dom, returnas='(X,Y,Z)',
+                            tile_pts=500,
+                        ))
+                        assert len(lt) > 1
+                        assert all([tt[2].size <= 1000 for tt in lt])
+                        indt = np.concatenate([tt[2] for tt in lt])
+                        ptst = np.concatenate([tt[0] for tt in lt], axis=1)
+                        ii, iit = np.argsort(ind), np.argsort(indt)
+                        assert np.array_equal(ind[ii], indt[iit])
+                        assert np.allclose(pts[:, ii], ptst[:, iit])
+
+                        # memmap
+                        pfe = os.path.join(_here, 'TFG_memmap')
+                        out = obj.get_sampleV(
+                            0.1, domain=dom, returnas='(X,Y,Z)',
+                            tile_pts=500, memmap=pfe,
+                        )
+                        iim = np.argsort(out[2])
+                        assert np.array_equal(ind[ii], out[2][iim])
+                        assert np.allclose(pts[:, ii], out[0][:, iim])
+                        assert np.allclose(
+                            np.broadcast_to(dV, ind.shape)[ii],
+                            np.broadcast_to(out[1], ind.shape)[iim],
+                        )
+                        for ii, rr in enumerate(lt[0][3]):
+                            if np.isscalar(rr):
+                                assert np.allclose(out[3][ii], reseff[ii])
+                            else:
+                                assert len(out[3][ii]) == len(lt)
+                                assert all([
+                                    np.allclose(out[3][ii][jj], tt[3][ii])
+                                    for jj, tt in enumerate(lt)
+                                ])
+                        del out
+                        for ext in ['pts', 'dV', 'ind']:
+                            if os.path.isfile(pfe + '_{}.bin'.format(ext)):
+                                os.remove(pfe + '_{}.bin'.format(ext))
+
 
 #######################################################
 #
@@ -797,6 +849,91 @@ class Test02_Config(object):
             obj.strip(0, verb=verb)
             os.remove(pfe)
 
+    def test19_get_geom_buffer(self):
+        conf = tf.load_config('WEST', strict=True)
+        dbuf = conf.get_geom_buffer()
+        nout = len([ss for ss in conf.lStruct if ss._InOut == 'out'])
+        assert dbuf['nstruct_lim'] == nout
+        assert dbuf['lstruct_polyx'].base is dbuf['lstruct_normy'].base
+        assert dbuf['lnvert'][-1] == dbuf['lstruct_polyx'].size
+        # cached, read-only
+        assert conf.get_geom_buffer()['lstruct_polyx'] is dbuf['lstruct_polyx']
+        assert not dbuf['lstruct_polyx'].flags.writeable
+        assert not dbuf['ves_poly'].flags.writeable
+        # saved / loaded
+        pfe = conf.save_geom_buffer(path=_here, verb=False)
+        dload = tf.geom.Config.load_geom_buffer(pfe)
+        os.remove(pfe)
+        for kk, vv in dbuf.items():
+            if kk == 'lstruct_lims':
+                assert all([
+                    np.allclose(aa, bb) for aa, bb in zip(vv, dload[kk])
+                ])
+            else:
+                assert np.all(np.asarray(vv) == np.asarray(dload[kk]))
+        # moving a struct invalidates the cache
+        ss = [ss for ss in conf.lStruct if ss._InOut == 'out'][0]
+        ss.translate_in_cross_section(distance=0.01, direction_rz=[1., 0.],
+                                      return_copy=False)
+        dbuf2 = conf.get_geom_buffer()
+        assert dbuf2['version'] == dbuf['version'] + 1
+        assert not np.allclose(dbuf2['lstruct_polyx'], dbuf['lstruct_polyx'])
+        # removing / adding a struct invalidates the cache (version increases)
+        conf.remove_Struct(ss.Id.Cls, ss.Id.Name)
+        dbuf3 = conf.get_geom_buffer()
+        assert dbuf3['nstruct_lim'] == nout - 1
+        assert dbuf3['version'] > dbuf2['version']
+        conf.add_Struct(struct=ss, dextraprop={'visible': True})
+        dbuf4 = conf.get_geom_buffer()
+        assert dbuf4['nstruct_lim'] == nout
+        assert dbuf4['version'] > dbuf3['version']
+
+    def test20_calc_solidangle_particle_eps(self):
+        conf = tf.load_config('WEST', strict=True)
+        theta = np.linspace(-1, 1, 50)*np.pi
+        part_traj = np.array([
+            2.4*np.cos(theta),
+            2.4*np.sin(theta),
+            0.2*np.sin(3*theta),
+        ])
+        part_radius = 1.e-3
+        eps = 1.e-6
+
+        # pts x particles
+        pts = np.array([[2.5, 0., 0.], [2.5, 0., 0.5], [3., 1., -0.3]]).T
+        for block in [False, True]:
+            sang0 = conf.calc_solidangle_particle(
+                pts=pts, part_traj=part_traj, part_radius=part_radius,
+                block=block,
+            )
+            sang1 = conf.calc_solidangle_particle(
+                pts=pts, part_traj=part_traj, part_radius=part_radius,
+                block=block, eps_sang=eps,
+            )
+            iok = sang0 >= eps
+            assert np.allclose(sang1[iok], sang0[iok])
+            assert np.all(sang1[~iok] == 0.)
+
+        # integrated
+        for block in [False, True]:
+            out0 = conf.calc_solidangle_particle_integrated(
+                part_traj=part_traj, part_radius=part_radius,
+                resolution=0.3, block=block, plot=False,
+            )
+            # grouping alone changes nothing
+            out1 = conf.calc_solidangle_particle_integrated(
+                part_traj=part_traj, part_radius=part_radius,
+                resolution=0.3, block=block, plot=False, ngroups=7,
+            )
+            out2 = conf.calc_solidangle_particle_integrated(
+                part_traj=part_traj, part_radius=part_radius,
+                resolution=0.3, block=block, plot=False, eps_sang=eps,
+            )
+            assert np.allclose(out0[1], out1[1])
+            assert np.all(out2[1] <= out0[1] + 1.e-14)
+            assert np.all(out2[1] >= 0.)
+            assert np.max(np.abs(out2[1] - out0[1])) < 0.05*np.max(out0[1])
+
 
 #######################################################
 #
@@ -1078,7 +1215,7 @@ class Test03_Rays(object):
             return E
 
         ind = None#[0,10,20,30,40]
-        minimize = ["memory", "calls", "hybrid"]
+        minimize = ["memory", "calls", "hybrid", "chunks"]
         for typ in self.dobj.keys():
             c = 'CamLOS1D'
             obj = self.dobj[typ][c]
@@ -1086,7 +1223,7 @@ class Test03_Rays(object):
                 rm = 'rel'
                 # for rm in ["abs", "rel"]:
                 sigref, ii = None, 0
-                for dm in ["simps", "romb", "sum"]:
+                for dm in ["simps", "romb", "sum", "adaptive"]:
                     for mmz in minimize:
                         ff = ffT if obj.config.Id.Type == 'Tor' else ffL
                         t = np.arange(0, 10, 10)
@@ -1182,6 +1319,63 @@ class Test03_Rays(object):
                     assert np.all(k[lind[0]:] >= DL[0][1])
                     assert np.all(k[lind[0]:] <= DL[1][1])
 
+    def test17_calc_signal_from_Plasma2D_geommat(self):
+        import matplotlib.tri as mpltri
+        import tofu.data as tfdata
+        obj = self.dobj['Tor']['CamLOS1D']
+        t = np.linspace(0., 1., 5)
+        R, Z = np.meshgrid(np.linspace(1.5, 3.5, 21),
+                           np.linspace(-1.2, 1.2, 25), indexing='ij')
+        nodes = np.array([R.ravel(), Z.ravel()]).T
+        faces = mpltri.Triangulation(nodes[:, 0], nodes[:, 1]).triangles
+        for ftype in [1, 0]:
+            if ftype == 1:
+                rr, zz = nodes[:, 0], nodes[:, 1]
+            else:
+                rr, zz = np.mean(nodes[faces], axis=1).T
+            val = (np.exp(-((rr - 2.5)**2 + zz**2)/0.3)[None, :]
+                   * (1. + t[:, None]))
+            plasma = tfdata.Plasma2D(
+                dtime={'t': {'data': t}},
+                dmesh={'m0': {'type': 'tri', 'ftype': ftype, 'ntri': 1,
+                              'nodes': nodes, 'faces': faces}},
+                d2d={'emis': {'data': val, 'depend': ('t', 'm0')}},
+                Name='test', Exp=_Exp,
+            )
+            for method in ['sum', 'simps']:
+                kwdargs = dict(quant='emis', res=0.01, method=method,
+                               plot=False, returnas=np.ndarray)
+                sig = obj.calc_signal_from_Plasma2D(plasma, **kwdargs)[0]
+                sigm = obj.calc_signal_from_Plasma2D(plasma, geommat=True,
+                                                     **kwdargs)[0]
+                assert np.any(sig > 0.)
+                assert np.allclose(sig, sigm)
+                # cached
+                geom = obj.calc_geommatrix_from_Plasma2D(
+                    plasma, quant='emis', res=0.01, method=method)
+                assert geom.shape[1] == val.shape[1]
+                assert obj.calc_geommatrix_from_Plasma2D(
+                    plasma, quant='emis', res=0.01, method=method) is geom
+                assert np.allclose(geom.dot(val[2, :]), sig[2, :])
+
+        # options the geometry matrix cannot honour are refused
+        try:
+            obj.calc_signal_from_Plasma2D(plasma, geommat=True,
+                                          interp_t='linear', **kwdargs)
+            raise Exception('interp_t should have been refused!')
+        except Exception as err:
+            assert 'geommat=True' in str(err)
+
+        # least recently used matrices are evicted beyond the memory cap
+        import tofu.geom._core as _core
+        maxbytes = _core._GEOMMAT_MAXBYTES
+        try:
+            _core._GEOMMAT_MAXBYTES = 0
+            obj.calc_geommatrix_from_Plasma2D(plasma, quant='emis', res=0.02)
+            assert len(obj._dgeommat) == 1
+        finally:
+            _core._GEOMMAT_MAXBYTES = maxbytes
+
 
 """
 class Test04_LOSCams(Test03_Rays):
@@ -308,6 +308,12 @@ class Test01_Crystal(object):
             lamb, phi, dtheta, psi, xi, xj = obj.get_lamb_avail_from_pts(
                 pts=pts, det=det, strict=True,
             )
+            # chunks of pts must not change the result
+            out = obj.get_lamb_avail_from_pts(
+                pts=pts, det=det, strict=True, chunk_pts=7,
+            )
+            for aa, bb in zip((lamb, phi, dtheta, psi, xi, xj), out):
+                assert np.allclose(aa, bb, equal_nan=True)
 
     def test11_calc_johann_error(self):
         for k0, obj in self.dobj.items():
@@ -387,3 +393,30 @@ class Test01_Crystal(object):
             # Just to check the loaded version works fine
             obj2.strip(0)
             os.remove(pfe)
+
+    def test16_get_lut(self):
+        for k0, obj in self.dobj.items():
+            det = obj.get_detector_approx()
+            bragg, phi, lamb = obj.get_lambbraggphi_from_ptsxixj_dthetapsi(
+                xi=self.xi, xj=self.xj, det=det, grid=True,
+            )
+            dlut = obj.get_lut(
+                xi=self.xi, xj=self.xj, det=det, nlambfit=50, nphifit=20,
+            )
+            assert np.allclose(dlut['lamb'], lamb[..., 0], equal_nan=True)
+            assert dlut['indlamb'].shape == (self.xi.size, self.xj.size)
+            dlut2 = obj.get_lut(
+                xi=self.xi, xj=self.xj, det=det, nlambfit=50, nphifit=20,
+            )
+            assert dlut2['lamb'] is dlut['lamb']
+
+            # save / load in a copy (same geometry)
+            pfe = obj.save_lut(verb=False)
+            obj2 = obj.copy()
+            obj2.load_lut(pfe)
+            assert len(obj2._dlut['dlut']) == 1
+            os.remove(pfe)
+
+            # Changing the geometry clears the tables
+            obj2.update_non_parallelism(alpha=0., beta=0.)
+            assert len(obj2._dlut['dlut']) == 0
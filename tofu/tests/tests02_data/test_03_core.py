@@ -4,6 +4,7 @@ This module contains tests for tofu.geom in its structured version
 
 # Built-in
 import os
+import shutil
 import warnings
 
 # Standard
@@ -389,8 +390,96 @@ class Test01_DataCam12D(object):
             obj = tfu.load(pfe, verb=verb)
             # Just to check the loaded version works fine
             assert oo == obj
+
+            # Partial load
+            dd = tfu.load(pfe, verb=verb, fields=['dId', 'ddataRef.data'])
+            assert sorted(dd.keys()) == ['dId', 'ddataRef']
+            assert list(dd['ddataRef'].keys()) == ['data']
+            assert np.allclose(dd['ddataRef']['data'], oo.ddataRef['data'])
+            assert dd['dId']['dall']['Name'] == oo.Id.Name
             os.remove(pfe)
 
+            # Directory of .npy, with memory-mapped arrays
+            pfe = oo.save(deep=False, mode='npy', verb=verb, return_pfe=True)
+            obj = tfu.load(pfe, verb=verb)
+            assert oo == obj
+            dd = tfu.load(pfe, verb=verb, fields='dtreat')
+            assert sorted(dd['dtreat'].keys()) == sorted(oo.dtreat.keys())
+            dd = tfu._load_npy(pfe, mmap=0)
+            lk = [kk for kk in dd.keys() if 'ddataRef' in kk and 'data' in kk]
+            assert all([isinstance(dd[kk].base, np.memmap) for kk in lk
+                        if isinstance(dd[kk], np.ndarray)])
+            shutil.rmtree(pfe)
+
+    def test24_get_data(self):
+        for oo in self.lobj:
+            oo.strip(0)
+            oo.clear_dtreat(force=True)
+            dref = oo.ddataRef['data']
+
+            # No treatment => read-only view of the reference (no copy)
+            assert np.shares_memory(oo.data, dref)
+            assert not oo.data.flags.writeable
+
+            # Treated slice, without treating the full data
+            oo.set_dtreat_indt(indt=np.arange(1, oo.ddataRef['nt'], 2))
+            oo.set_dtreat_mask(ind=[0, 3], val=np.nan)
+            oo.set_dtreat_data0(data0=dref[0, ...])
+            ref = dref[1::2, ...] - dref[0:1, ...]
+            ref[:, [0, 3], ...] = np.nan
+            indt, indch = [0, 2], np.arange(1, oo.ddataRef['nch'], 3)
+            sub = oo.get_data(indt=indt, indch=indch)
+            assert oo._ddata['uptodate'] is False
+            assert np.allclose(sub, ref[indt, ...][:, indch, ...],
+                               equal_nan=True)
+            assert np.allclose(oo.data, ref, equal_nan=True)
+            assert not np.shares_memory(oo.data, dref)
+            assert np.allclose(oo.get_data(indt=indt, indch=indch), sub,
+                               equal_nan=True)
+            oo.clear_dtreat(force=True)
+
+    def test25_treatcache(self):
+        for oo in self.lobj:
+            oo.strip(0)
+            oo.clear_dtreat(force=True)
+            dref = oo.ddataRef['data']
+            dstage = oo._dtreatcache['dstage']
+            assert len(dstage) == 0
+
+            # One cached intermediate per step (mask, data0)
+            oo.set_dtreat_mask(ind=[0, 3], val=np.nan)
+            oo.set_dtreat_data0(data0=dref[0, ...])
+            ref = dref - dref[0:1, ...]
+            ref[:, [0, 3], ...] = np.nan
+            assert np.allclose(oo.data, ref, equal_nan=True)
+            assert len(dstage) == 2
+            assert not oo.data.flags.writeable
+
+            # Changing data0 only re-uses the masked data
+            oo.set_dtreat_data0(data0=dref[1, ...])
+            ref = dref - dref[1:2, ...]
+            ref[:, [0, 3], ...] = np.nan
+            assert np.allclose(oo.data, ref, equal_nan=True)
+            assert len(dstage) == 3
+
+            # Back to previous parameters => no new stage
+            oo.set_dtreat_data0(data0=dref[0, ...])
+            ref = dref - dref[0:1, ...]
+            ref[:, [0, 3], ...] = np.nan
+            assert np.allclose(oo.data, ref, equal_nan=True)
+            assert len(dstage) == 3
+
+            # Memory budget
+            oo.set_treatcache(maxbytes=dref.nbytes)
+            assert oo._dtreatcache['nbytes'] <= dref.nbytes
+            oo.set_treatcache(maxbytes=0)
+            assert len(dstage) == 0
+            assert oo._dtreatcache['nbytes'] == 0
+            oo.set_dtreat_data0(data0=dref[1, ...])
+            assert len(dstage) == 0
+            oo.set_treatcache()
+            oo.clear_dtreat(force=True)
+
 
 
 
@@ -589,3 +678,101 @@ class Test02_Data2D(Test01_Data1D):
                              normt=True, dmargin=None)
         plt.close('all')
 """
+
+
+class Test03_Plasma2D(object):
+
+    @classmethod
+    def setup_class(cls):
+        import matplotlib.tri as mpltri
+        t = np.linspace(0., 1., 7)
+        R, Z = np.meshgrid(np.linspace(1.6, 3.2, 17),
+                           np.linspace(-1.2, 1.2, 25), indexing='ij')
+        nodes = np.array([R.ravel(), Z.ravel()]).T
+        faces = mpltri.Triangulation(nodes[:, 0], nodes[:, 1]).triangles
+        rho = (np.hypot(nodes[:, 0] - 2.4, nodes[:, 1])[None, :]
+               * (1. + 0.1*t[:, None]))
+        rho1d = np.linspace(0., 2., 30)
+        cls.t = t
+        cls.rho1d = rho1d
+        cls.mpltri = mpltri.Triangulation(nodes[:, 0], nodes[:, 1], faces)
+        cls.obj = tfd.Plasma2D(
+            dtime={'t': {'data': t}},
+            dradius={'rho1d': {'data': np.tile(rho1d, (t.size, 1)),
+                               'depend': ('t', 'rho1d')}},
+            dmesh={'m0': {'type': 'tri', 'ftype': 1, 'ntri': 1,
+                          'nodes': nodes, 'faces': faces}},
+            d1d={'te': {'data': (np.exp(-rho1d[None, :]**2)
+                                 * (1. + t[:, None])),
+                        'depend': ('t', 'rho1d'), 'quant': 'te'},
+                 'rho': {'data': np.tile(rho1d, (t.size, 1)),
+                         'depend': ('t', 'rho1d'), 'quant': 'rho'}},
+            d2d={'emis': {'data': np.exp(-rho**2/0.3)*(1. + t[:, None]),
+                          'depend': ('t', 'm0')},
+                 'rho2d': {'data': rho, 'depend': ('t', 'm0'),
+                           'quant': 'rho'}},
+            Name='Test', Exp='Dummy', SavePath=_here,
+        )
+        npts = 1000
+        cls.pts = np.array([np.linspace(1.4, 3.4, npts),
+                            np.zeros((npts,)),
+                            np.linspace(-1.4, 1.4, npts)])
+
+    def test01_interp_pts2profile(self):
+        import matplotlib.tri as mpltri
+        import tofu.data._comp as _comp
+        r, z = self.pts[0, :], self.pts[2, :]
+        vquant = self.obj._ddata['emis']['data']
+        tblock = _comp._TBLOCK_SIZE
+        for nthreads in [None, 2]:
+            # small time blocks to actually use the thread pool
+            _comp._TBLOCK_SIZE = 3*self.pts.shape[1]*2
+            try:
+                val, t = self.obj.interp_pts2profile(
+                    pts=self.pts, quant='emis', interp_t='nearest',
+                    fill_value=0., nthreads=nthreads,
+                )
+            finally:
+                _comp._TBLOCK_SIZE = tblock
+            assert val.shape == (self.t.size, self.pts.shape[1])
+            for ii in range(self.t.size):
+                vref = mpltri.LinearTriInterpolator(
+                    self.mpltri, vquant[ii, :],
+                )(r, z).filled(0.)
+                assert np.allclose(val[ii, :], vref)
+
+    def test02_interp_pts2profile_ref1d(self):
+        val, t = self.obj.interp_pts2profile(
+            pts=self.pts, quant='te', ref1d='rho', ref2d='rho2d',
+            t=self.t[1:3], interp_t='nearest', fill_value=0.,
+        )
+        assert val.shape == (2, self.pts.shape[1])
+        assert np.all(val >= 0.) and np.any(val > 0.)
+
+    def test03_ptscache(self):
+        self.obj.set_ptscache(clear=True)
+        val0, t0 = self.obj.interp_pts2profile(
+            pts=self.pts, quant='emis', interp_t='nearest', fill_value=0.,
+        )
+        ind0, wgt0 = self.obj._get_pts2mesh_weights(self.pts, 'm0')
+        assert len(self.obj._dptscache['dpts']) == 1
+
+        # Same points (new array) and other quantity => cache hit
+        val1, t1 = self.obj.interp_pts2profile(
+            pts=self.pts.copy(), quant='te', ref1d='rho', ref2d='rho2d',
+            interp_t='nearest', fill_value=0.,
+        )
+        ind1, wgt1 = self.obj._get_pts2mesh_weights(self.pts.copy(), 'm0')
+        assert ind1 is ind0 and wgt1 is wgt0
+        assert len(self.obj._dptscache['dpts']) == 1
+
+        # Disabled cache => same values
+        self.obj.set_ptscache(maxbytes=0)
+        assert len(self.obj._dptscache['dpts']) == 0
+        assert self.obj._dptscache['nbytes'] == 0
+        val2, t2 = self.obj.interp_pts2profile(
+            pts=self.pts, quant='emis', interp_t='nearest', fill_value=0.,
+        )
+        assert len(self.obj._dptscache['dpts']) == 0
+        assert np.allclose(val0, val2)
+        self.obj.set_ptscache()
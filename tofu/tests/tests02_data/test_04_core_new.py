@@ -10,6 +10,7 @@ import warnings
 # Standard
 import numpy as np
 import scipy.constants as scpct
+import scipy.interpolate as scpinterp
 import matplotlib.pyplot as plt
 
 # tofu-specific
@@ -657,6 +658,17 @@ class Test02_SpectralLines(object):
             key='Ar16_9_oa_pec40_cl', ne=ne, Te=Te[:ne.size], grid=False,
         )
 
+        # pre-computed splines vs direct interpolation
+        key = 'Ar16_9_oa_pec40_cl'
+        keypec, ne0, Te0 = self.sl._get_pec_refs(key=key)
+        pec = np.exp(scpinterp.RectBivariateSpline(
+            np.log(self.sl.ddata[ne0]['data']),
+            np.log(self.sl.ddata[Te0]['data']),
+            np.log(self.sl.ddata[keypec]['data']),
+            kx=2, ky=2,
+        )(np.log(ne), np.log(Te[:ne.size]), grid=False))
+        assert np.allclose(dpec[key], pec)
+
     def test05_calc_intensity(self):
         ne = np.r_[1e15, 1e18, 1e21]
         Te = np.r_[1e3, 2e3, 3e3, 4e3, 5e3]
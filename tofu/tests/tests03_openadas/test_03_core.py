@@ -169,6 +169,27 @@ class Test01_openadas(object):
         )
         assert isinstance(out, dict)
 
+        # From binary store vs text files
+        out = tfoa.step03_read_all(
+            element='ar',
+            typ1='adf15',
+            lambmin=3.94e-10,
+            lambmax=4.e-10,
+            pec_as_func=False,
+        )
+        out2 = tfoa.step03_read_all(
+            element='ar',
+            typ1='adf15',
+            lambmin=3.94e-10,
+            lambmax=4.e-10,
+            pec_as_func=False,
+            store=False,
+        )
+        assert sorted(out.keys()) == sorted(out2.keys())
+        assert all([
+            np.allclose(out[k0]['pec'], out2[k0]['pec']) for k0 in out.keys()
+        ])
+
         out = tfoa.step03_read_all(
             element='ar',
             charge=16,
@@ -187,3 +208,27 @@ class Test01_openadas(object):
 
     def test04_clear_downloads(self):
         tfoa.clear_downloads()
+
+    def test05_store_rewrite(self):
+        # Re-writing a stored file must not alter arrays read before
+        import tempfile
+        from tofu.openadas2tofu import _read_files
+        path_local = tempfile.mkdtemp()
+        try:
+            pfe = os.path.join(path_local, 'adf15', 'pec_test.dat')
+            os.makedirs(os.path.dirname(pfe))
+            with open(pfe, 'w') as fid:
+                fid.write('test')
+            ldraw = [
+                {'a': {'meta': {'lambda0': 1.}, 'arrays': {'pec': vv}}}
+                for vv in [np.arange(6.).reshape((2, 3)), np.ones((2, 3))]
+            ]
+            dfile = _read_files._store_write(pfe, ldraw[0], path_local)
+            pec0 = _read_files._store_read(dfile, path_local)['a']['arrays']
+            dfile = _read_files._store_write(pfe, ldraw[1], path_local)
+            pec1 = _read_files._store_read(dfile, path_local)['a']['arrays']
+            assert np.allclose(pec0['pec'], ldraw[0]['a']['arrays']['pec'])
+            assert np.allclose(pec1['pec'], ldraw[1]['a']['arrays']['pec'])
+            del pec0, pec1
+        finally:
+            shutil.rmtree(path_local)
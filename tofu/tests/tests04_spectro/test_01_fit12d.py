@@ -368,6 +368,34 @@ class Test01_DataCollection(object):
             assert np.sum(dfit1d['validity'] < 0) == 0
             self.ldfit1d.append(dfit1d)
 
+        # parallel (by blocks of spectra), without chain => same as serial
+        dfit1d = tfs.fit1d(
+            dinput=self.ldinput1d[0],
+            chain=False,
+            jac='dense',
+            nworkers=2,
+            verbose=0,
+        )
+        assert np.allclose(
+            dfit1d['sol_x'], self.ldfit1d[0]['sol_x'], equal_nan=True,
+        )
+
+        # concurrent (threads) serial fits do not share their inputs
+        import concurrent.futures as futures
+        with futures.ThreadPoolExecutor(max_workers=2) as pool:
+            lfut = [
+                pool.submit(
+                    tfs.fit1d, dinput=self.ldinput1d[ii], chain=False,
+                    jac='dense', verbose=0, plot=False,
+                )
+                for ii in [0, 1]
+            ]
+            lfit = [fut.result() for fut in lfut]
+        for ii, dfit1d in enumerate(lfit):
+            assert np.allclose(
+                dfit1d['sol_x'], self.ldfit1d[2*ii]['sol_x'], equal_nan=True,
+            )
+
     def test04_fit1d_dextract(self):
         for ii, dd in enumerate(self.ldfit1d):
             dex = tfs.fit1d_extract(
@@ -516,13 +544,12 @@ class Test01_DataCollection(object):
             )
             self.ldinput2d.append(dinput)
 
-    """
     def test07_funccostjac_2d(self):
         func = tfs._fit12d_funccostjac.multigausfit2d_from_dlines_funccostjac
         for ii, dd in enumerate(self.ldinput2d):
             func_detail, func_cost, func_jac = func(
-                lamb=dd['dprepare']['lamb'],
-                phi=dd['dprepare']['phi'],
+                dd['dprepare']['lamb'],
+                dd['dprepare']['phi'],
                 dinput=dd,
                 dind=dd['dind'], jac='dense',
             )
@@ -535,17 +562,85 @@ class Test01_DataCollection(object):
                 dd=dd['dscales'], dd_name='dscales', dinput=dd,
             )
 
-            y0 = func_detail(x0[0, :], scales=scales[0, :])
+            indok = dd['dprepare']['indok'][0, ...]
+            y0 = func_detail(x0[0, :], scales=scales[0, :], indok=indok)
             y1 = func_cost(
                 x0[0, :],
                 scales=scales[0, :],
-                data=dd['dprepare']['data'][0, :],
+                indok=indok,
+                data=dd['dprepare']['data'][0, ...],
             )
+            jac = func_jac(x0[0, :], scales=scales[0, :], indok=indok)
 
             # check consistency between func_detail and func_cost
             assert np.allclose(
-                np.sum(y0, axis=1) - dd['dprepare']['data'][0, :],
+                np.sum(y0, axis=1) - dd['dprepare']['data'][0, indok],
                 y1,
                 equal_nan=True,
             )
-    """
+            assert jac.shape == (indok.sum(), x0.shape[1])
+
+            # check jac vs central finite differences of func_cost
+            # (at a random x, for each dconstraints, double and dx0)
+            if ii % 48 == 0:
+                rng = np.random.RandomState(ii)
+                xx = x0[0, :] * (1. + 0.1*rng.uniform(-1, 1, x0.shape[1]))
+                jac = func_jac(xx, scales=scales[0, :], indok=indok)
+                jacfd = np.zeros(jac.shape)
+                for jj in range(xx.size):
+                    dx = np.zeros((xx.size,))
+                    dx[jj] = 1.e-6*max(abs(xx[jj]), 1.)
+                    jacfd[:, jj] = (
+                        func_cost(
+                            xx + dx, scales=scales[0, :], indok=indok,
+                            data=dd['dprepare']['data'][0, ...],
+                        )
+                        - func_cost(
+                            xx - dx, scales=scales[0, :], indok=indok,
+                            data=dd['dprepare']['data'][0, ...],
+                        )
+                    ) / (2.*dx[jj])
+                err = np.max(np.abs(jac - jacfd)) / np.max(np.abs(jacfd))
+                assert err < 1.e-5, err
+                jac = func_jac(x0[0, :], scales=scales[0, :], indok=indok)
+
+            # check consistency between dense and sparse jacobian
+            func_jac = func(
+                dd['dprepare']['lamb'],
+                dd['dprepare']['phi'],
+                dinput=dd,
+                dind=dd['dind'], jac='sparse',
+            )[2]
+            jacsp = func_jac(x0[0, :], scales=scales[0, :], indok=indok)
+            assert np.allclose(jacsp.toarray(), jac, equal_nan=True)
+
+    def test08_fit2d_binning(self):
+        data = np.repeat(self.spect2d[None, ...], 3, axis=0)
+        data[1, :5, :5] = np.nan
+        lbinning = [{'phi': 20, 'lamb': 50}, 10]
+        lstream = [None, 2]
+        for binning in lbinning:
+            ldprep = [
+                tfs._fit12d.multigausfit2d_from_dlines_prepare(
+                    data=np.copy(data), lamb=self.lamb, phi=self.var,
+                    binning=binning, nbsplines=5, stream=stream,
+                )
+                for stream in lstream
+            ]
+            nperbin = ldprep[0]['binning']['nperbin']
+            nbins = (
+                ldprep[0]['binning']['phi']['nbins'],
+                ldprep[0]['binning']['lamb']['nbins'],
+            )
+            assert ldprep[0]['data'].shape == (3,) + nbins
+            assert np.array_equal(ldprep[0]['indok'], nperbin > 0)
+            assert np.all(nperbin.sum(axis=(1, 2)) == (~np.isnan(data)).sum(
+                axis=(1, 2)
+            ))
+            assert np.allclose(
+                np.nansum(ldprep[0]['data'], axis=(1, 2)),
+                np.nansum(data, axis=(1, 2)),
+            )
+            assert np.array_equal(
+                ldprep[0]['data'], ldprep[1]['data'], equal_nan=True,
+            )
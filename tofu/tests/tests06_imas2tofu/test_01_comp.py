@@ -0,0 +1,166 @@
+"""
+This module contains tests for tofu.imas2tofu._comp (no database needed)
+"""
+
+# Built-in
+import os
+
+# Standard
+import numpy as np
+import pytest
+
+# tofu-specific (optional dependency: imas)
+pytest.importorskip('imas')
+import tofu.imas2tofu._comp as _comp
+
+
+#######################################################
+#
+#     Minimal ids-like objects
+#
+#######################################################
+
+
+class _Struct(object):
+    def __init__(self, **kwdargs):
+        self.__dict__.update(kwdargs)
+
+
+class _AoS(object):
+    """ Array of structures (hashable, weak-referenceable, like imas') """
+    def __init__(self, lstruct):
+        self.lstruct = lstruct
+
+    def __len__(self):
+        return len(self.lstruct)
+
+    def __getitem__(self, ind):
+        return self.lstruct[ind]
+
+
+#######################################################
+#
+#     Testing get_fsig()
+#
+#######################################################
+
+
+class Test01_get_fsig(object):
+
+    def test01_selection_cache(self):
+        ids = _Struct(channel=_AoS([
+            _Struct(name=nn, value=np.r_[vv])
+            for nn, vv in [('a', 1.), ('b', 2.), ('c', 3.)]
+        ]))
+        fsig = _comp.get_fsig('channel[name=b].value')
+        assert _comp.get_fsig('channel[name=b].value') is fsig
+        assert np.allclose(fsig(ids), 2.)
+        # cached selection
+        assert np.allclose(fsig(ids), 2.)
+
+        # re-filled in place, same length, different order
+        lstruct = ids.channel.lstruct
+        lstruct[:] = lstruct[1:] + lstruct[:1]
+        assert [ss.name for ss in lstruct] == ['b', 'c', 'a']
+        assert np.allclose(fsig(ids), 2.)
+
+        # re-filled in place, different length
+        ids.channel.lstruct.pop(-1)
+        ids.channel.lstruct.insert(0, _Struct(name='d', value=np.r_[5.]))
+        ids.channel.lstruct.insert(0, _Struct(name='e', value=np.r_[6.]))
+        assert np.allclose(fsig(ids), 2.)
+
+        # no match
+        ids.channel.lstruct[2].name = 'f'
+        try:
+            fsig(ids)
+            raise Exception('A missing selection should raise!')
+        except Exception as err:
+            assert 'No / several matching' in str(err)
+
+
+#######################################################
+#
+#     Testing the local disk cache
+#
+#######################################################
+
+
+class Test02_cache(object):
+
+    def test01_save_load_evict(self):
+        import tempfile
+        import shutil
+        path = tempfile.mkdtemp()
+        try:
+            dcache = {'path': path, 'maxbytes': 0, 'maxage': None,
+                      'dkey': {'ids': ['user', 'db', 3, 1, 0]}}
+            lval = [np.arange(10.), ('chan', 3)]
+            lkey = []
+            for ii, val in enumerate(lval):
+                key, pfe = _comp._get_cache_key(dcache, 'ids', 's', 0,
+                                                indt=[ii])
+                _comp._cache_save(pfe, key, val, dcache=dcache)
+                lkey.append((key, pfe))
+
+            # saving does not evict (even beyond maxbytes)
+            for (key, pfe), val in zip(lkey, lval):
+                ok, out = _comp._cache_load(pfe, key)
+                assert ok and np.all(np.asarray(out) == np.asarray(val))
+
+            # eviction
+            _comp.cache_evict(path=path, maxbytes=0)
+            assert not any([_comp._cache_load(pfe, key)[0]
+                            for key, pfe in lkey])
+        finally:
+            shutil.rmtree(path)
+
+    def test02_token(self):
+        import tempfile
+        import shutil
+
+        # token of an ids (got) and by partial get
+        ids = _Struct(ids_properties=_Struct(
+            creation_date='2020-01-01', provider='me',
+            version_put=_Struct(data_dictionary='3.30', access_layer='4.8'),
+        ))
+        token = _comp.get_cache_token(ids)
+        assert '2020-01-01' in token and '4.8' in token
+        ids.partial_get = lambda path, occ: {
+            'ids_properties/creation_date': b'2020-01-01',
+        }.get(path)
+        assert _comp.get_cache_token(ids, occ=0) == token
+        ids.ids_properties = _Struct(
+            creation_date='', provider='',
+            version_put=_Struct(data_dictionary='', access_layer=''),
+        )
+        assert _comp.get_cache_token(ids) is None
+
+        path = tempfile.mkdtemp()
+        try:
+            dcache = {'path': path, 'maxbytes': 0, 'maxage': None,
+                      'dkey': {'ids': ['user', 'db', 3, 1, 0]}}
+            key, pfe = _comp._get_cache_key(dcache, 'ids', 's', 0)
+            _comp._cache_save(pfe, key, np.r_[1.], token='v0',
+                              dcache=dcache)
+            assert _comp._cache_load(pfe, key, token='v0')[0]
+            assert _comp._cache_load(pfe, key)[0]
+
+            # ids re-written in the database => entry removed
+            assert not _comp._cache_load(pfe, key, token='v1')[0]
+            assert not os.path.isfile(pfe)
+
+            # concurrent saves of the same entry (threads of one process)
+            from concurrent.futures import ThreadPoolExecutor
+            lval = [np.full((10000,), ii, dtype=float) for ii in range(16)]
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(
+                    lambda vv: _comp._cache_save(pfe, key, vv, token='v1',
+                                                 dcache=dcache),
+                    lval,
+                ))
+            ok, val = _comp._cache_load(pfe, key, token='v1')
+            assert ok and any([np.array_equal(val, vv) for vv in lval])
+            assert os.listdir(path) == [os.path.basename(pfe)]
+        finally:
+            shutil.rmtree(path)
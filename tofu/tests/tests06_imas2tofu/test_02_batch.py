@@ -0,0 +1,77 @@
+"""
+This module contains tests for loading several shots concurrently
+(backend-independent part of tofu.imas2tofu.load_batch(), no imas needed)
+"""
+
+# Standard
+import numpy as np
+
+# tofu-specific
+import tofu.utils as utils
+
+
+_SHOTERR = 13
+
+
+#######################################################
+#
+#     Stand-in loader (module-level => picklable)
+#
+#######################################################
+
+
+def _load_standin(shot=None, run=None, ids=None):
+    if shot == _SHOTERR:
+        raise Exception('shot {} not in database'.format(shot))
+    return {'shot': shot, 'run': run, 'ids': ids,
+            'data': np.full((3,), shot + 0.1*run)}
+
+
+#######################################################
+#
+#     Testing _load_batch()
+#
+#######################################################
+
+
+class Test01_load_batch(object):
+
+    def test01_pools(self):
+        lshot = [5, (7, 2), _SHOTERR, 5, (5, 0), 3]
+        lok = [(5, 0), (7, 2), (3, 0)]
+        for pool in ['thread', 'process']:
+            lss, dout, derr = utils._load_batch(
+                lshot=lshot, func=_load_standin, run=0, nworkers=3,
+                pool=pool, kwdargs={'ids': 'wall'},
+            )
+
+            # de-duplicated, in the order of lshot, default run
+            assert lss == [(5, 0), (7, 2), (_SHOTERR, 0), (3, 0)]
+            assert list(dout.keys()) == lok
+            for (ss, rr), obj in dout.items():
+                assert obj['shot'] == ss and obj['run'] == rr
+                assert obj['ids'] == 'wall'
+                assert np.allclose(obj['data'], ss + 0.1*rr)
+
+            # the failing shot does not stop the others
+            assert list(derr.keys()) == [(_SHOTERR, 0)]
+            assert 'not in database' in derr[(_SHOTERR, 0)]
+
+    def test02_inputs(self):
+        lss, dout, derr = utils._load_batch(
+            lshot=4, func=_load_standin, run=1, pool='thread',
+        )
+        assert lss == [(4, 1)] and list(dout.keys()) == [(4, 1)]
+        assert len(derr) == 0
+
+        dkwd = {'lshot': [4], 'func': _load_standin}
+        for kk, vv in [('lshot', []), ('lshot', [(4, 1, 2)]),
+                       ('func', 'Config'), ('nworkers', 0),
+                       ('pool', 'mpi')]:
+            kwd = dict(dkwd)
+            kwd[kk] = vv
+            try:
+                utils._load_batch(**kwd)
+                raise Exception('Arg {} = {} should raise!'.format(kk, vv))
+            except Exception as err:
+                assert 'Arg {}'.format(kk) in str(err)
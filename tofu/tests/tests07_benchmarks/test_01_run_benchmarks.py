@@ -0,0 +1,160 @@
+"""
+This module contains tests for the benchmarks runner (run_benchmarks.py):
+choice of the reference baseline and detection of regressions
+"""
+
+# Built-in
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import importlib.util
+
+# Standard
+import numpy as np
+import pytest
+
+
+_HERE = os.path.abspath(os.path.dirname(__file__))
+_PFE = os.path.join(_HERE, '..', '..', '..', 'benchmarks', 'run_benchmarks.py')
+if not os.path.isfile(_PFE):
+    pytest.skip('benchmarks/ not available (not a tofu git repo)',
+                allow_module_level=True)
+if shutil.which('git') is None:
+    pytest.skip('git not available', allow_module_level=True)
+
+
+def _load_runner():
+    lpath = list(sys.path)
+    spec = importlib.util.spec_from_file_location('run_benchmarks', _PFE)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    sys.path[:] = lpath
+    return mod
+
+
+def _git(repo, *args):
+    out = subprocess.run(
+        ('git', '-c', 'user.name=tofu', '-c', 'user.email=tofu@tofu')
+        + args,
+        cwd=repo, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        check=True,
+    ).stdout
+    return out.decode().strip()
+
+
+def _save_baseline(path, name, dres):
+    with open(os.path.join(path, name + '.json'), 'w') as fid:
+        json.dump({'meta': {'commit': name.split('_')[0]}, 'results': dres},
+                  fid)
+
+
+#######################################################
+#
+#     Setup and Teardown
+#
+#######################################################
+
+
+def setup_module(module):
+    """ A git repo with commits A - B - C (HEAD) and a side branch A - D """
+    module.runner = _load_runner()
+    module.repo = tempfile.mkdtemp()
+    module.dsha = {}
+    _git(repo, 'init', '-q')
+    for cc in ['A', 'B', 'C']:
+        _git(repo, 'commit', '-q', '--allow-empty', '-m', cc)
+        module.dsha[cc] = _git(repo, 'rev-parse', 'HEAD')
+    _git(repo, 'checkout', '-q', '-b', 'side', dsha['A'])
+    _git(repo, 'commit', '-q', '--allow-empty', '-m', 'D')
+    module.dsha['D'] = _git(repo, 'rev-parse', 'HEAD')
+    _git(repo, 'checkout', '-q', dsha['C'])
+    runner._REPO = repo
+    runner.istofugit = True
+
+
+def teardown_module(module):
+    shutil.rmtree(module.repo)
+
+
+#######################################################
+#
+#     Testing the runner
+#
+#######################################################
+
+
+class Test01_Runner(object):
+
+    def setup_method(self):
+        self.path = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        shutil.rmtree(self.path)
+
+    def test01_get_reference(self):
+        path = self.path
+        assert runner.get_reference(path=path) is None
+
+        # Not ancestors of HEAD, dirty tree, unknown commit
+        _save_baseline(path, dsha['D'], {})
+        _save_baseline(path, dsha['B'] + '_dirty', {})
+        _save_baseline(path, 'nogit', {})
+        _save_baseline(path, 'f'*40, {})
+        assert runner.get_reference(path=path) is None
+
+        # Nearest ancestor
+        _save_baseline(path, dsha['A'], {})
+        pfeA = os.path.join(path, dsha['A'] + '.json')
+        assert runner.get_reference(path=path) == pfeA
+        _save_baseline(path, dsha['B'], {})
+        pfeB = os.path.join(path, dsha['B'] + '.json')
+        assert runner.get_reference(path=path) == pfeB
+        assert runner.get_reference(path=path, exclude=pfeB) == pfeA
+
+        # HEAD itself is eligible
+        _save_baseline(path, dsha['C'], {})
+        pfeC = os.path.join(path, dsha['C'] + '.json')
+        assert runner.get_reference(path=path) == pfeC
+
+    def test02_compare(self):
+        dref = {
+            'slower': {'min': 1.}, 'same': {'min': 1.},
+            'faster': {'min': 1.}, 'limit': {'min': 1.},
+            'fails': {'min': 1.}, 'failedref': {'error': 'Exception: ...'},
+        }
+        dout = {
+            'slower': {'min': 1.5}, 'same': {'min': 1.},
+            'faster': {'min': 0.5}, 'limit': {'min': 1.2},
+            'fails': {'error': 'Exception: ...'}, 'failedref': {'min': 1.},
+            'new': {'min': 10.},
+        }
+        lreg = runner.compare(dout, dref, threshold=1.2)
+        assert sorted([rr[0] for rr in lreg]) == ['fails', 'slower']
+        dreg = {rr[0]: rr for rr in lreg}
+        assert np.isclose(dreg['slower'][3], 1.5)
+        assert np.isinf(dreg['fails'][3])
+        assert len(runner.compare(dout, dref, threshold=2.)) == 1
+
+    def test03_main(self):
+        path = self.path
+        _save_baseline(path, dsha['B'], {'bench': {'min': 1.}})
+        get_benchmarks = runner.get_benchmarks
+        run_benchmarks = runner.run_benchmarks
+        try:
+            runner.get_benchmarks = lambda lbench=None: {}
+            for tt, code in [(1.1, 0), (2., 1)]:
+                runner.run_benchmarks = (
+                    lambda dbench, repeat=None, verb=None:
+                    {'bench': {'min': tt, 'median': tt, 'repeat': 1}}
+                )
+                # compared to the nearest ancestor B
+                assert runner.main(path=path, verb=False) == code
+                pfe = os.path.join(path, dsha['C'] + '.json')
+                assert os.path.isfile(pfe)
+                os.remove(pfe)
+        finally:
+            runner.get_benchmarks = get_benchmarks
+            runner.run_benchmarks = run_benchmarks
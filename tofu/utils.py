@@ -2,6 +2,7 @@
 # Built-in
 import os
 import sys
+import json
 import collections
 from abc import ABCMeta, abstractmethod
 import importlib
@@ -10,6 +11,8 @@ import subprocess
 import itertools as itt
 import warnings
 import inspect
+import traceback
+import concurrent.futures as futures
 
 # Common
 import scipy.io as scpio
@@ -28,6 +31,8 @@ _dict_lexcept_key = []
 
 _SAVETYP = '__type__'
 _NSAVETYP = len(_SAVETYP)
+_NPYINDEX = 'index.json'     # index of a 'npy' save (directory of .npy)
+_NPYMMAP = int(1e6)          # 'npy' arrays above this size are memory-mapped
 
 _LIDS_CUSTOM = ['magfieldlines', 'events', 'shortcuts', 'config']
 
@@ -63,7 +68,7 @@ def FindFilePattern(pattern, path, nocc=1, ntab=0):
 
 def get_pathfileext(path=None, name=None,
                     path_def='./', name_def='dummy', mode='npz'):
-    modeok = ['npz','mat']
+    modeok = ['npz','mat','npy']
     modeokstr = "["+", ".join(modeok)+"]"
 
     if name is not None:
@@ -273,6 +278,9 @@ def save(obj, path=None, name=None, sep=None, deep=False, mode='npz',
         Flag specifying the saving mode
             - 'npz': numpy file
             - 'mat': matlab file
+            - 'npy': directory of numpy .npy files (one per array), loaded
+                     lazily (large arrays are memory-mapped, so only the
+                     slices actually used are read from disk)
     strip:      int
         Flag indicating how stripped the saved object should be
         See docstring of self.strip()
@@ -293,6 +301,7 @@ def save(obj, path=None, name=None, sep=None, deep=False, mode='npz',
                     3/ self.save(deep=False)
     compressed :    bool
         Flag indicating whether to compress the file (slower, not recommended)
+        Not available for mode='npy' (arrays must be stored raw to be mapped)
     verb :          bool
         Flag indicating whether to print a summary (recommended)
 
@@ -303,8 +312,8 @@ def save(obj, path=None, name=None, sep=None, deep=False, mode='npz',
     assert path is None or isinstance(path,str), msg
     msg = "Arg name must be None or a str (file name) !"
     assert name is None or isinstance(name,str), msg
-    msg = "Arg mode must be in ['npz','mat'] !"
-    assert mode in ['npz','mat'], msg
+    msg = "Arg mode must be in ['npz','mat','npy'] !"
+    assert mode in ['npz','mat','npy'], msg
     msg = "Arg compressed must be a bool !"
     assert type(compressed) is bool, msg
     msg = "Arg verb must be a bool !"
@@ -340,6 +349,8 @@ def save(obj, path=None, name=None, sep=None, deep=False, mode='npz',
         _save_npz(dd, pathfileext, sep=sep, compressed=compressed)
     elif mode=='mat':
         _save_mat(dd, pathfileext, sep=sep, compressed=compressed)
+    elif mode=='npy':
+        _save_npy(dd, pathfileext, sep=sep)
 
     # print
     if verb:
@@ -396,6 +407,29 @@ def _save_mat(dd, pathfileext, sep=None, compressed=False):
     scpio.savemat(pathfileext, dsave, do_compression=compressed, format='5')
 
 
+def _save_npy(dd, pathfileext, sep=None):
+    """ Save as a directory of .npy files, indexed by a json file
+
+    Each array is stored raw in its own file, so it can be memory-mapped
+    """
+    dsave = _save_npzmat_dict(dd, sep=sep)
+    if os.path.isdir(pathfileext):
+        # Overwrite a previous save (remove only the files it created)
+        lf = [ff for ff in os.listdir(pathfileext)
+              if ff.endswith('.npy') or ff == _NPYINDEX]
+        for ff in lf:
+            os.remove(os.path.join(pathfileext, ff))
+    else:
+        os.makedirs(pathfileext)
+
+    dind = {}
+    for ii, (k, v) in enumerate(dsave.items()):
+        dind[k] = '{:05d}.npy'.format(ii)
+        np.save(os.path.join(pathfileext, dind[k]), v, allow_pickle=True)
+    with open(os.path.join(pathfileext, _NPYINDEX), 'w') as fid:
+        json.dump(dind, fid, indent=0)
+
+
 
 
 
@@ -514,15 +548,20 @@ def get_param_from_file_name(pfe=None, lparams=None, test=True):
     return dout
 
 
-def load(name, path=None, strip=None, verb=True, allow_pickle=None):
+def load(name, path=None, strip=None, verb=True, allow_pickle=None,
+         fields=None):
     """     Load a tofu object file
 
-    Can load from .npz or .txt files
-        In future versions, will also load from .mat
+    Can load from .npz, .mat, .npy (directory) or .txt files
+    With .npy, large arrays are memory-mapped (copy-on-write), so that
+    loading is fast and only the slices actually used are read from disk
 
     The file must have been saved with tofu (i.e.: must be tofu-formatted)
     The associated tofu object will be created and returned
 
+    Alternatively, only some fields (i.e.: attribute dicts) can be read
+    The object is then not created, and a dict of these fields is returned
+
     Parameters
     ----------
     name:   str
@@ -534,50 +573,102 @@ def load(name, path=None, strip=None, verb=True, allow_pickle=None):
             => see the docstring of the class strip() method for details
     verb:   bool
         Flag indocating whether to print a summary of the loaded file
+    fields: None / str / list of str
+        If provided, only these fields are read from the file (not .txt)
+        Fields are names of attribute dicts (e.g.: 'dgeom', 'ddataRef',
+        'dId'), or of sub-dicts / keys with '.' (e.g.: 'dgeom.Etendues')
+        The rest of the file is not read (nor decompressed)
+
+    Return
+    ------
+    obj:    ToFuObject / dict
+        The loaded object, or a dict {field: dict} if fields is provided
     """
 
-    lmodes = ['.npz', '.mat', '.txt', '.csv']
+    lmodes = ['.npz', '.mat', '.npy', '.txt', '.csv']
     name, mode, pfe = _filefind(name=name, path=path, lmodes=lmodes)
 
+    if fields is not None:
+        if isinstance(fields, str):
+            fields = [fields]
+        c0 = (isinstance(fields, list)
+              and all([isinstance(ff, str) for ff in fields]))
+        if not c0 or mode in ['txt', 'csv']:
+            msg = ("Arg fields must be a str or list of str!\n"
+                   + "  (only available for .npz, .mat and .npy files)\n"
+                   + "  Provided: {} ({})".format(fields, mode))
+            raise Exception(msg)
+
     if mode in ['txt', 'csv']:
         obj = _load_from_txt(name, pfe)
     else:
         if mode == 'npz':
-            dd = _load_npz(pfe, allow_pickle=allow_pickle)
+            dd = _load_npz(pfe, allow_pickle=allow_pickle, fields=fields)
         elif mode == 'mat':
-            dd = _load_mat(pfe)
+            dd = _load_mat(pfe, fields=fields)
+        elif mode == 'npy':
+            dd = _load_npy(pfe, allow_pickle=allow_pickle, fields=fields)
 
         # Recreate from dict
-        lsep, sep, keyMod = ['_', '.'], None, None
-        for ss in lsep:
-            key = 'dId{0}dall{0}Mod'.format(ss)
-            if key in dd.keys():
-                sep = ss
-                keyMod = key
-                break
+        if fields is None:
+            sep, keyMod = _get_sep(dd.keys())
+            mod = importlib.import_module('tofu.{0}'.format(dd[keyMod]))
+            cls = getattr(mod, dd['dId{0}dall{0}Cls'.format(sep)])
+            obj = cls(fromdict=dd, sep=sep)
         else:
-            msg = "No known separator in file keys!\n"
-            msg += "    - separators tested: {0}\n".format(lsep)
-            msg += "    - keys:\n"
-            msg += str(dd.keys())
-            raise Exception(msg)
-
-        mod = importlib.import_module('tofu.{0}'.format(dd[keyMod]))
-        cls = getattr(mod, dd['dId{0}dall{0}Cls'.format(sep)])
-        obj = cls(fromdict=dd, sep=sep)
+            obj = reshape_dict(dd, sep=dd.pop('sep'))
 
-    if strip is not None:
+    if strip is not None and fields is None:
         obj.strip(strip=strip)
 
     # print
     if verb:
         msg = "Loaded from:\n"
         msg += "    "+pfe
+        if fields is not None:
+            msg += "\n    fields: {}".format(fields)
         print(msg)
     return obj
 
 
-def _get_load_npzmat_dict(out, pfe, mode='npz', exclude_keys=[]):
+def _get_sep(lk):
+    """ Return the separator used in the (flat) keys of a file, and the key
+    of the module name """
+    lsep = ['_', '.']
+    for ss in lsep:
+        key = 'dId{0}dall{0}Mod'.format(ss)
+        if key in lk:
+            return ss, key
+    msg = "No known separator in file keys!\n"
+    msg += "    - separators tested: {0}\n".format(lsep)
+    msg += "    - keys:\n"
+    msg += str(lk)
+    raise Exception(msg)
+
+
+def _get_fields_keys(lk, fields=None, pfe=None):
+    """ Return the (flat) keys of lk belonging to the required fields
+
+    Also returns the separator used in the keys
+    """
+    lk = list(lk)
+    sep = _get_sep(lk)[0]
+    lkeys = []
+    for ff in fields:
+        ffs = ff.replace('.', sep)
+        lkf = [kk for kk in lk
+               if kk in [ffs, ffs + _SAVETYP] or kk.startswith(ffs + sep)]
+        if len(lkf) == 0:
+            lf = sorted(set([kk.split(sep)[0] for kk in lk]))
+            msg = ("Field {} not found in {}\n".format(ff, pfe)
+                   + "  Available fields: {}".format(lf))
+            raise Exception(msg)
+        lkeys += [kk for kk in lkf if kk not in lkeys]
+    return lkeys, sep
+
+
+def _get_load_npzmat_dict(out, pfe, mode='npz', exclude_keys=[],
+                          fields=None):
 
     C = ['dId' in kk for kk in out.keys()]
     if np.sum(C) < 1:
@@ -585,9 +676,14 @@ def _get_load_npzmat_dict(out, pfe, mode='npz', exclude_keys=[]):
         msg += "\n    => Is it really a tofu-generated file ?"
         raise Exception(msg)
 
-    lk = [k for k in out.keys()
+    # Only read the keys of the required fields (if any)
+    lkeys, sep = list(out.keys()), None
+    if fields is not None:
+        lkeys, sep = _get_fields_keys(lkeys, fields=fields, pfe=pfe)
+
+    lk = [k for k in lkeys
           if (k[-_NSAVETYP:] != _SAVETYP and k not in exclude_keys)]
-    lkt = [k for k in out.keys() if k[-_NSAVETYP:] == _SAVETYP]
+    lkt = [k for k in lkeys if k[-_NSAVETYP:] == _SAVETYP]
     dout = dict.fromkeys(lk)
 
     err, msgi = False, ""
@@ -637,10 +733,12 @@ def _get_load_npzmat_dict(out, pfe, mode='npz', exclude_keys=[]):
         msg += msgi
         raise Exception(msg)
 
+    if fields is not None:
+        dout['sep'] = sep
     return dout
 
 
-def _load_npz(pfe, allow_pickle=None):
+def _load_npz(pfe, allow_pickle=None, fields=None):
     if allow_pickle is None:
         allow_pickle = True
 
@@ -652,18 +750,72 @@ def _load_npz(pfe, allow_pickle=None):
     except Exception as err:
         raise err
 
-    return _get_load_npzmat_dict(out, pfe, mode='npz', exclude_keys=[])
+    # NpzFile only reads (and decompresses) the arrays that are accessed
+    return _get_load_npzmat_dict(out, pfe, mode='npz', exclude_keys=[],
+                                 fields=fields)
+
 
+def _load_mat(pfe, fields=None):
 
-def _load_mat(pfe):
+    # Only read the variables of the required fields (if any)
+    lvar = None
+    if fields is not None:
+        lk = [ww[0] for ww in scpio.whosmat(pfe)]
+        lvar = _get_fields_keys(lk, fields=fields, pfe=pfe)[0]
+        lvar.append(_get_sep(lk)[1])
 
     try:
-        out = scpio.loadmat(pfe)
+        out = scpio.loadmat(pfe, variable_names=lvar)
     except Exception as err:
         raise err
 
     lsmat = ['__header__', '__globals__', '__version__']
-    return _get_load_npzmat_dict(out, pfe, mode='mat', exclude_keys=lsmat)
+    return _get_load_npzmat_dict(out, pfe, mode='mat', exclude_keys=lsmat,
+                                 fields=fields)
+
+
+class _NpyDir(object):
+    """ Read-on-access mapping of a directory of .npy files (cf. 'npy' mode)
+
+    Files larger than mmap (bytes) are memory-mapped (copy-on-write)
+    """
+
+    def __init__(self, pfe, allow_pickle=True, mmap=_NPYMMAP):
+        pfi = os.path.join(pfe, _NPYINDEX)
+        if not os.path.isfile(pfi):
+            msg = ("No {} in {}\n".format(_NPYINDEX, pfe)
+                   + "    => Is it really a tofu-generated directory ?")
+            raise Exception(msg)
+        with open(pfi, 'r') as fid:
+            self._dind = json.load(fid)
+        self._pfe = pfe
+        self._allow_pickle = allow_pickle
+        self._mmap = mmap
+
+    def keys(self):
+        return self._dind.keys()
+
+    def __getitem__(self, k):
+        pf = os.path.join(self._pfe, self._dind[k])
+        mmap_mode = 'c' if os.path.getsize(pf) >= self._mmap else None
+        try:
+            # plain ndarray view, still backed by the mapped file
+            return np.asarray(np.load(pf, mmap_mode=mmap_mode,
+                                      allow_pickle=self._allow_pickle))
+        except ValueError:
+            # object arrays cannot be memory-mapped
+            return np.load(pf, allow_pickle=self._allow_pickle)
+
+
+def _load_npy(pfe, allow_pickle=None, mmap=None, fields=None):
+    if allow_pickle is None:
+        allow_pickle = True
+    if mmap is None:
+        mmap = _NPYMMAP
+
+    out = _NpyDir(pfe, allow_pickle=allow_pickle, mmap=mmap)
+    return _get_load_npzmat_dict(out, pfe, mode='npy', exclude_keys=[],
+                                 fields=fields)
 
 
 ###############################################
@@ -1579,6 +1731,92 @@ def calc_from_imas(
                 warnings.warn(msg)
 
 
+#############################################
+#       Loading several shots concurrently
+#############################################
+
+
+def _load_batch_one(func, shot, run, kwdargs):
+    """ Load one (shot, run), return (obj, None) or (None, error str) """
+    try:
+        return func(shot=shot, run=run, **kwdargs), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+def _load_batch(lshot=None, func=None, run=None, nworkers=None, pool=None,
+                kwdargs=None):
+    """ Load each (shot, run) with func in a bounded pool of workers
+
+    Backend-independent part of tofu.imas2tofu.load_batch()
+    The shots given as int are loaded with the default run
+    The duplicates are removed, the order of lshot is kept
+
+    Return the list of (shot, run) and the dict of loaded objects and of
+    errors (traceback str), both keyed by (shot, run), in the order of lshot
+    """
+
+    # -------------
+    # Check inputs
+
+    if isinstance(lshot, (int, np.integer, tuple)):
+        lshot = [lshot]
+    c0 = (isinstance(lshot, list) and len(lshot) > 0
+          and all([isinstance(ss, (int, np.integer))
+                   or (isinstance(ss, tuple) and len(ss) == 2)
+                   for ss in lshot]))
+    if not c0:
+        msg = ("Arg lshot must be a list of int (shot) "
+               + "or of (shot, run) tuples!\n"
+               + "\t- provided: {}".format(lshot))
+        raise Exception(msg)
+    lshot = [(int(ss), None) if not isinstance(ss, tuple)
+             else (int(ss[0]), ss[1]) for ss in lshot]
+    lshot = [(ss, run if rr is None else int(rr)) for ss, rr in lshot]
+    lshot = sorted(set(lshot), key=lshot.index)
+
+    if not callable(func):
+        msg = ("Arg func must be a callable!\n"
+               + "\t- provided: {}".format(func))
+        raise Exception(msg)
+    if nworkers is None:
+        nworkers = min(8, len(lshot))
+    if not (isinstance(nworkers, (int, np.integer)) and nworkers > 0):
+        msg = ("Arg nworkers must be a strictly positive int!\n"
+               + "\t- provided: {}".format(nworkers))
+        raise Exception(msg)
+    if pool is None:
+        pool = 'process'
+    if pool not in ['process', 'thread']:
+        msg = ("Arg pool must be in ['process', 'thread']\n"
+               + "\t- provided: {}".format(pool))
+        raise Exception(msg)
+    if kwdargs is None:
+        kwdargs = {}
+
+    # -------------
+    # Load concurrently
+
+    Executor = (futures.ProcessPoolExecutor if pool == 'process'
+                else futures.ThreadPoolExecutor)
+    dres = {}
+    with Executor(max_workers=int(nworkers)) as executor:
+        dfut = {
+            executor.submit(_load_batch_one, func, ss, rr, kwdargs): (ss, rr)
+            for ss, rr in lshot
+        }
+        for fut in futures.as_completed(dfut):
+            try:
+                dres[dfut[fut]] = fut.result()
+            except Exception:
+                # e.g.: worker crash or unpicklable result
+                dres[dfut[fut]] = (None, traceback.format_exc())
+
+    dout = {kk: dres[kk][0] for kk in lshot if dres[kk][1] is None}
+    derr = {kk: dres[kk][1] for kk in lshot if dres[kk][1] is not None}
+    return lshot, dout, derr
+
+
 #############################################
 #       Generic tofu object
 #############################################